@@ -33,6 +33,58 @@ class Settings(BaseSettings):
     enable_alpha_vantage: bool = False  # 默认关闭（需要 API Key）
     alpha_vantage_api_key: str = ""  # Alpha Vantage API Key
 
+    # 批量更新并发配置
+    stock_update_concurrency: int = 10  # 批量更新股票时同时进行的数据源请求数
+    stock_bulk_write_batch_size: int = 500  # 批量保存股票时每次 bulk_write 的数量
+
+    # 数据源限流配置（每秒请求数，0 表示不限流）
+    akshare_rate_limit: float = 5.0
+    yfinance_rate_limit: float = 2.0
+    easyquotation_rate_limit: float = 10.0
+
+    # 数据源专用线程池配置（每个数据源独立线程池，避免慢数据源拖垮其他请求）
+    akshare_executor_workers: int = 4
+    yfinance_executor_workers: int = 4
+    easyquotation_executor_workers: int = 2
+    provider_executor_queue_size: int = 100  # 每个线程池的最大排队数，超过后拒绝请求
+
+    # 历史数据批量下载配置
+    historical_batch_download_size: int = 100  # 美股/港股批量获取历史数据时每次 yf.download 的股票数
+    historical_fetch_concurrency: int = 4  # 批量获取历史数据时并发获取的股票数
+    historical_pipeline_queue_size: int = 20  # 获取与写入之间的队列长度（已获取未写入的股票数上限）
+    historical_write_batch_rows: int = 5000  # 跨股票合并写入时每次 bulk_write 的最大行数
+
+    # K线窗口缓存（历史数据查询、技术指标、数据质量检查共享）
+    kline_cache_max_bytes: int = 256 * 1024 * 1024  # 缓存的最大字节数（0 表示不缓存）
+    kline_cache_ttl: float = 300.0  # 窗口有效期（秒，兜底其他进程写入的数据；0 表示不限）
+
+    # K线流式导出（每批从数据库读取并编码输出的条数）
+    kline_export_batch_size: int = 5000
+
+    # 技术指标计算后端（numpy：内置 NumPy 内核；pandas_ta：使用 pandas-ta，未安装时回退到 numpy）
+    indicator_backend: str = "numpy"
+    indicator_panel_chunk_size: int = 500  # 全市场计算时每个面板（一次查询、一次计算）包含的股票数
+    indicator_write_batch_rows: int = 20000  # 全市场计算时每次 bulk_write 的最大指标数据条数
+
+    # 技术指标计算执行方式（process：进程池；thread：线程池；inline：在事件循环中直接计算）
+    indicator_executor: str = "process"
+    indicator_executor_workers: int = 0  # 进程 / 线程数（0 表示 CPU 核数）
+    indicator_executor_min_rows: int = 20000  # 数据量（K线行数 × 指标数）低于该值时直接计算，不提交到进程池
+
+    # akshare 全市场行情表（stock_zh_a_spot_em / stock_hk_spot_em）快照缓存时间（秒，0 表示不缓存）
+    akshare_spot_cache_ttl: float = 60.0
+
+    # 数据源健康检查配置
+    provider_health_ttl: float = 300.0  # 可用性探测结果缓存时间（秒）
+    provider_health_refresh_interval: float = 60.0  # 后台刷新检查间隔（秒）
+    provider_health_window: int = 20  # 被动健康统计的最近调用次数
+    provider_health_min_success_rate: float = 0.2  # 最近调用成功率低于该值时视为不健康
+
+    # 数据源熔断与自适应排序配置
+    provider_failure_threshold: int = 5  # 连续失败多少次后熔断
+    provider_recovery_timeout: float = 30.0  # 熔断后多久放行试探请求（秒）
+    provider_adaptive_ordering: bool = True  # 是否根据最近成功率和 p95 延迟调整数据源顺序
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -11,11 +11,18 @@ from app.models.stock import init_stock_indexes
 from app.models.schedule import init_schedule_indexes
 from app.models.kline_data import init_kline_data_collection
 from app.models.data_quality import init_data_quality_logs_collection
-from app.models.indicator_data import ensure_indicator_data_collection
+from app.models.indicator_data import (
+    ensure_indicator_data_collection,
+    ensure_indicator_coverage_indexes,
+)
 from app.routers import stocks, schedules, providers, historical_data, indicators
 from app.database import get_database
 from app.services.scheduler_service import get_scheduler_service
 from app.services.providers.initializer import initialize_providers
+from app.services.providers.router import get_stock_data_router
+from app.services.providers.executor import shutdown_provider_executors
+from app.services.indicators.indicator_executor import shutdown_indicator_executor
+from app.services.indicators.indicator_write_queue import get_indicator_write_queue
 
 # 配置日志系统
 def setup_logging():
@@ -70,6 +77,7 @@ async def lifespan(app: FastAPI):
     # 初始化技术指标数据 TimeSeries Collection
     db = get_database()
     await ensure_indicator_data_collection(db)
+    await ensure_indicator_coverage_indexes(db)
 
     # 初始化数据源提供者
     initialize_providers(
@@ -82,7 +90,37 @@ async def lifespan(app: FastAPI):
         iex_cloud_api_key=settings.iex_cloud_api_key,
         enable_alpha_vantage=settings.enable_alpha_vantage,
         alpha_vantage_api_key=settings.alpha_vantage_api_key,
+        akshare_spot_cache_ttl=settings.akshare_spot_cache_ttl,
+        executor_workers={
+            "akshare": settings.akshare_executor_workers,
+            "yfinance": settings.yfinance_executor_workers,
+            "easyquotation": settings.easyquotation_executor_workers,
+        },
+        executor_queue_size=settings.provider_executor_queue_size,
+        rate_limits={
+            "akshare": settings.akshare_rate_limit,
+            "yfinance": settings.yfinance_rate_limit,
+            "easyquotation": settings.easyquotation_rate_limit,
+        },
+    )
+
+    # 配置数据源熔断与自适应排序
+    stock_data_router = get_stock_data_router()
+    stock_data_router.configure_failover(
+        failure_threshold=settings.provider_failure_threshold,
+        recovery_timeout=settings.provider_recovery_timeout,
+        adaptive_ordering=settings.provider_adaptive_ordering,
+    )
+
+    # 启动数据源健康监控（后台刷新可用性，请求路径只读取缓存标记）
+    provider_health = stock_data_router.health
+    provider_health.configure(
+        ttl=settings.provider_health_ttl,
+        refresh_interval=settings.provider_health_refresh_interval,
+        window_size=settings.provider_health_window,
+        min_success_rate=settings.provider_health_min_success_rate,
     )
+    provider_health.start()
 
     # 启动定时任务调度器
     scheduler = get_scheduler_service()
@@ -96,6 +134,18 @@ async def lifespan(app: FastAPI):
     # 关闭时关闭调度器
     scheduler.shutdown()
 
+    # 停止数据源健康监控
+    await provider_health.stop()
+
+    # 关闭数据源线程池
+    shutdown_provider_executors()
+
+    # 写完后台队列中的技术指标数据
+    await get_indicator_write_queue().stop()
+
+    # 关闭技术指标计算进程池
+    shutdown_indicator_executor()
+
     # 关闭时断开数据库连接
     await close_mongo_connection()
 
@@ -9,6 +9,7 @@ from app.models.kline_data import (
     init_kline_data_collection,
     kline_data_from_dict,
     prepare_kline_document,
+    validate_kline_batch,
     validate_kline_data
 )
 from app.models.data_quality import (
@@ -28,6 +29,7 @@ __all__ = [
     "init_kline_data_collection",
     "kline_data_from_dict",
     "prepare_kline_document",
+    "validate_kline_batch",
     "validate_kline_data",
     # Data quality models
     "init_data_quality_logs_collection",
@@ -49,6 +49,18 @@ async def ensure_indicator_data_collection(db: AsyncIOMotorDatabase):
         )
 
 
+async def ensure_indicator_coverage_indexes(db: AsyncIOMotorDatabase):
+    """创建 indicator_coverage（指标覆盖范围）集合索引.
+
+    Args:
+        db: MongoDB 数据库对象
+    """
+    await db.indicator_coverage.create_index(
+        [("ticker", 1), ("period", 1), ("indicator_name", 1), ("params_key", 1)],
+        unique=True,
+    )
+
+
 def prepare_indicator_document(indicator_data: dict[str, Any]) -> dict[str, Any]:
     """准备技术指标文档数据（用于插入到 MongoDB）.
 
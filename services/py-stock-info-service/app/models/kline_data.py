@@ -1,9 +1,15 @@
 """K线数据模型（MongoDB TimeSeries Collection）."""
 
 from datetime import datetime, UTC
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+
 from app.database import get_database
 
+# 验证时的必需字段
+REQUIRED_KLINE_FIELDS = ("open", "high", "low", "close", "volume")
+
 
 async def init_kline_data_collection():
     """初始化K线数据 TimeSeries Collection."""
@@ -123,8 +129,7 @@ def validate_kline_data(kline_data: Dict[str, Any]) -> bool:
         bool: 数据是否有效
     """
     # 必需字段检查
-    required_fields = ["open", "high", "low", "close", "volume"]
-    for field in required_fields:
+    for field in REQUIRED_KLINE_FIELDS:
         if field not in kline_data or kline_data[field] is None:
             return False
     
@@ -156,3 +161,44 @@ def validate_kline_data(kline_data: Dict[str, Any]) -> bool:
         return False
     
     return True
+
+
+def _float_column(kline_data: List[Dict[str, Any]], field: str) -> np.ndarray:
+    """取出一列并转换为 float64 数组（缺失或无法转换的值为 NaN）."""
+    values = [item.get(field) for item in kline_data]
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        column = np.full(len(values), np.nan)
+        for position, value in enumerate(values):
+            try:
+                column[position] = float(value)
+            except (TypeError, ValueError):
+                pass
+        return column
+
+
+def validate_kline_batch(kline_data: List[Dict[str, Any]]) -> np.ndarray:
+    """批量验证K线数据（按列向量化检查，规则同 validate_kline_data）.
+    
+    缺失、NaN、无穷大或无法转换为数值的字段视为无效（不抛出异常）。
+    
+    Args:
+        kline_data: K线数据列表
+        
+    Returns:
+        np.ndarray: 每条数据是否有效（bool 数组，与 kline_data 一一对应）
+    """
+    if not kline_data:
+        return np.zeros(0, dtype=bool)
+    
+    open_price, high_price, low_price, close_price, volume = (
+        _float_column(kline_data, field) for field in REQUIRED_KLINE_FIELDS
+    )
+    valid = np.isfinite(open_price) & np.isfinite(high_price) & np.isfinite(low_price)
+    valid &= np.isfinite(close_price) & np.isfinite(volume)
+    # 价格逻辑：high 为最高、low 为最低，价格 > 0，成交量（取整后）>= 0
+    valid &= (high_price >= low_price) & (high_price >= open_price) & (high_price >= close_price)
+    valid &= (low_price <= open_price) & (low_price <= close_price) & (low_price > 0)
+    valid &= np.trunc(volume) >= 0
+    return valid
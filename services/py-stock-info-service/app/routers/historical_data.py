@@ -12,16 +12,28 @@ from fastapi.responses import StreamingResponse
 from app.database import get_database
 from app.schemas.historical_data import (
     DeleteKlineDataResponse,
-    HistoricalDataListResponse,
-    HistoricalDataPageResponse,
-    KlineDataResponse,
     StatisticsResponse,
     UpdateKlineDataResponse,
 )
-from app.schemas.response import error_response, success_response
+from app.schemas.response import (
+    JSON_FORMAT,
+    RESPONSE_FORMAT_PATTERN,
+    columnar_response,
+    error_response,
+    fast_response,
+    success_response,
+)
+from app.services.historical_data.historical_data_query import PAGE_FIELDS
 from app.services.historical_data.historical_data_service import (
     HistoricalDataService,
 )
+from app.services.historical_data.kline_cache import get_kline_cache
+from app.services.historical_data.kline_export import (
+    EXPORT_FORMAT_PATTERN,
+    EXPORT_FORMATS,
+    NDJSON_FORMAT,
+    export_stream,
+)
 from app.services.stock_service import get_stock_service
 
 router = APIRouter(prefix="/api/v1/historical-data", tags=["historical-data"])
@@ -33,6 +45,13 @@ def get_historical_data_service():
     return HistoricalDataService(db=get_database())
 
 
+# /{ticker} 会匹配任意路径，固定路径需要在其之前注册
+@router.get("/cache/metrics", response_model=dict)
+async def get_kline_cache_metrics():
+    """获取K线窗口缓存统计（命中率、占用字节数等）."""
+    return success_response(data=get_kline_cache().get_metrics())
+
+
 @router.get("/{ticker}", response_model=dict)
 async def get_kline_data(
     ticker: str,
@@ -42,12 +61,31 @@ async def get_kline_data(
     limit: Optional[int] = Query(None, ge=1, le=10000, description="返回数量限制"),
     page: Optional[int] = Query(None, ge=1, description="页码（分页模式）"),
     page_size: Optional[int] = Query(None, ge=1, le=1000, description="每页条数（分页模式）"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor，分页模式）"),
+    fields: Optional[str] = Query(
+        None, description="返回的字段，逗号分隔（如 timestamp,close，分页模式）"
+    ),
+    include_total: Optional[bool] = Query(
+        None, description="是否统计总条数（分页模式，页码分页默认统计，游标分页默认不统计）"
+    ),
+    response_format: str = Query(
+        JSON_FORMAT,
+        alias="format",
+        pattern=RESPONSE_FORMAT_PATTERN,
+        description="响应格式（json / columnar / msgpack，列表模式）",
+    ),
 ):
     """获取历史K线数据.
 
     支持两种模式：
-    1. 列表模式：不传 page/page_size 参数，返回列表格式
-    2. 分页模式：传 page/page_size 参数，返回分页格式
+    1. 列表模式：不传 page/page_size/cursor 参数，返回列表格式。
+       format=columnar 时返回列式数据（{"timestamps": [Unix 毫秒], "open": [...], ...}），
+       format=msgpack 时返回相同结构的 MessagePack 二进制（需安装 msgpack）
+    2. 分页模式：传 page/page_size/cursor 参数，返回分页格式（按时间降序）。
+       分页在数据库端完成：页码分页使用 skip/limit，游标分页按时间戳定位（翻页不随页数变慢），
+       fields 只读取指定字段，总条数使用单独的计数查询
+
+    数据库中的数据在写入时已校验，读取时直接组装为响应格式并序列化，不逐条构建响应模型
     """
     try:
         service = get_historical_data_service()
@@ -56,45 +94,78 @@ async def get_kline_data(
         start_dt = datetime.fromisoformat(start_date) if start_date else None
         end_dt = datetime.fromisoformat(end_date) if end_date else None
 
-        # 查询数据
-        kline_data = await service.query_kline_data(
-            ticker=ticker,
-            period=period,
-            start_date=start_dt,
-            end_date=end_dt,
-            limit=limit,
-        )
-
         # 判断是分页模式还是列表模式
-        if page is not None or page_size is not None:
+        if page is not None or page_size is not None or cursor is not None:
             # 分页模式
-            page = page or 1
+            if response_format != JSON_FORMAT:
+                raise ValueError(f"分页模式不支持 {response_format} 格式")
             page_size = page_size or 100
-
-            total = len(kline_data)
-            total_pages = (total + page_size - 1) // page_size
-
-            start_idx = (page - 1) * page_size
-            end_idx = start_idx + page_size
-            items = kline_data[start_idx:end_idx]
-
-            response_data = HistoricalDataPageResponse(
-                items=[KlineDataResponse(**item) for item in items],
-                total=total,
-                page=page,
+            field_list = None
+            if fields:
+                field_list = [field.strip() for field in fields.split(",") if field.strip()]
+                unknown = [field for field in field_list if field not in PAGE_FIELDS]
+                if unknown:
+                    raise ValueError(f"不支持的字段: {', '.join(unknown)}")
+
+            if cursor is not None:
+                # 游标分页：从上一页最后一条之后开始
+                page = None
+                after, skip = datetime.fromisoformat(cursor), 0
+                include_total = bool(include_total)
+            else:
+                page = page or 1
+                after, skip = None, (page - 1) * page_size
+                include_total = include_total is not False
+
+            result = await service.query_kline_page(
+                ticker=ticker,
+                period=period,
+                start_date=start_dt,
+                end_date=end_dt,
                 page_size=page_size,
-                total_pages=total_pages,
+                after=after,
+                skip=skip,
+                limit=limit if cursor is None else None,
+                fields=field_list,
+                include_total=include_total,
+            )
+
+            # 字段同 HistoricalDataPageResponse（数据库数据已是响应格式，不再经过模型校验）
+            total = result["total"]
+            return fast_response(
+                data={
+                    "items": result["items"],
+                    "total": total,
+                    "page": page,
+                    "page_size": page_size,
+                    "total_pages": (
+                        (total + page_size - 1) // page_size if total is not None else None
+                    ),
+                    "next_cursor": result["next_cursor"],
+                }
+            )
+        elif response_format != JSON_FORMAT:
+            # 列表模式（列式）
+            columns = await service.query_kline_columns(
+                ticker=ticker,
+                period=period,
+                start_date=start_dt,
+                end_date=end_dt,
+                limit=limit,
             )
+            return columnar_response(columns, response_format)
         else:
-            # 列表模式
-            response_data = HistoricalDataListResponse(
+            # 列表模式（字段同 HistoricalDataListResponse）
+            items = await service.query_kline_items(
                 ticker=ticker,
                 period=period,
-                count=len(kline_data),
-                data=[KlineDataResponse(**item) for item in kline_data],
+                start_date=start_dt,
+                end_date=end_dt,
+                limit=limit,
+            )
+            return fast_response(
+                data={"ticker": ticker, "period": period, "count": len(items), "data": items}
             )
-
-        return success_response(data=response_data.model_dump())
 
     except ValueError as e:
         raise HTTPException(
@@ -109,6 +180,55 @@ async def get_kline_data(
         )
 
 
+@router.get("/{ticker}/export")
+async def export_kline_data(
+    ticker: str,
+    period: str = Query("1d", description="时间周期（1m, 5m, 15m, 30m, 60m, 1d, 1w, 1M）"),
+    start_date: Optional[str] = Query(None, description="开始日期（YYYY-MM-DD）"),
+    end_date: Optional[str] = Query(None, description="结束日期（YYYY-MM-DD）"),
+    export_format: str = Query(
+        NDJSON_FORMAT,
+        alias="format",
+        pattern=EXPORT_FORMAT_PATTERN,
+        description="导出格式（ndjson / csv / arrow，arrow 需安装 pyarrow）",
+    ),
+    batch_size: Optional[int] = Query(
+        None, ge=1, le=100000, description="每批读取的条数（默认为配置 KLINE_EXPORT_BATCH_SIZE）"
+    ),
+):
+    """流式导出历史K线数据（按时间升序）.
+
+    按批迭代数据库游标，每批编码后立即写出（NDJSON 每行一条、CSV 带表头、
+    Arrow IPC 流每批一个 RecordBatch），内存占用不随导出范围增长。
+    """
+    try:
+        start_dt = datetime.fromisoformat(start_date) if start_date else None
+        end_dt = datetime.fromisoformat(end_date) if end_date else None
+
+        service = get_historical_data_service()
+        batches = service.iter_kline_batches(
+            ticker=ticker,
+            period=period,
+            start_date=start_dt,
+            end_date=end_dt,
+            batch_size=batch_size,
+        )
+        stream = export_stream(batches, export_format)
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"参数错误: {str(e)}",
+        )
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{ticker}_{period}.{extension}"'},
+    )
+
+
 @router.get("/{ticker}/statistics", response_model=dict)
 async def get_kline_data_statistics(
     ticker: str,
@@ -13,11 +13,15 @@ from app.database import get_database
 from app.schemas.indicators import (
     CalculateIndicatorRequest,
     IndicatorDataResponse,
-    IndicatorListResponse,
-    IndicatorPageResponse,
     SupportedIndicator,
 )
-from app.schemas.response import success_response
+from app.schemas.response import (
+    JSON_FORMAT,
+    RESPONSE_FORMAT_PATTERN,
+    columnar_response,
+    fast_response,
+    success_response,
+)
 from app.services.indicators.indicator_service import IndicatorService
 
 router = APIRouter(prefix="/api/v1/indicators", tags=["indicators"])
@@ -51,7 +55,9 @@ async def get_supported_indicators():
 @router.post("/{ticker}/calculate", response_model=dict)
 async def calculate_indicator(
     ticker: str,
-    indicator_name: str = Query(..., description="指标名称（如 MA5, RSI14, MACD_DIF）"),
+    indicator_name: str = Query(
+        ..., description="指标名称（如 MA50, EMA200, RSI14, MACD_DIF_8_21_5, BOLL_UP_20_2.5）"
+    ),
     period: str = Query("1d", description="时间周期"),
     start_date: Optional[str] = Query(None, description="开始日期（YYYY-MM-DD）"),
     end_date: Optional[str] = Query(None, description="结束日期（YYYY-MM-DD）"),
@@ -116,92 +122,16 @@ async def calculate_indicator(
         )
 
 
-@router.get("/{ticker}", response_model=dict)
-async def get_indicator_data(
-    ticker: str,
-    indicator_name: str = Query(..., description="指标名称（如 MA5, RSI14）"),
-    period: str = Query("1d", description="时间周期"),
-    start_date: Optional[str] = Query(None, description="开始日期（YYYY-MM-DD）"),
-    end_date: Optional[str] = Query(None, description="结束日期（YYYY-MM-DD）"),
-    page: Optional[int] = Query(None, ge=1, description="页码（分页模式）"),
-    page_size: Optional[int] = Query(None, ge=1, le=1000, description="每页条数（分页模式）"),
-    limit: Optional[int] = Query(None, ge=1, le=10000, description="返回数量限制"),
-):
-    """查询技术指标数据.
-
-    支持两种模式：
-    1. 列表模式：不传 page/page_size 参数，返回列表格式
-    2. 分页模式：传 page/page_size 参数，返回分页格式
-    """
-    try:
-        service = get_indicator_service()
-
-        # 解析日期
-        start_dt = datetime.fromisoformat(start_date) if start_date else None
-        end_dt = datetime.fromisoformat(end_date) if end_date else None
-
-        # 查询指标数据
-        indicator_data = await service.query_indicator_data(
-            ticker=ticker,
-            indicator_name=indicator_name,
-            period=period,
-            start_date=start_dt,
-            end_date=end_dt,
-            limit=limit,
-        )
-
-        # 判断是分页模式还是列表模式
-        if page is not None or page_size is not None:
-            # 分页模式
-            page = page or 1
-            page_size = page_size or 100
-
-            total = len(indicator_data)
-            total_pages = (total + page_size - 1) // page_size
-
-            start_idx = (page - 1) * page_size
-            end_idx = start_idx + page_size
-            items = indicator_data[start_idx:end_idx]
-
-            response_data = IndicatorPageResponse(
-                items=[IndicatorDataResponse(**item) for item in items],
-                total=total,
-                page=page,
-                page_size=page_size,
-                total_pages=total_pages,
-            )
-        else:
-            # 列表模式
-            response_data = IndicatorListResponse(
-                ticker=ticker,
-                indicator_name=indicator_name,
-                period=period,
-                count=len(indicator_data),
-                data=[IndicatorDataResponse(**item) for item in indicator_data],
-            )
-
-        return success_response(data=response_data.model_dump())
-
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"参数错误: {str(e)}",
-        )
-    except Exception as e:
-        logger.error(f"查询技术指标数据失败: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"查询失败: {str(e)}",
-        )
-
-
 @router.get("/batch-calculate")
 async def batch_calculate_indicators(
     tickers: str = Query(..., description="股票代码列表（逗号分隔）"),
-    indicator_names: str = Query(..., description="指标名称列表（逗号分隔）"),
+    indicator_names: str = Query(
+        ..., description="指标名称列表（逗号分隔，MACD_8_21_5、BOLL_20_2.5 等展开为全部子指标）"
+    ),
     period: str = Query("1d", description="时间周期"),
     start_date: Optional[str] = Query(None, description="开始日期（YYYY-MM-DD）"),
     end_date: Optional[str] = Query(None, description="结束日期（YYYY-MM-DD）"),
+    incremental: bool = Query(False, description="是否增量计算（只计算上次计算之后的新K线）"),
 ):
     """批量计算技术指标（SSE 实时推送进度）.
 
@@ -266,6 +196,7 @@ async def batch_calculate_indicators(
                                 start_date=start_dt,
                                 end_date=end_dt,
                                 progress_callback=progress_handler,
+                                incremental=incremental,
                             )
                         except Exception as e:
                             logger.error(f"计算 {ticker} 指标失败: {str(e)}")
@@ -328,3 +259,203 @@ async def batch_calculate_indicators(
             "X-Accel-Buffering": "no",
         },
     )
+
+
+@router.get("/market-calculate")
+async def market_calculate_indicators(
+    indicator_names: str = Query(
+        ..., description="指标名称列表（逗号分隔，MACD_8_21_5、BOLL_20_2.5 等展开为全部子指标）"
+    ),
+    market: Optional[str] = Query(None, description="市场（不传 tickers 时计算该市场全部股票）"),
+    tickers: Optional[str] = Query(None, description="股票代码列表（逗号分隔，可选）"),
+    period: str = Query("1d", description="时间周期"),
+    start_date: Optional[str] = Query(None, description="开始日期（YYYY-MM-DD）"),
+    end_date: Optional[str] = Query(None, description="结束日期（YYYY-MM-DD）"),
+):
+    """全市场批量计算技术指标（面板计算，SSE 实时推送进度）.
+
+    多只股票的K线一次查询、组成 时间 × 股票 面板，每类指标对所有股票一次计算后批量写入。
+
+    响应格式为 SSE 流，进度消息格式：
+    {
+        "stage": "init|calculating|completed|error",
+        "message": "进度描述",
+        "progress": 0-100,
+        "total": 股票总数,
+        "current": 已处理股票数,
+        "success": 成功数,
+        "failed": 失败数
+    }
+    """
+
+    async def event_generator():
+        """SSE 事件生成器."""
+        try:
+            indicator_list = [i.strip() for i in indicator_names.split(",") if i.strip()]
+            ticker_list = (
+                [t.strip() for t in tickers.split(",") if t.strip()] if tickers else None
+            )
+
+            if not indicator_list:
+                yield f"data: {json.dumps({'stage': 'error', 'message': '指标名称列表为空'})}\n\n"
+                return
+
+            if not ticker_list and not market:
+                yield f"data: {json.dumps({'stage': 'error', 'message': '需要提供 market 或 tickers'})}\n\n"
+                return
+
+            start_dt = datetime.fromisoformat(start_date) if start_date else None
+            end_dt = datetime.fromisoformat(end_date) if end_date else None
+
+            service = get_indicator_service()
+            progress_queue = asyncio.Queue()
+
+            async def progress_handler(progress_data: dict):
+                """进度处理器."""
+                await progress_queue.put(progress_data)
+
+            async def calculate_task():
+                """异步计算任务."""
+                try:
+                    await service.calculate_market_indicators(
+                        indicator_names=indicator_list,
+                        period=period,
+                        market=market,
+                        tickers=ticker_list,
+                        start_date=start_dt,
+                        end_date=end_dt,
+                        progress_callback=progress_handler,
+                    )
+                except Exception as e:
+                    logger.error(f"全市场计算指标失败: {str(e)}")
+                    await progress_queue.put({"stage": "error", "message": f"计算失败: {str(e)}"})
+                finally:
+                    await progress_queue.put(None)
+
+            task = asyncio.create_task(calculate_task())
+
+            while True:
+                try:
+                    progress_data = await asyncio.wait_for(progress_queue.get(), timeout=0.5)
+                    if progress_data is None:
+                        break
+                    yield f"data: {json.dumps(progress_data, default=str)}\n\n"
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+
+            await task
+
+        except Exception as e:
+            logger.error(f"SSE 事件生成器错误: {str(e)}")
+            yield f"data: {json.dumps({'stage': 'error', 'message': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+# /{ticker} 会匹配任意路径，必须在 /batch-calculate、/market-calculate 等固定路径之后注册
+@router.get("/{ticker}", response_model=dict)
+async def get_indicator_data(
+    ticker: str,
+    indicator_name: str = Query(..., description="指标名称（如 MA5, RSI14）"),
+    period: str = Query("1d", description="时间周期"),
+    start_date: Optional[str] = Query(None, description="开始日期（YYYY-MM-DD）"),
+    end_date: Optional[str] = Query(None, description="结束日期（YYYY-MM-DD）"),
+    page: Optional[int] = Query(None, ge=1, description="页码（分页模式）"),
+    page_size: Optional[int] = Query(None, ge=1, le=1000, description="每页条数（分页模式）"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="返回数量限制"),
+    response_format: str = Query(
+        JSON_FORMAT,
+        alias="format",
+        pattern=RESPONSE_FORMAT_PATTERN,
+        description="响应格式（json / columnar / msgpack，列表模式）",
+    ),
+):
+    """查询技术指标数据.
+
+    支持两种模式：
+    1. 列表模式：不传 page/page_size 参数，返回列表格式。
+       format=columnar 时返回列式数据（{"timestamps": [Unix 毫秒], "value": [...]}），
+       format=msgpack 时返回相同结构的 MessagePack 二进制（需安装 msgpack）
+    2. 分页模式：传 page/page_size 参数，返回分页格式
+
+    数据库中的指标数据直接组装为响应格式并序列化，不逐条构建响应模型
+    """
+    try:
+        service = get_indicator_service()
+
+        # 解析日期
+        start_dt = datetime.fromisoformat(start_date) if start_date else None
+        end_dt = datetime.fromisoformat(end_date) if end_date else None
+
+        if response_format != JSON_FORMAT:
+            if page is not None or page_size is not None:
+                raise ValueError(f"分页模式不支持 {response_format} 格式")
+            columns = await service.query_indicator_columns(
+                ticker=ticker,
+                indicator_name=indicator_name,
+                period=period,
+                start_date=start_dt,
+                end_date=end_dt,
+                limit=limit,
+            )
+            return columnar_response(columns, response_format)
+
+        # 查询指标数据（已是响应格式，不再经过模型校验）
+        indicator_data = await service.query_indicator_items(
+            ticker=ticker,
+            indicator_name=indicator_name,
+            period=period,
+            start_date=start_dt,
+            end_date=end_dt,
+            limit=limit,
+        )
+
+        # 判断是分页模式还是列表模式
+        if page is not None or page_size is not None:
+            # 分页模式（字段同 IndicatorPageResponse）
+            page = page or 1
+            page_size = page_size or 100
+
+            total = len(indicator_data)
+            total_pages = (total + page_size - 1) // page_size
+
+            start_idx = (page - 1) * page_size
+            end_idx = start_idx + page_size
+            response_data = {
+                "items": indicator_data[start_idx:end_idx],
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": total_pages,
+            }
+        else:
+            # 列表模式（字段同 IndicatorListResponse）
+            response_data = {
+                "ticker": ticker,
+                "indicator_name": indicator_name,
+                "period": period,
+                "count": len(indicator_data),
+                "data": indicator_data,
+            }
+
+        return fast_response(data=response_data)
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"参数错误: {str(e)}",
+        )
+    except Exception as e:
+        logger.error(f"查询技术指标数据失败: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"查询失败: {str(e)}",
+        )
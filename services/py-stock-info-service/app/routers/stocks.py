@@ -117,11 +117,13 @@ async def update_stock(
 
 
 @router.post("/update-all", response_model=dict)
-async def update_all_stocks():
+async def update_all_stocks(
+    concurrency: int | None = Query(None, ge=1, le=100, description="同时进行的数据源请求数（可选，默认使用服务配置）"),
+):
     """手动触发所有股票的更新."""
     try:
         stock_service = get_stock_service(db=get_database())
-        result = await stock_service.update_all_stocks()
+        result = await stock_service.update_all_stocks(concurrency=concurrency)
         return success_response(
             data=result,
             message=f"批量更新完成：总数 {result['total']}，成功 {result['success']}，失败 {result['failed']}",
@@ -138,7 +140,9 @@ async def batch_update_stocks(request: BatchUpdateRequest):
     """批量手动更新股票."""
     try:
         stock_service = get_stock_service(db=get_database())
-        result = await stock_service.batch_update_stocks(request.tickers)
+        result = await stock_service.batch_update_stocks(
+            request.tickers, concurrency=request.concurrency
+        )
         return success_response(
             data=result,
             message=f"批量更新完成：总数 {result['total']}，成功 {result['success']}，失败 {result['failed']}",
@@ -1,7 +1,7 @@
 """历史数据 Schema 定义."""
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -34,11 +34,14 @@ class HistoricalDataListResponse(BaseModel):
 class HistoricalDataPageResponse(BaseModel):
     """历史数据分页响应."""
     
-    items: list[KlineDataResponse] = Field(..., description="K线数据列表")
-    total: int = Field(..., description="总条数")
-    page: int = Field(..., description="当前页码")
+    items: list[dict[str, Any]] = Field(
+        ..., description="K线数据列表（字段同 KlineDataResponse，指定 fields 时只包含这些字段）"
+    )
+    total: Optional[int] = Field(None, description="总条数（游标分页默认不统计）")
+    page: Optional[int] = Field(None, description="当前页码（游标分页时为 None）")
     page_size: int = Field(..., description="每页条数")
-    total_pages: int = Field(..., description="总页数")
+    total_pages: Optional[int] = Field(None, description="总页数（不统计总条数时为 None）")
+    next_cursor: Optional[str] = Field(None, description="下一页游标（没有下一页时为 None）")
 
 
 class UpdateKlineDataResponse(BaseModel):
@@ -1,10 +1,28 @@
 """统一响应格式."""
 
-from typing import Generic, TypeVar, Optional
+import importlib.util
+import json
+import math
+from datetime import date, datetime
+from typing import Any, Generic, TypeVar, Optional
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, ConfigDict
 
 T = TypeVar("T")
 
+# 响应格式：json（逐条记录）、columnar（列式 JSON）、msgpack（列式 MessagePack，需安装 msgpack）
+JSON_FORMAT = "json"
+COLUMNAR_FORMAT = "columnar"
+MSGPACK_FORMAT = "msgpack"
+RESPONSE_FORMAT_PATTERN = f"^({JSON_FORMAT}|{COLUMNAR_FORMAT}|{MSGPACK_FORMAT})$"
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+HAS_MSGPACK = importlib.util.find_spec("msgpack") is not None
+HAS_ORJSON = importlib.util.find_spec("orjson") is not None
+
+if HAS_ORJSON:
+    import orjson
+
 
 class ApiResponse(BaseModel, Generic[T]):
     """统一 API 响应格式."""
@@ -24,11 +42,92 @@ class ApiResponse(BaseModel, Generic[T]):
     )
 
 
+def _json_default(value: Any) -> Any:
+    """json.dumps 无法直接序列化的值（时间转为 ISO 8601 字符串，与 orjson 一致）."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _replace_non_finite(value: Any) -> Any:
+    """将 NaN / Infinity 替换为 None（与 orjson 输出 null 一致）."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _replace_non_finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_non_finite(item) for item in value]
+    return value
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_json_default,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """直接序列化的 JSON 响应（已安装 orjson 时使用 orjson，否则使用标准库 json）.
+
+    用于读取接口返回数据库中已校验的数据：内容必须是 dict / list / 基本类型 / datetime，
+    不经过 FastAPI 的 jsonable_encoder 和 Pydantic 模型。NaN / Infinity 两种实现都输出 null。
+    """
+
+    def render(self, content: Any) -> bytes:
+        if HAS_ORJSON:
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+        try:
+            return _stdlib_dumps(content)
+        except ValueError:
+            # 极少出现，仅在包含 NaN / Infinity 时才遍历替换
+            return _stdlib_dumps(_replace_non_finite(content))
+
+
 def success_response(data=None, message: str = "success") -> dict:
     """成功响应."""
     return {"code": 200, "message": message, "data": data}
 
 
+def fast_response(data=None, message: str = "success") -> FastJSONResponse:
+    """成功响应（跳过响应模型校验和 jsonable_encoder，直接序列化）.
+
+    Args:
+        data: 响应数据（已是接口响应格式的 dict / list）
+        message: 响应消息
+
+    Returns:
+        FastJSONResponse: 响应对象
+    """
+    return FastJSONResponse(content=success_response(data=data, message=message))
+
+
+def columnar_response(data: dict, response_format: str, message: str = "success") -> Response:
+    """列式数据响应（统一响应格式，columnar 为 JSON，msgpack 为 MessagePack）.
+
+    直接返回 Response，跳过 FastAPI 对返回值逐个元素的编码。
+
+    Args:
+        data: 列式数据（值为 JSON 原生类型）
+        response_format: 响应格式（columnar / msgpack）
+        message: 响应消息
+
+    Returns:
+        Response: 响应对象
+    """
+    content = success_response(data=data, message=message)
+    if response_format == MSGPACK_FORMAT:
+        if not HAS_MSGPACK:
+            raise ValueError("msgpack 未安装，不支持 msgpack 格式")
+        import msgpack
+
+        return Response(content=msgpack.packb(content), media_type=MSGPACK_MEDIA_TYPE)
+    return FastJSONResponse(content=content)
+
+
 def error_response(message: str = "error", code: int = 400) -> dict:
     """错误响应."""
     return {"code": code, "message": message, "data": None}
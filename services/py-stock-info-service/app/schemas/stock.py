@@ -101,3 +101,6 @@ class BatchUpdateRequest(BaseModel):
     """批量更新请求."""
 
     tickers: list[str] = Field(..., description="股票代码列表", min_length=1)
+    concurrency: Optional[int] = Field(
+        None, description="同时进行的数据源请求数（可选，默认使用服务配置）", ge=1, le=100
+    )
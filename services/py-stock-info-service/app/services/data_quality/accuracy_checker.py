@@ -5,6 +5,8 @@ from datetime import datetime
 from typing import List, Dict, Any, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.services.historical_data.historical_data_query import HistoricalDataQuery
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,6 +21,7 @@ class AccuracyChecker:
         """
         self.db = db
         self.collection = db["kline_data"]
+        self.query = HistoricalDataQuery(db)
     
     async def check_abnormal_values(
         self,
@@ -42,23 +45,11 @@ class AccuracyChecker:
         
         abnormal_data = []
         
-        # 查询数据
-        cursor = self.collection.find(
-            {
-                "metadata.ticker": ticker,
-                "metadata.period": period,
-                "timestamp": {
-                    "$gte": start_date,
-                    "$lte": end_date
-                }
-            }
-        ).sort("timestamp", 1)
+        # 查询数据（优先从K线窗口缓存读取）
+        window = await self.query.get_kline_window(ticker, period, start_date, end_date)
         
         prev_close = None
-        data_list = []
-        
-        async for doc in cursor:
-            data_list.append(doc)
+        data_list = window.to_records()
         
         if not data_list:
             return abnormal_data
@@ -145,19 +136,10 @@ class AccuracyChecker:
         
         unreasonable_data = []
         
-        # 查询数据
-        cursor = self.collection.find(
-            {
-                "metadata.ticker": ticker,
-                "metadata.period": period,
-                "timestamp": {
-                    "$gte": start_date,
-                    "$lte": end_date
-                }
-            }
-        ).sort("timestamp", 1)
-        
-        async for doc in cursor:
+        # 查询数据（优先从K线窗口缓存读取）
+        window = await self.query.get_kline_window(ticker, period, start_date, end_date)
+        
+        for doc in window.to_records():
             timestamp = doc.get("timestamp")
             open_price = doc.get("open")
             close_price = doc.get("close")
@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.services.historical_data.historical_data_query import HistoricalDataQuery
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,6 +21,7 @@ class CompletenessChecker:
         """
         self.db = db
         self.collection = db["kline_data"]
+        self.query = HistoricalDataQuery(db)
     
     async def check_missing_data(
         self,
@@ -40,22 +43,9 @@ class CompletenessChecker:
         """
         logger.info(f"检查 {ticker} 的数据完整性（{start_date} - {end_date}）")
         
-        # 查询已有数据的日期列表
-        cursor = self.collection.find(
-            {
-                "metadata.ticker": ticker,
-                "metadata.period": period,
-                "timestamp": {
-                    "$gte": start_date,
-                    "$lte": end_date
-                }
-            },
-            {"timestamp": 1}
-        ).sort("timestamp", 1)
-        
-        existing_dates = set()
-        async for doc in cursor:
-            existing_dates.add(doc["timestamp"].date())
+        # 查询已有数据的日期列表（优先从K线窗口缓存读取）
+        window = await self.query.get_kline_window(ticker, period, start_date, end_date)
+        existing_dates = {timestamp.date() for timestamp in window.datetimes()}
         
         # 生成预期的日期范围（排除周末，如果是日线数据）
         expected_dates = self._generate_expected_dates(start_date, end_date, period)
@@ -5,6 +5,8 @@ from datetime import datetime
 from typing import List, Dict, Any
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.services.historical_data.historical_data_query import HistoricalDataQuery
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,6 +21,7 @@ class ConsistencyChecker:
         """
         self.db = db
         self.collection = db["kline_data"]
+        self.query = HistoricalDataQuery(db)
     
     async def check_price_logic(
         self,
@@ -42,19 +45,10 @@ class ConsistencyChecker:
         
         inconsistent_data = []
         
-        # 查询数据
-        cursor = self.collection.find(
-            {
-                "metadata.ticker": ticker,
-                "metadata.period": period,
-                "timestamp": {
-                    "$gte": start_date,
-                    "$lte": end_date
-                }
-            }
-        ).sort("timestamp", 1)
+        # 查询数据（优先从K线窗口缓存读取）
+        window = await self.query.get_kline_window(ticker, period, start_date, end_date)
         
-        async for doc in cursor:
+        for doc in window.to_records():
             timestamp = doc.get("timestamp")
             open_price = doc.get("open")
             high = doc.get("high")
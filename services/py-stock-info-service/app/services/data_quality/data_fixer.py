@@ -5,6 +5,8 @@ from datetime import datetime
 from typing import List, Dict, Any, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.services.historical_data.kline_cache import get_kline_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -103,6 +105,9 @@ class DataFixer:
             result = await self.collection.delete_many({"_id": {"$in": ids_to_delete}})
             deleted_count += result.deleted_count
         
+        if deleted_count > 0:
+            get_kline_cache().invalidate(self.db.name, ticker, period)
+        
         if deleted_count > 0:
             logger.info(f"{ticker} 删除了 {deleted_count} 条重复数据")
         else:
@@ -0,0 +1,150 @@
+"""DataFrame 列式转换工具.
+
+按整列重命名、类型转换后再生成记录，避免 iterrows() 逐行转换和逐字段 float()/int()。
+"""
+
+from typing import Optional, Dict, Any, List, Mapping
+import numpy as np
+import pandas as pd
+
+# 支持的目标类型
+FLOAT = "float"
+INT = "int"
+DATETIME = "datetime"
+STR = "str"
+
+
+def _convert_column(values: Any, dtype: Optional[str], date_format: Optional[str] = None) -> List[Any]:
+    """整列类型转换，返回 Python 原生类型列表.
+
+    Args:
+        values: 列数据（Series / Index / ndarray）
+        dtype: 目标类型（float / int / datetime / str，None 表示不转换）
+        date_format: 日期解析格式（仅 datetime 类型使用，可选）
+
+    Returns:
+        转换后的值列表
+    """
+    if dtype == FLOAT:
+        return pd.to_numeric(pd.Series(values), errors="coerce").astype("float64").tolist()
+    if dtype == INT:
+        numeric = pd.to_numeric(pd.Series(values), errors="coerce").fillna(0)
+        return numeric.astype("int64").tolist()
+    if dtype == DATETIME:
+        if date_format:
+            # 按指定格式解析时先统一转为字符串
+            values = pd.Series(values).astype(str)
+        index = pd.DatetimeIndex(pd.to_datetime(values, format=date_format))
+        return list(index.to_pydatetime())
+    if dtype == STR:
+        return pd.Series(values).astype(str).str.strip().tolist()
+    if isinstance(values, (pd.Series, pd.Index)):
+        return values.tolist()
+    return np.asarray(values).tolist()
+
+
+def frame_to_columns(
+    df: pd.DataFrame,
+    column_map: Optional[Mapping[str, str]] = None,
+    dtypes: Optional[Mapping[str, str]] = None,
+    index_as: Optional[str] = None,
+    date_format: Optional[str] = None,
+) -> Dict[str, List[Any]]:
+    """将 DataFrame 转换为列式字典（{字段名: 值列表}）.
+
+    Args:
+        df: 源 DataFrame
+        column_map: 源列名 -> 目标字段名（None 表示保留全部列；源列不存在时跳过）
+        dtypes: 目标字段名 -> 类型（float / int / datetime / str）
+        index_as: 将索引作为字段输出时使用的字段名（可选）
+        date_format: 日期解析格式（可选）
+
+    Returns:
+        列式字典，字段顺序与 column_map 一致（索引字段在最前）
+    """
+    dtypes = dtypes or {}
+    columns: Dict[str, List[Any]] = {}
+
+    if index_as:
+        columns[index_as] = _convert_column(df.index, dtypes.get(index_as), date_format)
+
+    if column_map is None:
+        column_map = {column: column for column in df.columns}
+
+    for source, target in column_map.items():
+        if source not in df.columns:
+            continue
+        columns[target] = _convert_column(df[source], dtypes.get(target), date_format)
+
+    return columns
+
+
+def columns_to_records(columns: Mapping[str, List[Any]]) -> List[Dict[str, Any]]:
+    """将列式字典转换为记录列表.
+
+    Args:
+        columns: 列式字典（各列长度相同）
+
+    Returns:
+        记录列表
+    """
+    keys = list(columns.keys())
+    if not keys:
+        return []
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+
+def frame_to_records(
+    df: pd.DataFrame,
+    column_map: Optional[Mapping[str, str]] = None,
+    dtypes: Optional[Mapping[str, str]] = None,
+    index_as: Optional[str] = None,
+    date_format: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """将 DataFrame 转换为记录列表（列式转换后一次性组装）.
+
+    Args:
+        df: 源 DataFrame
+        column_map: 源列名 -> 目标字段名（None 表示保留全部列；源列不存在时跳过）
+        dtypes: 目标字段名 -> 类型（float / int / datetime / str）
+        index_as: 将索引作为字段输出时使用的字段名（可选）
+        date_format: 日期解析格式（可选）
+
+    Returns:
+        记录列表
+    """
+    if df is None or df.empty:
+        return []
+    return columns_to_records(
+        frame_to_columns(df, column_map, dtypes, index_as, date_format)
+    )
+
+
+def float_array_to_list(values: Any) -> List[Optional[float]]:
+    """将 float64 数组转换为列表（NaN 转换为 None，没有 NaN 时直接 tolist）.
+
+    Args:
+        values: 数值数组
+
+    Returns:
+        值列表
+    """
+    values = np.asarray(values, dtype="float64")
+    missing = np.isnan(values)
+    if not missing.any():
+        return values.tolist()
+    result = values.astype(object)
+    result[missing] = None
+    return result.tolist()
+
+
+def datetimes_to_epoch_ms(values: Any) -> List[int]:
+    """将时间数组转换为 Unix 毫秒时间戳列表（不带时区的时间视为 UTC）.
+
+    Args:
+        values: datetime64 数组或 datetime 列表
+
+    Returns:
+        毫秒时间戳列表
+    """
+    return np.asarray(values, dtype="datetime64[ms]").astype("int64").tolist()
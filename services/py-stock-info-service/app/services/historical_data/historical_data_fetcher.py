@@ -1,5 +1,6 @@
 """历史K线数据获取服务（从数据源获取数据）."""
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
@@ -9,9 +10,63 @@ import pandas as pd
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.database import get_database
+from app.services.providers.executor import get_provider_executor
+from app.services.frame_converter import (
+    frame_to_columns,
+    columns_to_records,
+    FLOAT,
+    INT,
+    DATETIME,
+)
 
 logger = logging.getLogger(__name__)
 
+# yfinance 列名 -> K线字段
+YFINANCE_KLINE_COLUMNS = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Volume": "volume",
+}
+
+# akshare 列名 -> K线字段
+AKSHARE_KLINE_COLUMNS = {
+    "日期": "timestamp",
+    "开盘": "open",
+    "最高": "high",
+    "最低": "low",
+    "收盘": "close",
+    "成交量": "volume",
+    "成交额": "amount",
+}
+
+# K线周期 -> yfinance interval
+YFINANCE_INTERVALS = {
+    "1m": "1m",
+    "5m": "5m",
+    "15m": "15m",
+    "30m": "30m",
+    "60m": "60m",
+    "1d": "1d",
+    "1w": "1wk",
+    "1M": "1mo"
+}
+
+# 使用 akshare 的市场
+AKSHARE_MARKETS = ["A股", "深圳", "上海"]
+
+# K线字段类型
+KLINE_DTYPES = {
+    "timestamp": DATETIME,
+    "open": FLOAT,
+    "high": FLOAT,
+    "low": FLOAT,
+    "close": FLOAT,
+    "volume": INT,
+    "amount": FLOAT,
+}
+
 
 class HistoricalDataFetcher:
     """历史K线数据获取服务."""
@@ -49,17 +104,7 @@ class HistoricalDataFetcher:
             stock = yf.Ticker(ticker)
             
             # 转换周期格式（yfinance 使用不同的周期格式）
-            interval_map = {
-                "1m": "1m",
-                "5m": "5m",
-                "15m": "15m",
-                "30m": "30m",
-                "60m": "60m",
-                "1d": "1d",
-                "1w": "1wk",
-                "1M": "1mo"
-            }
-            yf_interval = interval_map.get(period, "1d")
+            yf_interval = YFINANCE_INTERVALS.get(period, "1d")
             
             # 获取历史数据
             if start_date and end_date:
@@ -77,19 +122,8 @@ class HistoricalDataFetcher:
                 logger.warning(f"yfinance 未返回 {ticker} 的数据")
                 return []
             
-            # 转换为字典列表
-            kline_data = []
-            for timestamp, row in df.iterrows():
-                data = {
-                    "timestamp": timestamp.to_pydatetime(),
-                    "open": float(row["Open"]),
-                    "high": float(row["High"]),
-                    "low": float(row["Low"]),
-                    "close": float(row["Close"]),
-                    "volume": int(row["Volume"]),
-                    "adj_close": float(row["Close"])  # yfinance 默认返回复权价格
-                }
-                kline_data.append(data)
+            # 转换为字典列表（整列转换）
+            kline_data = self._yfinance_frame_to_kline(df)
             
             logger.info(f"成功获取 {ticker} 的 {len(kline_data)} 条数据")
             return kline_data
@@ -98,6 +132,108 @@ class HistoricalDataFetcher:
             logger.error(f"从 yfinance 获取 {ticker} 数据失败: {str(e)}")
             return []
     
+    def _yfinance_frame_to_kline(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """将 yfinance 历史数据 DataFrame 转换为K线数据列表.
+        
+        Args:
+            df: yfinance 返回的单只股票历史数据（索引为时间）
+            
+        Returns:
+            List[Dict]: K线数据列表
+        """
+        columns = frame_to_columns(
+            df,
+            YFINANCE_KLINE_COLUMNS,
+            KLINE_DTYPES,
+            index_as="timestamp",
+        )
+        columns["adj_close"] = columns["close"]  # yfinance 默认返回复权价格
+        return columns_to_records(columns)
+    
+    async def fetch_batch_from_yfinance(
+        self,
+        tickers: List[str],
+        period: str = "1d",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        chunk_size: int = 100
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """使用 yf.download 批量获取多只股票的历史K线数据（美股/港股）.
+        
+        按 chunk_size 分组，每组一次 yf.download 调用（各组在 yfinance 线程池中并发执行），
+        再按股票拆分结果。
+        
+        Args:
+            tickers: 股票代码列表
+            period: 时间周期（1m, 5m, 15m, 30m, 60m, 1d, 1w, 1M）
+            start_date: 开始日期
+            end_date: 结束日期
+            chunk_size: 每次 yf.download 请求的股票数量
+            
+        Returns:
+            Dict: {ticker: K线数据列表}，只包含下载成功的分组中的股票
+            （分组内没有数据的股票对应空列表）
+        """
+        yf_interval = YFINANCE_INTERVALS.get(period, "1d")
+        executor = get_provider_executor("yfinance")
+        # 各分组并发下载，同时执行的分组数不超过 yfinance 线程池的线程数，
+        # 避免分组过多时占满排队名额（超过上限会被线程池拒绝）
+        semaphore = asyncio.Semaphore(executor.max_workers)
+        
+        async def download_chunk(chunk: List[str]) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+            download_kwargs = {
+                "tickers": chunk,
+                "interval": yf_interval,
+                "group_by": "ticker",
+                "auto_adjust": True,  # 与 Ticker.history 默认值一致
+                "actions": False,
+                "ignore_tz": False,  # 保留交易所时区，与单只获取结果一致
+                "threads": True,
+                "progress": False,
+            }
+            if start_date and end_date:
+                download_kwargs.update(start=start_date, end=end_date)
+            else:
+                # 默认获取最近 1 年数据
+                download_kwargs["period"] = "1y"
+            
+            async with semaphore:
+                logger.info(
+                    f"从 yfinance 批量获取 {len(chunk)} 只股票的历史数据，周期: {period}"
+                )
+                try:
+                    df = await executor.run(lambda: yf.download(**download_kwargs))
+                except Exception as e:
+                    logger.error(f"yfinance 批量获取历史数据失败（{len(chunk)} 只）: {e}")
+                    return None
+            
+            if df is None or df.empty:
+                logger.warning(f"yfinance 批量获取未返回数据（{len(chunk)} 只）")
+                return {ticker: [] for ticker in chunk}
+            
+            chunk_results: Dict[str, List[Dict[str, Any]]] = {}
+            available = set(df.columns.get_level_values(0))
+            for ticker in chunk:
+                if ticker not in available:
+                    chunk_results[ticker] = []
+                    continue
+                # 多只股票的交易日可能不同，去掉该股票没有数据的行
+                ticker_df = df[ticker].dropna(subset=["Close"])
+                chunk_results[ticker] = (
+                    self._yfinance_frame_to_kline(ticker_df) if not ticker_df.empty else []
+                )
+            return chunk_results
+        
+        chunks = [tickers[offset:offset + chunk_size] for offset in range(0, len(tickers), chunk_size)]
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        for chunk_results in await asyncio.gather(*(download_chunk(chunk) for chunk in chunks)):
+            if chunk_results is not None:
+                results.update(chunk_results)
+        
+        fetched = sum(1 for data in results.values() if data)
+        logger.info(f"yfinance 批量获取完成: {fetched}/{len(tickers)} 只股票有数据")
+        return results
+    
     async def fetch_from_akshare(
         self,
         ticker: str,
@@ -160,24 +296,17 @@ class HistoricalDataFetcher:
                 logger.warning(f"akshare 未返回 {ticker} 的数据")
                 return []
             
-            # 转换为字典列表（akshare 列名是中文）
-            kline_data = []
-            for _, row in df.iterrows():
-                # 解析日期
-                date_str = str(row["日期"])
-                timestamp = datetime.strptime(date_str, "%Y-%m-%d")
-                
-                data = {
-                    "timestamp": timestamp,
-                    "open": float(row["开盘"]),
-                    "high": float(row["最高"]),
-                    "low": float(row["最低"]),
-                    "close": float(row["收盘"]),
-                    "volume": int(row["成交量"]),
-                    "amount": float(row["成交额"]) if "成交额" in row else None,
-                    "adj_close": float(row["收盘"])  # akshare 默认返回复权价格
-                }
-                kline_data.append(data)
+            # 转换为字典列表（akshare 列名是中文，整列转换）
+            columns = frame_to_columns(
+                df,
+                AKSHARE_KLINE_COLUMNS,
+                KLINE_DTYPES,
+                date_format="%Y-%m-%d",
+            )
+            if "amount" not in columns:
+                columns["amount"] = [None] * len(df)
+            columns["adj_close"] = columns["close"]  # akshare 默认返回复权价格
+            kline_data = columns_to_records(columns)
             
             logger.info(f"成功获取 {ticker} 的 {len(kline_data)} 条数据")
             return kline_data
@@ -210,10 +339,7 @@ class HistoricalDataFetcher:
         """
         # 自动选择数据源
         if data_source is None:
-            if market in ["A股", "深圳", "上海"]:
-                data_source = "akshare"
-            else:
-                data_source = "yfinance"
+            data_source = self.select_data_source(market)
         
         # 根据数据源获取数据
         if data_source == "yfinance":
@@ -230,3 +356,14 @@ class HistoricalDataFetcher:
         else:
             logger.error(f"不支持的数据源: {data_source}")
             return []
+    
+    def select_data_source(self, market: str) -> str:
+        """根据市场选择历史数据的数据源.
+        
+        Args:
+            market: 市场（如 NASDAQ, A股）
+            
+        Returns:
+            str: 数据源名称（akshare 或 yfinance）
+        """
+        return "akshare" if market in AKSHARE_MARKETS else "yfinance"
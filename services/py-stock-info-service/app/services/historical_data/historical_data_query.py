@@ -2,14 +2,25 @@
 
 import logging
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.database import get_database
-from app.models.kline_data import kline_data_from_dict
+from app.services.historical_data.kline_cache import (
+    KlineCache,
+    KlineWindow,
+    get_kline_cache,
+    to_datetime64,
+)
 
 logger = logging.getLogger(__name__)
 
+# 分页查询可返回的字段（与 KlineDataResponse 一致，date 由 timestamp 生成）
+PAGE_FIELDS = (
+    "timestamp", "date", "open", "high", "low", "close", "volume",
+    "amount", "adj_close", "data_source",
+)
+
 
 class HistoricalDataQuery:
     """历史K线数据查询服务."""
@@ -22,6 +33,67 @@ class HistoricalDataQuery:
         """
         self.db = db if db is not None else get_database()
         self.collection = self.db.kline_data
+        self.cache: KlineCache = get_kline_cache()
+    
+    async def get_kline_window(
+        self,
+        ticker: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        sort_desc: bool = False
+    ) -> KlineWindow:
+        """按股票代码查询K线窗口（列数组，优先从K线窗口缓存读取）.
+        
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            limit: 返回数量限制（可选）
+            sort_desc: limit 是否从最新的K线开始计数
+            
+        Returns:
+            KlineWindow: K线窗口（按时间升序）
+        """
+        key = (self.db.name, ticker, period)
+        window = self.cache.get(key, start_date, end_date, limit, sort_desc)
+        if window is not None:
+            return window
+        
+        # 构建查询条件
+        query = {
+            "metadata.ticker": ticker,
+            "metadata.period": period
+        }
+        
+        # 添加时间范围条件
+        if start_date or end_date:
+            time_query = {}
+            if start_date:
+                time_query["$gte"] = start_date
+            if end_date:
+                time_query["$lte"] = end_date
+            query["timestamp"] = time_query
+        
+        generation = self.cache.generation
+        cursor = self.collection.find(query).sort("timestamp", -1 if sort_desc else 1)
+        if limit:
+            cursor = cursor.limit(limit)
+        documents = await cursor.to_list(length=None)
+        
+        # 窗口覆盖的范围：返回条数达到 limit 时只覆盖到最后一条（更早 / 更晚的K线未读取）
+        start, end = to_datetime64(start_date), to_datetime64(end_date)
+        if limit and len(documents) >= limit:
+            boundary = to_datetime64(documents[-1]["timestamp"])
+            if sort_desc:
+                start = boundary
+            else:
+                end = boundary
+        window = KlineWindow.from_documents(ticker, period, documents, start, end)
+        self.cache.put(key, window, generation)
+        return window
     
     async def query_by_ticker(
         self,
@@ -48,39 +120,10 @@ class HistoricalDataQuery:
         try:
             logger.info(f"查询 {ticker} 的历史数据，周期: {period}")
             
-            # 构建查询条件
-            query = {
-                "metadata.ticker": ticker,
-                "metadata.period": period
-            }
-            
-            # 添加时间范围条件
-            if start_date or end_date:
-                time_query = {}
-                if start_date:
-                    time_query["$gte"] = start_date
-                if end_date:
-                    time_query["$lte"] = end_date
-                query["timestamp"] = time_query
-            
-            # 执行查询
-            cursor = self.collection.find(query)
-            
-            # 排序
-            if sort_desc:
-                cursor = cursor.sort("timestamp", -1)
-            else:
-                cursor = cursor.sort("timestamp", 1)
-            
-            # 限制数量
-            if limit:
-                cursor = cursor.limit(limit)
-            
-            # 获取结果
-            documents = await cursor.to_list(length=None)
-            
-            # 转换格式
-            kline_data = [kline_data_from_dict(doc) for doc in documents]
+            window = await self.get_kline_window(
+                ticker, period, start_date, end_date, limit, sort_desc
+            )
+            kline_data = window.to_records(sort_desc=sort_desc)
             
             logger.info(f"查询到 {ticker} 的 {len(kline_data)} 条数据")
             return kline_data
@@ -89,6 +132,276 @@ class HistoricalDataQuery:
             logger.error(f"查询 {ticker} 数据失败: {str(e)}")
             return []
     
+    async def query_columns(
+        self,
+        ticker: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        sort_desc: bool = True
+    ) -> Dict[str, Any]:
+        """按股票代码查询历史K线数据（列式，由K线窗口的列数组直接生成）.
+        
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            limit: 返回数量限制（可选）
+            sort_desc: 是否按时间降序排序（默认 True）
+            
+        Returns:
+            Dict: {"ticker", "period", "count", "timestamps"（Unix 毫秒）, "open", ..., "data_source"}
+        """
+        window = await self.get_kline_window(
+            ticker, period, start_date, end_date, limit, sort_desc
+        )
+        return {
+            "ticker": ticker,
+            "period": period,
+            "count": len(window),
+            **window.to_columns(sort_desc=sort_desc),
+        }
+
+    async def query_items(
+        self,
+        ticker: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        sort_desc: bool = True
+    ) -> List[Dict[str, Any]]:
+        """按股票代码查询历史K线数据（接口响应格式，由K线窗口的列数组直接生成）.
+
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            limit: 返回数量限制（可选）
+            sort_desc: 是否按时间降序排序（默认 True）
+
+        Returns:
+            List[Dict]: K线数据列表（字段同 KlineDataResponse，时间为 ISO 8601 字符串）
+        """
+        window = await self.get_kline_window(
+            ticker, period, start_date, end_date, limit, sort_desc
+        )
+        return window.to_items(sort_desc=sort_desc)
+
+    async def query_page(
+        self,
+        ticker: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        page_size: int = 100,
+        after: Optional[datetime] = None,
+        skip: int = 0,
+        sort_desc: bool = True,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """分页查询K线数据（数据库端分页，只读取需要的字段）.
+        
+        after 为上一页最后一条的时间（游标分页，按时间戳定位，不随页数变慢）；
+        skip 为跳过的条数（页码分页）。
+        
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            page_size: 每页条数
+            after: 游标，只返回排序方向上该时间之后的数据（可选）
+            skip: 跳过的条数（可选）
+            sort_desc: 是否按时间降序排序（默认 True）
+            fields: 返回的字段（可选，默认为 PAGE_FIELDS，总是包含 timestamp）
+            
+        Returns:
+            (items, has_more)：items 为本页数据（时间为 ISO 8601 字符串，缺少的字段为 None），
+            has_more 表示之后是否还有数据
+        """
+        fields = ["timestamp"] + [field for field in fields or PAGE_FIELDS if field != "timestamp"]
+        query: Dict[str, Any] = {
+            "metadata.ticker": ticker,
+            "metadata.period": period
+        }
+        time_query: Dict[str, Any] = {}
+        if start_date:
+            time_query["$gte"] = start_date
+        if end_date:
+            time_query["$lte"] = end_date
+        if after is not None:
+            time_query["$lt" if sort_desc else "$gt"] = after
+        if time_query:
+            query["timestamp"] = time_query
+        
+        projection = {"_id": 0, "timestamp": 1}
+        projection.update((field, 1) for field in fields if field not in ("timestamp", "date"))
+        cursor = self.collection.find(query, projection).sort("timestamp", -1 if sort_desc else 1)
+        if skip:
+            cursor = cursor.skip(skip)
+        # 多读一条判断是否还有下一页
+        documents = await cursor.limit(page_size + 1).to_list(length=None)
+        
+        items = []
+        for doc in documents[:page_size]:
+            timestamp = doc["timestamp"].isoformat()
+            items.append(
+                {
+                    field: timestamp if field in ("timestamp", "date") else doc.get(field)
+                    for field in fields
+                }
+            )
+        return items, len(documents) > page_size
+
+    async def iter_batches(
+        self,
+        ticker: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        batch_size: int = 5000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """按时间升序分批读取K线文档（逐批迭代数据库游标，不一次性加载整个范围）.
+
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            batch_size: 每批条数（同时作为游标每次从数据库读取的条数）
+
+        Yields:
+            List[Dict]: 每批最多 batch_size 条文档（不含 _id 和 metadata）
+        """
+        query: Dict[str, Any] = {
+            "metadata.ticker": ticker,
+            "metadata.period": period
+        }
+        if start_date or end_date:
+            query["timestamp"] = {}
+            if start_date:
+                query["timestamp"]["$gte"] = start_date
+            if end_date:
+                query["timestamp"]["$lte"] = end_date
+
+        cursor = self.collection.find(query, {"_id": 0, "metadata": 0}).sort("timestamp", 1)
+        cursor = cursor.batch_size(batch_size)
+        batch: List[Dict[str, Any]] = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def count_by_ticker(
+        self,
+        ticker: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> int:
+        """统计K线条数（K线窗口缓存覆盖查询范围时直接计数，否则使用 count_documents）.
+        
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            
+        Returns:
+            int: K线条数
+        """
+        start, end = to_datetime64(start_date), to_datetime64(end_date)
+        window = self.cache.peek((self.db.name, ticker, period))
+        if window is not None and window.covers(start, end):
+            return window.count(start, end)
+        
+        query: Dict[str, Any] = {
+            "metadata.ticker": ticker,
+            "metadata.period": period
+        }
+        if start_date or end_date:
+            time_query = {}
+            if start_date:
+                time_query["$gte"] = start_date
+            if end_date:
+                time_query["$lte"] = end_date
+            query["timestamp"] = time_query
+        return await self.collection.count_documents(query)
+    
+    async def query_closes_by_tickers(
+        self,
+        tickers: List[str],
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """一次查询多只股票的收盘价（只返回 timestamp 和指定字段）.
+        
+        Args:
+            tickers: 股票代码列表
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            fields: 返回的价格字段（可选，默认只返回 close）
+            
+        Returns:
+            Dict: {股票代码: [{"timestamp", "close", ...}, ...]}（按时间升序，缺少的字段为 None）
+        """
+        fields = fields or ["close"]
+        query: Dict[str, Any] = {
+            "metadata.ticker": {"$in": tickers},
+            "metadata.period": period
+        }
+        if start_date or end_date:
+            time_query = {}
+            if start_date:
+                time_query["$gte"] = start_date
+            if end_date:
+                time_query["$lte"] = end_date
+            query["timestamp"] = time_query
+        
+        results: Dict[str, List[Dict[str, Any]]] = {ticker: [] for ticker in tickers}
+        projection = {"_id": 0, "timestamp": 1, "metadata.ticker": 1}
+        projection.update((field, 1) for field in fields)
+        cursor = self.collection.find(query, projection).sort("timestamp", 1)
+        async for doc in cursor:
+            ticker = doc["metadata"]["ticker"]
+            item = {"timestamp": doc["timestamp"]}
+            for field in fields:
+                item[field] = doc.get(field)
+            results[ticker].append(item)
+        
+        logger.info(f"查询到 {len(tickers)} 只股票的收盘价数据")
+        return results
+    
+    async def get_tickers(
+        self,
+        period: str,
+        market: Optional[str] = None
+    ) -> List[str]:
+        """获取有历史数据的股票代码列表.
+        
+        Args:
+            period: 时间周期
+            market: 市场（可选）
+            
+        Returns:
+            List[str]: 股票代码列表（排序后）
+        """
+        query: Dict[str, Any] = {"metadata.period": period}
+        if market:
+            query["metadata.market"] = market
+        tickers = await self.collection.distinct("metadata.ticker", query)
+        return sorted(tickers)
+    
     async def get_latest_date(
         self,
         ticker: str,
@@ -3,9 +3,10 @@
 import logging
 import asyncio
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Callable
+from typing import AsyncIterator, List, Dict, Any, Optional, Callable, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.config import settings
 from app.database import get_database
 from app.services.historical_data.historical_data_fetcher import HistoricalDataFetcher
 from app.services.historical_data.historical_data_storage import HistoricalDataStorage
@@ -66,7 +67,9 @@ class HistoricalDataService:
         period: str = "1d",
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-        data_source: Optional[str] = None
+        data_source: Optional[str] = None,
+        append: bool = False,
+        latest_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """获取并保存单只股票的历史K线数据.
         
@@ -77,6 +80,8 @@ class HistoricalDataService:
             start_date: 开始日期（可选）
             end_date: 结束日期（可选）
             data_source: 数据源（可选）
+            append: 是否追加保存（晚于 latest_date 的K线直接插入，见 save_fetched_kline_data）
+            latest_date: 已有数据的最新时间（追加保存时使用，None 表示没有已有数据）
             
         Returns:
             Dict: {"ticker": 股票代码, "saved": 保存条数, "updated": 更新条数}
@@ -88,14 +93,51 @@ class HistoricalDataService:
             ticker, market, period, start_date, end_date, data_source
         )
         
+        return await self.save_fetched_kline_data(
+            ticker, market, period, kline_data, data_source, append, latest_date
+        )
+    
+    async def save_fetched_kline_data(
+        self,
+        ticker: str,
+        market: str,
+        period: str,
+        kline_data: List[Dict[str, Any]],
+        data_source: Optional[str] = None,
+        append: bool = False,
+        latest_date: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """保存已获取的历史K线数据.
+        
+        默认逐条 upsert；append 为 True 时晚于 latest_date 的K线直接 insert_many 插入，
+        只有与已有数据重叠的K线才 upsert（增量更新时使用）。
+        
+        Args:
+            ticker: 股票代码
+            market: 市场
+            period: 时间周期
+            kline_data: K线数据列表
+            data_source: 数据源（可选）
+            append: 是否追加保存
+            latest_date: 已有数据的最新时间（追加保存时使用，None 表示没有已有数据）
+            
+        Returns:
+            Dict: {"ticker": 股票代码, "inserted": 插入条数, "updated": 更新条数}
+        """
         if not kline_data:
             logger.warning(f"{ticker} 没有获取到数据")
             return {"ticker": ticker, "inserted": 0, "updated": 0}
         
-        # 保存数据（使用 upsert 避免重复）
-        result = await self.storage.upsert_kline_data(
-            ticker, market, period, kline_data, data_source or "yfinance"
-        )
+        if append:
+            # 追加保存（新K线直接插入，重叠的K线 upsert）
+            result = await self.storage.append_kline_data(
+                ticker, market, period, kline_data, data_source or "yfinance", latest_date
+            )
+        else:
+            # 保存数据（使用 upsert 避免重复）
+            result = await self.storage.upsert_kline_data(
+                ticker, market, period, kline_data, data_source or "yfinance"
+            )
         
         logger.info(f"{ticker} 数据保存完成: 插入 {result['inserted']}, 更新 {result['updated']}")
         return {
@@ -132,6 +174,131 @@ class HistoricalDataService:
         
         return kline_data
     
+    async def query_kline_columns(
+        self,
+        ticker: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """查询历史K线数据（列式，字段见 HistoricalDataQuery.query_columns）.
+        
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            limit: 返回数量限制（可选）
+            
+        Returns:
+            Dict: 列式K线数据（按时间降序，与 query_kline_data 的顺序一致）
+        """
+        return await self.query.query_columns(ticker, period, start_date, end_date, limit)
+
+    async def query_kline_items(
+        self,
+        ticker: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """查询历史K线数据（接口响应格式，字段见 HistoricalDataQuery.query_items）.
+
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            limit: 返回数量限制（可选）
+
+        Returns:
+            List[Dict]: K线数据列表（按时间降序）
+        """
+        return await self.query.query_items(ticker, period, start_date, end_date, limit)
+
+    def iter_kline_batches(
+        self,
+        ticker: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """按时间升序分批读取历史K线数据（用于流式导出，内存占用只与批大小有关）.
+
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            batch_size: 每批条数（可选，默认为配置 kline_export_batch_size）
+
+        Returns:
+            AsyncIterator[List[Dict]]: K线文档批次
+        """
+        return self.query.iter_batches(
+            ticker, period, start_date, end_date,
+            batch_size or settings.kline_export_batch_size
+        )
+
+    async def query_kline_page(
+        self,
+        ticker: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        page_size: int = 100,
+        after: Optional[datetime] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        include_total: bool = False
+    ) -> Dict[str, Any]:
+        """分页查询历史K线数据（按时间降序，数据库端分页）.
+        
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            page_size: 每页条数
+            after: 游标（上一页的 next_cursor 对应的时间，可选）
+            skip: 跳过的条数（页码分页，可选）
+            limit: 最多返回最新的多少条（页码分页，可选）
+            fields: 返回的字段（可选，默认返回全部字段）
+            include_total: 是否统计总条数（需要额外一次计数查询）
+            
+        Returns:
+            Dict: {"items": 本页数据, "total": 总条数（不统计时为 None）,
+                "next_cursor": 下一页游标（没有下一页时为 None）}
+        """
+        if limit is not None:
+            page_size = min(page_size, limit - skip)
+        
+        items: List[Dict[str, Any]] = []
+        has_more = False
+        if page_size > 0:
+            items, has_more = await self.query.query_page(
+                ticker, period, start_date, end_date, page_size, after, skip,
+                sort_desc=True, fields=fields
+            )
+        if limit is not None and skip + len(items) >= limit:
+            has_more = False
+        
+        total = None
+        if include_total:
+            total = await self.query.count_by_ticker(ticker, period, start_date, end_date)
+            if limit is not None:
+                total = min(total, limit)
+        
+        return {
+            "items": items,
+            "total": total,
+            "next_cursor": items[-1]["timestamp"] if has_more else None,
+        }
+    
     async def update_kline_data_incremental(
         self,
         ticker: str,
@@ -141,6 +308,8 @@ class HistoricalDataService:
     ) -> Dict[str, Any]:
         """增量更新历史K线数据（只更新缺失的数据）.
         
+        最新数据日期之后的K线直接插入（insert_many），与已有数据重叠的K线才 upsert。
+        
         Args:
             ticker: 股票代码
             market: 市场
@@ -172,9 +341,10 @@ class HistoricalDataService:
             
             logger.info(f"{ticker} 增量更新从 {start_date} 到 {end_date}")
         
-        # 获取并保存数据
+        # 获取并保存数据（latest_date 之后的K线一定不存在，追加保存）
         result = await self.fetch_and_save_kline_data(
-            ticker, market, period, start_date, end_date, data_source
+            ticker, market, period, start_date, end_date, data_source,
+            append=True, latest_date=latest_date
         )
         
         return result
@@ -228,10 +398,15 @@ class HistoricalDataService:
         period: str = "1d",
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        concurrency: Optional[int] = None
     ) -> Dict[str, Any]:
         """批量获取股票的历史K线数据（支持 SSE 进度推送）.
         
+        使用流水线处理：多个获取协程并发拉取数据，放入有界队列；
+        写入协程从队列中取出数据，跨股票合并为一次 bulk_write。
+        网络获取与数据库写入同时进行。
+        
         Args:
             tickers: 股票代码列表
             markets: 股票市场映射（{ticker: market}）
@@ -239,6 +414,7 @@ class HistoricalDataService:
             start_date: 开始日期（可选）
             end_date: 结束日期（可选）
             progress_callback: 进度回调函数（可选）
+            concurrency: 并发获取数（可选，默认使用配置）
             
         Returns:
             Dict: {"total": 总数, "success": 成功数, "failed": 失败数, "results": [结果列表]}
@@ -246,9 +422,10 @@ class HistoricalDataService:
         logger.info(f"批量获取 {len(tickers)} 只股票的历史K线数据")
         
         total = len(tickers)
-        success_count = 0
-        failed_count = 0
-        results = []
+        concurrency = max(1, concurrency or settings.historical_fetch_concurrency)
+        results: List[Optional[Dict[str, Any]]] = [None] * total
+        fetched_count = 0
+        saved_count = 0
         
         # 发送初始化进度
         if progress_callback:
@@ -259,55 +436,143 @@ class HistoricalDataService:
                 "total": total
             })
         
-        # 遍历股票列表
-        for idx, ticker in enumerate(tickers):
-            try:
+        # 美股/港股使用 yf.download 批量下载（按周期和日期范围一次请求多只股票）
+        prefetched: Dict[str, List[Dict[str, Any]]] = {}
+        yfinance_tickers = [
+            ticker for ticker in tickers
+            if self.fetcher.select_data_source(markets.get(ticker, "NASDAQ")) == "yfinance"
+        ]
+        if len(yfinance_tickers) > 1:
+            if progress_callback:
+                await progress_callback({
+                    "stage": "fetching",
+                    "message": f"正在批量下载 {len(yfinance_tickers)} 只美股/港股的数据...",
+                    "progress": 0,
+                    "total": total
+                })
+            prefetched = await self.fetcher.fetch_batch_from_yfinance(
+                yfinance_tickers,
+                period,
+                start_date,
+                end_date,
+                chunk_size=settings.historical_batch_download_size
+            )
+        
+        pending = iter(enumerate(tickers))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.historical_pipeline_queue_size)
+        
+        def record_failure(idx: int, ticker: str, error: str):
+            results[idx] = {"ticker": ticker, "status": "failed", "error": error}
+        
+        async def fetch_worker():
+            """获取协程：拉取数据并放入写入队列."""
+            nonlocal fetched_count
+            for idx, ticker in pending:
                 market = markets.get(ticker, "NASDAQ")
+                # 批量下载失败的股票逐只获取
+                fetched_individually = ticker not in prefetched
+                try:
+                    if fetched_individually:
+                        kline_data = await self.fetch_kline_data(
+                            ticker, market, period, start_date, end_date
+                        )
+                        data_source = self.fetcher.select_data_source(market)
+                    else:
+                        kline_data = prefetched.pop(ticker)
+                        data_source = "yfinance"
+                except Exception as e:
+                    logger.error(f"批量获取 {ticker} 数据失败: {str(e)}")
+                    kline_data = None
+                    record_failure(idx, ticker, str(e))
                 
-                # 发送进度更新
+                fetched_count += 1
                 if progress_callback:
                     await progress_callback({
                         "stage": "fetching",
-                        "message": f"正在获取 {ticker} 的数据... ({idx + 1}/{total})",
-                        "progress": int((idx + 1) / total * 100),
+                        "message": f"正在获取 {ticker} 的数据... ({fetched_count}/{total})",
+                        "progress": int(fetched_count / total * 100),
                         "total": total,
-                        "current": idx + 1,
+                        "current": fetched_count,
                         "ticker": ticker
                     })
                 
-                # 获取并保存数据
-                result = await self.fetch_and_save_kline_data(
-                    ticker, market, period, start_date, end_date
-                )
+                if kline_data:
+                    # 队列满时等待写入协程消费（背压）
+                    await queue.put((idx, ticker, market, kline_data, data_source))
+                elif results[idx] is None:
+                    record_failure(idx, ticker, "未获取到数据")
                 
-                if result["inserted"] > 0 or result["updated"] > 0:
-                    success_count += 1
-                    results.append({
+                # 逐只获取时添加延迟，避免请求过快
+                if fetched_individually:
+                    await asyncio.sleep(0.5)
+        
+        async def write_batch(batch: List[Tuple[int, str, str, List[Dict[str, Any]], str]]):
+            """将多只股票的数据合并为一次 bulk_write."""
+            nonlocal saved_count
+            write_results = await self.storage.upsert_kline_batch(
+                [(ticker, market, period, kline_data, data_source)
+                 for _, ticker, market, kline_data, data_source in batch]
+            )
+            for idx, ticker, _, _, _ in batch:
+                write_result = write_results.get(ticker, {})
+                if write_result.get("error"):
+                    record_failure(idx, ticker, write_result["error"])
+                elif write_result.get("inserted", 0) > 0 or write_result.get("updated", 0) > 0:
+                    results[idx] = {
                         "ticker": ticker,
                         "status": "success",
-                        "inserted": result["inserted"],
-                        "updated": result["updated"]
-                    })
+                        "inserted": write_result["inserted"],
+                        "updated": write_result["updated"]
+                    }
                 else:
-                    failed_count += 1
-                    results.append({
-                        "ticker": ticker,
-                        "status": "failed",
-                        "error": "未获取到数据"
-                    })
-                
-                # 添加延迟，避免请求过快
-                await asyncio.sleep(0.5)
-                
-            except Exception as e:
-                logger.error(f"批量获取 {ticker} 数据失败: {str(e)}")
-                failed_count += 1
-                results.append({
-                    "ticker": ticker,
-                    "status": "failed",
-                    "error": str(e)
+                    record_failure(idx, ticker, "没有有效数据")
+            
+            saved_count += len(batch)
+            if progress_callback:
+                await progress_callback({
+                    "stage": "saving",
+                    "message": f"已保存 {saved_count} 只股票的数据",
+                    "progress": int(fetched_count / total * 100),
+                    "total": total,
+                    "saved": saved_count
                 })
         
+        async def writer():
+            """写入协程：合并队列中已就绪的数据后批量写入."""
+            done = False
+            while not done:
+                item = await queue.get()
+                if item is None:
+                    break
+                batch = [item]
+                rows = len(item[3])
+                # 合并队列中已就绪的数据，直到达到批量写入上限
+                while rows < settings.historical_write_batch_rows and not queue.empty():
+                    next_item = queue.get_nowait()
+                    if next_item is None:
+                        done = True
+                        break
+                    batch.append(next_item)
+                    rows += len(next_item[3])
+                try:
+                    await write_batch(batch)
+                except Exception as e:
+                    logger.error(f"批量保存历史数据失败: {str(e)}")
+                    for idx, ticker, _, _, _ in batch:
+                        record_failure(idx, ticker, str(e))
+        
+        writer_task = asyncio.create_task(writer())
+        try:
+            await asyncio.gather(*(fetch_worker() for _ in range(min(concurrency, max(total, 1)))))
+            await queue.put(None)
+            await writer_task
+        finally:
+            if not writer_task.done():
+                writer_task.cancel()
+        
+        success_count = sum(1 for r in results if r and r["status"] == "success")
+        failed_count = total - success_count
+        
         # 发送完成通知
         if progress_callback:
             await progress_callback({
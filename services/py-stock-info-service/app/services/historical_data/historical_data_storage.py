@@ -1,13 +1,16 @@
 """历史K线数据存储服务（保存数据到MongoDB）."""
 
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from datetime import datetime, UTC
+from typing import List, Dict, Any, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
+from app.config import settings
 from app.database import get_database
-from app.models.kline_data import prepare_kline_document, validate_kline_data
+from app.models.kline_data import prepare_kline_document, validate_kline_batch
+from app.services.historical_data.kline_cache import KlineCache, get_kline_cache
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +26,7 @@ class HistoricalDataStorage:
         """
         self.db = db if db is not None else get_database()
         self.collection = self.db.kline_data
+        self.cache: KlineCache = get_kline_cache()
     
     async def save_kline_data(
         self,
@@ -51,11 +55,11 @@ class HistoricalDataStorage:
         try:
             logger.info(f"开始保存 {ticker} 的 {len(kline_data)} 条数据到数据库")
             
-            # 准备文档
+            # 准备文档（按列批量验证）
             documents = []
-            for data in kline_data:
-                # 验证数据
-                if not validate_kline_data(data):
+            valid = validate_kline_batch(kline_data)
+            for data, is_valid in zip(kline_data, valid.tolist()):
+                if not is_valid:
                     logger.warning(f"数据验证失败，跳过: {data}")
                     continue
                 
@@ -67,8 +71,11 @@ class HistoricalDataStorage:
                 logger.warning(f"没有有效数据可保存：{ticker}")
                 return 0
             
-            # 批量插入
-            result = await self.collection.insert_many(documents, ordered=False)
+            # 批量插入（失败时也可能已写入部分数据，总是让缓存失效）
+            try:
+                result = await self.collection.insert_many(documents, ordered=False)
+            finally:
+                self.cache.invalidate(self.db.name, ticker, period)
             inserted_count = len(result.inserted_ids)
             
             logger.info(f"成功保存 {ticker} 的 {inserted_count} 条数据")
@@ -107,11 +114,11 @@ class HistoricalDataStorage:
         try:
             logger.info(f"开始 upsert {ticker} 的 {len(kline_data)} 条数据")
             
-            # 准备 bulk operations
+            # 准备 bulk operations（按列批量验证）
             operations = []
-            for data in kline_data:
-                # 验证数据
-                if not validate_kline_data(data):
+            valid = validate_kline_batch(kline_data)
+            for data, is_valid in zip(kline_data, valid.tolist()):
+                if not is_valid:
                     logger.warning(f"数据验证失败，跳过: {data}")
                     continue
                 
@@ -139,7 +146,10 @@ class HistoricalDataStorage:
                 return {"inserted": 0, "updated": 0}
             
             # 批量执行
-            result = await self.collection.bulk_write(operations, ordered=False)
+            try:
+                result = await self.collection.bulk_write(operations, ordered=False)
+            finally:
+                self.cache.invalidate(self.db.name, ticker, period)
             
             inserted_count = result.upserted_count
             updated_count = result.modified_count
@@ -151,6 +161,219 @@ class HistoricalDataStorage:
             logger.error(f"Upsert {ticker} 数据失败: {str(e)}")
             return {"inserted": 0, "updated": 0}
     
+    async def append_kline_data(
+        self,
+        ticker: str,
+        market: str,
+        period: str,
+        kline_data: List[Dict[str, Any]],
+        data_source: str = "yfinance",
+        after: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """追加保存历史K线数据（增量更新使用）.
+        
+        晚于 after（数据库中已有数据的最新时间）的K线一定不存在，直接 insert_many 插入；
+        不晚于 after 的K线（与已有数据重叠）以及插入失败的K线回退到 upsert。
+        after 为 None 表示数据库中还没有该股票的数据，全部直接插入。
+        
+        Args:
+            ticker: 股票代码
+            market: 市场
+            period: 时间周期
+            kline_data: K线数据列表
+            data_source: 数据来源
+            after: 已有数据的最新时间（不带时区时视为 UTC，可选）
+            
+        Returns:
+            Dict[str, int]: {"inserted": 插入数, "updated": 更新数}
+        """
+        if not kline_data:
+            logger.warning(f"没有数据可保存：{ticker}")
+            return {"inserted": 0, "updated": 0}
+        
+        if after is not None and after.tzinfo is None:
+            after = after.replace(tzinfo=UTC)
+        
+        try:
+            # 按时间拆分为新数据（同一时间只保留最后一条）和重叠数据
+            new_documents: Dict[datetime, Dict[str, Any]] = {}
+            overlapping = []
+            valid = validate_kline_batch(kline_data)
+            for data, is_valid in zip(kline_data, valid.tolist()):
+                if not is_valid:
+                    logger.warning(f"数据验证失败，跳过: {data}")
+                    continue
+                doc = prepare_kline_document(ticker, market, period, data, data_source)
+                # MongoDB 只保存到毫秒，按毫秒精度与 after 比较（不带时区时视为 UTC）
+                timestamp = doc["timestamp"]
+                stored = timestamp.replace(microsecond=timestamp.microsecond // 1000 * 1000)
+                if stored.tzinfo is None:
+                    stored = stored.replace(tzinfo=UTC)
+                if after is None or stored > after:
+                    new_documents[timestamp] = doc
+                else:
+                    overlapping.append(doc)
+            
+            if not new_documents and not overlapping:
+                logger.warning(f"没有有效数据可保存：{ticker}")
+                return {"inserted": 0, "updated": 0}
+            
+            logger.info(
+                f"开始追加 {ticker} 的数据: 新数据 {len(new_documents)} 条，"
+                f"重叠数据 {len(overlapping)} 条"
+            )
+            
+            inserted_count = 0
+            updated_count = 0
+            try:
+                if new_documents:
+                    documents = list(new_documents.values())
+                    try:
+                        result = await self.collection.insert_many(documents, ordered=False)
+                        inserted_count = len(result.inserted_ids)
+                    except BulkWriteError as e:
+                        details = e.details or {}
+                        inserted_count = details.get("nInserted", 0)
+                        failed = [item["index"] for item in details.get("writeErrors", [])]
+                        logger.warning(f"{ticker} 有 {len(failed)} 条数据插入失败，改为 upsert")
+                        overlapping.extend(documents[index] for index in failed)
+                
+                if overlapping:
+                    operations = [
+                        UpdateOne(
+                            {
+                                "timestamp": doc["timestamp"],
+                                "metadata.ticker": ticker,
+                                "metadata.period": period
+                            },
+                            # 插入失败的文档可能已被 insert_many 加上 _id
+                            {"$set": {key: value for key, value in doc.items() if key != "_id"}},
+                            upsert=True
+                        )
+                        for doc in overlapping
+                    ]
+                    result = await self.collection.bulk_write(operations, ordered=False)
+                    inserted_count += result.upserted_count
+                    updated_count = result.modified_count
+            finally:
+                self.cache.invalidate(self.db.name, ticker, period)
+            
+            logger.info(f"成功追加 {ticker} 的数据: 插入 {inserted_count}, 更新 {updated_count}")
+            return {"inserted": inserted_count, "updated": updated_count}
+            
+        except Exception as e:
+            logger.error(f"追加 {ticker} 数据失败: {str(e)}")
+            return {"inserted": 0, "updated": 0}
+    
+    async def upsert_kline_batch(
+        self,
+        items: List[Tuple[str, str, str, List[Dict[str, Any]], str]],
+        batch_rows: Optional[int] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """跨股票批量 upsert 历史K线数据.
+        
+        每只股票的数据按列批量验证后，所有股票的写入操作合并按 batch_rows 分批执行
+        bulk_write（一批可包含多只股票，一只股票的数据也可能分在多批）。
+        
+        Args:
+            items: [(ticker, market, period, kline_data, data_source), ...]
+            batch_rows: 每次 bulk_write 的最大操作数（可选，默认为配置 historical_write_batch_rows）
+            
+        Returns:
+            Dict: {ticker: {"inserted": 插入数, "updated": 已存在并被覆盖的条数, "error": 错误信息（可选）}}
+        """
+        batch_rows = max(1, batch_rows or settings.historical_write_batch_rows)
+        results: Dict[str, Dict[str, Any]] = {}
+        operations = []
+        op_tickers: List[str] = []
+        
+        for ticker, market, period, kline_data, data_source in items:
+            results[ticker] = {"inserted": 0, "updated": 0}
+            valid = validate_kline_batch(kline_data)
+            skipped = len(kline_data) - int(valid.sum())
+            if skipped:
+                logger.warning(f"{ticker} 有 {skipped} 条数据验证失败，已跳过")
+            
+            for data, is_valid in zip(kline_data, valid.tolist()):
+                if not is_valid:
+                    continue
+                doc = prepare_kline_document(ticker, market, period, data, data_source)
+                operations.append(
+                    UpdateOne(
+                        {
+                            "timestamp": doc["timestamp"],
+                            "metadata.ticker": ticker,
+                            "metadata.period": period
+                        },
+                        {"$set": doc},
+                        upsert=True
+                    )
+                )
+                op_tickers.append(ticker)
+        
+        if not operations:
+            return results
+        
+        logger.info(
+            f"开始批量 upsert {len(items)} 只股票的 {len(operations)} 条数据"
+            f"（每批 {batch_rows} 条）"
+        )
+        
+        # 失败时也可能已写入部分数据，总是让缓存失效
+        try:
+            for start in range(0, len(operations), batch_rows):
+                await self._bulk_upsert(
+                    operations[start:start + batch_rows],
+                    op_tickers[start:start + batch_rows],
+                    results,
+                )
+        finally:
+            for ticker, _, period, _, _ in items:
+                self.cache.invalidate(self.db.name, ticker, period)
+        
+        return results
+    
+    async def _bulk_upsert(
+        self,
+        operations: List[UpdateOne],
+        op_tickers: List[str],
+        results: Dict[str, Dict[str, Any]],
+    ):
+        """执行一批 upsert 操作，并把插入 / 更新 / 错误计入对应股票的结果.
+        
+        Args:
+            operations: UpdateOne 操作列表
+            op_tickers: 每个操作对应的股票代码
+            results: 各股票的写入结果（原地累加）
+        """
+        upserted_indexes: List[int] = []
+        failed_indexes: Dict[int, str] = {}
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            upserted_indexes = list(result.upserted_ids.keys())
+        except BulkWriteError as e:
+            details = e.details or {}
+            upserted_indexes = [item["index"] for item in details.get("upserted", [])]
+            failed_indexes = {
+                item["index"]: item.get("errmsg", "写入失败")
+                for item in details.get("writeErrors", [])
+            }
+            logger.error(f"批量 upsert 部分失败: {len(failed_indexes)} 条写入错误")
+        except Exception as e:
+            logger.error(f"批量 upsert 失败: {str(e)}")
+            for ticker in set(op_tickers):
+                results[ticker]["error"] = str(e)
+            return
+        
+        upserted = set(upserted_indexes)
+        for index, ticker in enumerate(op_tickers):
+            if index in failed_indexes:
+                results[ticker].setdefault("error", failed_indexes[index])
+            elif index in upserted:
+                results[ticker]["inserted"] += 1
+            else:
+                results[ticker]["updated"] += 1
+    
     async def delete_kline_data(
         self,
         ticker: Optional[str] = None,
@@ -188,7 +411,10 @@ class HistoricalDataStorage:
             logger.info(f"开始删除数据，条件: {query}")
             
             # 执行删除
-            result = await self.collection.delete_many(query)
+            try:
+                result = await self.collection.delete_many(query)
+            finally:
+                self.cache.invalidate(self.db.name, ticker, period)
             deleted_count = result.deleted_count
             
             logger.info(f"成功删除 {deleted_count} 条数据")
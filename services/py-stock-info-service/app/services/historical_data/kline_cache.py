@@ -0,0 +1,482 @@
+"""热点K线窗口缓存（进程内 LRU，按字节数限制容量）."""
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.frame_converter import datetimes_to_epoch_ms, float_array_to_list
+
+logger = logging.getLogger(__name__)
+
+# 数值列（缺失值用 NaN 表示，转换回记录时省略该字段）
+FLOAT_FIELDS = ("open", "high", "low", "close", "amount", "adj_close")
+# 文本列（按取值编码：codes 数组 + 取值列表）
+LABEL_FIELDS = ("market", "data_source")
+# 还原记录时的字段顺序（与 kline_data_from_dict 的输出一致）
+RECORD_FIELDS = ("open", "high", "low", "close", "volume", "amount", "adj_close", "data_source")
+
+# (数据库名, ticker, period)
+CacheKey = Tuple[str, str, str]
+
+
+def to_datetime64(value: Optional[datetime]) -> Optional[np.datetime64]:
+    """转换为 datetime64（不带时区的 UTC 时间，与 MongoDB 返回的时间一致）."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return np.datetime64(value, "us")
+
+
+class KlineWindow:
+    """一只股票、一个周期在 [start, end] 内的全部K线（按时间升序的列数组）.
+
+    start / end 为 None 表示不限；窗口包含数据库中该范围内的所有K线，
+    因此范围内的任意查询都可以直接从窗口切片得到。
+    """
+
+    def __init__(
+        self,
+        ticker: str,
+        period: str,
+        start: Optional[np.datetime64],
+        end: Optional[np.datetime64],
+        timestamps: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        labels: Dict[str, Tuple[np.ndarray, List[Any]]],
+    ):
+        """初始化窗口.
+
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            start: 覆盖范围开始时间（None 表示不限）
+            end: 覆盖范围结束时间（None 表示不限）
+            timestamps: 时间戳数组（datetime64[us]，升序）
+            columns: 数值列 {字段: 数组}（volume 为 int64，其余为 float64）
+            labels: 文本列 {字段: (编码数组, 取值列表)}
+        """
+        self.ticker = ticker
+        self.period = period
+        self.start = start
+        self.end = end
+        self.timestamps = timestamps
+        self.columns = columns
+        self.labels = labels
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def from_documents(
+        cls,
+        ticker: str,
+        period: str,
+        documents: List[Dict[str, Any]],
+        start: Optional[np.datetime64],
+        end: Optional[np.datetime64],
+    ) -> "KlineWindow":
+        """从 MongoDB 文档构建窗口.
+
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            documents: kline_data 文档（任意顺序）
+            start: 覆盖范围开始时间
+            end: 覆盖范围结束时间
+
+        Returns:
+            窗口
+        """
+        timestamps = np.array(
+            [to_datetime64(doc["timestamp"]) for doc in documents], dtype="datetime64[us]"
+        )
+        order = np.argsort(timestamps, kind="stable")
+        columns: Dict[str, np.ndarray] = {
+            field: np.array([doc.get(field, np.nan) for doc in documents], dtype=np.float64)[order]
+            for field in FLOAT_FIELDS
+        }
+        columns["volume"] = np.array(
+            [doc.get("volume", 0) for doc in documents], dtype=np.int64
+        )[order]
+
+        labels: Dict[str, Tuple[np.ndarray, List[Any]]] = {}
+        for field in LABEL_FIELDS:
+            values: Dict[Any, int] = {}
+            codes = np.empty(len(documents), dtype=np.int32)
+            for position, doc in enumerate(documents):
+                value = doc.get("metadata", {}).get(field) if field == "market" else doc.get(field)
+                codes[position] = values.setdefault(value, len(values))
+            labels[field] = (codes[order], list(values))
+
+        return cls(ticker, period, start, end, timestamps[order], columns, labels)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        """窗口占用的字节数（只计算数组）."""
+        return (
+            self.timestamps.nbytes
+            + sum(array.nbytes for array in self.columns.values())
+            + sum(codes.nbytes for codes, _ in self.labels.values())
+        )
+
+    def covers(self, start: Optional[np.datetime64], end: Optional[np.datetime64]) -> bool:
+        """[start, end] 是否完全在窗口覆盖范围内."""
+        start_ok = self.start is None or (start is not None and start >= self.start)
+        end_ok = self.end is None or (end is not None and end <= self.end)
+        return start_ok and end_ok
+
+    def _bounds(self, start: Optional[np.datetime64], end: Optional[np.datetime64]) -> Tuple[int, int]:
+        """[start, end] 对应的行号范围 [lo, hi)."""
+        lo = 0 if start is None else int(np.searchsorted(self.timestamps, start, side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.timestamps, end, side="right"))
+        return lo, max(lo, hi)
+
+    def count(self, start: Optional[np.datetime64], end: Optional[np.datetime64]) -> int:
+        """窗口中 [start, end] 内的K线数量."""
+        lo, hi = self._bounds(start, end)
+        return hi - lo
+
+    def select(
+        self,
+        start: Optional[np.datetime64],
+        end: Optional[np.datetime64],
+        limit: Optional[int] = None,
+        sort_desc: bool = False,
+    ) -> "KlineWindow":
+        """截取 [start, end] 内的K线（数组视图，不复制数据）.
+
+        Args:
+            start: 开始时间（None 表示不限）
+            end: 结束时间（None 表示不限）
+            limit: 数量限制（可选，sort_desc 时保留最新的 limit 条）
+            sort_desc: limit 是否从最新的K线开始计数
+
+        Returns:
+            新窗口（仍按时间升序）
+        """
+        lo, hi = self._bounds(start, end)
+        if limit:
+            if sort_desc:
+                lo = max(lo, hi - limit)
+            else:
+                hi = min(hi, lo + limit)
+        return KlineWindow(
+            self.ticker,
+            self.period,
+            start,
+            end,
+            self.timestamps[lo:hi],
+            {field: array[lo:hi] for field, array in self.columns.items()},
+            {field: (codes[lo:hi], values) for field, (codes, values) in self.labels.items()},
+        )
+
+    def merge(self, other: "KlineWindow") -> Optional["KlineWindow"]:
+        """与覆盖范围重叠或相接的窗口合并（重叠部分以 other 为准）.
+
+        Args:
+            other: 更新的窗口
+
+        Returns:
+            合并后的窗口，两个窗口不相交时返回 None
+        """
+        if (other.end is not None and self.start is not None and other.end < self.start) or (
+            self.end is not None and other.start is not None and self.end < other.start
+        ):
+            return None
+
+        keep = np.ones(len(self), dtype=bool)
+        lo, hi = self._bounds(other.start, other.end)
+        keep[lo:hi] = False
+        timestamps = np.concatenate([self.timestamps[keep], other.timestamps])
+        order = np.argsort(timestamps, kind="stable")
+
+        columns = {
+            field: np.concatenate([array[keep], other.columns[field]])[order]
+            for field, array in self.columns.items()
+        }
+        labels: Dict[str, Tuple[np.ndarray, List[Any]]] = {}
+        for field, (codes, values) in self.labels.items():
+            other_codes, other_values = other.labels[field]
+            merged_values = list(values)
+            mapping = np.empty(len(other_values), dtype=np.int32)
+            for code, value in enumerate(other_values):
+                if value not in merged_values:
+                    merged_values.append(value)
+                mapping[code] = merged_values.index(value)
+            labels[field] = (
+                np.concatenate([codes[keep], mapping[other_codes]])[order],
+                merged_values,
+            )
+
+        start = None if self.start is None or other.start is None else min(self.start, other.start)
+        end = None if self.end is None or other.end is None else max(self.end, other.end)
+        return KlineWindow(self.ticker, self.period, start, end, timestamps[order], columns, labels)
+
+    def datetimes(self) -> List[datetime]:
+        """时间戳列表（不带时区的 UTC datetime）."""
+        return self.timestamps.tolist()
+
+    def to_records(self, sort_desc: bool = False) -> List[Dict[str, Any]]:
+        """还原为 K线记录列表（格式与 kline_data_from_dict 的输出一致）.
+
+        Args:
+            sort_desc: 是否按时间降序
+
+        Returns:
+            K线记录列表
+        """
+        step = -1 if sort_desc else 1
+        timestamps = self.timestamps[::step].tolist()
+        values = {field: array[::step].tolist() for field, array in self.columns.items()}
+        for field, (codes, names) in self.labels.items():
+            values[field] = [names[code] for code in codes[::step].tolist()]
+
+        records = []
+        for position, timestamp in enumerate(timestamps):
+            record: Dict[str, Any] = {"timestamp": timestamp}
+            for field in RECORD_FIELDS:
+                value = values[field][position]
+                # NaN / None 表示原文档中没有该字段
+                if value is not None and value == value:
+                    record[field] = value
+            record["ticker"] = self.ticker
+            record["market"] = values["market"][position]
+            record["period"] = self.period
+            record["date"] = timestamp.isoformat()
+            records.append(record)
+        return records
+
+    def to_columns(self, sort_desc: bool = False) -> Dict[str, List[Any]]:
+        """转换为列式数据（时间为 Unix 毫秒时间戳，缺失的数值为 None）.
+
+        直接由列数组生成，不构建逐行记录。
+
+        Args:
+            sort_desc: 是否按时间降序
+
+        Returns:
+            {"timestamps": [...], "open": [...], ..., "data_source": [...]}（字段顺序同 RECORD_FIELDS）
+        """
+        step = -1 if sort_desc else 1
+        columns: Dict[str, List[Any]] = {"timestamps": datetimes_to_epoch_ms(self.timestamps[::step])}
+        for field in RECORD_FIELDS:
+            if field in self.labels:
+                codes, values = self.labels[field]
+                columns[field] = np.array(values, dtype=object)[codes[::step]].tolist()
+            elif field == "volume":
+                columns[field] = self.columns[field][::step].tolist()
+            else:
+                columns[field] = float_array_to_list(self.columns[field][::step])
+        return columns
+
+    def to_items(self, sort_desc: bool = False) -> List[Dict[str, Any]]:
+        """转换为接口响应的逐条数据（字段同 KlineDataResponse，时间为 ISO 8601 字符串，缺失的数值为 None）.
+
+        由整列转换后的列表按行组装，不经过 Pydantic 模型校验（数据来自数据库，写入时已校验）。
+
+        Args:
+            sort_desc: 是否按时间降序
+
+        Returns:
+            [{"date", "timestamp", "open", ..., "data_source"}, ...]
+        """
+        columns = self.to_columns(sort_desc=sort_desc)
+        step = -1 if sort_desc else 1
+        timestamps = [timestamp.isoformat() for timestamp in self.timestamps[::step].tolist()]
+        keys = ("date", "timestamp") + RECORD_FIELDS
+        return [
+            dict(zip(keys, row))
+            for row in zip(timestamps, timestamps, *(columns[field] for field in RECORD_FIELDS))
+        ]
+
+
+class KlineCache:
+    """K线窗口缓存.
+
+    - 每个 (数据库, ticker, period) 保存一个窗口，新查询的范围与已有窗口相接时合并
+    - 总字节数超过 max_bytes 时淘汰最久未使用的窗口
+    - 写入K线后调用 invalidate() 丢弃对应窗口；ttl 兜底其他进程写入的数据
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, ttl: float = 300.0):
+        """初始化缓存.
+
+        Args:
+            max_bytes: 缓存的最大字节数（0 表示不缓存）
+            ttl: 窗口有效期（秒，0 表示不限）
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._windows: "OrderedDict[CacheKey, KlineWindow]" = OrderedDict()
+        # 失效次数（加载期间发生过写入时，加载结果不再放入缓存）
+        self._generation = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _is_fresh(self, window: KlineWindow) -> bool:
+        return self.ttl <= 0 or time.monotonic() - window.loaded_at < self.ttl
+
+    def _pop(self, key: CacheKey) -> Optional[KlineWindow]:
+        window = self._windows.pop(key, None)
+        if window is not None:
+            self.bytes -= window.nbytes
+        return window
+
+    def peek(self, key: CacheKey) -> Optional[KlineWindow]:
+        """获取未过期的窗口（不更新统计和使用顺序）."""
+        window = self._windows.get(key)
+        if window is not None and not self._is_fresh(window):
+            self._pop(key)
+            return None
+        return window
+
+    def get(
+        self,
+        key: CacheKey,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        sort_desc: bool = False,
+    ) -> Optional[KlineWindow]:
+        """查询缓存.
+
+        范围完全在窗口内时命中；带 limit 时只要窗口内从查询端点起已有 limit 条K线也能命中。
+
+        Args:
+            key: (数据库名, ticker, period)
+            start: 开始时间（可选）
+            end: 结束时间（可选）
+            limit: 数量限制（可选）
+            sort_desc: limit 是否从最新的K线开始计数
+
+        Returns:
+            截取后的窗口，未命中时返回 None
+        """
+        if not self.enabled:
+            return None
+        start64, end64 = to_datetime64(start), to_datetime64(end)
+        window = self.peek(key)
+        hit = window is not None and (
+            window.covers(start64, end64)
+            or (
+                limit is not None
+                and sort_desc
+                and window.covers(window.start, end64)
+                and window.count(start64, end64) >= limit
+            )
+            or (
+                limit is not None
+                and not sort_desc
+                and window.covers(start64, window.end)
+                and window.count(start64, end64) >= limit
+            )
+        )
+        if not hit:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._windows.move_to_end(key)
+        return window.select(start64, end64, limit, sort_desc)
+
+    @property
+    def generation(self) -> int:
+        """当前的失效次数（加载数据前读取，传给 put）."""
+        return self._generation
+
+    def put(self, key: CacheKey, window: KlineWindow, generation: int) -> KlineWindow:
+        """放入新加载的窗口（与已有窗口相接时合并）.
+
+        Args:
+            key: (数据库名, ticker, period)
+            window: 新加载的窗口
+            generation: 加载前读取的 generation，之后发生过写入时不放入缓存
+
+        Returns:
+            放入缓存的窗口（可能是合并后的窗口）
+        """
+        if not self.enabled or generation != self._generation:
+            return window
+        existing = self.peek(key)
+        if existing is not None:
+            window = existing.merge(window) or window
+        self._pop(key)
+        if window.nbytes > self.max_bytes:
+            return window
+
+        self._windows[key] = window
+        self.bytes += window.nbytes
+        while self.bytes > self.max_bytes:
+            evicted_key, _ = next(iter(self._windows.items()))
+            self._pop(evicted_key)
+            self.evictions += 1
+        return window
+
+    def invalidate(self, db_name: str, ticker: Optional[str] = None, period: Optional[str] = None):
+        """丢弃写入影响的窗口（写入数据库之后调用）.
+
+        Args:
+            db_name: 数据库名
+            ticker: 股票代码（None 表示所有股票）
+            period: 时间周期（None 表示所有周期）
+        """
+        self.invalidations += 1
+        self._generation += 1
+        for key in list(self._windows):
+            if key[0] == db_name and ticker in (None, key[1]) and period in (None, key[2]):
+                self._pop(key)
+
+    def clear(self):
+        """清空缓存."""
+        self._windows.clear()
+        self._generation += 1
+        self.bytes = 0
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取缓存统计.
+
+        Returns:
+            {"entries", "bytes", "max_bytes", "hits", "misses", "hit_rate", "evictions", "invalidations"}
+        """
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._windows),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# 全局K线窗口缓存
+_kline_cache: Optional[KlineCache] = None
+
+
+def get_kline_cache() -> KlineCache:
+    """获取全局K线窗口缓存（不存在时按配置创建）.
+
+    Returns:
+        缓存实例
+    """
+    global _kline_cache
+    if _kline_cache is None:
+        _kline_cache = KlineCache(
+            max_bytes=settings.kline_cache_max_bytes, ttl=settings.kline_cache_ttl
+        )
+    return _kline_cache
@@ -0,0 +1,116 @@
+"""K线数据流式导出（NDJSON / CSV / Arrow IPC 流）.
+
+按批读取数据库游标、逐批编码输出，内存占用只与批大小有关，不随导出范围增长。
+"""
+
+import csv
+import importlib.util
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+NDJSON_FORMAT = "ndjson"
+CSV_FORMAT = "csv"
+ARROW_FORMAT = "arrow"
+EXPORT_FORMAT_PATTERN = f"^({NDJSON_FORMAT}|{CSV_FORMAT}|{ARROW_FORMAT})$"
+
+# 导出格式 -> (媒体类型, 文件扩展名)
+EXPORT_FORMATS = {
+    NDJSON_FORMAT: ("application/x-ndjson", "ndjson"),
+    CSV_FORMAT: ("text/csv; charset=utf-8", "csv"),
+    ARROW_FORMAT: ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+# 导出的字段（timestamp 为 ISO 8601 字符串 / Arrow 毫秒时间戳，缺少的字段为空）
+EXPORT_FIELDS = (
+    "timestamp", "open", "high", "low", "close", "volume",
+    "amount", "adj_close", "data_source",
+)
+VALUE_FIELDS = EXPORT_FIELDS[1:-1]
+
+KlineBatches = AsyncIterator[List[Dict[str, Any]]]
+
+
+async def _ndjson_stream(batches: KlineBatches) -> AsyncIterator[bytes]:
+    """每条K线一行 JSON."""
+    async for batch in batches:
+        lines = []
+        for doc in batch:
+            row = {field: doc.get(field) for field in EXPORT_FIELDS}
+            row["timestamp"] = doc["timestamp"].isoformat()
+            lines.append(json.dumps(row, ensure_ascii=False))
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def _csv_stream(batches: KlineBatches) -> AsyncIterator[bytes]:
+    """表头 + 每条K线一行."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_FIELDS)
+    async for batch in batches:
+        for doc in batch:
+            writer.writerow(
+                [doc["timestamp"].isoformat(), *(doc.get(field) for field in EXPORT_FIELDS[1:])]
+            )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # 没有数据时只输出表头
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    """取出缓冲区中已写入的数据并清空缓冲区."""
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+async def _arrow_stream(batches: KlineBatches) -> AsyncIterator[bytes]:
+    """Arrow IPC 流：schema 消息 + 每批一个 RecordBatch."""
+    import pyarrow as pa
+
+    schema = pa.schema(
+        [("timestamp", pa.timestamp("ms"))]
+        + [(field, pa.float64()) for field in VALUE_FIELDS]
+        + [("data_source", pa.string())]
+    )
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+    async for batch in batches:
+        arrays = [
+            pa.array([doc.get(field) for doc in batch], type=schema.field(field).type)
+            for field in EXPORT_FIELDS
+        ]
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+        yield _drain(sink)
+    writer.close()
+    yield _drain(sink)
+
+
+def export_stream(batches: KlineBatches, export_format: str) -> AsyncIterator[bytes]:
+    """将K线批次编码为导出格式的字节流.
+
+    Args:
+        batches: K线文档批次（按时间升序）
+        export_format: 导出格式（ndjson / csv / arrow）
+
+    Returns:
+        AsyncIterator[bytes]: 每批编码后的数据
+
+    Raises:
+        ValueError: 不支持的格式，或 arrow 格式未安装 pyarrow
+    """
+    if export_format == NDJSON_FORMAT:
+        return _ndjson_stream(batches)
+    if export_format == CSV_FORMAT:
+        return _csv_stream(batches)
+    if export_format == ARROW_FORMAT:
+        if not HAS_PYARROW:
+            raise ValueError("arrow 格式需要安装 pyarrow")
+        return _arrow_stream(batches)
+    raise ValueError(f"不支持的导出格式: {export_format}")
@@ -1,37 +1,525 @@
-"""技术指标计算服务（使用 pandas-ta）."""
+"""技术指标计算服务（NumPy 内核 / pandas-ta）."""
 
+import asyncio
+import importlib.util
 import logging
 from datetime import datetime
 from typing import Any, Optional
 
 import numpy as np
 import pandas as pd
+from motor.motor_asyncio import AsyncIOMotorDatabase
 
-try:
-    import pandas_ta as ta
+from app.config import settings
+from app.services.indicators import indicator_kernels as kernels
+from app.services.indicators.indicator_executor import IndicatorExecutor, get_indicator_executor
+from app.services.indicators.indicator_registry import get_supported_indicators
 
-    HAS_PANDAS_TA = True
-except ImportError:
-    HAS_PANDAS_TA = False
-    logging.warning("pandas-ta 未安装，技术指标计算功能将不可用")
+logger = logging.getLogger(__name__)
 
-from motor.motor_asyncio import AsyncIOMotorDatabase
+# 计算后端
+NUMPY_BACKEND = "numpy"
+PANDAS_TA_BACKEND = "pandas_ta"
 
-logger = logging.getLogger(__name__)
+HAS_PANDAS_TA = importlib.util.find_spec("pandas_ta") is not None
+
+# pandas-ta 模块（导入耗时较长，只在选择 pandas_ta 后端时导入）
+ta = None
+
+
+def _import_pandas_ta():
+    """导入 pandas-ta."""
+    global ta
+    if ta is None:
+        import pandas_ta
+
+        ta = pandas_ta
+    return ta
+
+
+def _index_to_pydatetime(index: pd.Index) -> np.ndarray:
+    """将时间索引整体转换为 datetime 对象数组."""
+    return pd.DatetimeIndex(index).to_pydatetime()
+
+
+def _column_values(values: Any) -> np.ndarray:
+    """将指标列转换为 float64 数组."""
+    return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype="float64")
+
+
+def series_to_columns(series: pd.Series) -> dict[str, list[Any]]:
+    """将指标序列转换为列式数据（去除 NaN）.
+
+    Args:
+        series: 以时间为索引的指标序列
+
+    Returns:
+        {"timestamp": [...], "value": [...]}
+    """
+    if series is None or series.empty:
+        return {"timestamp": [], "value": []}
+    values = _column_values(series)
+    mask = ~np.isnan(values)
+    return {
+        "timestamp": _index_to_pydatetime(series.index)[mask].tolist(),
+        "value": values[mask].tolist(),
+    }
+
+
+def series_to_records(series: pd.Series, params: dict[str, Any]) -> list[dict[str, Any]]:
+    """将指标序列转换为 {timestamp, value, params} 记录列表（去除 NaN）.
+
+    整列完成 NaN 过滤和时间转换，记录中的 params 为同一个只读字典。
+
+    Args:
+        series: 以时间为索引的指标序列
+        params: 指标参数
+
+    Returns:
+        指标数据列表
+    """
+    columns = series_to_columns(series)
+    return [
+        {"timestamp": timestamp, "value": value, "params": params}
+        for timestamp, value in zip(columns["timestamp"], columns["value"])
+    ]
+
+
+def frame_to_indicator_records(
+    df: pd.DataFrame, column_map: dict[str, str], params: dict[str, Any]
+) -> dict[str, list[dict[str, Any]]]:
+    """将多列指标结果（如 MACD、布林带）转换为各指标的记录列表.
+
+    时间索引只转换一次，各列分别按 NaN 掩码过滤。
+
+    Args:
+        df: 以时间为索引的指标结果
+        column_map: 指标名称 -> 列名
+        params: 指标参数
+
+    Returns:
+        {指标名称: 指标数据列表}
+    """
+    timestamps = _index_to_pydatetime(df.index)
+    return {
+        name: array_to_records(timestamps, _column_values(df[column]), params)
+        for name, column in column_map.items()
+    }
+
+
+def array_to_records(
+    timestamps: np.ndarray, values: np.ndarray, params: dict[str, Any]
+) -> list[dict[str, Any]]:
+    """将等长的时间数组和 float64 指标值数组转换为记录列表（去除 NaN）.
+
+    Args:
+        timestamps: datetime 对象数组
+        values: 指标值数组
+        params: 指标参数
+
+    Returns:
+        指标数据列表
+    """
+    mask = ~np.isnan(values)
+    return [
+        {"timestamp": timestamp, "value": value, "params": params}
+        for timestamp, value in zip(timestamps[mask].tolist(), values[mask].tolist())
+    ]
+
+
+def _ewm_from(seed: float, values: np.ndarray, alpha: float) -> np.ndarray:
+    """从已知的上一个平滑值继续递推指数加权平均（adjust=False）.
+
+    Args:
+        seed: 上一个平滑值
+        values: 新数据
+        alpha: 平滑系数
+
+    Returns:
+        与 values 等长的平滑值数组
+    """
+    return kernels.ewm(np.concatenate([[seed], values]), alpha)[1:]
+
+
+# 单值指标的默认周期
+DEFAULT_PERIODS = {"MA": 5, "EMA": 12, "RSI": 14, "ATR": 14, "VWAP": 20, "CCI": 14, "WR": 14}
+
+# 各类指标的子指标名称（多值指标）
+MULTI_VALUE_INDICATORS = {
+    "MACD": ["MACD_DIF", "MACD_DEA", "MACD_HIST"],
+    "BOLL": ["BOLL_UP", "BOLL_MID", "BOLL_LOW"],
+    "KDJ": ["KDJ_K", "KDJ_D", "KDJ_J"],
+}
+
+# 各类指标需要的K线字段（未列出的指标只使用收盘价）
+INDICATOR_INPUTS = {
+    "ATR": ("high", "low", "close"),
+    "KDJ": ("high", "low", "close"),
+    "OBV": ("close", "volume"),
+    "VWAP": ("high", "low", "close", "volume"),
+    "CCI": ("high", "low", "close"),
+    "WR": ("high", "low", "close"),
+}
+
+# 只使用 NumPy 内核计算的指标（pandas_ta 后端同样使用，见 _price_family）
+PRICE_INDICATORS = tuple(INDICATOR_INPUTS)
+
+# 滑动窗口指标（增量计算时基于 period - 1 根历史K线重新计算窗口）
+WINDOW_INDICATORS = ("MA", "BOLL", "VWAP", "CCI", "WR")
+
+
+def price_fields(indicator_types) -> list[str]:
+    """计算指定类型的指标需要的K线字段.
+
+    Args:
+        indicator_types: 指标类型列表
+
+    Returns:
+        字段列表（至少包含 close）
+    """
+    fields = ["close"]
+    for indicator_type in indicator_types:
+        for field in INDICATOR_INPUTS.get(indicator_type, ()):
+            if field not in fields:
+                fields.append(field)
+    return fields
+
+
+def _ends_with_value(values: np.ndarray) -> bool:
+    """最后一根K线是否有指标值."""
+    return len(values) > 0 and not np.isnan(values[-1])
+
+
+def _nan_values(close: np.ndarray) -> np.ndarray:
+    """与 close 等长的全 NaN 数组."""
+    return np.full(len(close), np.nan)
+
+
+def _single_values(backend: str, indicator_type: str, close: np.ndarray, length: int) -> np.ndarray:
+    """计算单值指标（MA / EMA / RSI）.
+
+    Args:
+        backend: 计算后端
+        indicator_type: 指标类型
+        close: 收盘价数组
+        length: 周期
+
+    Returns:
+        与 close 等长的指标值数组（不足窗口的位置为 NaN）
+    """
+    if backend == PANDAS_TA_BACKEND:
+        function = {"MA": ta.sma, "EMA": ta.ema, "RSI": ta.rsi}[indicator_type]
+        series = function(pd.Series(close), length=length)
+        # 数据不足时 pandas-ta 返回 None
+        return _nan_values(close) if series is None else _column_values(series)
+
+    kernel = {"MA": kernels.sma, "EMA": kernels.ema, "RSI": kernels.rsi}[indicator_type]
+    return kernel(close, length)
+
+
+def _macd_values(
+    backend: str, close: np.ndarray, fast: int, slow: int, signal: int
+) -> Optional[dict[str, np.ndarray]]:
+    """计算 MACD（{MACD_DIF, MACD_DEA, MACD_HIST: 指标值数组}，pandas-ta 无结果时返回 None）."""
+    if backend == NUMPY_BACKEND:
+        dif, dea, hist = kernels.macd(close, fast, slow, signal)
+        return {"MACD_DIF": dif, "MACD_DEA": dea, "MACD_HIST": hist}
+
+    macd_df = ta.macd(pd.Series(close), fast=fast, slow=slow, signal=signal)
+
+    # 检查 macd_df 是否为 None 或空
+    if macd_df is None or macd_df.empty:
+        return None
+
+    # 获取实际的列名（pandas-ta 可能使用不同的命名格式）
+    columns = macd_df.columns.tolist()
+    macd_col = next((col for col in columns if "MACD_" in col and "s_" not in col and "h_" not in col), None)
+    signal_col = next((col for col in columns if "MACDs_" in col), None)
+    hist_col = next((col for col in columns if "MACDh_" in col), None)
+
+    if not all([macd_col, signal_col, hist_col]):
+        logger.warning(f"MACD 列名不匹配，可用列：{columns}")
+        return None
+
+    return {
+        "MACD_DIF": _column_values(macd_df[macd_col]),
+        "MACD_DEA": _column_values(macd_df[signal_col]),
+        "MACD_HIST": _column_values(macd_df[hist_col]),
+    }
+
+
+def _bollinger_values(
+    backend: str, close: np.ndarray, period: int, std_dev: float
+) -> Optional[dict[str, np.ndarray]]:
+    """计算布林带（{BOLL_UP, BOLL_MID, BOLL_LOW: 指标值数组}，pandas-ta 无结果时返回 None）."""
+    if backend == NUMPY_BACKEND:
+        upper, mid, lower = kernels.bbands(close, period, std_dev)
+        return {"BOLL_UP": upper, "BOLL_MID": mid, "BOLL_LOW": lower}
+
+    # pandas-ta 0.4 起使用 lower_std / upper_std，旧版本使用 std
+    bbands_df = ta.bbands(
+        pd.Series(close), length=period, std=std_dev, lower_std=std_dev, upper_std=std_dev
+    )
+
+    # 检查 bbands_df 是否为 None 或空
+    if bbands_df is None or bbands_df.empty:
+        return None
+
+    # 获取实际的列名（pandas-ta 可能使用不同的命名格式）
+    columns = bbands_df.columns.tolist()
+    # pandas-ta 实际返回的列名格式：BBL_20_2.0_2.0, BBM_20_2.0_2.0, BBU_20_2.0_2.0
+    upper_col = next((col for col in columns if "BBU_" in col), None)
+    mid_col = next((col for col in columns if "BBM_" in col), None)
+    lower_col = next((col for col in columns if "BBL_" in col), None)
+
+    if not all([upper_col, mid_col, lower_col]):
+        logger.warning(f"布林带列名不匹配，可用列：{columns}")
+        return None
+
+    return {
+        "BOLL_UP": _column_values(bbands_df[upper_col]),
+        "BOLL_MID": _column_values(bbands_df[mid_col]),
+        "BOLL_LOW": _column_values(bbands_df[lower_col]),
+    }
+
+
+def _price_family(
+    prices: dict[str, np.ndarray], indicator_type: str, params: dict[str, Any]
+) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray], dict[str, Any], int]:
+    """计算 ATR / KDJ / OBV / VWAP / CCI / WR（NumPy 内核，一维数组或 时间 × 股票 面板）.
+
+    这些指标的 pandas-ta 实现与常用定义不一致（KDJ、VWAP 没有对应实现），
+    pandas_ta 后端同样使用 NumPy 内核。
+
+    Args:
+        prices: {字段: 按时间升序的数组}（字段见 INDICATOR_INPUTS）
+        indicator_type: 指标类型
+        params: 指标参数（缺省时使用默认参数）
+
+    Returns:
+        (outputs, states, params, min_length)：outputs 为 {子指标名称: 指标值数组}，
+        states 为 {状态字段: 各位置的状态值}（递推指标增量计算使用），
+        params 为补全默认值后的参数，min_length 为产生结果所需的最少K线数量
+    """
+    high, low, close = prices.get("high"), prices.get("low"), prices["close"]
+
+    if indicator_type == "KDJ":
+        period = params.get("period", 9)
+        m1 = params.get("m1", 3)
+        m2 = params.get("m2", 3)
+        k, d, j = kernels.kdj(high, low, close, period, m1, m2)
+        outputs = {"KDJ_K": k, "KDJ_D": d, "KDJ_J": j}
+        return outputs, {"k": k, "d": d}, {"period": period, "m1": m1, "m2": m2}, period
+
+    if indicator_type == "OBV":
+        values = kernels.obv(close, prices["volume"])
+        return {"OBV": values}, {"close": close}, {}, 1
+
+    period = params.get("period", DEFAULT_PERIODS[indicator_type])
+    states, min_length = {}, period
+    if indicator_type == "ATR":
+        values = kernels.atr(high, low, close, period)
+        states, min_length = {"atr": values, "close": close}, period + 1
+    elif indicator_type == "VWAP":
+        values = kernels.vwap(high, low, close, prices["volume"], period)
+    elif indicator_type == "CCI":
+        values = kernels.cci(high, low, close, period)
+    else:
+        values = kernels.willr(high, low, close, period)
+    return {indicator_type: values}, states, {"period": period}, min_length
+
+
+def compute_family_arrays(
+    backend: str, prices: dict[str, np.ndarray], indicator_type: str, params: dict[str, Any]
+) -> tuple[dict[str, np.ndarray], Optional[dict[str, float]], dict[str, Any]]:
+    """基于K线字段数组计算一类指标.
+
+    只使用 NumPy 数组作为输入输出，可以提交到进程池执行。
+
+    Args:
+        backend: 计算后端（numpy / pandas_ta）
+        prices: {字段: 按时间升序的数组}，至少包含 close，其余字段见 INDICATOR_INPUTS
+        indicator_type: 指标类型（MA, EMA, RSI, MACD, BOLL, ATR, KDJ, OBV, VWAP, CCI, WR）
+        params: 指标参数（缺省时使用默认参数）
+
+    Returns:
+        (outputs, state, params)：outputs 为 {子指标名称: 指标值数组}（单值指标以类型为键），
+        state 为最后一根K线的平滑状态（递推指标且最后一根K线有指标值时，否则为 None），
+        params 为补全默认值后的参数
+    """
+    if indicator_type in PRICE_INDICATORS:
+        outputs, states, full_params, _ = _price_family(prices, indicator_type, params)
+        state = None
+        if states and all(_ends_with_value(values) for values in outputs.values()):
+            state = {field: float(values[-1]) for field, values in states.items()}
+        return outputs, state, full_params
+
+    if backend == PANDAS_TA_BACKEND:
+        _import_pandas_ta()
+
+    close = prices["close"]
+
+    if indicator_type in ("MA", "EMA", "RSI"):
+        period = params.get("period", DEFAULT_PERIODS[indicator_type])
+        state = None
+        if indicator_type == "RSI":
+            values, avg_gain, avg_loss = kernels.rsi_components(close, period)
+            if backend == PANDAS_TA_BACKEND:
+                values = _single_values(backend, "RSI", close, period)
+            if _ends_with_value(values):
+                state = {
+                    "avg_gain": float(avg_gain[-1]),
+                    "avg_loss": float(avg_loss[-1]),
+                    "close": float(close[-1]),
+                }
+        else:
+            values = _single_values(backend, indicator_type, close, period)
+        return {indicator_type: values}, state, {"period": period}
+
+    if indicator_type == "MACD":
+        fast = params.get("fast", 12)
+        slow = params.get("slow", 26)
+        signal = params.get("signal", 9)
+        full_params = {"fast": fast, "slow": slow, "signal": signal}
+        outputs = _macd_values(backend, close, fast, slow, signal)
+        if outputs is None:
+            return {name: _nan_values(close) for name in MULTI_VALUE_INDICATORS["MACD"]}, None, full_params
+        state = None
+        if all(_ends_with_value(values) for values in outputs.values()):
+            state = {
+                "ema_fast": float(_single_values(backend, "EMA", close, fast)[-1]),
+                "ema_slow": float(_single_values(backend, "EMA", close, slow)[-1]),
+                "dea": float(outputs["MACD_DEA"][-1]),
+            }
+        return outputs, state, full_params
+
+    if indicator_type == "BOLL":
+        period = params.get("period", 20)
+        std_dev = params.get("std_dev", 2.0)
+        full_params = {"period": period, "std_dev": std_dev}
+        outputs = _bollinger_values(backend, close, period, std_dev)
+        if outputs is None:
+            return {name: _nan_values(close) for name in MULTI_VALUE_INDICATORS["BOLL"]}, None, full_params
+        return outputs, None, full_params
+
+    raise ValueError(f"不支持的指标类型：{indicator_type}")
+
+
+def compute_batch_arrays(
+    backend: str, prices: dict[str, np.ndarray], families: list[tuple[str, dict[str, Any]]]
+) -> list[Any]:
+    """基于同一组K线字段数组计算多类指标（一次提交到进程池）.
+
+    Args:
+        backend: 计算后端
+        prices: {字段: 按时间升序的数组}
+        families: [(指标类型, 参数)]
+
+    Returns:
+        与 families 一一对应的 compute_family_arrays 结果，计算失败的项为异常对象
+    """
+    results: list[Any] = []
+    for indicator_type, params in families:
+        try:
+            results.append(compute_family_arrays(backend, prices, indicator_type, params))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def compute_panel_family(
+    panels: dict[str, np.ndarray], lengths: np.ndarray, indicator_type: str, params: dict[str, Any]
+) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray], dict[str, Any], int]:
+    """在 时间 × 股票 面板上计算一类指标（所有股票一次完成，NumPy 内核）.
+
+    Args:
+        panels: {字段: 左对齐的面板}（每列一只股票，较短的列末尾为 NaN），至少包含 close
+        lengths: 每只股票的K线数量
+        indicator_type: 指标类型
+        params: 指标参数
+
+    Returns:
+        (outputs, states, params, min_length)：outputs 为 {子指标名称: 面板}，
+        states 为 {状态字段: 各股票最后一根K线的状态值}，params 为补全默认值后的参数，
+        min_length 为逐只计算时产生结果所需的最少K线数量（不足的股票没有结果）
+    """
+    panel = panels["close"]
+    columns = np.arange(panel.shape[1])
+    last_rows = np.asarray(lengths) - 1
+
+    if indicator_type in PRICE_INDICATORS:
+        outputs, states, full_params, min_length = _price_family(panels, indicator_type, params)
+
+    elif indicator_type in ("MA", "EMA", "RSI"):
+        period = params.get("period", DEFAULT_PERIODS[indicator_type])
+        states = {}
+        if indicator_type == "RSI":
+            values, avg_gain, avg_loss = kernels.rsi_components(panel, period)
+            states = {"avg_gain": avg_gain, "avg_loss": avg_loss, "close": panel}
+        else:
+            kernel = kernels.sma if indicator_type == "MA" else kernels.ema
+            values = kernel(panel, period)
+        min_length = period + 1 if indicator_type == "RSI" else period
+        outputs, full_params = {indicator_type: values}, {"period": period}
+
+    elif indicator_type == "MACD":
+        fast = params.get("fast", 12)
+        slow = params.get("slow", 26)
+        signal = params.get("signal", 9)
+        ema_fast, ema_slow, dif, dea = kernels.macd_components(panel, fast, slow, signal)
+        outputs = {"MACD_DIF": dif, "MACD_DEA": dea, "MACD_HIST": dif - dea}
+        states = {"ema_fast": ema_fast, "ema_slow": ema_slow, "dea": dea}
+        min_length = max(fast, slow) + signal - 1
+        full_params = {"fast": fast, "slow": slow, "signal": signal}
+
+    elif indicator_type == "BOLL":
+        period = params.get("period", 20)
+        std_dev = params.get("std_dev", 2.0)
+        upper, mid, lower = kernels.bbands(panel, period, std_dev)
+        outputs = {"BOLL_UP": upper, "BOLL_MID": mid, "BOLL_LOW": lower}
+        states, min_length = {}, period
+        full_params = {"period": period, "std_dev": std_dev}
+
+    else:
+        raise ValueError(f"不支持的指标类型：{indicator_type}")
+
+    # 只返回每只股票最后一根K线的状态，减少进程间传输的数据量
+    last_states = {field: state[last_rows, columns] for field, state in states.items()}
+    return outputs, last_states, full_params, min_length
 
 
 class IndicatorCalculator:
-    """技术指标计算服务（使用 pandas-ta 计算指标）."""
+    """技术指标计算服务（默认使用 NumPy 内核，可切换为 pandas-ta）."""
 
-    def __init__(self, db: Optional[AsyncIOMotorDatabase] = None):
+    def __init__(
+        self,
+        db: Optional[AsyncIOMotorDatabase] = None,
+        backend: Optional[str] = None,
+        executor: Optional[IndicatorExecutor] = None,
+    ):
         """初始化指标计算服务.
 
         Args:
             db: MongoDB 数据库对象（可选）
+            backend: 计算后端（numpy / pandas_ta，默认使用配置 indicator_backend）
+            executor: 指标计算执行器（可选，默认使用全局执行器）
         """
         self.db = db
-        if not HAS_PANDAS_TA:
-            logger.warning("pandas-ta 未安装，技术指标计算功能将不可用")
+        backend = backend or settings.indicator_backend
+        if backend not in (NUMPY_BACKEND, PANDAS_TA_BACKEND):
+            raise ValueError(f"不支持的指标计算后端：{backend}")
+        if backend == PANDAS_TA_BACKEND and not HAS_PANDAS_TA:
+            logger.warning("pandas-ta 未安装，使用 NumPy 内核计算技术指标")
+            backend = NUMPY_BACKEND
+        if backend == PANDAS_TA_BACKEND:
+            _import_pandas_ta()
+        self.backend = backend
+        self._executor = executor
+
+    @property
+    def executor(self) -> IndicatorExecutor:
+        """指标计算执行器（进程池 / 线程池）."""
+        return self._executor or get_indicator_executor()
 
     def _prepare_dataframe(self, kline_data: list[dict[str, Any]]) -> pd.DataFrame:
         """准备 DataFrame 用于指标计算.
@@ -61,6 +549,276 @@ class IndicatorCalculator:
 
         return df
 
+    def _frame_prices(self, df: pd.DataFrame, indicator_types) -> dict[str, np.ndarray]:
+        """取出指标计算需要的K线字段数组.
+
+        Args:
+            df: 以时间为索引的K线 DataFrame
+            indicator_types: 指标类型列表
+
+        Returns:
+            {字段: float64 数组}
+        """
+        return {
+            field: df[field].to_numpy(dtype="float64") for field in price_fields(indicator_types)
+        }
+
+    def _ends_at_last_bar(self, records: list[dict[str, Any]], df: pd.DataFrame) -> bool:
+        """指标数据的最后一条是否对应最后一根K线."""
+        return bool(records) and records[-1]["timestamp"] == df.index[-1].to_pydatetime()
+
+    def _family_records(
+        self, timestamps: np.ndarray, indicator_type: str, computed: tuple
+    ) -> Any:
+        """将 compute_family_arrays 的结果转换为记录（state 附加在最后一条数据上）.
+
+        Args:
+            timestamps: datetime 对象数组
+            indicator_type: 指标类型
+            computed: compute_family_arrays 的返回值
+
+        Returns:
+            单值指标返回指标数据列表，多值指标返回 {子指标名称: 指标数据列表}
+        """
+        outputs, state, params = computed
+        results = {
+            name: array_to_records(timestamps, values, params) for name, values in outputs.items()
+        }
+        if state:
+            for records in results.values():
+                records[-1]["state"] = state
+        if indicator_type in MULTI_VALUE_INDICATORS:
+            return results
+        return results[indicator_type]
+
+    def _compute_family(
+        self, df: pd.DataFrame, indicator_type: str, params: dict[str, Any]
+    ) -> Any:
+        """基于已准备好的 DataFrame 计算一类指标（在当前线程中计算）.
+
+        递推指标（RSI、MACD、ATR、KDJ、OBV）最后一条数据附带 state 字段（平滑状态），供增量计算使用。
+
+        Args:
+            df: _prepare_dataframe 返回的 DataFrame
+            indicator_type: 指标类型
+            params: 指标参数（缺省时使用默认参数）
+
+        Returns:
+            单值指标返回指标数据列表，多值指标返回 {子指标名称: 指标数据列表}
+        """
+        prices = self._frame_prices(df, [indicator_type])
+        computed = compute_family_arrays(self.backend, prices, indicator_type, params)
+        return self._family_records(_index_to_pydatetime(df.index), indicator_type, computed)
+
+    async def _calculate_family(
+        self, df: pd.DataFrame, indicator_type: str, params: dict[str, Any]
+    ) -> Any:
+        """与 _compute_family 相同，数值计算交给指标计算执行器（不阻塞事件循环）."""
+        prices = self._frame_prices(df, [indicator_type])
+        computed = await self.executor.run(
+            len(df), compute_family_arrays, self.backend, prices, indicator_type, params
+        )
+        return self._family_records(_index_to_pydatetime(df.index), indicator_type, computed)
+
+    def incremental_window(self, indicator_type: str, params: dict[str, Any]) -> int:
+        """增量计算需要的历史K线数量（截至上次计算的最后一根K线，含该K线）.
+
+        滑动窗口指标（MA、BOLL、VWAP、CCI、WR）需要 period - 1 根历史K线，
+        KDJ 的 RSV 同样需要 period - 1 根历史K线（K、D 从保存的状态递推）；其余指标从保存的状态递推。
+
+        Args:
+            indicator_type: 指标类型
+            params: 指标参数
+
+        Returns:
+            历史K线数量
+        """
+        if indicator_type == "BOLL":
+            return max(params.get("period", 20) - 1, 0)
+        if indicator_type == "KDJ":
+            return max(params.get("period", 9) - 1, 0)
+        if indicator_type in WINDOW_INDICATORS:
+            return max(params.get("period", DEFAULT_PERIODS[indicator_type]) - 1, 0)
+        return 0
+
+    def warmup_window(self, indicator_type: str, params: dict[str, Any]) -> Optional[int]:
+        """计算某一时间之后的指标值需要的之前K线数量.
+
+        滑动窗口指标（MA、BOLL、VWAP、CCI、WR）需要 period - 1 根；
+        EMA、RSI、MACD、ATR、KDJ、OBV 为递推指标，结果依赖全部历史K线，返回 None。
+
+        Args:
+            indicator_type: 指标类型
+            params: 指标参数
+
+        Returns:
+            之前K线数量，None 表示需要全部历史K线
+        """
+        if indicator_type not in WINDOW_INDICATORS:
+            return None
+        return self.incremental_window(indicator_type, params)
+
+    def supports_incremental(self, indicator_type: str, previous: dict[str, Any]) -> bool:
+        """上次保存的最后一条指标数据是否足以进行增量计算.
+
+        Args:
+            indicator_type: 指标类型
+            previous: 上次保存的最后一条指标数据
+
+        Returns:
+            是否支持增量计算
+        """
+        state = previous.get("state") or {}
+        if indicator_type in WINDOW_INDICATORS:
+            return True
+        if indicator_type == "EMA":
+            return previous.get("value") is not None
+        if indicator_type == "RSI":
+            return all(key in state for key in ("avg_gain", "avg_loss", "close"))
+        if indicator_type == "MACD":
+            return all(key in state for key in ("ema_fast", "ema_slow", "dea"))
+        if indicator_type == "ATR":
+            return all(key in state for key in ("atr", "close"))
+        if indicator_type == "KDJ":
+            return all(key in state for key in ("k", "d"))
+        if indicator_type == "OBV":
+            return previous.get("value") is not None and "close" in state
+        return False
+
+    def _empty_family(self, indicator_type: str) -> Any:
+        """空的指标计算结果."""
+        if indicator_type in MULTI_VALUE_INDICATORS:
+            return {name: [] for name in MULTI_VALUE_INDICATORS[indicator_type]}
+        return []
+
+    def _compute_incremental(
+        self,
+        df: pd.DataFrame,
+        indicator_type: str,
+        params: dict[str, Any],
+        previous: dict[str, Any],
+    ) -> Any:
+        """只计算上次保存的最后一条数据之后的新数据点.
+
+        Args:
+            df: 历史窗口K线 + 新K线（_prepare_dataframe 返回的 DataFrame）
+            indicator_type: 指标类型
+            params: 指标参数
+            previous: 上次保存的最后一条指标数据（含 timestamp、value、state）
+
+        Returns:
+            与 _compute_family 相同结构的新数据点
+        """
+        new_close = df.loc[df.index > previous["timestamp"], "close"]
+        if new_close.empty:
+            return self._empty_family(indicator_type)
+
+        if indicator_type in WINDOW_INDICATORS:
+            # 只保留 period - 1 根历史K线，窗口不足的位置为 NaN 会被过滤
+            window = self.incremental_window(indicator_type, params)
+            return self._compute_family(df.iloc[-(len(new_close) + window):], indicator_type, params)
+
+        closes = new_close.to_numpy(dtype="float64")
+        state = previous.get("state") or {}
+
+        if indicator_type == "EMA":
+            period = params.get("period", 12)
+            values = _ewm_from(previous["value"], closes, 2.0 / (period + 1))
+            return series_to_records(pd.Series(values, index=new_close.index), {"period": period})
+
+        if indicator_type == "RSI":
+            period = params.get("period", 14)
+            diff = np.diff(np.concatenate([[state["close"]], closes]))
+            avg_gain = _ewm_from(state["avg_gain"], np.clip(diff, 0, None), 1.0 / period)
+            avg_loss = _ewm_from(state["avg_loss"], np.clip(-diff, 0, None), 1.0 / period)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rsi = 100 * avg_gain / (avg_gain + avg_loss)
+            records = series_to_records(pd.Series(rsi, index=new_close.index), {"period": period})
+            if self._ends_at_last_bar(records, df):
+                records[-1]["state"] = {
+                    "avg_gain": float(avg_gain[-1]),
+                    "avg_loss": float(avg_loss[-1]),
+                    "close": float(closes[-1]),
+                }
+            return records
+
+        if indicator_type == "MACD":
+            fast = params.get("fast", 12)
+            slow = params.get("slow", 26)
+            signal = params.get("signal", 9)
+            ema_fast = _ewm_from(state["ema_fast"], closes, 2.0 / (fast + 1))
+            ema_slow = _ewm_from(state["ema_slow"], closes, 2.0 / (slow + 1))
+            dif = ema_fast - ema_slow
+            dea = _ewm_from(state["dea"], dif, 2.0 / (signal + 1))
+            frame = pd.DataFrame({"dif": dif, "dea": dea, "hist": dif - dea}, index=new_close.index)
+            results = frame_to_indicator_records(
+                frame,
+                {"MACD_DIF": "dif", "MACD_DEA": "dea", "MACD_HIST": "hist"},
+                {"fast": fast, "slow": slow, "signal": signal},
+            )
+            new_state = {
+                "ema_fast": float(ema_fast[-1]),
+                "ema_slow": float(ema_slow[-1]),
+                "dea": float(dea[-1]),
+            }
+            for records in results.values():
+                if self._ends_at_last_bar(records, df):
+                    records[-1]["state"] = new_state
+            return results
+
+        new_rows = df.loc[df.index > previous["timestamp"]]
+
+        if indicator_type == "ATR":
+            period = params.get("period", 14)
+            tr = kernels.true_range(
+                new_rows["high"].to_numpy(dtype="float64"),
+                new_rows["low"].to_numpy(dtype="float64"),
+                closes,
+                prev_close=state["close"],
+            )
+            atr = _ewm_from(state["atr"], tr, 1.0 / period)
+            records = series_to_records(pd.Series(atr, index=new_close.index), {"period": period})
+            if self._ends_at_last_bar(records, df):
+                records[-1]["state"] = {"atr": float(atr[-1]), "close": float(closes[-1])}
+            return records
+
+        if indicator_type == "OBV":
+            direction = np.sign(np.diff(np.concatenate([[state["close"]], closes])))
+            volume = new_rows["volume"].to_numpy(dtype="float64")
+            obv = previous["value"] + np.cumsum(direction * volume)
+            records = series_to_records(pd.Series(obv, index=new_close.index), {})
+            if self._ends_at_last_bar(records, df):
+                records[-1]["state"] = {"close": float(closes[-1])}
+            return records
+
+        if indicator_type == "KDJ":
+            period = params.get("period", 9)
+            m1 = params.get("m1", 3)
+            m2 = params.get("m2", 3)
+            # RSV 需要 period - 1 根历史K线，K、D 从保存的状态递推
+            window = df.iloc[-(len(new_close) + self.incremental_window(indicator_type, params)):]
+            rsv = kernels.kdj_rsv(
+                window["high"].to_numpy(dtype="float64"),
+                window["low"].to_numpy(dtype="float64"),
+                window["close"].to_numpy(dtype="float64"),
+                period,
+            )[-len(new_close):]
+            k = _ewm_from(state["k"], rsv, 1.0 / m1)
+            d = _ewm_from(state["d"], k, 1.0 / m2)
+            frame = pd.DataFrame({"k": k, "d": d, "j": 3 * k - 2 * d}, index=new_close.index)
+            results = frame_to_indicator_records(
+                frame,
+                {"KDJ_K": "k", "KDJ_D": "d", "KDJ_J": "j"},
+                {"period": period, "m1": m1, "m2": m2},
+            )
+            new_state = {"k": float(k[-1]), "d": float(d[-1])}
+            for records in results.values():
+                if self._ends_at_last_bar(records, df):
+                    records[-1]["state"] = new_state
+            return results
+
+        raise ValueError(f"不支持增量计算的指标类型：{indicator_type}")
+
     async def calculate_ma(
         self, ticker: str, period: int, kline_data: list[dict[str, Any]]
     ) -> list[dict[str, Any]]:
@@ -74,29 +832,11 @@ class IndicatorCalculator:
         Returns:
             list[dict]: 指标数据列表
         """
-        if not HAS_PANDAS_TA:
-            raise RuntimeError("pandas-ta 未安装")
-
         df = self._prepare_dataframe(kline_data)
         if df.empty:
             return []
 
-        # 计算 MA
-        ma_values = ta.sma(df["close"], length=period)
-
-        # 转换为列表格式
-        results = []
-        for timestamp, value in ma_values.items():
-            if pd.notna(value):
-                results.append(
-                    {
-                        "timestamp": timestamp.to_pydatetime(),
-                        "value": float(value),
-                        "params": {"period": period},
-                    }
-                )
-
-        return results
+        return await self._calculate_family(df, "MA", {"period": period})
 
     async def calculate_ema(
         self, ticker: str, period: int, kline_data: list[dict[str, Any]]
@@ -111,29 +851,11 @@ class IndicatorCalculator:
         Returns:
             list[dict]: 指标数据列表
         """
-        if not HAS_PANDAS_TA:
-            raise RuntimeError("pandas-ta 未安装")
-
         df = self._prepare_dataframe(kline_data)
         if df.empty:
             return []
 
-        # 计算 EMA
-        ema_values = ta.ema(df["close"], length=period)
-
-        # 转换为列表格式
-        results = []
-        for timestamp, value in ema_values.items():
-            if pd.notna(value):
-                results.append(
-                    {
-                        "timestamp": timestamp.to_pydatetime(),
-                        "value": float(value),
-                        "params": {"period": period},
-                    }
-                )
-
-        return results
+        return await self._calculate_family(df, "EMA", {"period": period})
 
     async def calculate_rsi(
         self, ticker: str, period: int, kline_data: list[dict[str, Any]]
@@ -148,29 +870,11 @@ class IndicatorCalculator:
         Returns:
             list[dict]: 指标数据列表
         """
-        if not HAS_PANDAS_TA:
-            raise RuntimeError("pandas-ta 未安装")
-
         df = self._prepare_dataframe(kline_data)
         if df.empty:
             return []
 
-        # 计算 RSI
-        rsi_values = ta.rsi(df["close"], length=period)
-
-        # 转换为列表格式
-        results = []
-        for timestamp, value in rsi_values.items():
-            if pd.notna(value):
-                results.append(
-                    {
-                        "timestamp": timestamp.to_pydatetime(),
-                        "value": float(value),
-                        "params": {"period": period},
-                    }
-                )
-
-        return results
+        return await self._calculate_family(df, "RSI", {"period": period})
 
     async def calculate_macd(
         self,
@@ -192,70 +896,11 @@ class IndicatorCalculator:
         Returns:
             dict: 包含 MACD_DIF, MACD_DEA, MACD_HIST 三个指标的数据
         """
-        if not HAS_PANDAS_TA:
-            raise RuntimeError("pandas-ta 未安装")
-
         df = self._prepare_dataframe(kline_data)
         if df.empty:
             return {"MACD_DIF": [], "MACD_DEA": [], "MACD_HIST": []}
 
-        # 计算 MACD
-        macd_df = ta.macd(df["close"], fast=fast, slow=slow, signal=signal)
-
-        # 转换为列表格式
-        results = {"MACD_DIF": [], "MACD_DEA": [], "MACD_HIST": []}
-
-        # 检查 macd_df 是否为 None 或空
-        if macd_df is None or macd_df.empty:
-            return results
-
-        # 获取实际的列名（pandas-ta 可能使用不同的命名格式）
-        columns = macd_df.columns.tolist()
-        macd_col = next((col for col in columns if "MACD_" in col and "s_" not in col and "h_" not in col), None)
-        signal_col = next((col for col in columns if "MACDs_" in col), None)
-        hist_col = next((col for col in columns if "MACDh_" in col), None)
-
-        if not all([macd_col, signal_col, hist_col]):
-            logger.warning(f"MACD 列名不匹配，可用列：{columns}")
-            return results
-
-        for timestamp in macd_df.index:
-            params = {"fast": fast, "slow": slow, "signal": signal}
-
-            # MACD_DIF (MACD line)
-            macd_value = macd_df.loc[timestamp, macd_col]
-            if pd.notna(macd_value):
-                results["MACD_DIF"].append(
-                    {
-                        "timestamp": timestamp.to_pydatetime(),
-                        "value": float(macd_value),
-                        "params": params,
-                    }
-                )
-
-            # MACD_DEA (Signal line)
-            signal_value = macd_df.loc[timestamp, signal_col]
-            if pd.notna(signal_value):
-                results["MACD_DEA"].append(
-                    {
-                        "timestamp": timestamp.to_pydatetime(),
-                        "value": float(signal_value),
-                        "params": params,
-                    }
-                )
-
-            # MACD_HIST (Histogram)
-            hist_value = macd_df.loc[timestamp, hist_col]
-            if pd.notna(hist_value):
-                results["MACD_HIST"].append(
-                    {
-                        "timestamp": timestamp.to_pydatetime(),
-                        "value": float(hist_value),
-                        "params": params,
-                    }
-                )
-
-        return results
+        return await self._calculate_family(df, "MACD", {"fast": fast, "slow": slow, "signal": signal})
 
     async def calculate_bollinger_bands(
         self,
@@ -275,167 +920,241 @@ class IndicatorCalculator:
         Returns:
             dict: 包含 BOLL_UP, BOLL_MID, BOLL_LOW 三个指标的数据
         """
-        if not HAS_PANDAS_TA:
-            raise RuntimeError("pandas-ta 未安装")
-
         df = self._prepare_dataframe(kline_data)
         if df.empty:
             return {"BOLL_UP": [], "BOLL_MID": [], "BOLL_LOW": []}
 
-        # 计算布林带
-        bbands_df = ta.bbands(df["close"], length=period, std=std_dev)
+        return await self._calculate_family(df, "BOLL", {"period": period, "std_dev": std_dev})
 
-        # 转换为列表格式
-        results = {"BOLL_UP": [], "BOLL_MID": [], "BOLL_LOW": []}
+    async def calculate_batch(
+        self,
+        ticker: str,
+        indicators: list[dict[str, Any]],
+        kline_data: list[dict[str, Any]],
+    ) -> tuple[dict[str, list[dict[str, Any]]], dict[str, str]]:
+        """基于同一份K线数据批量计算多个指标.
 
-        # 检查 bbands_df 是否为 None 或空
-        if bbands_df is None or bbands_df.empty:
-            return results
+        DataFrame 只构建一次；相同类型和参数的指标（如 MACD_DIF / MACD_DEA / MACD_HIST）
+        只计算一次，再拆分出各个子指标。
 
-        # 获取实际的列名（pandas-ta 可能使用不同的命名格式）
-        columns = bbands_df.columns.tolist()
-        # pandas-ta 实际返回的列名格式：BBL_20_2.0_2.0, BBM_20_2.0_2.0, BBU_20_2.0_2.0
-        upper_col = next((col for col in columns if "BBU_" in col), None)
-        mid_col = next((col for col in columns if "BBM_" in col), None)
-        lower_col = next((col for col in columns if "BBL_" in col), None)
+        Args:
+            ticker: 股票代码
+            indicators: 指标列表，每项为 {"name": 指标名称, "type": 指标类型, "params": 参数,
+                "output": 子指标键（可选，默认为指标名称）}
+            kline_data: K线数据列表
 
-        if not all([upper_col, mid_col, lower_col]):
-            logger.warning(f"布林带列名不匹配，可用列：{columns}")
-            return results
+        Returns:
+            (results, errors)：results 为 {指标名称: 指标数据列表}，errors 为 {指标名称: 错误信息}
+        """
+        df = self._prepare_dataframe(kline_data)
+        if df.empty:
+            return {indicator["name"]: [] for indicator in indicators}, {}
+        return await self._batch_from_frame(ticker, indicators, df)
+
+    async def _batch_from_frame(
+        self, ticker: str, indicators: list[dict[str, Any]], df: pd.DataFrame
+    ) -> tuple[dict[str, list[dict[str, Any]]], dict[str, str]]:
+        """基于已准备好的 DataFrame 批量计算指标（同类指标只计算一次，一次提交到执行器）."""
+        results: dict[str, list[dict[str, Any]]] = {}
+        errors: dict[str, str] = {}
+
+        # (类型, 参数) -> (类型, 参数字典)，保持首次出现的顺序
+        keys: dict[tuple, tuple[str, dict[str, Any]]] = {}
+        for indicator in indicators:
+            params = indicator.get("params") or {}
+            key = (indicator["type"], tuple(sorted(params.items())))
+            keys.setdefault(key, (indicator["type"], params))
+
+        prices = self._frame_prices(df, [indicator_type for indicator_type, _ in keys.values()])
+        computed = await self.executor.run(
+            len(df) * len(keys), compute_batch_arrays, self.backend, prices, list(keys.values())
+        )
+
+        # (类型, 参数) -> 计算结果 / 异常
+        timestamps = _index_to_pydatetime(df.index)
+        families: dict[tuple, Any] = {}
+        for key, (indicator_type, params), family in zip(keys, keys.values(), computed):
+            if isinstance(family, Exception):
+                logger.error(f"计算指标失败：{ticker} {indicator_type} {params} - {family}")
+                families[key] = family
+            else:
+                families[key] = self._family_records(timestamps, indicator_type, family)
+
+        for indicator in indicators:
+            name = indicator["name"]
+            params = indicator.get("params") or {}
+            family = families[(indicator["type"], tuple(sorted(params.items())))]
+            if isinstance(family, Exception):
+                errors[name] = str(family)
+            elif isinstance(family, dict):
+                results[name] = family.get(indicator.get("output") or name, [])
+            else:
+                results[name] = family
+
+        logger.debug(f"批量计算指标：{ticker} {len(indicators)} 个指标，{len(families)} 次计算")
+        return results, errors
+
+    async def calculate_incremental(
+        self,
+        ticker: str,
+        families: list[dict[str, Any]],
+        kline_data: list[dict[str, Any]],
+    ) -> tuple[dict[str, list[dict[str, Any]]], dict[str, str]]:
+        """基于上次保存的指标状态增量计算新数据点.
 
-        for timestamp in bbands_df.index:
-            params = {"period": period, "std_dev": std_dev}
-
-            # BOLL_UP (上轨)
-            upper_value = bbands_df.loc[timestamp, upper_col]
-            if pd.notna(upper_value):
-                results["BOLL_UP"].append(
-                    {
-                        "timestamp": timestamp.to_pydatetime(),
-                        "value": float(upper_value),
-                        "params": params,
-                    }
-                )
+        Args:
+            ticker: 股票代码
+            families: 指标族列表，每项为 {"type": 指标类型, "params": 参数, "names": [指标名称],
+                "outputs": {指标名称: 子指标键}（可选）, "previous": 上次保存的最后一条指标数据}
+            kline_data: 历史窗口K线（见 incremental_window）+ 上次计算之后的新K线
 
-            # BOLL_MID (中轨)
-            mid_value = bbands_df.loc[timestamp, mid_col]
-            if pd.notna(mid_value):
-                results["BOLL_MID"].append(
-                    {
-                        "timestamp": timestamp.to_pydatetime(),
-                        "value": float(mid_value),
-                        "params": params,
-                    }
-                )
+        Returns:
+            (results, errors)：results 为 {指标名称: 新数据点列表}，errors 为 {指标名称: 错误信息}
+        """
+        results: dict[str, list[dict[str, Any]]] = {}
+        errors: dict[str, str] = {}
 
-            # BOLL_LOW (下轨)
-            lower_value = bbands_df.loc[timestamp, lower_col]
-            if pd.notna(lower_value):
-                results["BOLL_LOW"].append(
-                    {
-                        "timestamp": timestamp.to_pydatetime(),
-                        "value": float(lower_value),
-                        "params": params,
-                    }
+        df = self._prepare_dataframe(kline_data)
+        for family in families:
+            indicator_type = family["type"]
+            params = family.get("params") or {}
+            try:
+                if df.empty:
+                    computed = self._empty_family(indicator_type)
+                else:
+                    computed = self._compute_incremental(df, indicator_type, params, family["previous"])
+            except Exception as e:
+                logger.error(f"增量计算指标失败：{ticker} {indicator_type} {params} - {e}")
+                for name in family["names"]:
+                    errors[name] = str(e)
+                continue
+
+            outputs = family.get("outputs") or {}
+            for name in family["names"]:
+                if isinstance(computed, dict):
+                    results[name] = computed.get(outputs.get(name, name), [])
+                else:
+                    results[name] = computed
+
+        return results, errors
+
+    async def calculate_panel(
+        self,
+        indicators: list[dict[str, Any]],
+        kline_by_ticker: dict[str, list[dict[str, Any]]],
+    ) -> tuple[dict[str, dict[str, list[dict[str, Any]]]], dict[str, str]]:
+        """跨股票批量计算指标（时间 × 股票面板，每类指标对所有股票只计算一次）.
+
+        各股票的K线按自身顺序左对齐到同一个面板中，计算结果与逐只计算一致。
+        pandas_ta 后端不支持面板计算，逐只股票计算。
+
+        Args:
+            indicators: 指标列表，每项为 {"name": 指标名称, "type": 指标类型, "params": 参数}
+            kline_by_ticker: {股票代码: K线数据列表（包含 timestamp 和 price_fields 返回的字段）}
+
+        Returns:
+            (results, errors)：results 为 {股票代码: {指标名称: 指标数据列表}}，
+            errors 为 {指标名称: 错误信息}
+        """
+        results: dict[str, dict[str, list[dict[str, Any]]]] = {}
+        errors: dict[str, str] = {}
+
+        # 每只股票的时间（datetime 对象数组）和指标需要的K线字段
+        fields = price_fields([indicator["type"] for indicator in indicators])
+        tickers, timestamps, prices = [], [], []
+        for ticker, kline_data in kline_by_ticker.items():
+            if not kline_data:
+                continue
+            index = pd.DatetimeIndex(pd.to_datetime([item["timestamp"] for item in kline_data]))
+            order = np.argsort(index.asi8, kind="stable")
+            tickers.append(ticker)
+            timestamps.append(index[order])
+            prices.append(
+                {
+                    field: np.array([item[field] for item in kline_data], dtype="float64")[order]
+                    for field in fields
+                }
+            )
+        if not tickers:
+            return results, errors
+
+        if self.backend == PANDAS_TA_BACKEND:
+            for ticker, index, ticker_prices in zip(tickers, timestamps, prices):
+                df = pd.DataFrame(ticker_prices, index=index)
+                results[ticker], ticker_errors = await self._batch_from_frame(ticker, indicators, df)
+                errors.update(ticker_errors)
+            return results, errors
+
+        lengths = [len(index) for index in timestamps]
+        panels = {field: np.full((max(lengths), len(tickers)), np.nan) for field in fields}
+        for column, ticker_prices in enumerate(prices):
+            for field, values in ticker_prices.items():
+                panels[field][: len(values), column] = values
+        py_timestamps = [index.to_pydatetime() for index in timestamps]
+        results = {ticker: {} for ticker in tickers}
+
+        # 各指标族互相独立，同时提交到执行器（进程池模式下并行计算）
+        keys: dict[tuple, tuple[str, dict[str, Any]]] = {}
+        for indicator in indicators:
+            params = indicator.get("params") or {}
+            key = (indicator["type"], tuple(sorted(params.items())))
+            keys.setdefault(key, (indicator["type"], params))
+        lengths_array = np.asarray(lengths)
+        computed = await asyncio.gather(
+            *[
+                self.executor.run(
+                    panels["close"].size,
+                    compute_panel_family,
+                    panels,
+                    lengths_array,
+                    indicator_type,
+                    params,
                 )
+                for indicator_type, params in keys.values()
+            ],
+            return_exceptions=True,
+        )
+        families = dict(zip(keys, computed))
+        for (indicator_type, params), family in zip(keys.values(), computed):
+            if isinstance(family, Exception):
+                logger.error(f"面板计算指标失败：{indicator_type} {params} - {family}")
+
+        for indicator in indicators:
+            name = indicator["name"]
+            params = indicator.get("params") or {}
+            family = families[(indicator["type"], tuple(sorted(params.items())))]
+            if isinstance(family, Exception):
+                errors[name] = str(family)
+                continue
+
+            outputs, states, full_params, min_length = family
+            values = outputs.get(indicator.get("output") or name, outputs.get(indicator["type"]))
+            if values is None:
+                for ticker in tickers:
+                    results[ticker][name] = []
+                continue
+            for column, ticker in enumerate(tickers):
+                length = lengths[column]
+                if length < min_length:
+                    results[ticker][name] = []
+                    continue
+                records = array_to_records(
+                    py_timestamps[column], values[:length, column], full_params
+                )
+                # 最后一条数据对应最后一根K线时附带增量计算状态
+                if states and records and not np.isnan(values[length - 1, column]):
+                    records[-1]["state"] = {
+                        field: float(state[column]) for field, state in states.items()
+                    }
+                results[ticker][name] = records
 
-        return results
+        logger.info(f"面板计算指标：{len(tickers)} 只股票，{len(indicators)} 个指标，{len(families)} 次计算")
+        return results, errors
 
     def get_supported_indicators(self) -> list[dict[str, Any]]:
-        """获取支持的指标列表.
+        """获取支持的指标列表（默认参数，其他参数组合见 indicator_registry 的名称格式）.
 
         Returns:
             list[dict]: 支持的指标列表
         """
-        return [
-            {
-                "type": "MA",
-                "name": "MA5",
-                "description": "5日移动平均线",
-                "params": {"period": 5},
-            },
-            {
-                "type": "MA",
-                "name": "MA10",
-                "description": "10日移动平均线",
-                "params": {"period": 10},
-            },
-            {
-                "type": "MA",
-                "name": "MA20",
-                "description": "20日移动平均线",
-                "params": {"period": 20},
-            },
-            {
-                "type": "MA",
-                "name": "MA60",
-                "description": "60日移动平均线",
-                "params": {"period": 60},
-            },
-            {
-                "type": "EMA",
-                "name": "EMA12",
-                "description": "12日指数移动平均线",
-                "params": {"period": 12},
-            },
-            {
-                "type": "EMA",
-                "name": "EMA26",
-                "description": "26日指数移动平均线",
-                "params": {"period": 26},
-            },
-            {
-                "type": "RSI",
-                "name": "RSI6",
-                "description": "6日相对强弱指标",
-                "params": {"period": 6},
-            },
-            {
-                "type": "RSI",
-                "name": "RSI12",
-                "description": "12日相对强弱指标",
-                "params": {"period": 12},
-            },
-            {
-                "type": "RSI",
-                "name": "RSI14",
-                "description": "14日相对强弱指标",
-                "params": {"period": 14},
-            },
-            {
-                "type": "MACD",
-                "name": "MACD_DIF",
-                "description": "MACD 差离值（DIF）",
-                "params": {"fast": 12, "slow": 26, "signal": 9},
-            },
-            {
-                "type": "MACD",
-                "name": "MACD_DEA",
-                "description": "MACD 信号线（DEA）",
-                "params": {"fast": 12, "slow": 26, "signal": 9},
-            },
-            {
-                "type": "MACD",
-                "name": "MACD_HIST",
-                "description": "MACD 柱状图（HIST）",
-                "params": {"fast": 12, "slow": 26, "signal": 9},
-            },
-            {
-                "type": "BOLL",
-                "name": "BOLL_UP",
-                "description": "布林带上轨",
-                "params": {"period": 20, "std_dev": 2.0},
-            },
-            {
-                "type": "BOLL",
-                "name": "BOLL_MID",
-                "description": "布林带中轨",
-                "params": {"period": 20, "std_dev": 2.0},
-            },
-            {
-                "type": "BOLL",
-                "name": "BOLL_LOW",
-                "description": "布林带下轨",
-                "params": {"period": 20, "std_dev": 2.0},
-            },
-        ]
+        return get_supported_indicators()
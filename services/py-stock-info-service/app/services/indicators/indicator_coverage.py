@@ -0,0 +1,160 @@
+"""技术指标计算覆盖范围（已计算并保存到数据库的时间区间）."""
+
+import json
+import logging
+from datetime import datetime, UTC
+from typing import Any, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from app.database import get_database
+
+logger = logging.getLogger(__name__)
+
+# 不限开始日期的区间以该时间作为起点（早于所有K线数据）
+EARLIEST = datetime(1900, 1, 1)
+
+# 区间记录数超过该值时合并后整体重写
+MAX_STORED_INTERVALS = 16
+
+Interval = tuple[datetime, datetime]
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """统一为不带时区的 UTC 时间（与 MongoDB 返回的时间一致）."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+def merge_intervals(intervals: list[Interval]) -> list[Interval]:
+    """合并重叠或相接的闭区间.
+
+    Args:
+        intervals: [(start, end)] 列表
+
+    Returns:
+        按开始时间排序、互不重叠的区间列表
+    """
+    merged: list[list[datetime]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def missing_ranges(
+    intervals: list[Interval], start: Optional[datetime], end: Optional[datetime]
+) -> list[tuple[Optional[datetime], Optional[datetime]]]:
+    """计算 [start, end] 中未被已覆盖区间覆盖的部分.
+
+    返回的子区间为闭区间，与相邻的已覆盖区间共享边界点（边界上的一根K线会重新计算）。
+    end 为 None 时总会返回最后一个已覆盖区间之后的部分（可能有新的K线）。
+
+    Args:
+        intervals: 已覆盖的区间列表
+        start: 开始时间（None 表示不限）
+        end: 结束时间（None 表示不限）
+
+    Returns:
+        [(start, end)] 列表，None 表示不限
+    """
+    cursor = to_naive_utc(start) or EARLIEST
+    end = to_naive_utc(end)
+    missing: list[tuple[datetime, Optional[datetime]]] = []
+    for covered_start, covered_end in merge_intervals(intervals):
+        if end is not None and covered_start > end:
+            break
+        if covered_start > cursor:
+            missing.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if end is None or cursor < end:
+        missing.append((cursor, end))
+    return [(None if lo == EARLIEST else lo, hi) for lo, hi in missing]
+
+
+class IndicatorCoverage:
+    """技术指标覆盖范围记录（每个 ticker、period、指标、参数一条文档）."""
+
+    def __init__(self, db: Optional[AsyncIOMotorDatabase] = None):
+        """初始化覆盖范围记录.
+
+        Args:
+            db: MongoDB 数据库对象（可选）
+        """
+        self.db = db if db is not None else get_database()
+        self.collection = self.db.indicator_coverage
+
+    @staticmethod
+    def _filter(
+        ticker: str, period: str, indicator_name: str, params: Optional[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """覆盖范围文档的查询条件."""
+        return {
+            "ticker": ticker,
+            "period": period,
+            "indicator_name": indicator_name,
+            "params_key": json.dumps(params or {}, sort_keys=True),
+        }
+
+    async def get_intervals(
+        self,
+        ticker: str,
+        period: str,
+        indicator_name: str,
+        params: Optional[dict[str, Any]] = None,
+    ) -> list[Interval]:
+        """获取已覆盖的时间区间.
+
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            indicator_name: 指标名称
+            params: 指标参数
+
+        Returns:
+            合并后的区间列表
+        """
+        doc = await self.collection.find_one(self._filter(ticker, period, indicator_name, params))
+        if not doc:
+            return []
+        return merge_intervals([(item["start"], item["end"]) for item in doc.get("intervals", [])])
+
+    async def add_interval(
+        self,
+        ticker: str,
+        period: str,
+        indicator_name: str,
+        params: Optional[dict[str, Any]],
+        start: Optional[datetime],
+        end: datetime,
+    ):
+        """记录新覆盖的时间区间（在指标数据写入数据库之后调用）.
+
+        Args:
+            ticker: 股票代码
+            period: 时间周期
+            indicator_name: 指标名称
+            params: 指标参数
+            start: 开始时间（None 表示从最早的K线开始）
+            end: 结束时间
+        """
+        query = self._filter(ticker, period, indicator_name, params)
+        interval = {"start": to_naive_utc(start) or EARLIEST, "end": to_naive_utc(end)}
+        # $push 为原子操作，并发写入的区间不会互相覆盖
+        doc = await self.collection.find_one_and_update(
+            query,
+            {"$push": {"intervals": interval}, "$set": {"updated_at": datetime.now(UTC)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        intervals = doc.get("intervals", []) if doc else []
+        if len(intervals) > MAX_STORED_INTERVALS:
+            merged = merge_intervals([(item["start"], item["end"]) for item in intervals])
+            await self.collection.update_one(
+                query,
+                {"$set": {"intervals": [{"start": s, "end": e} for s, e in merged]}},
+            )
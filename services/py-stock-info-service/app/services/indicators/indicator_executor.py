@@ -0,0 +1,145 @@
+"""技术指标计算执行器（进程池 / 线程池）."""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 执行方式
+PROCESS_MODE = "process"
+THREAD_MODE = "thread"
+INLINE_MODE = "inline"
+
+EXECUTOR_MODES = (PROCESS_MODE, THREAD_MODE, INLINE_MODE)
+
+
+class IndicatorExecutor:
+    """技术指标计算执行器.
+
+    - process：进程池，计算不占用事件循环所在进程的 GIL，批量计算可以用满所有核
+    - thread：线程池，NumPy / pandas 计算期间大部分时间释放 GIL，没有进程间传输开销
+    - inline：直接在事件循环中计算
+
+    数据量小于 min_rows 的计算直接在事件循环中执行（提交开销大于计算本身）。
+    提交到进程池的函数必须是模块级函数，参数和返回值应为 NumPy 数组等可高效 pickle 的对象。
+    """
+
+    def __init__(self, mode: str = PROCESS_MODE, max_workers: int = 0, min_rows: int = 0):
+        """初始化执行器.
+
+        Args:
+            mode: 执行方式（process / thread / inline）
+            max_workers: 进程 / 线程数（0 表示 CPU 核数）
+            min_rows: 提交到进程池 / 线程池的最小数据量（K线行数 × 指标族数）
+        """
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"不支持的指标计算执行方式：{mode}")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_rows = min_rows
+        self._pool: Optional[Executor] = None
+        self.active = 0
+        self.submitted = 0
+        self.inline = 0
+        self.broken = 0
+
+    def _get_pool(self) -> Executor:
+        """获取进程池 / 线程池（首次使用时创建）."""
+        if self._pool is None:
+            if self.mode == PROCESS_MODE:
+                # spawn：子进程不继承父进程的线程和锁（数据源线程池、Motor 连接等）
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="indicator"
+                )
+            logger.info(f"指标计算{'进程' if self.mode == PROCESS_MODE else '线程'}池: {self.max_workers} 个")
+        return self._pool
+
+    async def run(self, rows: int, func: Callable[..., Any], *args: Any) -> Any:
+        """执行计算函数.
+
+        Args:
+            rows: 计算数据量（K线行数 × 指标族数），小于 min_rows 时直接执行
+            func: 计算函数（进程池模式下必须是模块级函数）
+            *args: 函数参数
+
+        Returns:
+            函数返回值
+        """
+        if self.mode == INLINE_MODE or rows < self.min_rows:
+            self.inline += 1
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        self.submitted += 1
+        self.active += 1
+        try:
+            return await loop.run_in_executor(self._get_pool(), func, *args)
+        except BrokenProcessPool:
+            # 子进程异常退出（如被 OOM 终止）后进程池不可再用：丢弃进程池，本次在当前进程计算
+            logger.error("指标计算进程池已损坏，重建进程池")
+            self.broken += 1
+            self.shutdown()
+            return func(*args)
+        finally:
+            self.active -= 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取执行器统计.
+
+        Returns:
+            {"mode", "max_workers", "min_rows", "active", "submitted", "inline", "broken"}
+        """
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "min_rows": self.min_rows,
+            "active": self.active,
+            "submitted": self.submitted,
+            "inline": self.inline,
+            "broken": self.broken,
+        }
+
+    def shutdown(self):
+        """关闭进程池 / 线程池（不等待执行中的任务，再次使用时重新创建）."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# 全局执行器
+_executor: Optional[IndicatorExecutor] = None
+
+
+def get_indicator_executor() -> IndicatorExecutor:
+    """获取全局指标计算执行器（不存在时按配置创建）.
+
+    Returns:
+        执行器实例
+    """
+    global _executor
+    if _executor is None:
+        _executor = IndicatorExecutor(
+            mode=settings.indicator_executor,
+            max_workers=settings.indicator_executor_workers,
+            min_rows=settings.indicator_executor_min_rows,
+        )
+    return _executor
+
+
+def shutdown_indicator_executor():
+    """关闭全局指标计算执行器."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
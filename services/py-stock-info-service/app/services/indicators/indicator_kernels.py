@@ -0,0 +1,419 @@
+"""技术指标 NumPy 计算内核.
+
+与 pandas-ta 的默认实现保持一致（误差在浮点精度范围内）：
+- SMA：前缀和滑动窗口
+- EMA：前 length 个值的 SMA 作为种子，再按 alpha = 2 / (length + 1) 递推
+- RSI：Wilder 平滑（alpha = 1 / length）的平均涨幅 / 跌幅
+- MACD：快慢 EMA 之差，信号线为差值的 EMA
+- 布林带：SMA ± k 倍滚动标准差（ddof=1）
+- ATR：真实波幅的 Wilder 平滑，以前 length 个真实波幅的均值作为种子
+- OBV：按收盘价涨跌方向累加成交量（与 TA-Lib 一致，第一根K线的成交量计为正；
+  pandas-ta 从第二根K线开始累加，两者相差一个常数）
+- CCI：典型价格（(H + L + C) / 3）与其 SMA 之差除以 0.015 倍平均绝对偏差
+- Williams %R：100 × ((C - LLV) / (HHV - LLV) - 1)，取值 -100 ~ 0
+
+以下指标没有对应的 pandas-ta 实现，按常用定义计算：
+- KDJ：A 股行情软件的算法，RSV 的 SMA(RSV, M1, 1) 为 K，SMA(K, M2, 1) 为 D，J = 3K - 2D，
+  K、D 的初始值为 50（最高价等于最低价时 RSV 记为 0）
+- VWAP：滚动窗口内典型价格按成交量加权的平均值（成交量之和为 0 时为 NaN）
+
+所有函数沿第 0 轴（时间）计算，输入可以是一维数组（单只股票）或二维数组
+（时间 × 股票的面板，各列独立计算），输出形状与输入相同，不足窗口的位置为 NaN。
+面板中较短的列在末尾以 NaN 填充，末尾 NaN 不影响前面的计算结果。
+指数递推部分使用 pandas 的 ewm（C 实现），避免 Python 循环。
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _as_float_array(values) -> np.ndarray:
+    """转换为 float64 数组."""
+    return np.asarray(values, dtype="float64")
+
+
+def _nan_array(shape) -> np.ndarray:
+    """创建全 NaN 数组."""
+    return np.full(shape, np.nan, dtype="float64")
+
+
+def ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    """指数加权平均（adjust=False，以第一个值为初始值，沿第 0 轴）.
+
+    Args:
+        values: 输入数组（一维或二维）
+        alpha: 平滑系数
+
+    Returns:
+        平滑后的数组
+    """
+    values = _as_float_array(values)
+    if values.shape[0] == 0:
+        return values.copy()
+    frame = pd.DataFrame(values) if values.ndim == 2 else pd.Series(values)
+    return frame.ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def sma(values: np.ndarray, length: int) -> np.ndarray:
+    """简单移动平均（SMA）.
+
+    Args:
+        values: 收盘价数组
+        length: 周期
+
+    Returns:
+        SMA 数组
+    """
+    values = _as_float_array(values)
+    result = _nan_array(values.shape)
+    if length <= 0 or values.shape[0] < length:
+        return result
+    zeros = np.zeros((1,) + values.shape[1:])
+    cumsum = np.cumsum(np.concatenate((zeros, values)), axis=0)
+    result[length - 1:] = (cumsum[length:] - cumsum[:-length]) / length
+    return result
+
+
+def ema(values: np.ndarray, length: int) -> np.ndarray:
+    """指数移动平均（EMA，以前 length 个值的 SMA 作为种子）.
+
+    Args:
+        values: 收盘价数组
+        length: 周期
+
+    Returns:
+        EMA 数组
+    """
+    values = _as_float_array(values)
+    result = _nan_array(values.shape)
+    if length <= 0 or values.shape[0] < length:
+        return result
+    seeded = values[length - 1:].copy()
+    seeded[0] = values[:length].mean(axis=0)
+    result[length - 1:] = ewm(seeded, 2.0 / (length + 1))
+    return result
+
+
+def rsi_components(values: np.ndarray, length: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """RSI 及其平均涨幅 / 平均跌幅（Wilder 平滑）.
+
+    Args:
+        values: 收盘价数组
+        length: 周期
+
+    Returns:
+        (RSI, 平均涨幅, 平均跌幅) 三个数组
+    """
+    values = _as_float_array(values)
+    result = _nan_array(values.shape)
+    avg_gain = _nan_array(values.shape)
+    avg_loss = _nan_array(values.shape)
+    if length <= 0 or values.shape[0] < length + 1:
+        return result, avg_gain, avg_loss
+    diff = np.diff(values, axis=0)
+    avg_gain[1:] = ewm(np.clip(diff, 0, None), 1.0 / length)
+    avg_loss[1:] = ewm(np.clip(-diff, 0, None), 1.0 / length)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result[1:] = 100 * avg_gain[1:] / (avg_gain[1:] + avg_loss[1:])
+    return result, avg_gain, avg_loss
+
+
+def rsi(values: np.ndarray, length: int) -> np.ndarray:
+    """相对强弱指标（RSI，Wilder 平滑）.
+
+    Args:
+        values: 收盘价数组
+        length: 周期
+
+    Returns:
+        RSI 数组（0-100）
+    """
+    return rsi_components(values, length)[0]
+
+
+def macd_components(
+    values: np.ndarray, fast: int, slow: int, signal: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """MACD 及其快慢 EMA.
+
+    Args:
+        values: 收盘价数组
+        fast: 快速周期
+        slow: 慢速周期
+        signal: 信号周期
+
+    Returns:
+        (快速 EMA, 慢速 EMA, DIF, DEA) 四个数组
+    """
+    values = _as_float_array(values)
+    if slow < fast:
+        fast, slow = slow, fast
+    if values.shape[0] < slow + signal - 1:
+        return tuple(_nan_array(values.shape) for _ in range(4))
+
+    ema_fast = ema(values, fast)
+    ema_slow = ema(values, slow)
+    dif = ema_fast - ema_slow
+    dea = _nan_array(values.shape)
+    dea[slow - 1:] = ema(dif[slow - 1:], signal)
+    return ema_fast, ema_slow, dif, dea
+
+
+def macd(
+    values: np.ndarray, fast: int, slow: int, signal: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD 指标.
+
+    Args:
+        values: 收盘价数组
+        fast: 快速周期
+        slow: 慢速周期
+        signal: 信号周期
+
+    Returns:
+        (DIF, DEA, HIST) 三个数组
+    """
+    _, _, dif, dea = macd_components(values, fast, slow, signal)
+    return dif, dea, dif - dea
+
+
+def bbands(
+    values: np.ndarray, length: int, std_dev: float = 2.0
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """布林带.
+
+    Args:
+        values: 收盘价数组
+        length: 周期
+        std_dev: 标准差倍数
+
+    Returns:
+        (上轨, 中轨, 下轨) 三个数组
+    """
+    values = _as_float_array(values)
+    mid = sma(values, length)
+    deviation = _nan_array(values.shape)
+    if length > 1 and values.shape[0] >= length:
+        windows = sliding_window_view(values, length, axis=0)
+        deviation[length - 1:] = windows.std(axis=-1, ddof=1)
+    return mid + std_dev * deviation, mid, mid - std_dev * deviation
+
+
+def rolling_max(values: np.ndarray, length: int) -> np.ndarray:
+    """滚动最大值（HHV）.
+
+    Args:
+        values: 输入数组
+        length: 周期
+
+    Returns:
+        滚动最大值数组
+    """
+    values = _as_float_array(values)
+    result = _nan_array(values.shape)
+    if length > 0 and values.shape[0] >= length:
+        result[length - 1:] = sliding_window_view(values, length, axis=0).max(axis=-1)
+    return result
+
+
+def rolling_min(values: np.ndarray, length: int) -> np.ndarray:
+    """滚动最小值（LLV）.
+
+    Args:
+        values: 输入数组
+        length: 周期
+
+    Returns:
+        滚动最小值数组
+    """
+    values = _as_float_array(values)
+    result = _nan_array(values.shape)
+    if length > 0 and values.shape[0] >= length:
+        result[length - 1:] = sliding_window_view(values, length, axis=0).min(axis=-1)
+    return result
+
+
+def true_range(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, prev_close: np.ndarray = None
+) -> np.ndarray:
+    """真实波幅（第一根K线没有前收盘价时为最高价 - 最低价）.
+
+    Args:
+        high: 最高价数组
+        low: 最低价数组
+        close: 收盘价数组
+        prev_close: 第一根K线之前的收盘价（可选，增量计算时使用）
+
+    Returns:
+        真实波幅数组
+    """
+    high, low, close = _as_float_array(high), _as_float_array(low), _as_float_array(close)
+    previous = np.empty_like(close)
+    if previous.shape[0] == 0:
+        return previous
+    previous[1:] = close[:-1]
+    previous[0] = np.nan if prev_close is None else prev_close
+    # fmax 忽略 NaN：没有前收盘价时只取最高价 - 最低价
+    return np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int) -> np.ndarray:
+    """平均真实波幅（ATR，Wilder 平滑）.
+
+    Args:
+        high: 最高价数组
+        low: 最低价数组
+        close: 收盘价数组
+        length: 周期
+
+    Returns:
+        ATR 数组
+    """
+    close = _as_float_array(close)
+    result = _nan_array(close.shape)
+    # 与 pandas-ta 一致：K线数量不超过 length 时没有结果
+    if length <= 0 or close.shape[0] <= length:
+        return result
+    tr = true_range(high, low, close)
+    seeded = tr[length - 1:].copy()
+    seeded[0] = tr[:length].mean(axis=0)
+    result[length - 1:] = ewm(seeded, 1.0 / length)
+    return result
+
+
+def kdj_rsv(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int) -> np.ndarray:
+    """KDJ 的未成熟随机值（RSV，0-100）.
+
+    Args:
+        high: 最高价数组
+        low: 最低价数组
+        close: 收盘价数组
+        length: 周期
+
+    Returns:
+        RSV 数组
+    """
+    close = _as_float_array(close)
+    highest = rolling_max(high, length)
+    lowest = rolling_min(low, length)
+    spread = highest - lowest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsv = np.where(spread > 0, 100 * (close - lowest) / spread, 0.0)
+    rsv[np.isnan(spread)] = np.nan
+    return rsv
+
+
+def kdj(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int, m1: int, m2: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """KDJ 指标.
+
+    Args:
+        high: 最高价数组
+        low: 最低价数组
+        close: 收盘价数组
+        length: RSV 周期
+        m1: K 的平滑周期
+        m2: D 的平滑周期
+
+    Returns:
+        (K, D, J) 三个数组
+    """
+    close = _as_float_array(close)
+    k = _nan_array(close.shape)
+    d = _nan_array(close.shape)
+    if length > 0 and close.shape[0] >= length:
+        rsv = kdj_rsv(high, low, close, length)[length - 1:]
+        seed = np.full((1,) + close.shape[1:], 50.0)
+        k[length - 1:] = ewm(np.concatenate((seed, rsv)), 1.0 / m1)[1:]
+        d[length - 1:] = ewm(np.concatenate((seed, k[length - 1:])), 1.0 / m2)[1:]
+    return k, d, 3 * k - 2 * d
+
+
+def obv(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """能量潮（OBV）.
+
+    Args:
+        close: 收盘价数组
+        volume: 成交量数组
+
+    Returns:
+        OBV 数组
+    """
+    close, volume = _as_float_array(close), _as_float_array(volume)
+    if close.shape[0] == 0:
+        return close.copy()
+    direction = np.ones_like(close)
+    direction[1:] = np.sign(np.diff(close, axis=0))
+    return np.cumsum(direction * volume, axis=0)
+
+
+def vwap(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray, length: int
+) -> np.ndarray:
+    """滚动成交量加权平均价（VWAP）.
+
+    Args:
+        high: 最高价数组
+        low: 最低价数组
+        close: 收盘价数组
+        volume: 成交量数组
+        length: 周期
+
+    Returns:
+        VWAP 数组
+    """
+    volume = _as_float_array(volume)
+    typical = (_as_float_array(high) + _as_float_array(low) + _as_float_array(close)) / 3
+    volume_sum = sma(volume, length)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(volume_sum > 0, sma(typical * volume, length) / volume_sum, np.nan)
+
+
+def cci(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int, c: float = 0.015
+) -> np.ndarray:
+    """顺势指标（CCI）.
+
+    Args:
+        high: 最高价数组
+        low: 最低价数组
+        close: 收盘价数组
+        length: 周期
+        c: 常数（默认 0.015）
+
+    Returns:
+        CCI 数组（平均绝对偏差为 0 时为 NaN）
+    """
+    typical = (_as_float_array(high) + _as_float_array(low) + _as_float_array(close)) / 3
+    result = _nan_array(typical.shape)
+    if length <= 0 or typical.shape[0] < length:
+        return result
+    windows = sliding_window_view(typical, length, axis=0)
+    mean = windows.mean(axis=-1)
+    deviation = np.abs(windows - mean[..., None]).mean(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = (typical[length - 1:] - mean) / (c * deviation)
+    result[length - 1:] = np.where(deviation > 0, values, np.nan)
+    return result
+
+
+def willr(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int) -> np.ndarray:
+    """威廉指标（Williams %R，-100 ~ 0）.
+
+    Args:
+        high: 最高价数组
+        low: 最低价数组
+        close: 收盘价数组
+        length: 周期
+
+    Returns:
+        Williams %R 数组（最高价等于最低价时为 NaN）
+    """
+    close = _as_float_array(close)
+    highest = rolling_max(high, length)
+    lowest = rolling_min(low, length)
+    spread = highest - lowest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(spread > 0, 100 * ((close - lowest) / spread - 1), np.nan)
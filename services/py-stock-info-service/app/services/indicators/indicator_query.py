@@ -7,6 +7,7 @@ from typing import Any, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.database import get_database
+from app.services.frame_converter import datetimes_to_epoch_ms
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +85,104 @@ class IndicatorQuery:
         )
         return results
 
+    async def query_columns(
+        self,
+        ticker: str,
+        indicator_name: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> dict[str, list[Any]]:
+        """按指标查询数据（列式，只读取 timestamp、value 字段）.
+
+        Args:
+            ticker: 股票代码
+            indicator_name: 指标名称
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            limit: 返回数量限制（可选）
+
+        Returns:
+            {"timestamps": Unix 毫秒时间戳列表, "value": 指标值列表}（按时间升序）
+        """
+        query: dict[str, Any] = {
+            "metadata.ticker": ticker,
+            "metadata.period": period,
+            "metadata.indicator_name": indicator_name,
+        }
+        if start_date or end_date:
+            query["timestamp"] = {}
+            if start_date:
+                query["timestamp"]["$gte"] = start_date
+            if end_date:
+                query["timestamp"]["$lte"] = end_date
+
+        cursor = self.collection.find(query, {"_id": 0, "timestamp": 1, "value": 1}).sort("timestamp", 1)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        timestamps, values = [], []
+        async for doc in cursor:
+            timestamps.append(doc["timestamp"])
+            values.append(doc.get("value"))
+        return {"timestamps": datetimes_to_epoch_ms(timestamps), "value": values}
+
+    async def query_items(
+        self,
+        ticker: str,
+        indicator_name: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """按指标查询数据（接口响应格式，只读取 timestamp、value、params 字段）.
+
+        Args:
+            ticker: 股票代码
+            indicator_name: 指标名称
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            limit: 返回数量限制（可选）
+
+        Returns:
+            [{"date", "timestamp", "indicator_name", "value", "params"}, ...]
+            （字段同 IndicatorDataResponse，时间为 ISO 8601 字符串，按时间升序）
+        """
+        query: dict[str, Any] = {
+            "metadata.ticker": ticker,
+            "metadata.period": period,
+            "metadata.indicator_name": indicator_name,
+        }
+        if start_date or end_date:
+            query["timestamp"] = {}
+            if start_date:
+                query["timestamp"]["$gte"] = start_date
+            if end_date:
+                query["timestamp"]["$lte"] = end_date
+
+        projection = {"_id": 0, "timestamp": 1, "value": 1, "params": 1}
+        cursor = self.collection.find(query, projection).sort("timestamp", 1)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        items = []
+        async for doc in cursor:
+            timestamp = doc["timestamp"].isoformat()
+            items.append(
+                {
+                    "date": timestamp,
+                    "timestamp": timestamp,
+                    "indicator_name": indicator_name,
+                    "value": doc.get("value"),
+                    "params": doc.get("params"),
+                }
+            )
+        return items
+
     async def get_latest_date(
         self, ticker: str, indicator_name: str, period: str
     ) -> Optional[datetime]:
@@ -111,6 +210,32 @@ class IndicatorQuery:
             return doc["timestamp"]
         return None
 
+    async def get_latest_record(
+        self, ticker: str, indicator_name: str, period: str
+    ) -> Optional[dict[str, Any]]:
+        """获取最新的一条指标数据（含增量计算使用的 state 字段）.
+
+        Args:
+            ticker: 股票代码
+            indicator_name: 指标名称
+            period: 时间周期
+
+        Returns:
+            dict: 最新一条数据（timestamp、value、params、state），如果没有数据则返回 None
+        """
+        doc = await self.collection.find_one(
+            {
+                "metadata.ticker": ticker,
+                "metadata.period": period,
+                "metadata.indicator_name": indicator_name,
+            },
+            sort=[("timestamp", -1)],
+        )
+        if doc:
+            doc.pop("_id", None)
+            doc.pop("metadata", None)
+        return doc
+
     async def check_data_exists(
         self,
         ticker: str,
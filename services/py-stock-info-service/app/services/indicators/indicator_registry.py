@@ -0,0 +1,300 @@
+"""技术指标注册表（指标名称解析）.
+
+指标名称格式（参数写在名称中，缺省时使用默认参数）：
+
+- 单值指标：``MA50``、``EMA200``、``RSI14``、``ATR14``、``CCI20``（类型 + 周期）
+- 无参数的指标：``OBV``
+- 多值指标的子指标：``MACD_DIF``、``MACD_DIF_8_21_5``、``BOLL_UP``、``BOLL_UP_20_2.5``、``KDJ_K_9_3_3``
+- 多值指标整体（批量计算时展开为全部子指标）：``MACD``、``MACD_8_21_5``、``BOLL``、``KDJ_9_3_3``
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+# 周期参数上限（避免误输入导致超大窗口）
+MAX_INDICATOR_PERIOD = 1000
+
+
+class IndicatorType:
+    """一类技术指标的定义（参数列表、子指标）."""
+
+    def __init__(
+        self,
+        name: str,
+        category: str,
+        display_name: str,
+        params: list[tuple[str, Callable[[str], Any], Any]],
+        outputs: Optional[dict[str, str]] = None,
+        description: str = "",
+    ):
+        """初始化指标类型.
+
+        Args:
+            name: 指标类型（如 MA、MACD）
+            category: 指标分类（trend, momentum, volatility, volume）
+            display_name: 显示名称模板（使用参数格式化，如 "MA{period}"）
+            params: [(参数名, 类型转换函数, 默认值)]，顺序即名称中参数的顺序
+            outputs: 多值指标的子指标 {子指标后缀: 描述}，单值指标为 None
+            description: 单值指标的描述模板（使用参数格式化）
+        """
+        self.name = name
+        self.category = category
+        self.display_name = display_name
+        self.params = params
+        self.outputs = outputs
+        self.description = description
+
+    @property
+    def defaults(self) -> dict[str, Any]:
+        """默认参数."""
+        return {param: default for param, _, default in self.params}
+
+    def parse_params(self, values: list[str]) -> Optional[dict[str, Any]]:
+        """解析名称中的参数（缺省时使用默认参数）.
+
+        Args:
+            values: 名称中的参数文本（为空或与参数个数一致）
+
+        Returns:
+            参数字典，无法解析或超出范围时返回 None
+        """
+        if not values:
+            return self.defaults
+        if len(values) != len(self.params):
+            return None
+        params = {}
+        for (param, convert, _), value in zip(self.params, values):
+            try:
+                params[param] = convert(value)
+            except ValueError:
+                return None
+            if not 0 < params[param] <= MAX_INDICATOR_PERIOD:
+                return None
+        return params
+
+
+class IndicatorSpec:
+    """解析后的指标（名称、类型、参数、计算结果中的子指标键）."""
+
+    __slots__ = ("name", "type", "params", "output")
+
+    def __init__(self, name: str, indicator_type: str, params: dict[str, Any], output: str):
+        """初始化指标.
+
+        Args:
+            name: 指标名称（也是保存到数据库的 indicator_name）
+            indicator_type: 指标类型
+            params: 指标参数
+            output: 计算结果中的子指标键（单值指标为类型，如 MA；多值指标如 MACD_DIF）
+        """
+        self.name = name
+        self.type = indicator_type
+        self.params = params
+        self.output = output
+
+    def to_dict(self) -> dict[str, Any]:
+        """转换为指标信息字典（params 为副本，调用方可以修改）.
+
+        Returns:
+            {"type", "params", "output"}
+        """
+        return {"type": self.type, "params": dict(self.params), "output": self.output}
+
+    def __repr__(self) -> str:
+        return f"IndicatorSpec({self.name!r}, {self.type!r}, {self.params!r})"
+
+
+INDICATOR_TYPES: dict[str, IndicatorType] = {
+    indicator.name: indicator
+    for indicator in [
+        IndicatorType(
+            "MA", "trend", "MA{period}", [("period", int, 5)],
+            description="{period}日移动平均线",
+        ),
+        IndicatorType(
+            "EMA", "trend", "EMA{period}", [("period", int, 12)],
+            description="{period}日指数移动平均线",
+        ),
+        IndicatorType(
+            "RSI", "momentum", "RSI{period}", [("period", int, 14)],
+            description="{period}日相对强弱指标",
+        ),
+        IndicatorType(
+            "MACD",
+            "momentum",
+            "MACD({fast},{slow},{signal})",
+            [("fast", int, 12), ("slow", int, 26), ("signal", int, 9)],
+            {"DIF": "MACD 差离值（DIF）", "DEA": "MACD 信号线（DEA）", "HIST": "MACD 柱状图（HIST）"},
+        ),
+        IndicatorType(
+            "BOLL",
+            "volatility",
+            "BOLL({period},{std_dev})",
+            [("period", int, 20), ("std_dev", float, 2.0)],
+            {"UP": "布林带上轨", "MID": "布林带中轨", "LOW": "布林带下轨"},
+        ),
+        IndicatorType(
+            "ATR", "volatility", "ATR{period}", [("period", int, 14)],
+            description="{period}日平均真实波幅",
+        ),
+        IndicatorType(
+            "KDJ",
+            "momentum",
+            "KDJ({period},{m1},{m2})",
+            [("period", int, 9), ("m1", int, 3), ("m2", int, 3)],
+            {"K": "KDJ 指标 K 值", "D": "KDJ 指标 D 值", "J": "KDJ 指标 J 值"},
+        ),
+        IndicatorType("OBV", "volume", "OBV", [], description="能量潮"),
+        IndicatorType(
+            "VWAP", "volume", "VWAP{period}", [("period", int, 20)],
+            description="{period}日成交量加权平均价",
+        ),
+        IndicatorType(
+            "CCI", "momentum", "CCI{period}", [("period", int, 14)],
+            description="{period}日顺势指标",
+        ),
+        IndicatorType(
+            "WR", "momentum", "WR{period}", [("period", int, 14)],
+            description="{period}日威廉指标",
+        ),
+    ]
+}
+
+# 单值指标：类型 + 周期（如 MA50）
+_SINGLE_PATTERN = re.compile(r"^([A-Z]+)(\d+)$")
+
+# 默认展示的指标（/supported 接口返回，其余参数组合按名称格式解析）
+_DEFAULT_PERIODS = {
+    "MA": [5, 10, 20, 60],
+    "EMA": [12, 26],
+    "RSI": [6, 12, 14],
+    "ATR": [14],
+    "VWAP": [20],
+    "CCI": [14],
+    "WR": [14],
+}
+
+
+@lru_cache(maxsize=4096)
+def _parse(indicator_name: str) -> Optional[tuple[IndicatorSpec, ...]]:
+    """解析指标名称（结果缓存，同一名称只解析一次）."""
+    indicator = INDICATOR_TYPES.get(indicator_name)
+    if indicator is not None and not indicator.params and indicator.outputs is None:
+        return (IndicatorSpec(indicator_name, indicator.name, {}, indicator.name),)
+
+    match = _SINGLE_PATTERN.match(indicator_name)
+    if match:
+        indicator = INDICATOR_TYPES.get(match.group(1))
+        if indicator is None or indicator.outputs is not None or not indicator.params:
+            return None
+        params = indicator.parse_params([match.group(2)])
+        if params is None:
+            return None
+        return (IndicatorSpec(indicator_name, indicator.name, params, indicator.name),)
+
+    parts = indicator_name.split("_")
+    indicator = INDICATOR_TYPES.get(parts[0])
+    if indicator is None or indicator.outputs is None:
+        return None
+
+    # MACD_DIF[_8_21_5]：子指标；MACD[_8_21_5]：展开为全部子指标
+    if len(parts) > 1 and parts[1] in indicator.outputs:
+        params = indicator.parse_params(parts[2:])
+        if params is None:
+            return None
+        return (IndicatorSpec(indicator_name, indicator.name, params, f"{parts[0]}_{parts[1]}"),)
+
+    params = indicator.parse_params(parts[1:])
+    if params is None:
+        return None
+    suffix = "".join(f"_{value}" for value in parts[1:])
+    return tuple(
+        IndicatorSpec(f"{parts[0]}_{output}{suffix}", indicator.name, params, f"{parts[0]}_{output}")
+        for output in indicator.outputs
+    )
+
+
+def parse_indicator_name(indicator_name: str) -> Optional[IndicatorSpec]:
+    """解析单个指标名称（多值指标须指定子指标，如 MACD_DIF_8_21_5）.
+
+    Args:
+        indicator_name: 指标名称
+
+    Returns:
+        解析后的指标，无法解析时返回 None
+    """
+    specs = _parse(indicator_name)
+    if not specs or len(specs) != 1 or specs[0].name != indicator_name:
+        return None
+    return specs[0]
+
+
+def expand_indicator_name(indicator_name: str) -> list[IndicatorSpec]:
+    """解析指标名称，多值指标整体（如 MACD_8_21_5）展开为全部子指标.
+
+    Args:
+        indicator_name: 指标名称
+
+    Returns:
+        解析后的指标列表，无法解析时返回空列表
+    """
+    return list(_parse(indicator_name) or ())
+
+
+def _build_supported_indicators() -> list[dict[str, Any]]:
+    """构建默认参数的指标列表."""
+    supported = []
+    for indicator_type, periods in _DEFAULT_PERIODS.items():
+        indicator = INDICATOR_TYPES[indicator_type]
+        for period in periods:
+            params = {"period": period}
+            supported.append(
+                {
+                    "type": indicator_type,
+                    "name": f"{indicator_type}{period}",
+                    "display_name": indicator.display_name.format(**params),
+                    "category": indicator.category,
+                    "description": indicator.description.format(**params),
+                    "params": params,
+                }
+            )
+    for indicator in INDICATOR_TYPES.values():
+        if indicator.outputs is None and not indicator.params:
+            supported.append(
+                {
+                    "type": indicator.name,
+                    "name": indicator.name,
+                    "display_name": indicator.display_name,
+                    "category": indicator.category,
+                    "description": indicator.description,
+                    "params": {},
+                }
+            )
+        if indicator.outputs is None:
+            continue
+        params = indicator.defaults
+        for output, description in indicator.outputs.items():
+            supported.append(
+                {
+                    "type": indicator.name,
+                    "name": f"{indicator.name}_{output}",
+                    "display_name": f"{indicator.display_name.format(**params)} {output}",
+                    "category": indicator.category,
+                    "description": description,
+                    "params": params,
+                }
+            )
+    return supported
+
+
+_SUPPORTED_INDICATORS = _build_supported_indicators()
+
+
+def get_supported_indicators() -> list[dict[str, Any]]:
+    """获取默认参数的指标列表（其他参数组合可按名称格式直接使用）.
+
+    Returns:
+        指标列表（副本）
+    """
+    return [dict(item, params=dict(item["params"])) for item in _SUPPORTED_INDICATORS]
@@ -1,17 +1,29 @@
 """技术指标核心服务（协调各个子服务）."""
 
-import asyncio
 import logging
 from datetime import datetime
+from functools import partial
 from typing import Any, Callable, Optional
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.config import settings
 from app.database import get_database
 from app.services.historical_data.historical_data_service import HistoricalDataService
-from app.services.indicators.indicator_calculator import IndicatorCalculator
+from app.services.indicators.indicator_calculator import IndicatorCalculator, price_fields
+from app.services.indicators.indicator_coverage import (
+    IndicatorCoverage,
+    missing_ranges,
+    to_naive_utc,
+)
 from app.services.indicators.indicator_query import IndicatorQuery
+from app.services.indicators.indicator_registry import (
+    INDICATOR_TYPES,
+    expand_indicator_name,
+    parse_indicator_name,
+)
 from app.services.indicators.indicator_storage import IndicatorStorage
+from app.services.indicators.indicator_write_queue import get_indicator_write_queue
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +41,8 @@ class IndicatorService:
         self.calculator = IndicatorCalculator(self.db)
         self.storage = IndicatorStorage(self.db)
         self.query = IndicatorQuery(self.db)
+        self.coverage = IndicatorCoverage(self.db)
+        self.write_queue = get_indicator_write_queue()
         self.historical_data_service = HistoricalDataService(self.db)
 
     def get_supported_indicators(self) -> list[dict[str, Any]]:
@@ -39,6 +53,65 @@ class IndicatorService:
         """
         return self.calculator.get_supported_indicators()
 
+    async def query_indicator_columns(
+        self,
+        ticker: str,
+        indicator_name: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """查询技术指标数据（列式）.
+
+        Args:
+            ticker: 股票代码
+            indicator_name: 指标名称
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            limit: 返回数量限制（可选）
+
+        Returns:
+            dict: {"ticker", "indicator_name", "period", "count", "timestamps", "value"}
+        """
+        columns = await self.query.query_columns(
+            ticker, indicator_name, period, start_date, end_date, limit
+        )
+        return {
+            "ticker": ticker,
+            "indicator_name": indicator_name,
+            "period": period,
+            "count": len(columns["timestamps"]),
+            **columns,
+        }
+
+    async def query_indicator_items(
+        self,
+        ticker: str,
+        indicator_name: str,
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """查询技术指标数据（接口响应格式，字段见 IndicatorQuery.query_items）.
+
+        Args:
+            ticker: 股票代码
+            indicator_name: 指标名称
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            limit: 返回数量限制（可选）
+
+        Returns:
+            list[dict]: 指标数据列表（按时间升序）
+        """
+        return await self.query.query_items(
+            ticker, indicator_name, period, start_date, end_date, limit
+        )
+
     async def calculate_indicator(
         self,
         ticker: str,
@@ -52,6 +125,10 @@ class IndicatorService:
     ) -> list[dict[str, Any]]:
         """计算单个技术指标.
 
+        使用缓存时根据覆盖范围记录找出 [start_date, end_date] 中尚未计算保存的子区间，
+        只计算这些子区间（带上所需的预热K线），再与已保存的数据合并。
+        计算结果通过后台写入队列保存，写入成功后才记录覆盖范围。
+
         Args:
             ticker: 股票代码
             indicator_type: 指标类型（MA, EMA, RSI, MACD, BOLL）
@@ -65,39 +142,163 @@ class IndicatorService:
         Returns:
             list[dict]: 指标数据列表
         """
-        # 1. 如果使用缓存，先检查数据库是否已有数据
-        if use_cache:
-            existing_data = await self.query.query_by_indicator(
+        params = params or {}
+        latest_kline = await self.historical_data_service.query.get_latest_date(ticker, period)
+        if latest_kline is None:
+            logger.warning(f"历史K线数据不足：{ticker} {period}")
+            if not use_cache:
+                return []
+            return await self.query.query_by_indicator(
                 ticker, indicator_name, period, start_date, end_date
             )
-            if existing_data:
-                logger.info(
-                    f"使用缓存的指标数据：{ticker} {indicator_name} {period} - {len(existing_data)} 条"
-                )
-                return existing_data
 
-        # 2. 获取历史K线数据
-        kline_data = await self.historical_data_service.query_kline_data(
-            ticker, period, start_date, end_date
-        )
+        intervals = []
+        ranges = [(start_date, end_date)]
+        if use_cache:
+            intervals = await self.coverage.get_intervals(ticker, period, indicator_name, params)
+            # 已覆盖到最新K线、之后没有新K线的部分不需要计算
+            covered_ends = {end for _, end in intervals}
+            ranges = [
+                (range_start, range_end)
+                for range_start, range_end in missing_ranges(intervals, start_date, end_date)
+                if not (range_start in covered_ends and range_start >= latest_kline)
+            ]
+
+        computed: dict[datetime, dict[str, Any]] = {}
+        for range_start, range_end in ranges:
+            indicator_data = await self._calculate_range(
+                ticker, indicator_type, indicator_name, period, params,
+                range_start, range_end, latest_kline,
+            )
+            computed.update((record["timestamp"], record) for record in indicator_data)
 
-        if not kline_data:
-            logger.warning(f"历史K线数据不足：{ticker} {period}")
-            return []
+        if not intervals:
+            return [computed[timestamp] for timestamp in sorted(computed)]
 
-        # 3. 计算指标
-        indicator_data = await self._calculate_indicator_by_type(
-            ticker, indicator_type, indicator_name, params or {}, kline_data
+        # 已保存的数据 + 新计算的子区间
+        existing_data = await self.query.query_by_indicator(
+            ticker, indicator_name, period, start_date, end_date
+        )
+        if not computed:
+            logger.info(
+                f"使用缓存的指标数据：{ticker} {indicator_name} {period} - {len(existing_data)} 条"
+            )
+            return existing_data
+        logger.info(
+            f"部分使用缓存的指标数据：{ticker} {indicator_name} {period} - "
+            f"已保存 {len(existing_data)} 条，新计算 {len(computed)} 条（{len(ranges)} 个区间）"
         )
+        merged = {record["timestamp"]: record for record in existing_data}
+        merged.update(computed)
+        return [merged[timestamp] for timestamp in sorted(merged)]
 
-        # 4. 保存到数据库（异步，不等待）
-        if indicator_data:
-            asyncio.create_task(
-                self.storage.upsert_indicator_data(
-                    ticker, period, indicator_type, indicator_name, indicator_data
+    async def _calculate_range(
+        self,
+        ticker: str,
+        indicator_type: str,
+        indicator_name: str,
+        period: str,
+        params: dict[str, Any],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        latest_kline: datetime,
+    ) -> list[dict[str, Any]]:
+        """计算 [start_date, end_date] 内的指标数据，并提交写入（写入后记录覆盖范围）.
+
+        滑动窗口指标（MA / BOLL / VWAP / CCI / WR）只额外读取 start_date 之前的 period - 1 根K线作为预热；
+        EMA / RSI / MACD / ATR / KDJ / OBV 为递推指标：已保存的最后一条数据正好在 start_date 且带有平滑状态时
+        从该状态继续计算，否则从最早的K线开始计算，保证结果与全量计算一致。
+
+        Args:
+            ticker: 股票代码
+            indicator_type: 指标类型
+            indicator_name: 指标名称
+            period: 时间周期
+            params: 指标参数
+            start_date: 开始时间（None 表示从最早的K线开始）
+            end_date: 结束时间（None 表示到最新的K线）
+            latest_kline: 最新K线的时间
+
+        Returns:
+            list[dict]: start_date 之后（含）的指标数据
+        """
+        start_date, end_date = to_naive_utc(start_date), to_naive_utc(end_date)
+        query = self.historical_data_service.query
+        window = self.calculator.warmup_window(indicator_type, params)
+
+        previous = None
+        if window is None and start_date is not None:
+            latest = await self.query.get_latest_record(ticker, indicator_name, period)
+            if (
+                latest
+                and to_naive_utc(latest["timestamp"]) == start_date
+                and self.calculator.supports_incremental(indicator_type, latest)
+            ):
+                previous = latest
+
+        if previous is not None:
+            new_klines = [
+                kline
+                for kline in await query.query_by_ticker(
+                    ticker, period, start_date=start_date, end_date=end_date, sort_desc=False
+                )
+                if kline["timestamp"] > start_date
+            ]
+            # KDJ 的 RSV 需要截至 start_date（含）的历史K线窗口
+            history_window = self.calculator.incremental_window(indicator_type, params)
+            if new_klines and history_window:
+                history = await query.query_by_ticker(
+                    ticker, period, end_date=start_date, limit=history_window, sort_desc=True
                 )
+                new_klines = history[::-1] + new_klines
+            family = {
+                "type": indicator_type,
+                "params": params,
+                "names": [indicator_name],
+                "outputs": {indicator_name: self._output_key(indicator_name)},
+                "previous": previous,
+            }
+            results, errors = await self.calculator.calculate_incremental(
+                ticker, [family], new_klines
             )
-
+            if indicator_name in errors:
+                raise ValueError(errors[indicator_name])
+            indicator_data = results.get(indicator_name, [])
+        else:
+            kline_data = await self.historical_data_service.query_kline_data(
+                ticker, period, start_date if window is not None else None, end_date
+            )
+            if window and start_date is not None:
+                history = await query.query_by_ticker(
+                    ticker, period, end_date=start_date, limit=window + 1, sort_desc=True
+                )
+                kline_data = kline_data + [
+                    kline for kline in history if kline["timestamp"] < start_date
+                ][:window]
+            if not kline_data:
+                return []
+            indicator_data = await self._calculate_indicator_by_type(
+                ticker, indicator_type, indicator_name, params, kline_data
+            )
+            if start_date is not None:
+                indicator_data = [
+                    record for record in indicator_data if record["timestamp"] >= start_date
+                ]
+
+        # end_date 之后已有K线时覆盖到 end_date，否则覆盖到最新K线（之后可能有新K线）
+        covered_end = end_date if end_date is not None and end_date < latest_kline else latest_kline
+        self.write_queue.enqueue(
+            self.storage,
+            ticker,
+            period,
+            indicator_type,
+            indicator_name,
+            indicator_data,
+            on_written=partial(
+                self.coverage.add_interval,
+                ticker, period, indicator_name, params, start_date, covered_end,
+            ),
+        )
         return indicator_data
 
     async def _calculate_indicator_by_type(
@@ -120,44 +321,25 @@ class IndicatorService:
         Returns:
             list[dict]: 指标数据
         """
-        if indicator_type == "MA":
-            period_param = params.get("period", 5)
-            return await self.calculator.calculate_ma(ticker, period_param, kline_data)
-
-        elif indicator_type == "EMA":
-            period_param = params.get("period", 12)
-            return await self.calculator.calculate_ema(ticker, period_param, kline_data)
-
-        elif indicator_type == "RSI":
-            period_param = params.get("period", 14)
-            return await self.calculator.calculate_rsi(ticker, period_param, kline_data)
-
-        elif indicator_type == "MACD":
-            fast = params.get("fast", 12)
-            slow = params.get("slow", 26)
-            signal = params.get("signal", 9)
-            macd_results = await self.calculator.calculate_macd(
-                ticker, fast, slow, signal, kline_data
-            )
-            # 返回指定的 MACD 子指标
-            if indicator_name in macd_results:
-                return macd_results[indicator_name]
+        if indicator_type not in INDICATOR_TYPES:
+            logger.warning(f"不支持的指标类型：{indicator_type}")
             return []
 
-        elif indicator_type == "BOLL":
-            period_param = params.get("period", 20)
-            std_dev = params.get("std_dev", 2.0)
-            boll_results = await self.calculator.calculate_bollinger_bands(
-                ticker, period_param, std_dev, kline_data
-            )
-            # 返回指定的 BOLL 子指标
-            if indicator_name in boll_results:
-                return boll_results[indicator_name]
-            return []
+        indicator = {
+            "name": indicator_name,
+            "type": indicator_type,
+            "params": params,
+            "output": self._output_key(indicator_name),
+        }
+        results, errors = await self.calculator.calculate_batch(ticker, [indicator], kline_data)
+        if indicator_name in errors:
+            raise ValueError(errors[indicator_name])
+        return results.get(indicator_name, [])
 
-        else:
-            logger.warning(f"不支持的指标类型：{indicator_type}")
-            return []
+    def _output_key(self, indicator_name: str) -> str:
+        """指标在计算结果中的子指标键（如 MACD_DIF_8_21_5 -> MACD_DIF）."""
+        spec = parse_indicator_name(indicator_name)
+        return spec.output if spec is not None else indicator_name
 
     async def query_indicator_data(
         self,
@@ -193,6 +375,7 @@ class IndicatorService:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         progress_callback: Optional[Callable] = None,
+        incremental: bool = False,
     ) -> dict[str, Any]:
         """批量计算多个技术指标.
 
@@ -200,16 +383,19 @@ class IndicatorService:
             ticker: 股票代码
             indicator_names: 指标名称列表
             period: 时间周期（默认 1d）
-            start_date: 开始日期（可选）
-            end_date: 结束日期（可选）
+            start_date: 开始日期（可选，增量模式下忽略）
+            end_date: 结束日期（可选，增量模式下忽略）
             progress_callback: 进度回调函数（可选）
+            incremental: 是否增量计算（只计算上次保存的最后一条数据之后的新数据点）
 
         Returns:
             dict: 包含统计信息和结果的字典
         """
-        total = len(indicator_names)
+        # 解析指标类型和参数（MACD_8_21_5 等多值指标整体展开为子指标）
+        indicators, invalid = self._expand_indicator_names(indicator_names)
+        total = len(indicators) + len(invalid)
         success = 0
-        failed = 0
+        failed = len(invalid)
         results = {}
 
         # 发送初始化进度
@@ -223,50 +409,70 @@ class IndicatorService:
                 }
             )
 
-        # 遍历指标列表
-        for idx, indicator_name in enumerate(indicator_names):
+        calculated: dict[str, list[dict[str, Any]]] = {}
+        errors: dict[str, str] = {}
+        # 从最早的K线计算到最新K线时，结果与按覆盖范围计算的结果一致，可以记录覆盖范围
+        covered_end = None
+        if indicators and not incremental and start_date is None and end_date is None:
+            covered_end = await self.historical_data_service.query.get_latest_date(ticker, period)
+        if indicators:
             try:
-                # 解析指标类型和参数
-                indicator_info = self._parse_indicator_name(indicator_name)
-                if not indicator_info:
-                    logger.warning(f"无法解析指标名称：{indicator_name}")
-                    failed += 1
-                    continue
-
-                # 计算指标
-                indicator_data = await self.calculate_indicator(
-                    ticker=ticker,
-                    indicator_type=indicator_info["type"],
-                    indicator_name=indicator_name,
-                    period=period,
-                    params=indicator_info["params"],
-                    start_date=start_date,
-                    end_date=end_date,
-                    use_cache=False,  # 批量计算不使用缓存
-                )
-
-                results[indicator_name] = indicator_data
-                success += 1
-
-                # 发送进度更新
-                if progress_callback:
-                    progress = int((idx + 1) / total * 100)
-                    await progress_callback(
-                        {
-                            "stage": "calculating",
-                            "message": f"正在计算指标... ({idx + 1}/{total})",
-                            "progress": progress,
-                            "current": idx + 1,
-                            "total": total,
-                            "success": success,
-                            "failed": failed,
-                            "current_indicator": indicator_name,
-                        }
+                if incremental:
+                    calculated, errors = await self._calculate_batch_incremental(
+                        ticker, indicators, period
+                    )
+                else:
+                    calculated, errors = await self._calculate_batch_full(
+                        ticker, indicators, period, start_date, end_date
                     )
-
             except Exception as e:
-                logger.error(f"计算指标失败：{indicator_name} - {e}")
+                logger.error(f"批量计算指标失败：{ticker} - {e}")
+                errors = {indicator["name"]: str(e) for indicator in indicators}
+
+        for idx, indicator in enumerate(indicators):
+            indicator_name = indicator["name"]
+            if indicator_name in errors:
+                logger.error(f"计算指标失败：{indicator_name} - {errors[indicator_name]}")
                 failed += 1
+                continue
+
+            indicator_data = calculated.get(indicator_name, [])
+            results[indicator_name] = indicator_data
+            success += 1
+
+            # 通过后台写入队列保存（全量计算全部历史时同时记录覆盖范围）
+            on_written = None
+            if covered_end is not None:
+                on_written = partial(
+                    self.coverage.add_interval,
+                    ticker, period, indicator_name, indicator.get("params") or {},
+                    None, covered_end,
+                )
+            self.write_queue.enqueue(
+                self.storage,
+                ticker,
+                period,
+                indicator["type"],
+                indicator_name,
+                indicator_data,
+                on_written=on_written,
+            )
+
+            # 发送进度更新
+            if progress_callback:
+                progress = int((idx + 1) / len(indicators) * 100)
+                await progress_callback(
+                    {
+                        "stage": "calculating",
+                        "message": f"正在计算指标... ({idx + 1}/{len(indicators)})",
+                        "progress": progress,
+                        "current": idx + 1,
+                        "total": total,
+                        "success": success,
+                        "failed": failed,
+                        "current_indicator": indicator_name,
+                    }
+                )
 
         # 发送完成通知
         if progress_callback:
@@ -297,21 +503,306 @@ class IndicatorService:
             "results": results,
         }
 
+    async def calculate_market_indicators(
+        self,
+        indicator_names: list[str],
+        period: str = "1d",
+        market: Optional[str] = None,
+        tickers: Optional[list[str]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        progress_callback: Optional[Callable] = None,
+    ) -> dict[str, Any]:
+        """全市场（多只股票）批量计算技术指标.
+
+        按 indicator_panel_chunk_size 分组，每组一次查询所需的价格字段、构建 时间 × 股票 面板，
+        每类指标对整组股票只计算一次，结果按 indicator_write_batch_rows 批量写入。
+
+        Args:
+            indicator_names: 指标名称列表
+            period: 时间周期（默认 1d）
+            market: 市场（tickers 为空时计算该市场有K线数据的全部股票）
+            tickers: 股票代码列表（可选）
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            progress_callback: 进度回调函数（可选）
+
+        Returns:
+            dict: 统计信息
+        """
+        indicators, invalid = self._expand_indicator_names(indicator_names)
+
+        query = self.historical_data_service.query
+        if tickers is None:
+            tickers = await query.get_tickers(period, market)
+
+        total = len(tickers)
+        success = 0
+        failed = 0
+        written = 0
+        errors: dict[str, str] = {}
+
+        if progress_callback:
+            await progress_callback(
+                {
+                    "stage": "init",
+                    "message": f"开始全市场计算指标：{total} 只股票",
+                    "progress": 0,
+                    "total": total,
+                }
+            )
+
+        fields = price_fields([indicator["type"] for indicator in indicators])
+        chunk_size = max(settings.indicator_panel_chunk_size, 1)
+        for offset in range(0, total if indicators else 0, chunk_size):
+            chunk = tickers[offset : offset + chunk_size]
+            try:
+                kline_by_ticker = await query.query_closes_by_tickers(
+                    chunk, period, start_date, end_date, fields
+                )
+                results, chunk_errors = await self.calculator.calculate_panel(
+                    indicators, kline_by_ticker
+                )
+                errors.update(chunk_errors)
+                written += await self._write_market_results(period, indicators, results)
+                success += len(results)
+                failed += len(chunk) - len(results)
+            except Exception as e:
+                logger.error(f"全市场计算指标失败（第 {offset + 1}-{offset + len(chunk)} 只）：{e}")
+                failed += len(chunk)
+
+            if progress_callback:
+                current = offset + len(chunk)
+                await progress_callback(
+                    {
+                        "stage": "calculating",
+                        "message": f"正在计算指标... ({current}/{total})",
+                        "progress": int(current / total * 100),
+                        "current": current,
+                        "total": total,
+                        "success": success,
+                        "failed": failed,
+                    }
+                )
+
+        result = {
+            "market": market,
+            "period": period,
+            "total": total,
+            "success": success,
+            "failed": failed,
+            "written": written,
+            "invalid_indicators": invalid,
+            "errors": errors,
+        }
+
+        if progress_callback:
+            await progress_callback(
+                {
+                    "stage": "completed",
+                    "message": f"全市场计算完成：总数 {total}，成功 {success}，失败 {failed}，写入 {written} 条",
+                    "progress": 100,
+                    "total": total,
+                    "success": success,
+                    "failed": failed,
+                    "result": result,
+                }
+            )
+
+        return result
+
+    async def _write_market_results(
+        self,
+        period: str,
+        indicators: list[dict[str, Any]],
+        results: dict[str, dict[str, list[dict[str, Any]]]],
+    ) -> int:
+        """按 indicator_write_batch_rows 分批写入面板计算结果.
+
+        Args:
+            period: 时间周期
+            indicators: 已解析的指标列表
+            results: {股票代码: {指标名称: 指标数据列表}}
+
+        Returns:
+            int: 写入的指标数据条数
+        """
+        batch_rows = max(settings.indicator_write_batch_rows, 1)
+        items = []
+        rows = 0
+        written = 0
+        for ticker, ticker_results in results.items():
+            for indicator in indicators:
+                indicator_data = ticker_results.get(indicator["name"])
+                if not indicator_data:
+                    continue
+                items.append((ticker, period, indicator["type"], indicator["name"], indicator_data))
+                rows += len(indicator_data)
+                if rows >= batch_rows:
+                    await self.storage.upsert_indicator_batch(items)
+                    written += rows
+                    items, rows = [], 0
+        if items:
+            await self.storage.upsert_indicator_batch(items)
+            written += rows
+        return written
+
+    async def _calculate_batch_full(
+        self,
+        ticker: str,
+        indicators: list[dict[str, Any]],
+        period: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> tuple[dict[str, list[dict[str, Any]]], dict[str, str]]:
+        """全量计算：只查询一次K线数据，同类指标（如 MACD 三条线）只计算一次.
+
+        Args:
+            ticker: 股票代码
+            indicators: 已解析的指标列表（{"name", "type", "params"}）
+            period: 时间周期
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+
+        Returns:
+            (results, errors)
+        """
+        kline_data = await self.historical_data_service.query_kline_data(
+            ticker, period, start_date, end_date
+        )
+        if not kline_data:
+            logger.warning(f"历史K线数据不足：{ticker} {period}")
+            return {indicator["name"]: [] for indicator in indicators}, {}
+
+        return await self.calculator.calculate_batch(ticker, indicators, kline_data)
+
+    async def _calculate_batch_incremental(
+        self, ticker: str, indicators: list[dict[str, Any]], period: str
+    ) -> tuple[dict[str, list[dict[str, Any]]], dict[str, str]]:
+        """增量计算：从上次保存的最后一条指标数据继续计算.
+
+        只读取计算新数据点所需的K线（滑动窗口指标和 KDJ 的 period - 1 根历史K线 + 新K线），
+        没有历史指标数据或缺少平滑状态的指标退回全量计算。
+
+        Args:
+            ticker: 股票代码
+            indicators: 已解析的指标列表（{"name", "type", "params"}）
+            period: 时间周期
+
+        Returns:
+            (results, errors)
+        """
+        # 按 (类型, 参数) 分组，同组指标共享一次计算
+        families: dict[tuple, dict[str, Any]] = {}
+        for indicator in indicators:
+            params = indicator.get("params") or {}
+            key = (indicator["type"], tuple(sorted(params.items())))
+            family = families.setdefault(
+                key, {"type": indicator["type"], "params": params, "names": [], "outputs": {}}
+            )
+            family["names"].append(indicator["name"])
+            family["outputs"][indicator["name"]] = indicator.get("output") or indicator["name"]
+
+        incremental_families = []
+        full_indicators = []
+        for family in families.values():
+            latest = [
+                await self.query.get_latest_record(ticker, name, period)
+                for name in family["names"]
+            ]
+            if (
+                all(latest)
+                and len({record["timestamp"] for record in latest}) == 1
+                and self.calculator.supports_incremental(family["type"], latest[0])
+            ):
+                family["previous"] = latest[0]
+                incremental_families.append(family)
+            else:
+                full_indicators.extend(
+                    {
+                        "name": name,
+                        "type": family["type"],
+                        "params": family["params"],
+                        "output": family["outputs"][name],
+                    }
+                    for name in family["names"]
+                )
+
+        results: dict[str, list[dict[str, Any]]] = {}
+        errors: dict[str, str] = {}
+
+        if full_indicators:
+            logger.info(f"{ticker} 没有可用的历史指标状态，全量计算 {len(full_indicators)} 个指标")
+            full_results, full_errors = await self._calculate_batch_full(
+                ticker, full_indicators, period
+            )
+            results.update(full_results)
+            errors.update(full_errors)
+
+        if incremental_families:
+            since = min(family["previous"]["timestamp"] for family in incremental_families)
+            window = max(
+                self.calculator.incremental_window(family["type"], family["params"])
+                for family in incremental_families
+            )
+            query = self.historical_data_service.query
+            new_klines = [
+                kline
+                for kline in await query.query_by_ticker(
+                    ticker, period, start_date=since, sort_desc=False
+                )
+                if kline["timestamp"] > since
+            ]
+            history = []
+            if new_klines and window:
+                history = await query.query_by_ticker(
+                    ticker, period, end_date=since, limit=window, sort_desc=True
+                )
+                history.reverse()
+
+            logger.info(
+                f"增量计算指标：{ticker} {len(incremental_families)} 组，"
+                f"新K线 {len(new_klines)} 根，历史窗口 {len(history)} 根"
+            )
+            inc_results, inc_errors = await self.calculator.calculate_incremental(
+                ticker, incremental_families, history + new_klines
+            )
+            results.update(inc_results)
+            errors.update(inc_errors)
+
+        return results, errors
+
     def _parse_indicator_name(self, indicator_name: str) -> Optional[dict[str, Any]]:
         """解析指标名称，提取指标类型和参数.
 
         Args:
-            indicator_name: 指标名称（如 MA5, RSI14, MACD_DIF）
+            indicator_name: 指标名称（如 MA50, RSI14, MACD_DIF, MACD_DIF_8_21_5, BOLL_UP_20_2.5）
 
         Returns:
-            dict: {"type": 指标类型, "params": 参数字典}，解析失败返回 None
+            dict: {"type": 指标类型, "params": 参数字典, "output": 子指标键}，解析失败返回 None
         """
-        # 获取支持的指标列表
-        supported = self.get_supported_indicators()
+        spec = parse_indicator_name(indicator_name)
+        return spec.to_dict() if spec is not None else None
 
-        # 查找匹配的指标
-        for indicator in supported:
-            if indicator["name"] == indicator_name:
-                return {"type": indicator["type"], "params": indicator["params"]}
+    def _expand_indicator_names(
+        self, indicator_names: list[str]
+    ) -> tuple[list[dict[str, Any]], list[str]]:
+        """解析批量计算的指标名称（多值指标整体展开为子指标，重复的指标只保留一个）.
 
-        return None
+        Args:
+            indicator_names: 指标名称列表
+
+        Returns:
+            (indicators, invalid)：indicators 为 [{"name", "type", "params", "output"}]，
+            invalid 为无法解析的指标名称
+        """
+        indicators: dict[str, dict[str, Any]] = {}
+        invalid = []
+        for indicator_name in indicator_names:
+            specs = expand_indicator_name(indicator_name)
+            if not specs:
+                logger.warning(f"无法解析指标名称：{indicator_name}")
+                invalid.append(indicator_name)
+            for spec in specs:
+                indicators.setdefault(spec.name, {"name": spec.name, **spec.to_dict()})
+        return list(indicators.values()), invalid
@@ -62,6 +62,9 @@ class IndicatorStorage:
                 "value": data["value"],
                 "params": data.get("params"),
             }
+            # 增量计算使用的平滑状态（仅最后一条数据携带）
+            if "state" in data:
+                document["state"] = data["state"]
             documents.append(document)
 
         try:
@@ -114,6 +117,9 @@ class IndicatorStorage:
                 "value": data["value"],
                 "params": data.get("params"),
             }
+            # 增量计算使用的平滑状态（仅最后一条数据携带）
+            if "state" in data:
+                document["state"] = data["state"]
 
             # 使用 UpdateOne 进行 upsert
             operations.append(
@@ -142,6 +148,57 @@ class IndicatorStorage:
             logger.error(f"Upsert 指标数据失败：{ticker} {indicator_name} - {e}")
             raise
 
+    async def upsert_indicator_batch(
+        self,
+        items: list[tuple[str, str, str, str, list[dict[str, Any]]]],
+    ) -> dict[str, int]:
+        """跨股票、跨指标批量 upsert 技术指标数据（一次 bulk_write）.
+
+        Args:
+            items: [(ticker, period, indicator_type, indicator_name, indicator_data), ...]
+
+        Returns:
+            dict: {"inserted": 插入数量, "updated": 更新数量}
+        """
+        operations = []
+        for ticker, period, indicator_type, indicator_name, indicator_data in items:
+            metadata = {
+                "ticker": ticker,
+                "period": period,
+                "indicator_type": indicator_type,
+                "indicator_name": indicator_name,
+            }
+            for data in indicator_data:
+                document = {
+                    "timestamp": data["timestamp"],
+                    "metadata": metadata,
+                    "value": data["value"],
+                    "params": data.get("params"),
+                }
+                if "state" in data:
+                    document["state"] = data["state"]
+                operations.append(
+                    UpdateOne(
+                        {
+                            "timestamp": data["timestamp"],
+                            "metadata.ticker": ticker,
+                            "metadata.period": period,
+                            "metadata.indicator_name": indicator_name,
+                        },
+                        {"$set": document},
+                        upsert=True,
+                    )
+                )
+
+        if not operations:
+            return {"inserted": 0, "updated": 0}
+
+        result = await self.collection.bulk_write(operations, ordered=False)
+        logger.info(
+            f"批量 Upsert 指标数据成功：{len(items)} 组 - 插入 {result.upserted_count} 条，更新 {result.modified_count} 条"
+        )
+        return {"inserted": result.upserted_count, "updated": result.modified_count}
+
     async def delete_indicator_data(
         self,
         ticker: Optional[str] = None,
@@ -0,0 +1,189 @@
+"""技术指标后台写入队列."""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.services.indicators.indicator_storage import IndicatorStorage
+
+logger = logging.getLogger(__name__)
+
+# 写入成功后的回调（如记录覆盖范围）
+WrittenCallback = Callable[[], Awaitable[Any]]
+
+
+class IndicatorWriteQueue:
+    """技术指标后台写入队列.
+
+    - 计算结果由单个后台任务按提交顺序写入，请求不等待写入完成
+    - 同一指标（ticker、period、指标名称）尚未开始写入的数据按时间戳合并，只写一次
+    - 写入失败按指数退避重试，超过次数后记录错误；flush() 等待队列写完（关闭服务时调用）
+    """
+
+    def __init__(self, max_retries: int = 3, retry_delay: float = 0.5):
+        """初始化写入队列.
+
+        Args:
+            max_retries: 写入失败后的最大重试次数
+            retry_delay: 第一次重试前的等待时间（秒），之后每次翻倍
+        """
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        # (数据库名, ticker, period, 指标名称) -> 待写入任务（dict 保持提交顺序）
+        self._jobs: Dict[tuple, Dict[str, Any]] = {}
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self.enqueued = 0
+        self.merged = 0
+        self.written = 0
+        self.retried = 0
+        self.failed = 0
+
+    def _ensure_worker(self):
+        """启动后台写入任务（首次使用或事件循环变化时重新创建）."""
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._worker.get_loop() is loop:
+            return
+        if self._worker is not None and self._worker.get_loop() is not loop and self._jobs:
+            # 原事件循环已关闭，其数据库连接无法再使用，未写入的任务无法完成
+            logger.warning(f"事件循环已变化，丢弃 {len(self._jobs)} 个未写入的指标数据任务")
+            self.failed += len(self._jobs)
+            self._jobs.clear()
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._worker = loop.create_task(self._run())
+
+    def enqueue(
+        self,
+        storage: IndicatorStorage,
+        ticker: str,
+        period: str,
+        indicator_type: str,
+        indicator_name: str,
+        indicator_data: list[dict[str, Any]],
+        on_written: Optional[WrittenCallback] = None,
+    ):
+        """提交指标数据写入.
+
+        Args:
+            storage: 指标存储服务
+            ticker: 股票代码
+            period: 时间周期
+            indicator_type: 指标类型
+            indicator_name: 指标名称
+            indicator_data: 指标数据列表
+            on_written: 写入成功后的回调（可选）
+        """
+        if not indicator_data:
+            return
+        self._ensure_worker()
+
+        key = (storage.db.name, ticker, period, indicator_name)
+        job = self._jobs.get(key)
+        if job is None:
+            job = {
+                "storage": storage,
+                "indicator_type": indicator_type,
+                "records": {},
+                "callbacks": [],
+            }
+            self._jobs[key] = job
+        else:
+            self.merged += 1
+        job["records"].update((record["timestamp"], record) for record in indicator_data)
+        if on_written is not None:
+            job["callbacks"].append(on_written)
+        self.enqueued += 1
+
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def _run(self):
+        """后台写入循环."""
+        while True:
+            if not self._jobs:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            key = next(iter(self._jobs))
+            await self._write(key, self._jobs.pop(key))
+
+    async def _write(self, key: tuple, job: Dict[str, Any]):
+        """写入一个任务（失败时重试）."""
+        _, ticker, period, indicator_name = key
+        records = sorted(job["records"].values(), key=lambda record: record["timestamp"])
+        for attempt in range(self.max_retries + 1):
+            try:
+                await job["storage"].upsert_indicator_data(
+                    ticker, period, job["indicator_type"], indicator_name, records
+                )
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.failed += 1
+                    logger.error(
+                        f"写入指标数据失败（已重试 {self.max_retries} 次）：{ticker} {indicator_name} {period} - {e}"
+                    )
+                    return
+                self.retried += 1
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+
+        self.written += len(records)
+        for callback in job["callbacks"]:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"指标数据写入回调失败：{ticker} {indicator_name} {period} - {e}")
+
+    @property
+    def pending(self) -> int:
+        """待写入的任务数."""
+        return len(self._jobs)
+
+    async def flush(self):
+        """等待已提交的数据全部写入."""
+        if self._worker is None or self._worker.done():
+            return
+        if self._worker.get_loop() is not asyncio.get_running_loop():
+            return
+        await self._idle.wait()
+
+    async def stop(self):
+        """写完已提交的数据后停止后台任务."""
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    def get_metrics(self) -> Dict[str, int]:
+        """获取写入队列统计.
+
+        Returns:
+            {"pending", "enqueued", "merged", "written", "retried", "failed"}
+        """
+        return {
+            "pending": self.pending,
+            "enqueued": self.enqueued,
+            "merged": self.merged,
+            "written": self.written,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+# 全局写入队列
+_write_queue: Optional[IndicatorWriteQueue] = None
+
+
+def get_indicator_write_queue() -> IndicatorWriteQueue:
+    """获取全局技术指标写入队列.
+
+    Returns:
+        写入队列实例
+    """
+    global _write_queue
+    if _write_queue is None:
+        _write_queue = IndicatorWriteQueue()
+    return _write_queue
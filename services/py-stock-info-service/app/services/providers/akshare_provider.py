@@ -1,11 +1,11 @@
 """akshare 数据源提供者."""
 
-import asyncio
 import logging
 from typing import Optional, Dict, Any, List
 import akshare as ak
 from app.services.providers.base import StockDataProvider
 from app.services.providers.field_mapper import FieldMapper
+from app.services.providers.spot_cache import get_spot_table_cache, SpotTableCache
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +17,20 @@ class AkshareProvider(StockDataProvider):
     第一优先级：免费优先、无需认证。
     """
 
+    def __init__(self, spot_cache_ttl: Optional[float] = None):
+        """初始化 akshare 数据源.
+        
+        Args:
+            spot_cache_ttl: 全市场行情表快照的缓存时间（秒，可选，默认 60 秒）
+        """
+        # 全市场行情表在进程内共享，单只查询和批量查询复用同一次下载
+        self.a_spot_cache: SpotTableCache = get_spot_table_cache(
+            "stock_zh_a_spot_em", lambda: ak.stock_zh_a_spot_em(), spot_cache_ttl
+        )
+        self.hk_spot_cache: SpotTableCache = get_spot_table_cache(
+            "stock_hk_spot_em", lambda: ak.stock_hk_spot_em(), spot_cache_ttl
+        )
+
     @property
     def name(self) -> str:
         """数据源名称."""
@@ -45,23 +59,15 @@ class AkshareProvider(StockDataProvider):
             股票信息字典，如果失败返回 None
         """
         try:
-            # 在线程池中执行同步的 akshare 调用
-            loop = asyncio.get_event_loop()
-            
+            # 在数据源专用线程池中执行同步的 akshare 调用
             # 根据市场类型选择不同的接口
             if market == "A股" or (market is None and self._is_a_stock(ticker)):
-                stock_data = await loop.run_in_executor(
-                    None, self._fetch_a_stock_info, ticker
-                )
+                stock_data = await self.run_blocking(self._fetch_a_stock_info, ticker)
             elif market == "港股" or (market is None and self._is_hk_stock(ticker)):
-                stock_data = await loop.run_in_executor(
-                    None, self._fetch_hk_stock_info, ticker
-                )
+                stock_data = await self.run_blocking(self._fetch_hk_stock_info, ticker)
             else:
                 # 默认尝试 A 股
-                stock_data = await loop.run_in_executor(
-                    None, self._fetch_a_stock_info, ticker
-                )
+                stock_data = await self.run_blocking(self._fetch_a_stock_info, ticker)
 
             if stock_data:
                 # 使用字段映射器统一格式
@@ -88,25 +94,17 @@ class AkshareProvider(StockDataProvider):
             股票代码列表
         """
         try:
-            loop = asyncio.get_event_loop()
-
             if market == "A股" or market is None:
                 # 获取 A 股股票列表
-                tickers = await loop.run_in_executor(
-                    None, self._get_a_stock_tickers
-                )
+                tickers = await self.run_blocking(self._get_a_stock_tickers)
                 return tickers
             elif market == "港股":
                 # 获取港股股票列表
-                tickers = await loop.run_in_executor(
-                    None, self._get_hk_stock_tickers
-                )
+                tickers = await self.run_blocking(self._get_hk_stock_tickers)
                 return tickers
             else:
                 # 默认返回 A 股列表
-                tickers = await loop.run_in_executor(
-                    None, self._get_a_stock_tickers
-                )
+                tickers = await self.run_blocking(self._get_a_stock_tickers)
                 return tickers
 
         except Exception as e:
@@ -117,10 +115,7 @@ class AkshareProvider(StockDataProvider):
         """检查数据源是否可用."""
         try:
             # 尝试获取 A 股股票列表，如果能成功则说明可用
-            loop = asyncio.get_event_loop()
-            tickers = await loop.run_in_executor(
-                None, self._get_a_stock_tickers
-            )
+            tickers = await self.run_blocking(self._get_a_stock_tickers)
             return len(tickers) > 0
         except Exception as e:
             logger.warning(f"akshare 可用性检查失败: {e}")
@@ -171,19 +166,16 @@ class AkshareProvider(StockDataProvider):
             股票信息字典
         """
         try:
-            # akshare 港股接口
-            df = ak.stock_hk_spot_em()
-            
-            if df is None or df.empty:
+            # akshare 港股接口（全市场行情表快照）
+            snapshot = self.hk_spot_cache.get_snapshot()
+            if snapshot is None:
                 return None
 
             # 查找指定股票代码
-            stock_row = df[df["代码"] == ticker]
-            if stock_row.empty:
+            stock_info = snapshot.get(ticker)
+            if stock_info is None:
                 return None
 
-            # 转换为字典
-            stock_info = stock_row.iloc[0].to_dict()
             stock_info["code"] = ticker
 
             return stock_info
@@ -220,15 +212,12 @@ class AkshareProvider(StockDataProvider):
             股票代码列表
         """
         try:
-            # 获取港股股票列表
-            df = ak.stock_hk_spot_em()
-            
-            if df is None or df.empty:
+            # 获取港股股票列表（全市场行情表快照）
+            snapshot = self.hk_spot_cache.get_snapshot()
+            if snapshot is None:
                 return []
 
-            # 提取股票代码
-            tickers = df["代码"].tolist()
-            return [str(ticker).strip() for ticker in tickers if ticker]
+            return snapshot.tickers()
 
         except Exception as e:
             logger.error(f"akshare 获取港股股票列表失败: {e}")
@@ -276,19 +265,13 @@ class AkshareProvider(StockDataProvider):
             return {}
 
         try:
-            loop = asyncio.get_event_loop()
-
             # 根据市场类型选择批量查询方法
             if market == "A股" or (market is None and all(self._is_a_stock(t) for t in tickers)):
                 # 使用 A 股批量查询
-                stock_data_dict = await loop.run_in_executor(
-                    None, self._fetch_multiple_a_stocks, tickers
-                )
+                stock_data_dict = await self.run_blocking(self._fetch_multiple_a_stocks, tickers)
             elif market == "港股" or (market is None and all(self._is_hk_stock(t) for t in tickers)):
                 # 使用港股批量查询
-                stock_data_dict = await loop.run_in_executor(
-                    None, self._fetch_multiple_hk_stocks, tickers
-                )
+                stock_data_dict = await self.run_blocking(self._fetch_multiple_hk_stocks, tickers)
             else:
                 # 混合市场或不确定，回退到逐个查询
                 logger.warning("混合市场或不确定市场类型，回退到逐个查询")
@@ -315,8 +298,7 @@ class AkshareProvider(StockDataProvider):
     def _fetch_multiple_a_stocks(self, tickers: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
         """批量获取 A 股股票信息（同步方法）.
         
-        使用 akshare 的批量接口一次性获取多个股票信息。
-        如果请求的股票数量较多（>50），直接获取所有 A 股数据然后过滤，比逐个查询快得多。
+        从缓存的全部 A 股行情快照中按股票代码查找，快照未找到的股票再单独查询。
         
         Args:
             tickers: 股票代码列表
@@ -325,47 +307,23 @@ class AkshareProvider(StockDataProvider):
             字典，key 为 ticker，value 为股票信息或 None
         """
         results = {}
-        tickers_set = set(tickers)  # 使用 set 提高查找效率
         
         try:
-            # 如果请求的股票数量较多，直接获取所有 A 股数据然后过滤
-            # 这样可以避免多次网络请求，大幅提升性能
-            if len(tickers) > 50:
-                logger.info(f"请求股票数量较多（{len(tickers)} 只），使用全量数据过滤模式")
-                # 使用 stock_zh_a_spot_em 获取所有 A 股实时行情（包含基本信息）
-                df_all = ak.stock_zh_a_spot_em()
-                
-                if df_all is not None and not df_all.empty:
-                    logger.info(f"获取到 {len(df_all)} 只 A 股数据，开始过滤...")
-                    # 将 DataFrame 转换为字典，以股票代码为 key
-                    for _, row in df_all.iterrows():
-                        code = str(row.get("代码", "")).strip()
-                        if code in tickers_set:
-                            # 转换为字典
-                            stock_info = row.to_dict()
-                            stock_info["code"] = code
-                            stock_info["name"] = stock_info.get("名称") or stock_info.get("name")
-                            results[code] = stock_info
-                    
-                    logger.info(f"批量查询成功: 找到 {len(results)}/{len(tickers)} 只股票")
-                else:
-                    logger.warning("批量查询返回空结果，回退到逐个查询")
-                    raise Exception("批量查询返回空结果")
-            else:
-                # 如果请求的股票数量较少，仍然使用全量数据过滤（因为 akshare 的接口就是返回全量）
-                logger.debug(f"请求股票数量较少（{len(tickers)} 只），使用全量数据过滤模式")
-                df_all = ak.stock_zh_a_spot_em()
-                
-                if df_all is not None and not df_all.empty:
-                    for _, row in df_all.iterrows():
-                        code = str(row.get("代码", "")).strip()
-                        if code in tickers_set:
-                            stock_info = row.to_dict()
-                            stock_info["code"] = code
-                            stock_info["name"] = stock_info.get("名称") or stock_info.get("name")
-                            results[code] = stock_info
-                else:
-                    raise Exception("批量查询返回空结果")
+            # stock_zh_a_spot_em 返回全部 A 股实时行情（包含基本信息），
+            # 使用缓存的快照按股票代码直接查找，避免重复下载和逐行扫描
+            snapshot = self.a_spot_cache.get_snapshot()
+            if snapshot is None:
+                logger.warning("批量查询返回空结果，回退到逐个查询")
+                raise Exception("批量查询返回空结果")
+
+            for ticker in tickers:
+                stock_info = snapshot.get(ticker)
+                if stock_info is not None:
+                    stock_info["code"] = ticker
+                    stock_info["name"] = stock_info.get("名称") or stock_info.get("name")
+                    results[ticker] = stock_info
+
+            logger.info(f"批量查询成功: 找到 {len(results)}/{len(tickers)} 只股票")
             
             # 对于没有在批量结果中找到的股票，尝试单独查询
             missing_tickers = [t for t in tickers if t not in results]
@@ -404,8 +362,7 @@ class AkshareProvider(StockDataProvider):
     def _fetch_multiple_hk_stocks(self, tickers: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
         """批量获取港股股票信息（同步方法）.
         
-        使用 akshare 的批量接口一次性获取多个港股信息。
-        直接获取所有港股数据然后过滤，比逐个查询快得多。
+        从缓存的全部港股行情快照中按股票代码查找。
         
         Args:
             tickers: 股票代码列表
@@ -414,37 +371,27 @@ class AkshareProvider(StockDataProvider):
             字典，key 为 ticker，value 为股票信息或 None
         """
         results = {}
-        tickers_set = set(tickers)  # 使用 set 提高查找效率
         
         try:
-            # 使用 stock_hk_spot_em 获取所有港股实时行情（包含基本信息）
+            # 使用 stock_hk_spot_em 全部港股实时行情快照（包含基本信息）
             logger.info(f"批量获取港股信息: 请求 {len(tickers)} 只股票")
-            df_all = ak.stock_hk_spot_em()
-            
-            if df_all is not None and not df_all.empty:
-                logger.info(f"获取到 {len(df_all)} 只港股数据，开始过滤...")
-                # 将 DataFrame 转换为字典，以股票代码为 key
-                for _, row in df_all.iterrows():
-                    code = str(row.get("代码", "")).strip()
-                    if code in tickers_set:
-                        # 转换为字典
-                        stock_info = row.to_dict()
-                        stock_info["code"] = code
-                        results[code] = stock_info
-                
-                logger.info(f"批量查询成功: 找到 {len(results)}/{len(tickers)} 只股票")
-                
-                # 确保所有 tickers 都在结果中
-                for ticker in tickers:
-                    if ticker not in results:
-                        results[ticker] = None
-                
-                return results
-            else:
+            snapshot = self.hk_spot_cache.get_snapshot()
+            if snapshot is None:
                 # 如果批量查询失败，回退到逐个查询
                 logger.warning("批量查询返回空结果，回退到逐个查询")
                 raise Exception("批量查询返回空结果")
 
+            for ticker in tickers:
+                stock_info = snapshot.get(ticker)
+                if stock_info is not None:
+                    stock_info["code"] = ticker
+                results[ticker] = stock_info
+
+            logger.info(
+                f"批量查询成功: 找到 {sum(1 for v in results.values() if v)}/{len(tickers)} 只股票"
+            )
+            return results
+
         except Exception as e:
             logger.error(f"akshare 批量获取港股股票信息失败: {e}")
             # 回退到逐个查询
@@ -1,8 +1,9 @@
 """数据源提供者抽象基类."""
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable
 import logging
+from app.services.providers.executor import get_provider_executor
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +47,18 @@ class StockDataProvider(ABC):
         """
         return 1  # 默认第一优先级
 
+    async def run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """在数据源专用线程池中执行同步 SDK 调用.
+        
+        Args:
+            func: 同步函数
+            *args: 函数参数
+        
+        Returns:
+            函数返回值
+        """
+        return await get_provider_executor(self.name).run(func, *args)
+
     @abstractmethod
     async def fetch_stock_info(
         self, ticker: str, market: Optional[str] = None
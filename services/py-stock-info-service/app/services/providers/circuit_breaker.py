@@ -0,0 +1,141 @@
+"""数据源熔断器与调用统计."""
+
+import logging
+import math
+import time
+from collections import deque
+from typing import Optional, Dict, Any, Deque, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """数据源熔断器.
+
+    状态：
+    - closed：正常放行请求
+    - open：连续失败达到阈值后打开，跳过该数据源
+    - half_open：打开一段时间后放行一个试探请求，成功则关闭，失败则重新打开
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """初始化熔断器.
+
+        Args:
+            failure_threshold: 连续失败多少次后打开熔断器
+            recovery_timeout: 打开后多久进入半开状态（秒）
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """当前状态（打开超时后自动进入半开状态）."""
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self.opened_at >= self.recovery_timeout
+        ):
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """是否允许请求该数据源.
+
+        半开状态下同一时间只放行一个试探请求。
+
+        Returns:
+            是否允许
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        """记录一次成功调用."""
+        if self._state != self.CLOSED:
+            logger.info("熔断器关闭，数据源恢复")
+        self._state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        """记录一次失败调用."""
+        self.consecutive_failures += 1
+        if self._state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """获取熔断器状态快照（用于状态接口）."""
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_seconds": (
+                round(max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at)), 1)
+                if state == self.OPEN
+                else None
+            ),
+        }
+
+
+class CallStats:
+    """数据源调用统计（滑动窗口内的成功率和延迟）."""
+
+    def __init__(self, window_size: int = 50):
+        """初始化调用统计.
+
+        Args:
+            window_size: 滑动窗口大小
+        """
+        self.calls: Deque[Tuple[bool, float]] = deque(maxlen=window_size)
+
+    def record(self, success: bool, latency: float):
+        """记录一次调用.
+
+        Args:
+            success: 是否成功
+            latency: 调用耗时（秒）
+        """
+        self.calls.append((success, latency))
+
+    def __len__(self) -> int:
+        return len(self.calls)
+
+    def success_rate(self) -> Optional[float]:
+        """成功率（无记录时返回 None）."""
+        if not self.calls:
+            return None
+        return sum(1 for ok, _ in self.calls if ok) / len(self.calls)
+
+    def p95_latency(self) -> Optional[float]:
+        """p95 延迟（秒，无记录时返回 None）."""
+        if not self.calls:
+            return None
+        latencies = sorted(latency for _, latency in self.calls)
+        return latencies[max(0, math.ceil(len(latencies) * 0.95) - 1)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """获取统计快照（用于状态接口）."""
+        success_rate = self.success_rate()
+        p95 = self.p95_latency()
+        return {
+            "calls": len(self.calls),
+            "success_rate": round(success_rate, 3) if success_rate is not None else None,
+            "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
@@ -3,6 +3,7 @@
 import logging
 from typing import Dict, Any, List
 from app.config import settings
+from app.services.providers.executor import get_executor_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -92,15 +93,27 @@ def get_data_source_status() -> Dict[str, Any]:
     }
 
     # 获取每个数据源的状态
+    failover_status = router.get_status()
     for name, provider in router.providers.items():
         status["providers"][name] = {
             "name": provider.name,
             "supported_markets": provider.supported_markets,
             "priority": provider.priority,
+            "health": router.health.snapshot(name),
+            **failover_status.get(name, {}),
         }
 
     # 获取市场覆盖情况
     for market, providers in router.market_providers.items():
         status["market_coverage"][market] = providers
 
+    # 当前实际尝试顺序（自适应排序后）
+    status["market_order"] = router.get_market_order()
+
+    # 并发相同请求的合并统计
+    status["single_flight"] = router.single_flight.get_metrics()
+
+    # 数据源专用线程池统计
+    status["executors"] = get_executor_metrics()
+
     return status
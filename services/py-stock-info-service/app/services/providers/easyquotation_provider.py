@@ -1,6 +1,5 @@
 """easyquotation 数据源提供者."""
 
-import asyncio
 import logging
 from typing import Optional, Dict, Any, List
 import easyquotation
@@ -65,11 +64,8 @@ class EasyQuotationProvider(StockDataProvider):
             return None
 
         try:
-            # 在线程池中执行同步的 easyquotation 调用
-            loop = asyncio.get_event_loop()
-            stock_data = await loop.run_in_executor(
-                None, self._fetch_stock_info_sync, ticker
-            )
+            # 在数据源专用线程池中执行同步的 easyquotation 调用
+            stock_data = await self.run_blocking(self._fetch_stock_info_sync, ticker)
 
             if stock_data:
                 # 使用字段映射器统一格式
@@ -110,10 +106,7 @@ class EasyQuotationProvider(StockDataProvider):
 
         try:
             # 尝试获取一个已知股票（000001）的实时行情
-            loop = asyncio.get_event_loop()
-            data = await loop.run_in_executor(
-                None, self._fetch_stock_info_sync, "000001"
-            )
+            data = await self.run_blocking(self._fetch_stock_info_sync, "000001")
             return data is not None
         except Exception as e:
             logger.warning(f"easyquotation 可用性检查失败: {e}")
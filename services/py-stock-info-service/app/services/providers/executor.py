@@ -0,0 +1,155 @@
+"""数据源专用线程池."""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorFullError(RuntimeError):
+    """数据源线程池排队已满（请求被拒绝）."""
+
+
+class ProviderExecutor:
+    """单个数据源的有界线程池.
+
+    - 每个数据源使用独立线程池，慢数据源不会占满默认线程池
+    - 排队数量超过上限时直接拒绝（背压），由路由器切换到其他数据源
+    """
+
+    def __init__(self, name: str, max_workers: int = 4, max_queue: int = 100):
+        """初始化线程池.
+
+        Args:
+            name: 数据源名称
+            max_workers: 线程数
+            max_queue: 最大排队数（不含正在执行的任务）
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"provider-{name}"
+        )
+        self._lock = threading.Lock()
+        self.pending = 0  # 已提交未完成（执行中 + 排队中）
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """在线程池中执行同步函数.
+
+        Args:
+            func: 同步函数
+            *args: 函数参数
+
+        Returns:
+            函数返回值
+
+        Raises:
+            ExecutorFullError: 排队已满
+        """
+        with self._lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorFullError(
+                    f"数据源 {self.name} 线程池已满（执行中 {self.active}，排队 {self.pending - self.active}）"
+                )
+            self.pending += 1
+
+        def wrapped():
+            with self._lock:
+                self.active += 1
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.pending -= 1
+                    self.completed += 1
+
+        def release_if_cancelled(future: Future):
+            # 尚未开始执行就被取消的任务不会进入 wrapped，需要在这里释放排队名额
+            if future.cancelled():
+                with self._lock:
+                    self.pending -= 1
+
+        future = self._pool.submit(wrapped)
+        future.add_done_callback(release_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def get_metrics(self) -> Dict[str, int]:
+        """获取线程池统计.
+
+        Returns:
+            {"max_workers", "max_queue", "active", "queued", "completed", "rejected"}
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "queued": self.pending - self.active,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        """关闭线程池（不等待执行中的任务）."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# 全局线程池（按数据源名称）
+_executors: Dict[str, ProviderExecutor] = {}
+
+
+def get_provider_executor(name: str) -> ProviderExecutor:
+    """获取数据源线程池（不存在时按默认配置创建）.
+
+    Args:
+        name: 数据源名称
+
+    Returns:
+        线程池实例
+    """
+    executor = _executors.get(name)
+    if executor is None:
+        executor = ProviderExecutor(name)
+        _executors[name] = executor
+    return executor
+
+
+def configure_provider_executor(name: str, max_workers: int, max_queue: int) -> ProviderExecutor:
+    """配置数据源线程池（替换已有线程池）.
+
+    Args:
+        name: 数据源名称
+        max_workers: 线程数
+        max_queue: 最大排队数
+
+    Returns:
+        线程池实例
+    """
+    old = _executors.get(name)
+    executor = ProviderExecutor(name, max_workers, max_queue)
+    _executors[name] = executor
+    if old is not None:
+        old.shutdown()
+    logger.info(f"数据源 {name} 线程池: {max_workers} 线程，最大排队 {max_queue}")
+    return executor
+
+
+def get_executor_metrics() -> Dict[str, Dict[str, int]]:
+    """获取所有数据源线程池统计."""
+    return {name: executor.get_metrics() for name, executor in _executors.items()}
+
+
+def shutdown_provider_executors():
+    """关闭所有数据源线程池."""
+    for executor in _executors.values():
+        executor.shutdown()
+    _executors.clear()
@@ -0,0 +1,285 @@
+"""数据源健康状态管理."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Optional, Dict, Any, Deque
+from app.services.providers.base import StockDataProvider
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderHealth:
+    """单个数据源的健康状态.
+
+    综合两类信号：
+    - 主动探测：调用数据源的 is_available()，结果按 TTL 缓存
+    - 被动健康：根据最近调用结果（滑动窗口）计算成功率
+    """
+
+    def __init__(self, window_size: int = 20):
+        """初始化健康状态.
+
+        Args:
+            window_size: 被动健康统计的滑动窗口大小
+        """
+        self.probe_ok: Optional[bool] = None  # None 表示尚未探测
+        self.probed_at: Optional[float] = None
+        self.probe_error: Optional[str] = None
+        self.outcomes: Deque[bool] = deque(maxlen=window_size)
+        self.last_success_at: Optional[float] = None
+        self.last_failure_at: Optional[float] = None
+
+    def success_rate(self) -> Optional[float]:
+        """最近调用的成功率（无调用记录时返回 None）."""
+        if not self.outcomes:
+            return None
+        return sum(self.outcomes) / len(self.outcomes)
+
+
+class ProviderHealthMonitor:
+    """数据源健康监控器.
+
+    - 热路径只读取缓存的健康标记，不触发网络请求
+    - 探测结果过期后在后台刷新，调用方继续使用上一次的结果
+    - 后台刷新任务定期探测所有数据源，保证标记持续有效
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        refresh_interval: float = 60.0,
+        window_size: int = 20,
+        min_samples: int = 10,
+        min_success_rate: float = 0.2,
+    ):
+        """初始化健康监控器.
+
+        Args:
+            ttl: 主动探测结果的有效期（秒）
+            refresh_interval: 后台刷新任务的检查间隔（秒）
+            window_size: 被动健康统计的滑动窗口大小
+            min_samples: 计算被动健康所需的最少调用次数
+            min_success_rate: 被动健康的最低成功率，低于该值视为不健康
+        """
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self.min_success_rate = min_success_rate
+        self.providers: Dict[str, StockDataProvider] = {}
+        self.states: Dict[str, ProviderHealth] = {}
+        self._probe_tasks: Dict[str, asyncio.Task] = {}
+        self._refresher: Optional[asyncio.Task] = None
+
+    def configure(
+        self,
+        ttl: Optional[float] = None,
+        refresh_interval: Optional[float] = None,
+        window_size: Optional[int] = None,
+        min_samples: Optional[int] = None,
+        min_success_rate: Optional[float] = None,
+    ):
+        """更新监控参数（未提供的参数保持不变）."""
+        if ttl is not None:
+            self.ttl = ttl
+        if refresh_interval is not None:
+            self.refresh_interval = refresh_interval
+        if min_samples is not None:
+            self.min_samples = min_samples
+        if min_success_rate is not None:
+            self.min_success_rate = min_success_rate
+        if window_size is not None and window_size != self.window_size:
+            self.window_size = window_size
+            for state in self.states.values():
+                state.outcomes = deque(state.outcomes, maxlen=window_size)
+
+    def register(self, provider: StockDataProvider):
+        """注册需要监控的数据源.
+
+        Args:
+            provider: 数据源提供者实例
+        """
+        self.providers[provider.name] = provider
+        self.states[provider.name] = ProviderHealth(self.window_size)
+
+    def _is_passively_healthy(self, state: ProviderHealth) -> bool:
+        """根据最近调用结果判断是否健康."""
+        if len(state.outcomes) < self.min_samples:
+            return True
+        return state.success_rate() >= self.min_success_rate
+
+    def is_healthy(self, provider_name: str) -> bool:
+        """读取数据源的健康标记（不触发探测）.
+
+        尚未探测过的数据源视为健康。
+
+        Args:
+            provider_name: 数据源名称
+
+        Returns:
+            是否健康
+        """
+        state = self.states.get(provider_name)
+        if state is None:
+            return False
+        if state.probe_ok is False:
+            return False
+        return self._is_passively_healthy(state)
+
+    async def is_available(self, provider_name: str) -> bool:
+        """检查数据源是否可用（热路径）.
+
+        首次调用时等待一次探测；之后只读取缓存标记，
+        探测结果过期时在后台刷新。
+
+        Args:
+            provider_name: 数据源名称
+
+        Returns:
+            是否可用
+        """
+        state = self.states.get(provider_name)
+        if state is None:
+            return False
+
+        if state.probed_at is None:
+            await self.probe(provider_name)
+        elif time.monotonic() - state.probed_at >= self.ttl:
+            self._schedule_probe(provider_name)
+
+        return self.is_healthy(provider_name)
+
+    def _schedule_probe(self, provider_name: str) -> asyncio.Task:
+        """在后台发起探测（同一数据源同时只有一个探测任务）."""
+        task = self._probe_tasks.get(provider_name)
+        if task is None or task.done():
+            task = asyncio.create_task(self._probe(provider_name))
+            self._probe_tasks[provider_name] = task
+        return task
+
+    async def probe(self, provider_name: str) -> bool:
+        """主动探测数据源可用性并更新缓存.
+
+        同一数据源的并发探测共享同一个任务。
+
+        Args:
+            provider_name: 数据源名称
+
+        Returns:
+            探测结果
+        """
+        return await asyncio.shield(self._schedule_probe(provider_name))
+
+    async def _probe(self, provider_name: str) -> bool:
+        """执行一次探测."""
+        provider = self.providers[provider_name]
+        state = self.states[provider_name]
+        was_healthy = self.is_healthy(provider_name)
+        try:
+            ok = bool(await provider.is_available())
+            state.probe_error = None
+        except Exception as e:
+            logger.warning(f"数据源 {provider_name} 可用性探测失败: {e}")
+            ok = False
+            state.probe_error = str(e)
+
+        # 探测成功时清空被动统计，给被动判定为不健康的数据源重新尝试的机会
+        if ok and not self._is_passively_healthy(state):
+            state.outcomes.clear()
+
+        state.probe_ok = ok
+        state.probed_at = time.monotonic()
+
+        if was_healthy != self.is_healthy(provider_name):
+            logger.info(
+                f"数据源 {provider_name} 健康状态变化: "
+                f"{'健康' if self.is_healthy(provider_name) else '不健康'}"
+            )
+        return ok
+
+    def record_success(self, provider_name: str):
+        """记录一次成功调用."""
+        state = self.states.get(provider_name)
+        if state is not None:
+            state.outcomes.append(True)
+            state.last_success_at = time.time()
+
+    def record_failure(self, provider_name: str):
+        """记录一次失败调用."""
+        state = self.states.get(provider_name)
+        if state is not None:
+            state.outcomes.append(False)
+            state.last_failure_at = time.time()
+            if len(state.outcomes) >= self.min_samples and not self._is_passively_healthy(state):
+                logger.debug(f"数据源 {provider_name} 最近调用成功率过低，标记为不健康")
+
+    async def refresh_all(self):
+        """探测所有已过期的数据源."""
+        now = time.monotonic()
+        stale = [
+            name
+            for name, state in self.states.items()
+            if state.probed_at is None or now - state.probed_at >= self.ttl
+        ]
+        if stale:
+            await asyncio.gather(*(self.probe(name) for name in stale))
+
+    async def _refresh_loop(self):
+        """后台刷新循环."""
+        while True:
+            try:
+                await self.refresh_all()
+            except Exception as e:
+                logger.error(f"数据源健康状态刷新失败: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        """启动后台刷新任务."""
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_loop())
+            logger.info(
+                f"数据源健康监控已启动（TTL {self.ttl} 秒，刷新间隔 {self.refresh_interval} 秒）"
+            )
+
+    async def stop(self):
+        """停止后台刷新任务."""
+        tasks = [t for t in self._probe_tasks.values() if not t.done()]
+        if self._refresher is not None:
+            tasks.append(self._refresher)
+            self._refresher = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._probe_tasks.clear()
+
+    def snapshot(self, provider_name: str) -> Dict[str, Any]:
+        """获取数据源健康状态快照（用于状态接口）.
+
+        Args:
+            provider_name: 数据源名称
+
+        Returns:
+            健康状态字典
+        """
+        state = self.states.get(provider_name)
+        if state is None:
+            return {}
+        success_rate = state.success_rate()
+        return {
+            "healthy": self.is_healthy(provider_name),
+            "probe_ok": state.probe_ok,
+            "probe_age_seconds": (
+                round(time.monotonic() - state.probed_at, 1)
+                if state.probed_at is not None
+                else None
+            ),
+            "probe_error": state.probe_error,
+            "recent_calls": len(state.outcomes),
+            "recent_success_rate": (
+                round(success_rate, 3) if success_rate is not None else None
+            ),
+            "last_success_at": state.last_success_at,
+            "last_failure_at": state.last_failure_at,
+        }
@@ -1,11 +1,13 @@
 """数据源初始化模块."""
 
 import logging
+from typing import Dict, Optional
 from app.services.providers.router import get_stock_data_router
 from app.services.providers.akshare_provider import AkshareProvider
 from app.services.providers.yfinance_provider import YFinanceProvider
 from app.services.providers.easyquotation_provider import EasyQuotationProvider
 from app.services.providers.config_validator import validate_data_source_config
+from app.services.providers.executor import configure_provider_executor
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +23,10 @@ def initialize_providers(
     iex_cloud_api_key: str = "",
     enable_alpha_vantage: bool = False,
     alpha_vantage_api_key: str = "",
+    rate_limits: Optional[Dict[str, float]] = None,
+    akshare_spot_cache_ttl: Optional[float] = None,
+    executor_workers: Optional[Dict[str, int]] = None,
+    executor_queue_size: int = 100,
 ) -> None:
     """初始化并注册所有数据源.
     
@@ -34,6 +40,10 @@ def initialize_providers(
         iex_cloud_api_key: IEX Cloud API Key（如果启用 IEX Cloud）
         enable_alpha_vantage: 是否启用 Alpha Vantage（第二优先级，需要 API Key）
         alpha_vantage_api_key: Alpha Vantage API Key（如果启用 Alpha Vantage）
+        rate_limits: 各数据源的限流配置（{数据源名称: 每秒请求数}，可选）
+        akshare_spot_cache_ttl: akshare 全市场行情表快照缓存时间（秒，可选）
+        executor_workers: 各数据源专用线程池的线程数（{数据源名称: 线程数}，可选）
+        executor_queue_size: 数据源线程池的最大排队数
     """
     router = get_stock_data_router()
 
@@ -52,7 +62,7 @@ def initialize_providers(
     # 第一优先级数据源（免费优先、无需认证）
     if enable_akshare:
         try:
-            akshare_provider = AkshareProvider()
+            akshare_provider = AkshareProvider(spot_cache_ttl=akshare_spot_cache_ttl)
             router.register_provider(akshare_provider)
             logger.info("✅ 已注册数据源: akshare (第一优先级)")
         except Exception as e:
@@ -105,6 +115,15 @@ def initialize_providers(
         except Exception as e:
             logger.error(f"❌ 注册 Alpha Vantage 数据源失败: {e}")
 
+    # 配置数据源专用线程池（未配置的数据源使用默认大小）
+    for provider_name, workers in (executor_workers or {}).items():
+        configure_provider_executor(provider_name, workers, executor_queue_size)
+
+    # 配置数据源限流
+    for provider_name, rate in (rate_limits or {}).items():
+        if provider_name in router.providers:
+            router.set_rate_limit(provider_name, rate)
+
     # 输出注册总结
     logger.info("=" * 80)
     logger.info("数据源注册总结:")
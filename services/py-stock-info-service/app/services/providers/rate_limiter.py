@@ -0,0 +1,57 @@
+"""数据源限流器（令牌桶）."""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """异步令牌桶限流器.
+
+    以固定速率补充令牌，每次请求消耗一个令牌；令牌不足时等待补充。
+    用于限制单个数据源的请求速率，避免并发抓取时触发上游限流。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """初始化令牌桶.
+
+        Args:
+            rate: 令牌补充速率（每秒令牌数，必须大于 0）
+            capacity: 桶容量（允许的突发请求数，默认与 rate 相同且不小于 1）
+        """
+        if rate <= 0:
+            raise ValueError("限流速率必须大于 0")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """按流逝时间补充令牌."""
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """获取令牌（不足时等待）.
+
+        等待者持有锁依次排队，保证按到达顺序获取令牌。
+
+        Args:
+            tokens: 需要的令牌数（默认 1）
+        """
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    @property
+    def available_tokens(self) -> float:
+        """当前可用令牌数（用于状态展示）."""
+        self._refill()
+        return self._tokens
@@ -1,12 +1,22 @@
 """数据源路由器."""
 
 import logging
-from typing import Optional, Dict, Any, List
+import time
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
 from app.services.providers.base import StockDataProvider
+from app.services.providers.rate_limiter import TokenBucket
+from app.services.providers.health import ProviderHealthMonitor
+from app.services.providers.circuit_breaker import CircuitBreaker, CallStats
+from app.services.providers.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 
+def _copy_stock_info(info: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """复制股票信息（合并请求的等待方拿到独立副本）."""
+    return dict(info) if info is not None else None
+
+
 class StockDataRouter:
     """数据源路由器，负责选择合适的数据源.
     
@@ -19,6 +29,79 @@ class StockDataRouter:
         self.providers: Dict[str, StockDataProvider] = {}
         # 市场 -> 数据源列表（按优先级排序）
         self.market_providers: Dict[str, List[str]] = {}
+        # 数据源名称 -> 令牌桶限流器（未配置则不限流）
+        self.rate_limiters: Dict[str, TokenBucket] = {}
+        # 数据源健康状态（缓存的可用性标记 + 最近调用结果）
+        self.health = ProviderHealthMonitor()
+        # 数据源名称 -> 熔断器
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        # (市场, 数据源名称) -> 最近调用统计（用于自适应排序）
+        self.call_stats: Dict[Tuple[Optional[str], str], CallStats] = {}
+        self.failure_threshold = 5
+        self.recovery_timeout = 30.0
+        self.stats_window = 50
+        self.adaptive_ordering = True
+        self.adaptive_min_samples = 10
+        # 合并并发的相同上游请求
+        self.single_flight = SingleFlight()
+
+    def set_rate_limit(
+        self,
+        provider_name: str,
+        rate: Optional[float],
+        capacity: Optional[float] = None,
+    ):
+        """设置数据源的请求速率限制.
+        
+        Args:
+            provider_name: 数据源名称
+            rate: 每秒允许的请求数（None 或 <= 0 表示不限流）
+            capacity: 允许的突发请求数（可选）
+        """
+        if not rate or rate <= 0:
+            self.rate_limiters.pop(provider_name, None)
+            logger.info(f"数据源 {provider_name} 不限流")
+            return
+
+        self.rate_limiters[provider_name] = TokenBucket(rate, capacity)
+        logger.info(f"数据源 {provider_name} 限流: {rate} 次/秒")
+
+    async def _acquire_rate_limit(self, provider_name: str):
+        """请求数据源前获取限流令牌.
+        
+        Args:
+            provider_name: 数据源名称
+        """
+        limiter = self.rate_limiters.get(provider_name)
+        if limiter is not None:
+            await limiter.acquire()
+
+    def configure_failover(
+        self,
+        failure_threshold: Optional[int] = None,
+        recovery_timeout: Optional[float] = None,
+        adaptive_ordering: Optional[bool] = None,
+        adaptive_min_samples: Optional[int] = None,
+    ):
+        """配置熔断和自适应排序参数（未提供的参数保持不变）.
+        
+        Args:
+            failure_threshold: 连续失败多少次后熔断
+            recovery_timeout: 熔断后多久放行试探请求（秒）
+            adaptive_ordering: 是否根据最近调用统计调整数据源顺序
+            adaptive_min_samples: 参与自适应排序所需的最少调用次数
+        """
+        if failure_threshold is not None:
+            self.failure_threshold = failure_threshold
+        if recovery_timeout is not None:
+            self.recovery_timeout = recovery_timeout
+        if adaptive_ordering is not None:
+            self.adaptive_ordering = adaptive_ordering
+        if adaptive_min_samples is not None:
+            self.adaptive_min_samples = adaptive_min_samples
+        for breaker in self.breakers.values():
+            breaker.failure_threshold = self.failure_threshold
+            breaker.recovery_timeout = self.recovery_timeout
 
     def register_provider(self, provider: StockDataProvider):
         """注册数据源.
@@ -28,6 +111,10 @@ class StockDataRouter:
         """
         provider_name = provider.name
         self.providers[provider_name] = provider
+        self.health.register(provider)
+        self.breakers[provider_name] = CircuitBreaker(
+            self.failure_threshold, self.recovery_timeout
+        )
 
         # 更新市场映射
         for market in provider.supported_markets:
@@ -55,41 +142,20 @@ class StockDataRouter:
             f"支持市场: {provider.supported_markets})"
         )
 
-    async def fetch_stock_info(
+    def _candidate_providers(
         self,
-        ticker: str,
         market: Optional[str] = None,
-        preferred_provider: Optional[str] = None,
-    ) -> Optional[Dict[str, Any]]:
-        """获取股票信息（带容错）.
-        
-        按优先级尝试多个数据源，直到成功或所有数据源都失败。
+        exclude: Optional[str] = None,
+    ) -> List[str]:
+        """获取候选数据源列表（已按自适应顺序排列）.
         
         Args:
-            ticker: 股票代码
             market: 市场类型（可选）
-            preferred_provider: 首选数据源名称（可选）
+            exclude: 需要排除的数据源名称（可选，如已尝试过的首选数据源）
         
         Returns:
-            股票信息字典，如果所有数据源都失败返回 None
+            数据源名称列表
         """
-        # 1. 如果指定了首选数据源，先尝试
-        if preferred_provider and preferred_provider in self.providers:
-            provider = self.providers[preferred_provider]
-            if await provider.is_available() and provider.supports_market(market):
-                try:
-                    result = await provider.fetch_stock_info(ticker, market)
-                    if result:
-                        logger.info(
-                            f"从首选数据源 {preferred_provider} 获取股票 {ticker} 成功"
-                        )
-                        return result
-                except Exception as e:
-                    logger.warning(
-                        f"首选数据源 {preferred_provider} 获取股票 {ticker} 失败: {e}"
-                    )
-
-        # 2. 根据市场选择数据源列表
         if market:
             provider_names = self.market_providers.get(market, [])
             # 如果市场没有映射，尝试所有数据源
@@ -99,118 +165,312 @@ class StockDataRouter:
             # 如果没有指定市场，尝试所有数据源
             provider_names = list(self.providers.keys())
 
-        # 3. 按优先级尝试
-        for provider_name in provider_names:
-            # 跳过已经尝试过的首选数据源
-            if provider_name == preferred_provider:
-                continue
+        provider_names = [name for name in provider_names if name != exclude]
+        if self.adaptive_ordering:
+            provider_names = self._adaptive_order(provider_names, market)
+        return provider_names
 
-            provider = self.providers[provider_name]
+    def _adaptive_order(
+        self, provider_names: List[str], market: Optional[str]
+    ) -> List[str]:
+        """根据最近调用统计调整数据源顺序.
+        
+        只对调用次数足够的数据源重新排序（成功率优先，其次 p95 延迟），
+        样本不足的数据源保持原有优先级位置。
+        
+        Args:
+            provider_names: 按优先级排序的数据源名称列表
+            market: 市场类型（可选）
+        
+        Returns:
+            调整后的数据源名称列表
+        """
+        slots = []
+        ranked = []
+        for idx, name in enumerate(provider_names):
+            stats = self.call_stats.get((market, name))
+            if stats is not None and len(stats) >= self.adaptive_min_samples:
+                slots.append(idx)
+                ranked.append(
+                    (-round(stats.success_rate(), 1), stats.p95_latency(), idx, name)
+                )
 
-            # 检查数据源是否可用
-            if not await provider.is_available():
-                logger.debug(f"数据源 {provider_name} 不可用，跳过")
-                continue
+        if len(ranked) < 2:
+            return provider_names
 
-            # 检查是否支持指定市场
-            if not provider.supports_market(market):
-                logger.debug(
-                    f"数据源 {provider_name} 不支持市场 {market}，跳过"
-                )
-                continue
+        ordered = list(provider_names)
+        for slot, item in zip(slots, sorted(ranked)):
+            ordered[slot] = item[3]
+        return ordered
 
-            try:
-                result = await provider.fetch_stock_info(ticker, market)
-                if result:
-                    logger.info(
-                        f"从数据源 {provider_name} 获取股票 {ticker} 成功"
-                    )
-                    return result
-            except Exception as e:
+    def _record_outcome(
+        self,
+        provider_name: str,
+        market: Optional[str],
+        success: bool,
+        latency: float,
+        error: bool = False,
+    ):
+        """记录一次数据源调用结果（用于健康统计、熔断和自适应排序）.
+        
+        只有抛出异常（包括超时）才计入被动健康统计的失败和熔断；返回空结果（如数据源不覆盖
+        该股票）说明数据源正常响应，不计入被动健康统计，熔断器按成功处理，自适应排序中计为未命中。
+        
+        Args:
+            provider_name: 数据源名称
+            market: 市场类型（可选）
+            success: 调用是否成功返回数据
+            latency: 调用耗时（秒）
+            error: 调用是否抛出异常（包括超时）
+        """
+        if success:
+            self.health.record_success(provider_name)
+        elif error:
+            self.health.record_failure(provider_name)
+
+        breaker = self.breakers[provider_name]
+        if error:
+            was_open = breaker.state == CircuitBreaker.OPEN
+            breaker.record_failure()
+            if not was_open and breaker.state == CircuitBreaker.OPEN:
                 logger.warning(
-                    f"数据源 {provider_name} 获取股票 {ticker} 失败: {e}"
+                    f"数据源 {provider_name} 连续失败 {breaker.consecutive_failures} 次，"
+                    f"熔断 {breaker.recovery_timeout} 秒"
                 )
-                continue
+        else:
+            breaker.record_success()
 
-        logger.error(
-            f"所有数据源都失败，无法获取股票 {ticker} (市场: {market})"
+        stats = self.call_stats.get((market, provider_name))
+        if stats is None:
+            stats = CallStats(self.stats_window)
+            self.call_stats[(market, provider_name)] = stats
+        stats.record(success, latency)
+
+    async def _call_provider(
+        self,
+        provider_name: str,
+        market: Optional[str],
+        call: Callable[[StockDataProvider], Awaitable[Any]],
+        is_success: Callable[[Any], bool],
+    ) -> Any:
+        """调用数据源（限流、计时并记录结果）.
+        
+        Args:
+            provider_name: 数据源名称
+            market: 市场类型（可选）
+            call: 数据源调用函数
+            is_success: 判断返回结果是否成功的函数
+        
+        Returns:
+            数据源返回结果
+        """
+        provider = self.providers[provider_name]
+        await self._acquire_rate_limit(provider_name)
+        start = time.monotonic()
+        try:
+            result = await call(provider)
+        except Exception:
+            self._record_outcome(
+                provider_name, market, False, time.monotonic() - start, error=True
+            )
+            raise
+        self._record_outcome(
+            provider_name, market, bool(is_success(result)), time.monotonic() - start
         )
-        return None
+        return result
 
-    async def fetch_all_tickers(
+    async def _fetch_with_failover(
         self,
-        market: Optional[str] = None,
-        preferred_provider: Optional[str] = None,
-    ) -> List[str]:
-        """获取所有股票代码列表（带容错）.
+        action: str,
+        market: Optional[str],
+        preferred_provider: Optional[str],
+        call: Callable[[StockDataProvider], Awaitable[Any]],
+        is_success: Callable[[Any], bool],
+    ) -> Tuple[Optional[str], Any]:
+        """按顺序尝试数据源，直到某个数据源返回成功结果.
+        
+        跳过不可用、不支持该市场或熔断中的数据源。如果所有可用数据源
+        都因熔断被跳过，仍会依次尝试这些数据源，避免熔断导致完全不可用。
         
         Args:
+            action: 操作描述（用于日志）
             market: 市场类型（可选）
             preferred_provider: 首选数据源名称（可选）
+            call: 数据源调用函数
+            is_success: 判断返回结果是否成功的函数
         
         Returns:
-            股票代码列表
+            (数据源名称, 返回结果)，所有数据源都失败时返回 (None, None)
         """
         # 1. 如果指定了首选数据源，先尝试
         if preferred_provider and preferred_provider in self.providers:
             provider = self.providers[preferred_provider]
-            if await provider.is_available() and provider.supports_market(market):
+            if (
+                await self.health.is_available(preferred_provider)
+                and provider.supports_market(market)
+                and self.breakers[preferred_provider].allow_request()
+            ):
                 try:
-                    result = await provider.fetch_all_tickers(market)
-                    if result:
-                        logger.info(
-                            f"从首选数据源 {preferred_provider} 获取股票列表成功 "
-                            f"(市场: {market}, 数量: {len(result)})"
-                        )
-                        return result
-                except Exception as e:
-                    logger.warning(
-                        f"首选数据源 {preferred_provider} 获取股票列表失败: {e}"
+                    result = await self._call_provider(
+                        preferred_provider, market, call, is_success
                     )
+                    if is_success(result):
+                        logger.info(f"从首选数据源 {preferred_provider} {action}成功")
+                        return preferred_provider, result
+                except Exception as e:
+                    logger.warning(f"首选数据源 {preferred_provider} {action}失败: {e}")
 
-        # 2. 根据市场选择数据源列表
-        if market:
-            provider_names = self.market_providers.get(market, [])
-            if not provider_names:
-                provider_names = list(self.providers.keys())
-        else:
-            provider_names = list(self.providers.keys())
-
-        # 3. 按优先级尝试
-        for provider_name in provider_names:
-            if provider_name == preferred_provider:
-                continue
-
+        # 2. 按顺序尝试其他数据源
+        attempted = False
+        circuit_open = []
+        for provider_name in self._candidate_providers(market, exclude=preferred_provider):
             provider = self.providers[provider_name]
 
-            if not await provider.is_available():
+            # 检查数据源是否可用
+            if not await self.health.is_available(provider_name):
                 logger.debug(f"数据源 {provider_name} 不可用，跳过")
                 continue
 
+            # 检查是否支持指定市场
             if not provider.supports_market(market):
-                logger.debug(
-                    f"数据源 {provider_name} 不支持市场 {market}，跳过"
-                )
+                logger.debug(f"数据源 {provider_name} 不支持市场 {market}，跳过")
                 continue
 
+            # 检查熔断状态
+            if not self.breakers[provider_name].allow_request():
+                logger.debug(f"数据源 {provider_name} 熔断中，跳过")
+                circuit_open.append(provider_name)
+                continue
+
+            attempted = True
             try:
-                result = await provider.fetch_all_tickers(market)
-                if result:
-                    logger.info(
-                        f"从数据源 {provider_name} 获取股票列表成功 "
-                        f"(市场: {market}, 数量: {len(result)})"
-                    )
-                    return result
+                result = await self._call_provider(provider_name, market, call, is_success)
+                if is_success(result):
+                    logger.info(f"从数据源 {provider_name} {action}成功")
+                    return provider_name, result
             except Exception as e:
-                logger.warning(
-                    f"数据源 {provider_name} 获取股票列表失败: {e}"
-                )
-                continue
+                logger.warning(f"数据源 {provider_name} {action}失败: {e}")
+
+        # 3. 所有可用数据源都处于熔断状态时，仍然尝试一次
+        if not attempted:
+            for provider_name in circuit_open:
+                try:
+                    result = await self._call_provider(provider_name, market, call, is_success)
+                    if is_success(result):
+                        logger.info(f"从熔断中的数据源 {provider_name} {action}成功")
+                        return provider_name, result
+                except Exception as e:
+                    logger.warning(f"数据源 {provider_name} {action}失败: {e}")
+
+        return None, None
+
+    async def fetch_stock_info(
+        self,
+        ticker: str,
+        market: Optional[str] = None,
+        preferred_provider: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """获取股票信息（带容错）.
+        
+        按优先级尝试多个数据源，直到成功或所有数据源都失败。
+        并发的相同请求合并为一次上游调用。
+        
+        Args:
+            ticker: 股票代码
+            market: 市场类型（可选）
+            preferred_provider: 首选数据源名称（可选）
+        
+        Returns:
+            股票信息字典，如果所有数据源都失败返回 None
+        """
+        return await self.single_flight.do(
+            ("fetch_stock_info", ticker, market, preferred_provider),
+            lambda: self._fetch_stock_info(ticker, market, preferred_provider),
+            _copy_stock_info,
+        )
+
+    async def _fetch_stock_info(
+        self,
+        ticker: str,
+        market: Optional[str] = None,
+        preferred_provider: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """获取股票信息（实际执行）.
+        
+        Args:
+            ticker: 股票代码
+            market: 市场类型（可选）
+            preferred_provider: 首选数据源名称（可选）
+        
+        Returns:
+            股票信息字典，如果所有数据源都失败返回 None
+        """
+        _, result = await self._fetch_with_failover(
+            f"获取股票 {ticker} ",
+            market,
+            preferred_provider,
+            lambda provider: provider.fetch_stock_info(ticker, market),
+            bool,
+        )
+        if result is None:
+            logger.error(
+                f"所有数据源都失败，无法获取股票 {ticker} (市场: {market})"
+            )
+        return result
+
+    async def fetch_all_tickers(
+        self,
+        market: Optional[str] = None,
+        preferred_provider: Optional[str] = None,
+    ) -> List[str]:
+        """获取所有股票代码列表（带容错）.
+        
+        并发的相同请求合并为一次上游调用。
+        
+        Args:
+            market: 市场类型（可选）
+            preferred_provider: 首选数据源名称（可选）
+        
+        Returns:
+            股票代码列表
+        """
+        return await self.single_flight.do(
+            ("fetch_all_tickers", market, preferred_provider),
+            lambda: self._fetch_all_tickers(market, preferred_provider),
+            list,
+        )
+
+    async def _fetch_all_tickers(
+        self,
+        market: Optional[str] = None,
+        preferred_provider: Optional[str] = None,
+    ) -> List[str]:
+        """获取所有股票代码列表（实际执行）.
+        
+        Args:
+            market: 市场类型（可选）
+            preferred_provider: 首选数据源名称（可选）
+        
+        Returns:
+            股票代码列表
+        """
+        provider_name, result = await self._fetch_with_failover(
+            "获取股票列表",
+            market,
+            preferred_provider,
+            lambda provider: provider.fetch_all_tickers(market),
+            bool,
+        )
+        if result is None:
+            logger.error(
+                f"所有数据源都失败，无法获取股票列表 (市场: {market})"
+            )
+            return []
 
-        logger.error(
-            f"所有数据源都失败，无法获取股票列表 (市场: {market})"
+        logger.info(
+            f"数据源 {provider_name} 返回股票列表 (市场: {market}, 数量: {len(result)})"
         )
-        return []
+        return result
 
     async def fetch_multiple_stocks(
         self,
@@ -221,6 +481,7 @@ class StockDataRouter:
         """批量获取多个股票信息（带容错，优先使用批量查询）.
         
         优先使用数据源的批量查询方法（如果支持），否则回退到逐个查询。
+        并发的相同请求合并为一次上游调用。
         
         Args:
             tickers: 股票代码列表
@@ -233,63 +494,46 @@ class StockDataRouter:
         if not tickers:
             return {}
 
-        # 1. 如果指定了首选数据源，先尝试批量查询
-        if preferred_provider and preferred_provider in self.providers:
-            provider = self.providers[preferred_provider]
-            if await provider.is_available() and provider.supports_market(market):
-                try:
-                    result = await provider.fetch_multiple_stocks(tickers, market)
-                    if result and any(v is not None for v in result.values()):
-                        logger.info(
-                            f"从首选数据源 {preferred_provider} 批量获取股票信息成功 "
-                            f"(市场: {market}, 数量: {len([v for v in result.values() if v])}/{len(tickers)})"
-                        )
-                        return result
-                except Exception as e:
-                    logger.warning(
-                        f"首选数据源 {preferred_provider} 批量获取股票信息失败: {e}"
-                    )
-
-        # 2. 根据市场选择数据源列表
-        if market:
-            provider_names = self.market_providers.get(market, [])
-            if not provider_names:
-                provider_names = list(self.providers.keys())
-        else:
-            provider_names = list(self.providers.keys())
-
-        # 3. 按优先级尝试批量查询
-        for provider_name in provider_names:
-            if provider_name == preferred_provider:
-                continue
-
-            provider = self.providers[provider_name]
-
-            if not await provider.is_available():
-                logger.debug(f"数据源 {provider_name} 不可用，跳过")
-                continue
-
-            if not provider.supports_market(market):
-                logger.debug(
-                    f"数据源 {provider_name} 不支持市场 {market}，跳过"
-                )
-                continue
+        return await self.single_flight.do(
+            ("fetch_multiple_stocks", tuple(tickers), market, preferred_provider),
+            lambda: self._fetch_multiple_stocks(tickers, market, preferred_provider),
+            lambda result: {
+                ticker: _copy_stock_info(info) for ticker, info in result.items()
+            },
+        )
 
-            try:
-                result = await provider.fetch_multiple_stocks(tickers, market)
-                if result and any(v is not None for v in result.values()):
-                    logger.info(
-                        f"从数据源 {provider_name} 批量获取股票信息成功 "
-                        f"(市场: {market}, 数量: {len([v for v in result.values() if v])}/{len(tickers)})"
-                    )
-                    return result
-            except Exception as e:
-                logger.warning(
-                    f"数据源 {provider_name} 批量获取股票信息失败: {e}"
-                )
-                continue
+    async def _fetch_multiple_stocks(
+        self,
+        tickers: List[str],
+        market: Optional[str] = None,
+        preferred_provider: Optional[str] = None,
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """批量获取多个股票信息（实际执行）.
+        
+        Args:
+            tickers: 股票代码列表
+            market: 市场类型（可选）
+            preferred_provider: 首选数据源名称（可选）
+        
+        Returns:
+            字典，key 为 ticker，value 为股票信息或 None
+        """
 
-        # 4. 如果所有批量查询都失败，回退到逐个查询
+        provider_name, result = await self._fetch_with_failover(
+            "批量获取股票信息",
+            market,
+            preferred_provider,
+            lambda provider: provider.fetch_multiple_stocks(tickers, market),
+            lambda result: bool(result) and any(v is not None for v in result.values()),
+        )
+        if result is not None:
+            logger.info(
+                f"数据源 {provider_name} 批量返回股票信息 "
+                f"(市场: {market}, 数量: {len([v for v in result.values() if v])}/{len(tickers)})"
+            )
+            return result
+
+        # 如果所有批量查询都失败，回退到逐个查询
         logger.warning("所有数据源的批量查询都失败，回退到逐个查询模式")
         results = {}
         for ticker in tickers:
@@ -297,6 +541,36 @@ class StockDataRouter:
             results[ticker] = stock_data
         return results
 
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """获取各数据源的熔断状态和按市场统计的调用情况.
+        
+        Returns:
+            {数据源名称: {"circuit_breaker": {...}, "markets": {市场: {...}}}}
+        """
+        status = {}
+        for name in self.providers:
+            markets = {
+                market or "all": stats.snapshot()
+                for (market, provider_name), stats in self.call_stats.items()
+                if provider_name == name
+            }
+            status[name] = {
+                "circuit_breaker": self.breakers[name].snapshot(),
+                "markets": markets,
+            }
+        return status
+
+    def get_market_order(self) -> Dict[str, List[str]]:
+        """获取各市场当前的数据源尝试顺序（自适应排序后）.
+        
+        Returns:
+            {市场: 数据源名称列表}
+        """
+        return {
+            market: self._candidate_providers(market)
+            for market in self.market_providers
+        }
+
     def get_providers_for_market(
         self, market: Optional[str] = None
     ) -> List[str]:
@@ -0,0 +1,69 @@
+"""请求合并（single-flight）."""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """合并并发的相同请求.
+
+    同一个 key 同时只有一个请求在执行，其余并发调用方等待同一个结果。
+    执行中的请求使用独立任务，发起方被取消不会影响其他等待方。
+    """
+
+    def __init__(self):
+        """初始化请求合并器."""
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[Any]],
+        copy_result: Callable[[Any], Any] = lambda result: result,
+    ) -> Any:
+        """执行请求（相同 key 的并发请求只执行一次）.
+
+        Args:
+            key: 请求标识
+            func: 实际执行请求的协程函数
+            copy_result: 复制结果的函数（等待方拿到副本，避免共享可变对象）
+
+        Returns:
+            请求结果
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.debug(f"合并并发请求: {key}")
+            return copy_result(await asyncio.shield(task))
+
+        self.executed += 1
+        task = asyncio.create_task(func())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._forget(key, task))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        """请求完成后移除记录."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def get_metrics(self) -> Dict[str, int]:
+        """获取请求合并统计.
+
+        Returns:
+            {"calls": 总调用数, "executed": 实际执行数, "coalesced": 被合并数, "in_flight": 执行中数量}
+        """
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
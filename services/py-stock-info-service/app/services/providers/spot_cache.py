@@ -0,0 +1,156 @@
+"""全市场行情快照缓存."""
+
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List, Callable
+import pandas as pd
+from app.services.frame_converter import frame_to_columns, columns_to_records, STR
+
+logger = logging.getLogger(__name__)
+
+
+class SpotTableSnapshot:
+    """全市场行情表快照（按股票代码索引）."""
+
+    def __init__(self, df: pd.DataFrame, key_column: str = "代码"):
+        """从 DataFrame 构建快照.
+
+        Args:
+            df: 全市场行情表
+            key_column: 股票代码列名
+        """
+        columns = frame_to_columns(df)
+        codes = frame_to_columns(df, {key_column: key_column}, {key_column: STR})[key_column]
+        self.records: List[Dict[str, Any]] = columns_to_records(columns)
+        # 股票代码 -> 行号（重复代码保留第一条）
+        self.index: Dict[str, int] = {}
+        for position, code in enumerate(codes):
+            if code:
+                self.index.setdefault(code, position)
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.index
+
+    def get(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """按股票代码查找行（返回副本）.
+
+        Args:
+            ticker: 股票代码
+
+        Returns:
+            行数据字典，不存在时返回 None
+        """
+        position = self.index.get(ticker)
+        if position is None:
+            return None
+        return dict(self.records[position])
+
+    def tickers(self) -> List[str]:
+        """快照中的全部股票代码."""
+        return list(self.index.keys())
+
+
+class SpotTableCache:
+    """全市场行情表缓存.
+
+    - 快照在 TTL 内复用，单只查询和批量查询共享同一次下载
+    - 刷新为单飞模式：并发调用方（线程池中的同步调用）等待同一次下载
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], Optional[pd.DataFrame]],
+        ttl: float = 60.0,
+        key_column: str = "代码",
+    ):
+        """初始化缓存.
+
+        Args:
+            name: 缓存名称（用于日志）
+            loader: 下载全市场行情表的同步函数
+            ttl: 快照有效期（秒，<= 0 表示不缓存）
+            key_column: 股票代码列名
+        """
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.key_column = key_column
+        self._snapshot: Optional[SpotTableSnapshot] = None
+        self._lock = threading.Lock()
+        self.downloads = 0
+
+    def _is_fresh(self, snapshot: Optional[SpotTableSnapshot]) -> bool:
+        return (
+            snapshot is not None
+            and self.ttl > 0
+            and time.monotonic() - snapshot.loaded_at < self.ttl
+        )
+
+    def get_snapshot(self) -> Optional[SpotTableSnapshot]:
+        """获取快照（过期时下载，同一时间只有一个下载）.
+
+        Returns:
+            快照，下载失败或返回空表时返回 None
+        """
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        with self._lock:
+            # 等待锁期间其他调用方可能已经完成刷新
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                return snapshot
+
+            start = time.monotonic()
+            df = self.loader()
+            self.downloads += 1
+            if df is None or df.empty:
+                logger.warning(f"{self.name} 行情表下载结果为空")
+                return None
+
+            snapshot = SpotTableSnapshot(df, self.key_column)
+            self._snapshot = snapshot
+            logger.info(
+                f"{self.name} 行情表已刷新: {len(snapshot)} 行，"
+                f"耗时 {time.monotonic() - start:.2f} 秒"
+            )
+            return snapshot
+
+    def invalidate(self):
+        """清除缓存的快照."""
+        self._snapshot = None
+
+
+# 全局行情表缓存（按表名共享）
+_spot_caches: Dict[str, SpotTableCache] = {}
+
+
+def get_spot_table_cache(
+    name: str,
+    loader: Callable[[], Optional[pd.DataFrame]],
+    ttl: Optional[float] = None,
+) -> SpotTableCache:
+    """获取全局行情表缓存实例（同名缓存在进程内共享）.
+
+    Args:
+        name: 缓存名称（如 akshare 接口名）
+        loader: 下载全市场行情表的同步函数（仅首次创建时使用）
+        ttl: 快照有效期（秒，可选，提供时更新已有缓存的 TTL）
+
+    Returns:
+        行情表缓存实例
+    """
+    cache = _spot_caches.get(name)
+    if cache is None:
+        cache = SpotTableCache(name, loader, ttl if ttl is not None else 60.0)
+        _spot_caches[name] = cache
+    elif ttl is not None:
+        cache.ttl = ttl
+    return cache
@@ -1,6 +1,5 @@
 """yfinance 数据源提供者."""
 
-import asyncio
 import logging
 from typing import Optional, Dict, Any, List
 import yfinance as yf
@@ -45,11 +44,8 @@ class YFinanceProvider(StockDataProvider):
             股票信息字典，如果失败返回 None
         """
         try:
-            # 在线程池中执行同步的 yfinance 调用
-            loop = asyncio.get_event_loop()
-            stock_data = await loop.run_in_executor(
-                None, self._fetch_stock_info_sync, ticker
-            )
+            # 在数据源专用线程池中执行同步的 yfinance 调用
+            stock_data = await self.run_blocking(self._fetch_stock_info_sync, ticker)
 
             if stock_data:
                 # 使用字段映射器统一格式
@@ -78,12 +74,8 @@ class YFinanceProvider(StockDataProvider):
             股票代码列表
         """
         try:
-            loop = asyncio.get_event_loop()
-            
             # 使用多种方式获取股票列表
-            tickers = await loop.run_in_executor(
-                None, self._get_all_tickers_sync, market
-            )
+            tickers = await self.run_blocking(self._get_all_tickers_sync, market)
             return tickers
 
         except Exception as e:
@@ -94,10 +86,7 @@ class YFinanceProvider(StockDataProvider):
         """检查数据源是否可用."""
         try:
             # 尝试获取一个已知股票（AAPL）的信息，如果能成功则说明可用
-            loop = asyncio.get_event_loop()
-            stock_data = await loop.run_in_executor(
-                None, self._fetch_stock_info_sync, "AAPL"
-            )
+            stock_data = await self.run_blocking(self._fetch_stock_info_sync, "AAPL")
             return stock_data is not None
         except Exception as e:
             logger.warning(f"yfinance 可用性检查失败: {e}")
@@ -170,15 +159,13 @@ class YFinanceProvider(StockDataProvider):
             return {}
 
         try:
-            loop = asyncio.get_event_loop()
-            
             # 使用 yfinance 的 Tickers 类批量查询
             # 将股票代码列表转换为空格分隔的字符串
             ticker_string = " ".join(tickers)
             
-            # 在线程池中执行同步的 yfinance 批量调用
-            batch_results = await loop.run_in_executor(
-                None, self._fetch_multiple_stocks_sync, ticker_string, tickers
+            # 在数据源专用线程池中执行同步的 yfinance 批量调用
+            batch_results = await self.run_blocking(
+                self._fetch_multiple_stocks_sync, ticker_string, tickers
             )
             
             # 映射和清洗字段
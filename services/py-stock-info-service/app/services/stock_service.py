@@ -1,12 +1,16 @@
 """股票数据业务逻辑服务."""
 
+import asyncio
 import logging
 from datetime import datetime, UTC
 from typing import Optional, Dict, Any, List
 from bson import ObjectId
 from bson.regex import Regex
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
+from app.config import settings
 from app.database import get_database
 from app.models.stock import stock_from_dict, prepare_stock_document
 from app.services.yfinance_service import (
@@ -131,17 +135,19 @@ class StockService:
             "total_pages": (total + params.page_size - 1) // params.page_size,
         }
 
-    async def upsert_stock(self, stock_data: Dict[str, Any]) -> Dict[str, Any]:
-        """更新或插入股票数据（upsert）.
+    def _build_stock_update(
+        self, stock_data: Dict[str, Any], now: datetime
+    ) -> tuple[str, Dict[str, Any]]:
+        """构建股票 upsert 的更新文档.
 
         Args:
             stock_data: 股票数据字典
+            now: 更新时间
 
         Returns:
-            更新后的股票信息
+            (ticker, update) 元组，update 包含 $set 与 $setOnInsert
         """
         ticker = stock_data["ticker"].upper()
-        now = datetime.now(UTC)
 
         # 准备文档
         document = prepare_stock_document(stock_data)
@@ -152,19 +158,98 @@ class StockService:
         # 这样可以避免与 $setOnInsert 的冲突
         document.pop("created_at", None)
 
+        return ticker, {
+            "$set": document,
+            "$setOnInsert": {"created_at": now},
+        }
+
+    async def upsert_stock(self, stock_data: Dict[str, Any]) -> Dict[str, Any]:
+        """更新或插入股票数据（upsert）.
+
+        Args:
+            stock_data: 股票数据字典
+
+        Returns:
+            更新后的股票信息
+        """
+        ticker, update = self._build_stock_update(stock_data, datetime.now(UTC))
+
         # 使用 upsert 操作
         result = await self.collection.find_one_and_update(
             {"ticker": ticker},
-            {
-                "$set": document,
-                "$setOnInsert": {"created_at": now},
-            },
+            update,
             upsert=True,
             return_document=True,
         )
 
         return stock_from_dict(result)
 
+    async def bulk_upsert_stocks(
+        self,
+        stocks: List[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        progress_callback=None,
+    ) -> List[Dict[str, Any]]:
+        """批量更新或插入股票数据（bulk_write）.
+
+        将股票数据分批转换为 UpdateOne(upsert=True) 操作，每批一次 bulk_write，
+        数据库往返次数从 O(N) 降为 O(N/batch_size)。
+
+        Args:
+            stocks: 股票数据字典列表
+            batch_size: 每批写入的数量（可选，默认使用配置值）
+            progress_callback: 每批写入完成后的回调（可选），接收 (已处理数, 批次结果)
+
+        Returns:
+            每只股票的保存结果列表（{"ticker": 股票代码, "status": "success"|"failed"}），
+            顺序与输入一致
+        """
+        size = max(1, batch_size or settings.stock_bulk_write_batch_size)
+        now = datetime.now(UTC)
+        results: List[Dict[str, Any]] = []
+
+        for start in range(0, len(stocks), size):
+            chunk = stocks[start:start + size]
+            chunk_results: List[Dict[str, Any]] = []
+            operations = []
+            # operations 下标 -> chunk_results 下标
+            operation_positions = []
+
+            for stock_data in chunk:
+                ticker = str(stock_data.get("ticker") or "").upper()
+                try:
+                    ticker, update = self._build_stock_update(stock_data, now)
+                except Exception as e:
+                    logger.error(f"准备股票 {ticker} 文档失败: {str(e)}")
+                    chunk_results.append({"ticker": ticker, "status": "failed"})
+                    continue
+                operation_positions.append(len(chunk_results))
+                chunk_results.append({"ticker": ticker, "status": "success"})
+                operations.append(UpdateOne({"ticker": ticker}, update, upsert=True))
+
+            if operations:
+                try:
+                    await self.collection.bulk_write(operations, ordered=False)
+                except BulkWriteError as e:
+                    # ordered=False 时其余操作仍会执行，只标记出错的操作
+                    for error in e.details.get("writeErrors", []):
+                        position = operation_positions[error["index"]]
+                        chunk_results[position]["status"] = "failed"
+                        logger.error(
+                            f"保存股票 {chunk_results[position]['ticker']} 失败: "
+                            f"{error.get('errmsg')}"
+                        )
+                except Exception as e:
+                    logger.error(f"批量保存股票失败（{len(operations)} 只）: {str(e)}")
+                    for position in operation_positions:
+                        chunk_results[position]["status"] = "failed"
+
+            results.extend(chunk_results)
+            if progress_callback:
+                await progress_callback(len(results), chunk_results)
+
+        return results
+
     async def update_stock_from_provider(
         self,
         ticker: str,
@@ -246,9 +331,14 @@ class StockService:
             validate_if_new=validate_if_new,
         )
 
-    async def update_all_stocks(self) -> Dict[str, Any]:
+    async def update_all_stocks(
+        self, concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
         """更新所有股票数据.
 
+        Args:
+            concurrency: 同时进行的数据源请求数（可选，默认使用配置值）
+
         Returns:
             更新结果统计
         """
@@ -257,47 +347,33 @@ class StockService:
         async for stock in self.collection.find({}, {"ticker": 1}):
             tickers.append(stock["ticker"])
 
-        if not tickers:
-            return {
-                "total": 0,
-                "success": 0,
-                "failed": 0,
-                "results": [],
-            }
+        return await self._update_tickers(tickers, concurrency)
 
-        # 使用数据源路由器批量获取股票信息
-        success_count = 0
-        failed_count = 0
-        update_results = []
+    async def batch_update_stocks(
+        self, tickers: List[str], concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """批量更新指定股票数据.
 
-        for ticker in tickers:
-            # 使用多数据源方法更新
-            stock_data = await self.router.fetch_stock_info(ticker)
-            if stock_data:
-                # 更新到数据库
-                updated_stock = await self.upsert_stock(stock_data)
-                success_count += 1
-                update_results.append({"ticker": ticker, "status": "success"})
-            else:
-                failed_count += 1
-                update_results.append({"ticker": ticker, "status": "failed"})
+        Args:
+            tickers: 股票代码列表
+            concurrency: 同时进行的数据源请求数（可选，默认使用配置值）
 
-        logger.info(
-            f"批量更新完成：总数 {len(tickers)}，成功 {success_count}，失败 {failed_count}"
-        )
+        Returns:
+            更新结果统计
+        """
+        return await self._update_tickers(tickers, concurrency)
 
-        return {
-            "total": len(tickers),
-            "success": success_count,
-            "failed": failed_count,
-            "results": update_results,
-        }
+    async def _update_tickers(
+        self, tickers: List[str], concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """并发更新股票数据（有界并发）.
 
-    async def batch_update_stocks(self, tickers: List[str]) -> Dict[str, Any]:
-        """批量更新指定股票数据.
+        通过信号量限制同时进行的数据源请求数，各数据源的请求速率
+        由路由器的令牌桶限流器控制。结果顺序与输入顺序一致。
 
         Args:
             tickers: 股票代码列表
+            concurrency: 同时进行的数据源请求数（可选，默认使用配置值）
 
         Returns:
             更新结果统计
@@ -310,32 +386,41 @@ class StockService:
                 "results": [],
             }
 
-        # 使用数据源路由器批量获取股票信息
-        success_count = 0
-        failed_count = 0
-        update_results = []
+        limit = max(1, concurrency or settings.stock_update_concurrency)
+        semaphore = asyncio.Semaphore(limit)
+
+        async def update_one(ticker: str) -> Dict[str, Any]:
+            """抓取并保存单只股票."""
+            try:
+                # 使用数据源路由器获取股票信息（受并发数限制）
+                async with semaphore:
+                    stock_data = await self.router.fetch_stock_info(ticker)
+                if not stock_data:
+                    return {"ticker": ticker, "status": "failed"}
 
-        for ticker in tickers:
-            # 使用多数据源方法更新
-            stock_data = await self.router.fetch_stock_info(ticker)
-            if stock_data:
                 # 更新到数据库
-                updated_stock = await self.upsert_stock(stock_data)
-                success_count += 1
-                update_results.append({"ticker": ticker, "status": "success"})
-            else:
-                failed_count += 1
-                update_results.append({"ticker": ticker, "status": "failed"})
+                await self.upsert_stock(stock_data)
+                return {"ticker": ticker, "status": "success"}
+            except Exception as e:
+                logger.error(f"更新股票 {ticker} 失败: {str(e)}")
+                return {"ticker": ticker, "status": "failed"}
+
+        update_results = await asyncio.gather(
+            *(update_one(ticker) for ticker in tickers)
+        )
+        success_count = sum(1 for r in update_results if r["status"] == "success")
+        failed_count = len(update_results) - success_count
 
         logger.info(
-            f"批量更新完成：总数 {len(tickers)}，成功 {success_count}，失败 {failed_count}"
+            f"批量更新完成：总数 {len(tickers)}，成功 {success_count}，"
+            f"失败 {failed_count}（并发数 {limit}）"
         )
 
         return {
             "total": len(tickers),
             "success": success_count,
             "failed": failed_count,
-            "results": update_results,
+            "results": list(update_results),
         }
 
     async def delete_stock(self, ticker: str) -> bool:
@@ -578,56 +663,66 @@ class StockService:
         logger.info(f"待保存股票数量: {fetch_success} 只（有数据的股票）")
         save_start_time = time.time()
 
-        # 保存到数据库
+        # 保存到数据库（分批 bulk_write）
         save_success = 0
         save_failed = 0
-        save_results = []
         save_failed_tickers = []
+        save_status: Dict[str, str] = {}
 
-        for idx, (ticker, stock_data) in enumerate(fetch_results.items()):
+        # 抓取失败的股票直接记为保存失败
+        stocks_to_save = []
+        saved_tickers = []
+        for ticker, stock_data in fetch_results.items():
             if stock_data:
-                try:
-                    ticker_save_start = time.time()
-                    await self.upsert_stock(stock_data)
-                    ticker_save_elapsed = time.time() - ticker_save_start
-                    save_success += 1
-                    save_results.append({"ticker": ticker, "status": "success"})
-                    logger.debug(
-                        f"[{idx + 1}/{total}] 保存成功: {ticker} "
-                        f"(耗时 {ticker_save_elapsed:.3f}秒)"
-                    )
-                except Exception as e:
-                    logger.error(f"[{idx + 1}/{total}] 保存股票 {ticker} 失败: {str(e)}")
-                    save_failed += 1
-                    save_failed_tickers.append(ticker)
-                    save_results.append({"ticker": ticker, "status": "failed"})
+                stocks_to_save.append(stock_data)
+                saved_tickers.append(ticker)
             else:
                 save_failed += 1
-                save_results.append({"ticker": ticker, "status": "failed"})
+                save_status[ticker] = "failed"
 
-            # 每10只股票记录一次进度
-            if (idx + 1) % 10 == 0 or idx == total - 1:
-                elapsed = time.time() - save_start_time
-                avg_time = elapsed / (idx + 1) if idx > 0 else 0
-                remaining = avg_time * (total - idx - 1) if idx > 0 else 0
-                logger.info(
-                    f"保存进度: {idx + 1}/{total} ({int((idx + 1) / total * 100)}%) | "
-                    f"成功: {save_success} | 失败: {save_failed} | "
-                    f"已耗时: {elapsed:.1f}秒 | 预计剩余: {remaining:.1f}秒"
-                )
+        async def on_batch_saved(processed: int, batch_results: List[Dict[str, Any]]):
+            """每批保存完成后更新统计并发送进度."""
+            nonlocal save_success, save_failed
+            for item in batch_results:
+                if item["status"] == "success":
+                    save_success += 1
+                else:
+                    save_failed += 1
+                    save_failed_tickers.append(item["ticker"])
+
+            elapsed = time.time() - save_start_time
+            saved_total = len(stocks_to_save)
+            logger.info(
+                f"保存进度: {processed}/{saved_total} "
+                f"({int(processed / saved_total * 100)}%) | "
+                f"成功: {save_success} | 失败: {save_failed} | "
+                f"已耗时: {elapsed:.1f}秒"
+            )
 
-            # 发送保存进度
             if progress_callback:
+                current = total - saved_total + processed
                 await progress_callback({
                     "stage": "saving",
-                    "message": f"正在保存股票数据... ({idx + 1}/{total})",
-                    "progress": 50 + int((idx + 1) / total * 50),  # 保存阶段占 50%
+                    "message": f"正在保存股票数据... ({current}/{total})",
+                    "progress": 50 + int(current / total * 50),  # 保存阶段占 50%
                     "total": total,
-                    "current": idx + 1,
+                    "current": current,
                     "save_success": save_success,
                     "save_failed": save_failed,
                 })
 
+        bulk_results = await self.bulk_upsert_stocks(
+            stocks_to_save, progress_callback=on_batch_saved
+        )
+        # bulk_upsert_stocks 返回的 ticker 已转为大写，按顺序对应回原始 ticker
+        for ticker, item in zip(saved_tickers, bulk_results):
+            save_status[ticker] = item["status"]
+
+        save_results = [
+            {"ticker": ticker, "status": save_status[ticker]}
+            for ticker in fetch_results
+        ]
+
         save_elapsed = time.time() - save_start_time
         logger.info("=" * 80)
         logger.info(f"步骤3完成: 保存股票数据耗时 {save_elapsed:.2f} 秒")
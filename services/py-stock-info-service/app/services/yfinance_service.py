@@ -6,6 +6,7 @@ from typing import Optional, Dict, Any, List
 import yfinance as yf
 import requests
 from bs4 import BeautifulSoup
+from app.services.providers.executor import get_provider_executor
 
 logger = logging.getLogger(__name__)
 
@@ -93,9 +94,8 @@ async def fetch_stock_info_async(ticker: str, retry_count: int = 3) -> Optional[
     """
     for attempt in range(retry_count):
         try:
-            # 在线程池中执行同步的 yfinance 调用
-            loop = asyncio.get_event_loop()
-            stock_data = await loop.run_in_executor(None, fetch_stock_info, ticker)
+            # 在 yfinance 专用线程池中执行同步的 yfinance 调用
+            stock_data = await get_provider_executor("yfinance").run(fetch_stock_info, ticker)
 
             if stock_data:
                 return stock_data
@@ -144,8 +144,7 @@ async def fetch_multiple_stocks(tickers: list[str], delay: float = 1.0, batch_si
             # 将股票代码列表转换为空格分隔的字符串
             ticker_string = " ".join(batch_tickers)
             
-            # 在线程池中执行同步的 yfinance 批量调用
-            loop = asyncio.get_event_loop()
+            # 在 yfinance 专用线程池中执行同步的 yfinance 批量调用
             
             def fetch_batch():
                 """批量获取股票信息."""
@@ -175,7 +174,7 @@ async def fetch_multiple_stocks(tickers: list[str], delay: float = 1.0, batch_si
                 return batch_results
             
             # 执行批量获取
-            batch_results = await loop.run_in_executor(None, fetch_batch)
+            batch_results = await get_provider_executor("yfinance").run(fetch_batch)
             results.update(batch_results)
             
             # 检查是否有失败的股票（不在结果中的）
@@ -715,8 +714,7 @@ async def fetch_all_stocks_from_yahoo(delay: float = 1.0) -> Dict[str, Any]:
     logger.info("开始获取所有股票代码列表...")
     
     # 获取所有股票代码
-    loop = asyncio.get_event_loop()
-    all_tickers = await loop.run_in_executor(None, get_all_tickers_from_yahoo)
+    all_tickers = await get_provider_executor("yfinance").run(get_all_tickers_from_yahoo)
 
     if not all_tickers:
         logger.warning("未获取到任何股票代码")
@@ -0,0 +1,111 @@
+"""DataFrame 转换性能基准.
+
+对比 iterrows() 逐行转换与列式转换：
+- 5,000 行全市场行情表（akshare stock_zh_a_spot_em 结构）
+- 30 年日线历史数据（约 7,800 行）
+
+运行方式（在服务根目录）：
+    uv run python -m benchmarks.bench_frame_converter
+"""
+
+import timeit
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from app.services.frame_converter import frame_to_records, STR
+from app.services.historical_data.historical_data_fetcher import (
+    AKSHARE_KLINE_COLUMNS,
+    KLINE_DTYPES,
+)
+
+
+def make_spot_table(rows: int = 5000) -> pd.DataFrame:
+    """构造全市场行情表."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "序号": np.arange(1, rows + 1),
+        "代码": [f"{i:06d}" for i in range(rows)],
+        "名称": [f"股票{i}" for i in range(rows)],
+        "最新价": rng.uniform(1, 100, rows).round(2),
+        "涨跌幅": rng.normal(0, 2, rows).round(2),
+        "成交量": rng.integers(1_000, 10_000_000, rows),
+        "成交额": rng.uniform(1e5, 1e9, rows),
+        "总市值": rng.uniform(1e8, 1e12, rows),
+        "市盈率-动态": rng.uniform(-50, 200, rows),
+        "市净率": rng.uniform(0.1, 20, rows),
+    })
+
+
+def make_daily_history(years: int = 30) -> pd.DataFrame:
+    """构造日线历史数据（akshare stock_zh_a_hist 结构）."""
+    dates = pd.bdate_range(end="2024-12-31", periods=years * 260)
+    rows = len(dates)
+    rng = np.random.default_rng(0)
+    close = 10 + rng.normal(0, 0.1, rows).cumsum()
+    return pd.DataFrame({
+        "日期": dates.strftime("%Y-%m-%d"),
+        "开盘": close + rng.normal(0, 0.05, rows),
+        "最高": close + 0.2,
+        "最低": close - 0.2,
+        "收盘": close,
+        "成交量": rng.integers(1_000, 1_000_000, rows),
+        "成交额": rng.uniform(1e5, 1e9, rows),
+    })
+
+
+def spot_iterrows(df: pd.DataFrame) -> dict:
+    """逐行转换行情表（原实现）."""
+    results = {}
+    for _, row in df.iterrows():
+        code = str(row.get("代码", "")).strip()
+        results[code] = row.to_dict()
+    return results
+
+
+def spot_columnar(df: pd.DataFrame) -> dict:
+    """列式转换行情表."""
+    records = frame_to_records(df)
+    codes = frame_to_records(df, {"代码": "code"}, {"code": STR})
+    return {item["code"]: record for item, record in zip(codes, records)}
+
+
+def history_iterrows(df: pd.DataFrame) -> list:
+    """逐行转换日线数据（原实现）."""
+    kline_data = []
+    for _, row in df.iterrows():
+        kline_data.append({
+            "timestamp": datetime.strptime(str(row["日期"]), "%Y-%m-%d"),
+            "open": float(row["开盘"]),
+            "high": float(row["最高"]),
+            "low": float(row["最低"]),
+            "close": float(row["收盘"]),
+            "volume": int(row["成交量"]),
+            "amount": float(row["成交额"]),
+            "adj_close": float(row["收盘"]),
+        })
+    return kline_data
+
+
+def history_columnar(df: pd.DataFrame) -> list:
+    """列式转换日线数据."""
+    records = frame_to_records(df, AKSHARE_KLINE_COLUMNS, KLINE_DTYPES, date_format="%Y-%m-%d")
+    for record in records:
+        record["adj_close"] = record["close"]
+    return records
+
+
+def bench(name: str, df: pd.DataFrame, baseline, candidate, number: int = 5):
+    """运行基准并打印结果."""
+    assert len(baseline(df)) == len(candidate(df))
+    t_base = min(timeit.repeat(lambda: baseline(df), number=1, repeat=number))
+    t_cand = min(timeit.repeat(lambda: candidate(df), number=1, repeat=number))
+    print(
+        f"{name:<28} rows={len(df):>6}  iterrows={t_base * 1000:8.1f} ms  "
+        f"columnar={t_cand * 1000:7.1f} ms  speedup={t_base / t_cand:5.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    bench("spot table (5,000 rows)", make_spot_table(), spot_iterrows, spot_columnar)
+    bench("daily history (30 years)", make_daily_history(), history_iterrows, history_columnar)
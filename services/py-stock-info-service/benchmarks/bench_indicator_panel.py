@@ -0,0 +1,47 @@
+"""全市场（面板）技术指标计算性能基准.
+
+对比逐只股票调用 NumPy 内核与在 时间 × 股票 面板上一次计算：
+- RSI14
+- MACD(12, 26, 9)
+- 布林带(20, 2)
+
+默认 5,000 只股票 × 250 根日K线，可通过参数指定股票数量。
+
+运行方式（在服务根目录）：
+    uv run python -m benchmarks.bench_indicator_panel [tickers]
+"""
+
+import sys
+import timeit
+import numpy as np
+
+from app.services.indicators import indicator_kernels as kernels
+
+BARS = 250
+
+
+def make_panel(tickers: int) -> np.ndarray:
+    """构造 时间 × 股票 收盘价面板."""
+    rng = np.random.default_rng(0)
+    return 100 + rng.normal(0, 1, (BARS, tickers)).cumsum(axis=0)
+
+
+def bench(name: str, panel: np.ndarray, kernel, number: int = 3):
+    """运行基准并打印结果."""
+    columns = [np.ascontiguousarray(panel[:, i]) for i in range(panel.shape[1])]
+    t_loop = min(timeit.repeat(lambda: [kernel(c) for c in columns], number=1, repeat=number))
+    t_panel = min(timeit.repeat(lambda: kernel(panel), number=1, repeat=number))
+    print(
+        f"{name:<6} tickers={panel.shape[1]:>6}  per-ticker={t_loop * 1000:8.1f} ms  "
+        f"panel={t_panel * 1000:7.1f} ms  speedup={t_loop / t_panel:6.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    panel = make_panel(tickers)
+
+    np.testing.assert_allclose(kernels.rsi(panel, 14)[:, 0], kernels.rsi(panel[:, 0], 14))
+    bench("RSI14", panel, lambda v: kernels.rsi(v, 14))
+    bench("MACD", panel, lambda v: kernels.macd(v, 12, 26, 9))
+    bench("BOLL", panel, lambda v: kernels.bbands(v, 20, 2.0))
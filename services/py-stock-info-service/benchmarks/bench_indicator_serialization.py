@@ -0,0 +1,104 @@
+"""技术指标结果序列化性能基准.
+
+对比逐行（.items() / .loc[timestamp, col]）与列式转换 pandas-ta 指标结果：
+- 单列指标（MA）
+- 三列指标（MACD）
+
+指标只计算一次，计时仅包含结果转换为 {timestamp, value, params} 记录的部分。
+默认使用 1 年 1 分钟 K 线（约 98,000 行），可通过参数指定年数（如 10 年约 98 万行）。
+
+运行方式（在服务根目录）：
+    uv run python -m benchmarks.bench_indicator_serialization [years]
+"""
+
+import sys
+import timeit
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+from app.services.indicators.indicator_calculator import (
+    series_to_records,
+    frame_to_indicator_records,
+)
+
+# 每个交易日 390 根 1 分钟 K 线，每年约 252 个交易日
+BARS_PER_YEAR = 252 * 390
+
+
+def make_close(years: float = 1) -> pd.Series:
+    """构造 1 分钟收盘价序列."""
+    rows = int(years * BARS_PER_YEAR)
+    index = pd.date_range("2015-01-01 09:30", periods=rows, freq="min", tz="UTC")
+    rng = np.random.default_rng(0)
+    return pd.Series(100 + rng.normal(0, 0.05, rows).cumsum(), index=index, name="close")
+
+
+def ma_rowwise(series: pd.Series, period: int) -> list:
+    """逐行转换单列指标（原实现）."""
+    results = []
+    for timestamp, value in series.items():
+        if pd.notna(value):
+            results.append({
+                "timestamp": timestamp.to_pydatetime(),
+                "value": float(value),
+                "params": {"period": period},
+            })
+    return results
+
+
+def ma_columnar(series: pd.Series, period: int) -> list:
+    """列式转换单列指标."""
+    return series_to_records(series, {"period": period})
+
+
+def macd_rowwise(macd_df: pd.DataFrame, columns: dict) -> dict:
+    """逐行转换 MACD（原实现，每行三次 .loc 查找）."""
+    results = {name: [] for name in columns}
+    for timestamp in macd_df.index:
+        params = {"fast": 12, "slow": 26, "signal": 9}
+        for name, column in columns.items():
+            value = macd_df.loc[timestamp, column]
+            if pd.notna(value):
+                results[name].append({
+                    "timestamp": timestamp.to_pydatetime(),
+                    "value": float(value),
+                    "params": params,
+                })
+    return results
+
+
+def macd_columnar(macd_df: pd.DataFrame, columns: dict) -> dict:
+    """列式转换 MACD."""
+    return frame_to_indicator_records(macd_df, columns, {"fast": 12, "slow": 26, "signal": 9})
+
+
+def bench(name: str, rows: int, baseline, candidate, number: int = 3):
+    """运行基准并打印结果."""
+    t_base = min(timeit.repeat(baseline, number=1, repeat=number))
+    t_cand = min(timeit.repeat(candidate, number=1, repeat=number))
+    print(
+        f"{name:<12} rows={rows:>8}  rowwise={t_base * 1000:9.1f} ms  "
+        f"columnar={t_cand * 1000:8.1f} ms  speedup={t_base / t_cand:6.1f}x  "
+        f"per-row={t_base / rows * 1e6:5.2f} us -> {t_cand / rows * 1e6:5.2f} us"
+    )
+
+
+if __name__ == "__main__":
+    years = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    close = make_close(years)
+
+    ma = ta.sma(close, length=20)
+    assert ma_rowwise(ma, 20) == ma_columnar(ma, 20)
+    bench("MA20", len(close), lambda: ma_rowwise(ma, 20), lambda: ma_columnar(ma, 20))
+
+    macd_df = ta.macd(close, fast=12, slow=26, signal=9)
+    macd_columns = dict(zip(["MACD_DIF", "MACD_HIST", "MACD_DEA"], macd_df.columns))
+    assert macd_rowwise(macd_df, macd_columns) == macd_columnar(macd_df, macd_columns)
+    bench(
+        "MACD",
+        len(close),
+        lambda: macd_rowwise(macd_df, macd_columns),
+        lambda: macd_columnar(macd_df, macd_columns),
+        number=1,
+    )
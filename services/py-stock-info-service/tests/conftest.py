@@ -1,10 +1,16 @@
 """Pytest 配置和共享 fixtures."""
 
+import math
+from datetime import datetime, timedelta, UTC
+from types import SimpleNamespace
+from unittest.mock import patch
+
 import pytest
 from httpx import AsyncClient, ASGITransport
-from mongomock_motor import AsyncMongoMockClient
+from mongomock_motor import AsyncMongoMockClient, AsyncMongoMockCollection
 from app.main import app
 import app.database as db_module
+from app.services.historical_data.kline_cache import get_kline_cache
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -17,6 +23,8 @@ async def setup_test_db():
     # 替换全局数据库连接
     db_module.client = mock_client
     db_module.database = mock_database
+    # 各测试的 mock 数据库同名，清空K线窗口缓存
+    get_kline_cache().clear()
 
     # 清理测试数据
     await mock_database.stocks.delete_many({})
@@ -86,3 +94,56 @@ def sample_schedule_update():
         "schedule_config": {"interval": 3600},
         "is_active": False,
     }
+
+
+@pytest.fixture
+def fake_bulk_write():
+    """用逐条 update_one 模拟 bulk_write（mongomock 不完全支持 bulk_write 的 UpdateOne）.
+
+    Returns:
+        List[int]: 每次 bulk_write 调用的操作数
+    """
+    calls = []
+
+    async def fake(collection, operations, ordered=True):
+        calls.append(len(operations))
+        upserted_ids = {}
+        modified_count = 0
+        for index, op in enumerate(operations):
+            result = await collection.update_one(op._filter, op._doc, upsert=op._upsert)
+            if result.upserted_id is not None:
+                upserted_ids[index] = result.upserted_id
+            modified_count += result.modified_count
+        return SimpleNamespace(
+            upserted_ids=upserted_ids,
+            upserted_count=len(upserted_ids),
+            modified_count=modified_count,
+        )
+
+    with patch.object(AsyncMongoMockCollection, "bulk_write", new=fake):
+        yield calls
+
+
+@pytest.fixture
+def make_kline_data():
+    """生成带正弦波动的上涨趋势K线数据（指标结果不退化为常数）.
+
+    Returns:
+        Callable: make(count, base_date=2025-01-01 UTC, wave=3) -> List[Dict]
+    """
+
+    def make(count, base_date=datetime(2025, 1, 1, tzinfo=UTC), wave=3):
+        data = []
+        for i in range(count):
+            price = 100 + i * 0.2 + 3 * math.sin(i / wave)
+            data.append({
+                "timestamp": base_date + timedelta(days=i),
+                "open": price,
+                "high": price + 1,
+                "low": price - 1,
+                "close": price,
+                "volume": 1000000,
+            })
+        return data
+
+    return make
@@ -0,0 +1,124 @@
+"""DataFrame 列式转换测试."""
+
+import math
+import pytest
+import pandas as pd
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+from app.services.frame_converter import (
+    frame_to_records,
+    frame_to_columns,
+    FLOAT,
+    INT,
+    DATETIME,
+)
+from app.services.historical_data.historical_data_fetcher import HistoricalDataFetcher
+
+
+class TestFrameConverter:
+    """frame_converter 测试类."""
+
+    def test_frame_to_records_rename_and_cast(self):
+        """测试列重命名和类型转换."""
+        df = pd.DataFrame({
+            "日期": ["2024-01-02", "2024-01-03"],
+            "收盘": ["10.5", 11],
+            "成交量": [1000.0, None],
+            "其他": [1, 2],
+        })
+
+        records = frame_to_records(
+            df,
+            {"日期": "timestamp", "收盘": "close", "成交量": "volume", "缺失列": "missing"},
+            {"timestamp": DATETIME, "close": FLOAT, "volume": INT},
+            date_format="%Y-%m-%d",
+        )
+
+        assert records == [
+            {"timestamp": datetime(2024, 1, 2), "close": 10.5, "volume": 1000},
+            {"timestamp": datetime(2024, 1, 3), "close": 11.0, "volume": 0},
+        ]
+        # 输出 Python 原生类型
+        assert type(records[0]["close"]) is float
+        assert type(records[0]["volume"]) is int
+        assert type(records[0]["timestamp"]) is datetime
+
+    def test_frame_to_columns_index(self):
+        """测试将索引作为字段输出."""
+        index = pd.date_range("2024-01-01", periods=3, freq="D", tz="America/New_York")
+        df = pd.DataFrame({"Close": [1.0, float("nan"), 3.0]}, index=index)
+
+        columns = frame_to_columns(
+            df, {"Close": "close"}, {"timestamp": DATETIME, "close": FLOAT}, index_as="timestamp"
+        )
+
+        assert list(columns.keys()) == ["timestamp", "close"]
+        assert columns["timestamp"][0] == index[0].to_pydatetime()
+        assert columns["timestamp"][0].tzinfo is not None
+        assert math.isnan(columns["close"][1])
+
+    def test_frame_to_records_empty(self):
+        """测试空 DataFrame."""
+        assert frame_to_records(pd.DataFrame()) == []
+        assert frame_to_records(None) == []
+
+
+class TestHistoricalDataFetcherConversion:
+    """历史数据获取转换测试."""
+
+    @pytest.fixture
+    def fetcher(self):
+        return HistoricalDataFetcher(db=MagicMock())
+
+    @pytest.mark.asyncio
+    async def test_fetch_from_yfinance(self, fetcher):
+        """测试 yfinance 历史数据转换."""
+        index = pd.DatetimeIndex([datetime(2024, 1, 2), datetime(2024, 1, 3)])
+        df = pd.DataFrame({
+            "Open": [1.0, 2.0],
+            "High": [1.5, 2.5],
+            "Low": [0.5, 1.5],
+            "Close": [1.2, 2.2],
+            "Volume": [100, 200],
+            "Dividends": [0.0, 0.0],
+        }, index=index)
+        with patch("app.services.historical_data.historical_data_fetcher.yf.Ticker") as mock_ticker:
+            mock_ticker.return_value.history.return_value = df
+            result = await fetcher.fetch_from_yfinance("AAPL")
+
+        assert result[1] == {
+            "timestamp": datetime(2024, 1, 3),
+            "open": 2.0,
+            "high": 2.5,
+            "low": 1.5,
+            "close": 2.2,
+            "volume": 200,
+            "adj_close": 2.2,
+        }
+
+    @pytest.mark.asyncio
+    async def test_fetch_from_akshare(self, fetcher):
+        """测试 akshare 历史数据转换."""
+        df = pd.DataFrame({
+            "日期": ["2024-01-02", "2024-01-03"],
+            "开盘": [10.0, 10.2],
+            "最高": [10.5, 10.8],
+            "最低": [9.8, 10.1],
+            "收盘": [10.3, 10.6],
+            "成交量": [5000, 6000],
+            "成交额": [51500.0, 63600.0],
+        })
+        with patch("app.services.historical_data.historical_data_fetcher.ak.stock_zh_a_hist") as mock_hist:
+            mock_hist.return_value = df
+            result = await fetcher.fetch_from_akshare("000001")
+
+        assert result[0] == {
+            "timestamp": datetime(2024, 1, 2),
+            "open": 10.0,
+            "high": 10.5,
+            "low": 9.8,
+            "close": 10.3,
+            "volume": 5000,
+            "amount": 51500.0,
+            "adj_close": 10.3,
+        }
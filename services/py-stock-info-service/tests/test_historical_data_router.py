@@ -14,7 +14,7 @@ class TestHistoricalDataRouter:
         with patch(
             "app.routers.historical_data.get_historical_data_service"
         ) as mock_service:
-            mock_service.return_value.query_kline_data = AsyncMock(return_value=[])
+            mock_service.return_value.query_kline_items = AsyncMock(return_value=[])
 
             response = await client.get("/api/v1/historical-data/AAPL")
             assert response.status_code == 200
@@ -42,14 +42,14 @@ class TestHistoricalDataRouter:
         with patch(
             "app.routers.historical_data.get_historical_data_service"
         ) as mock_service:
-            mock_service.return_value.query_kline_data = AsyncMock(return_value=mock_data)
+            mock_service.return_value.query_kline_items = AsyncMock(return_value=mock_data)
 
             response = await client.get("/api/v1/historical-data/AAPL?period=1d")
             assert response.status_code == 200
             data = response.json()
             assert data["code"] == 200
             assert data["data"]["count"] == 1
-            assert len(data["data"]["data"]) == 1
+            assert data["data"]["data"] == mock_data
 
     @pytest.mark.asyncio
     async def test_get_kline_data_with_pagination(self, client):
@@ -65,25 +65,164 @@ class TestHistoricalDataRouter:
                 "volume": 1000000.0,
                 "data_source": "yfinance",
             }
-            for i in range(1, 51)
+            for i in range(1, 21)
         ]
 
         with patch(
             "app.routers.historical_data.get_historical_data_service"
         ) as mock_service:
-            mock_service.return_value.query_kline_data = AsyncMock(return_value=mock_data)
+            mock_service.return_value.query_kline_page = AsyncMock(
+                return_value={"items": mock_data, "total": 50, "next_cursor": "2024-01-20T00:00:00"}
+            )
 
             response = await client.get(
-                "/api/v1/historical-data/AAPL?page=1&page_size=20"
+                "/api/v1/historical-data/AAPL?page=2&page_size=20"
             )
             assert response.status_code == 200
             data = response.json()
             assert data["code"] == 200
             assert data["data"]["total"] == 50
-            assert data["data"]["page"] == 1
+            assert data["data"]["total_pages"] == 3
+            assert data["data"]["page"] == 2
             assert data["data"]["page_size"] == 20
+            assert data["data"]["next_cursor"] == "2024-01-20T00:00:00"
             assert len(data["data"]["items"]) == 20
 
+            # 分页在服务端完成（skip/limit），页码分页默认统计总条数
+            kwargs = mock_service.return_value.query_kline_page.call_args.kwargs
+            assert kwargs["skip"] == 20 and kwargs["after"] is None
+            assert kwargs["include_total"] is True
+
+    @pytest.mark.asyncio
+    async def test_get_kline_data_with_cursor_and_fields(self, client):
+        """测试游标分页和字段投影."""
+        with patch(
+            "app.routers.historical_data.get_historical_data_service"
+        ) as mock_service:
+            mock_service.return_value.query_kline_page = AsyncMock(
+                return_value={
+                    "items": [{"timestamp": "2024-01-09T00:00:00", "close": 103.0}],
+                    "total": None,
+                    "next_cursor": None,
+                }
+            )
+
+            response = await client.get(
+                "/api/v1/historical-data/AAPL?cursor=2024-01-10T00:00:00&fields=timestamp,close"
+            )
+            assert response.status_code == 200
+            data = response.json()["data"]
+            assert data["items"] == [{"timestamp": "2024-01-09T00:00:00", "close": 103.0}]
+            assert data["page"] is None and data["total"] is None and data["next_cursor"] is None
+            kwargs = mock_service.return_value.query_kline_page.call_args.kwargs
+            assert kwargs["after"] == datetime(2024, 1, 10)
+            assert kwargs["fields"] == ["timestamp", "close"]
+            assert kwargs["include_total"] is False
+
+            response = await client.get("/api/v1/historical-data/AAPL?page=1&fields=close,foo")
+            assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_get_kline_data_columnar(self, client):
+        """测试列式响应格式."""
+        columns = {
+            "ticker": "AAPL",
+            "period": "1d",
+            "count": 2,
+            "timestamps": [1704153600000, 1704067200000],
+            "close": [104.0, 103.0],
+        }
+        with patch(
+            "app.routers.historical_data.get_historical_data_service"
+        ) as mock_service:
+            mock_service.return_value.query_kline_columns = AsyncMock(return_value=columns)
+
+            response = await client.get("/api/v1/historical-data/AAPL?format=columnar")
+            assert response.status_code == 200
+            assert response.json()["data"] == columns
+
+            # 未安装 msgpack 时返回参数错误；分页模式只支持 json
+            with patch("app.schemas.response.HAS_MSGPACK", False):
+                response = await client.get("/api/v1/historical-data/AAPL?format=msgpack")
+            assert response.status_code == 400
+            response = await client.get("/api/v1/historical-data/AAPL?format=columnar&page=1")
+            assert response.status_code == 400
+            response = await client.get("/api/v1/historical-data/AAPL?format=xml")
+            assert response.status_code == 422
+
+    def test_fast_json_response(self):
+        """测试直接序列化的 JSON 响应（标准库 json 与 orjson 输出一致）."""
+        from app.schemas.response import FastJSONResponse
+
+        content = {"timestamp": datetime(2024, 1, 1, 9, 30), "close": 103.5, "amount": None, "name": "苹果"}
+        expected = '{"timestamp":"2024-01-01T09:30:00","close":103.5,"amount":null,"name":"苹果"}'.encode()
+        with patch("app.schemas.response.HAS_ORJSON", False):
+            assert FastJSONResponse(content).body == expected
+        pytest.importorskip("orjson")
+        assert FastJSONResponse(content).body == expected
+
+    def test_fast_json_response_non_finite(self):
+        """测试 NaN / Infinity 输出为 null（标准库 json 与 orjson 一致）."""
+        from app.schemas.response import FastJSONResponse
+
+        content = {"values": [1.5, float("nan")], "close": float("inf"), "rows": [{"v": float("-inf")}]}
+        expected = b'{"values":[1.5,null],"close":null,"rows":[{"v":null}]}'
+        with patch("app.schemas.response.HAS_ORJSON", False):
+            assert FastJSONResponse(content).body == expected
+        pytest.importorskip("orjson")
+        assert FastJSONResponse(content).body == expected
+
+    @pytest.mark.asyncio
+    async def test_get_kline_data_msgpack(self, client):
+        """测试 MessagePack 响应格式."""
+        msgpack = pytest.importorskip("msgpack")
+        columns = {"ticker": "AAPL", "period": "1d", "count": 1, "timestamps": [1704067200000], "close": [103.0]}
+        with patch(
+            "app.routers.historical_data.get_historical_data_service"
+        ) as mock_service:
+            mock_service.return_value.query_kline_columns = AsyncMock(return_value=columns)
+
+            response = await client.get("/api/v1/historical-data/AAPL?format=msgpack")
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/x-msgpack"
+            assert msgpack.unpackb(response.content)["data"] == columns
+
+    @pytest.mark.asyncio
+    async def test_export_kline_data(self, client):
+        """测试流式导出接口."""
+        async def batches():
+            yield [{"timestamp": datetime(2024, 1, 1), "close": 103.0, "volume": 1000}]
+            yield [{"timestamp": datetime(2024, 1, 2), "close": 104.0, "volume": 1100}]
+
+        with patch(
+            "app.routers.historical_data.get_historical_data_service"
+        ) as mock_service:
+            mock_service.return_value.iter_kline_batches = MagicMock(side_effect=lambda **_: batches())
+
+            response = await client.get(
+                "/api/v1/historical-data/AAPL/export?format=csv&start_date=2024-01-01&batch_size=500"
+            )
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/csv")
+            assert 'filename="AAPL_1d.csv"' in response.headers["content-disposition"]
+            lines = response.text.splitlines()
+            assert lines[0].startswith("timestamp,open")
+            assert lines[1].startswith("2024-01-01T00:00:00,,,,103.0,1000")
+            kwargs = mock_service.return_value.iter_kline_batches.call_args.kwargs
+            assert kwargs["start_date"] == datetime(2024, 1, 1) and kwargs["batch_size"] == 500
+
+            response = await client.get("/api/v1/historical-data/AAPL/export")
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/x-ndjson"
+            assert len(response.text.splitlines()) == 2
+
+            # 未安装 pyarrow 时返回参数错误；未知格式校验失败
+            with patch("app.services.historical_data.kline_export.HAS_PYARROW", False):
+                response = await client.get("/api/v1/historical-data/AAPL/export?format=arrow")
+            assert response.status_code == 400
+            response = await client.get("/api/v1/historical-data/AAPL/export?format=xml")
+            assert response.status_code == 422
+
     @pytest.mark.asyncio
     async def test_get_kline_data_statistics(self, client):
         """测试获取统计信息."""
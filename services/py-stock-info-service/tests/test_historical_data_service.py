@@ -11,7 +11,8 @@ from app.services.historical_data import (
     HistoricalDataStorage,
     HistoricalDataQuery,
 )
-from app.models.kline_data import prepare_kline_document, validate_kline_data
+from app.models.kline_data import prepare_kline_document, validate_kline_batch, validate_kline_data
+from app.schemas.historical_data import KlineDataResponse
 
 
 @pytest.fixture
@@ -103,6 +104,24 @@ class TestKlineDataModel:
         }
         assert validate_kline_data(invalid_data) is False
     
+    def test_validate_kline_batch(self, sample_kline_data):
+        """测试批量验证与逐条验证结果一致（缺失值、NaN、无法转换的值视为无效）."""
+        base = sample_kline_data[0]
+        rows = sample_kline_data + [
+            {**base, "high": 99.0, "low": 100.0},
+            {**base, "volume": -1000},
+            {**base, "low": 0.0},
+            {**base, "close": 106.0},
+            {**base, "open": "100.5"},
+            {key: value for key, value in base.items() if key != "close"},
+        ]
+        expected = [validate_kline_data(row) for row in rows]
+        assert validate_kline_batch(rows).tolist() == expected
+        
+        odd = [{**base, "close": None}, {**base, "open": float("nan")}, {**base, "volume": "abc"}]
+        assert validate_kline_batch(odd).tolist() == [False, False, False]
+        assert validate_kline_batch([]).tolist() == []
+    
     def test_prepare_kline_document(self, sample_kline_data):
         """测试准备K线文档."""
         data = sample_kline_data[0]
@@ -225,7 +244,246 @@ class TestHistoricalDataQuery:
         )
         # 应该返回最近2条数据
         assert len(results) >= 1
-    
+
+    @pytest.mark.asyncio
+    async def test_query_by_ticker_uses_kline_cache(self, mock_db):
+        """测试K线窗口缓存：范围内查询不再访问数据库，写入后失效."""
+        from unittest.mock import patch
+        from app.services.historical_data.kline_cache import KlineCache
+
+        base = datetime(2024, 1, 1)
+        klines = [
+            {
+                "timestamp": base + timedelta(days=i),
+                "open": 100.0 + i,
+                "high": 101.0 + i,
+                "low": 99.0 + i,
+                "close": 100.5 + i,
+                "volume": 1000 + i,
+            }
+            for i in range(30)
+        ]
+        storage = HistoricalDataStorage(mock_db)
+        query = HistoricalDataQuery(mock_db)
+        cache = KlineCache(max_bytes=1024 * 1024)
+        storage.cache = query.cache = cache
+        await storage.save_kline_data("AAPL", "NASDAQ", "1d", klines, "yfinance")
+
+        # 缓存结果与数据库查询结果一致
+        full = await query.query_by_ticker("AAPL", "1d")
+        cached_query = HistoricalDataQuery(mock_db)
+        cached_query.cache = KlineCache(max_bytes=0)
+        assert full == await cached_query.query_by_ticker("AAPL", "1d")
+
+        with patch.object(query.collection, "find", side_effect=AssertionError("不应访问数据库")):
+            window = await query.query_by_ticker(
+                "AAPL", "1d", start_date=base + timedelta(days=5), end_date=base + timedelta(days=9),
+                sort_desc=False,
+            )
+            latest = await query.query_by_ticker("AAPL", "1d", limit=3)
+            missing = await query.get_kline_window("AAPL", "1d", base, base + timedelta(days=29))
+        assert [item["close"] for item in window] == [105.5, 106.5, 107.5, 108.5, 109.5]
+        assert [item["close"] for item in latest] == [129.5, 128.5, 127.5]
+        assert len(missing) == 30
+        assert cache.hits == 3 and cache.misses == 1
+
+        # 写入后缓存失效，再次查询读取新数据
+        await storage.save_kline_data(
+            "AAPL", "NASDAQ", "1d", [{**klines[-1], "timestamp": base + timedelta(days=30)}], "yfinance"
+        )
+        assert cache.get_metrics()["entries"] == 0
+        latest = await query.query_by_ticker("AAPL", "1d", limit=1)
+        assert latest[0]["timestamp"] == base + timedelta(days=30)
+
+        # 超过容量时淘汰最久未使用的窗口
+        size = (await query.get_kline_window("AAPL", "1d", base, base + timedelta(days=29))).nbytes
+        small = KlineCache(max_bytes=size + 1)
+        storage.cache = query.cache = small
+        await storage.save_kline_data("MSFT", "NASDAQ", "1d", klines, "yfinance")
+        await query.query_by_ticker("AAPL", "1d", start_date=base, end_date=base + timedelta(days=29))
+        await query.query_by_ticker("MSFT", "1d")
+        assert small.get_metrics()["evictions"] == 1
+        assert small.get_metrics()["entries"] == 1
+        assert small.bytes <= small.max_bytes
+
+    @pytest.mark.asyncio
+    async def test_query_columns(self, mock_db):
+        """测试列式查询与逐条记录一致（毫秒时间戳，缺失字段为 None）."""
+        base = datetime(2024, 1, 1)
+        klines = [
+            {
+                "timestamp": base + timedelta(days=i),
+                "open": 100.0 + i,
+                "high": 101.0 + i,
+                "low": 99.0 + i,
+                "close": 100.5 + i,
+                "volume": 1000 + i,
+                **({"amount": 1e6 + i} if i % 2 else {}),
+            }
+            for i in range(5)
+        ]
+        await HistoricalDataStorage(mock_db).save_kline_data("AAPL", "NASDAQ", "1d", klines, "yfinance")
+        query = HistoricalDataQuery(mock_db)
+
+        records = await query.query_by_ticker("AAPL", "1d", limit=3)
+        columns = await query.query_columns("AAPL", "1d", limit=3)
+        assert columns["count"] == 3
+        assert columns["timestamps"] == [
+            int(record["timestamp"].replace(tzinfo=UTC).timestamp() * 1000) for record in records
+        ]
+        assert columns["close"] == [record["close"] for record in records]
+        assert columns["volume"] == [record["volume"] for record in records]
+        assert columns["amount"] == [record.get("amount") for record in records]
+        assert columns["amount"][0] is None
+        assert columns["data_source"] == ["yfinance"] * 3
+
+        # 接口响应格式：字段同 KlineDataResponse，时间为 ISO 8601 字符串
+        items = await query.query_items("AAPL", "1d", limit=3)
+        assert [item["timestamp"] for item in items] == [record["date"] for record in records]
+        assert [item["close"] for item in items] == columns["close"]
+        assert items[0]["amount"] is None and items[1]["amount"] == records[1]["amount"]
+        assert KlineDataResponse(**items[1]).model_dump() == {**items[1], "volume": float(items[1]["volume"])}
+
+    @pytest.mark.asyncio
+    async def test_query_page_keyset_pagination(self, mock_db):
+        """测试数据库端分页：游标分页、页码分页、字段投影和计数."""
+        from unittest.mock import patch
+
+        base = datetime(2024, 1, 1)
+        klines = [
+            {
+                "timestamp": base + timedelta(days=i),
+                "open": 100.0 + i,
+                "high": 101.0 + i,
+                "low": 99.0 + i,
+                "close": 100.5 + i,
+                "volume": 1000 + i,
+            }
+            for i in range(25)
+        ]
+        await HistoricalDataStorage(mock_db).save_kline_data("AAPL", "NASDAQ", "1d", klines, "yfinance")
+        service = HistoricalDataService(mock_db)
+
+        # 游标分页依次取完全部数据（按时间降序，不重复不遗漏）
+        closes, after = [], None
+        while True:
+            page = await service.query_kline_page(
+                "AAPL", "1d", page_size=10, fields=["close"],
+                after=datetime.fromisoformat(after) if after else None,
+            )
+            assert all(set(item) == {"timestamp", "close"} for item in page["items"])
+            closes.extend(item["close"] for item in page["items"])
+            after = page["next_cursor"]
+            if after is None:
+                break
+        assert closes == [100.5 + i for i in reversed(range(25))]
+        assert page["total"] is None
+
+        # 页码分页 + 总条数 + limit
+        page = await service.query_kline_page(
+            "AAPL", "1d", page_size=10, skip=10, include_total=True
+        )
+        assert [item["close"] for item in page["items"]] == [100.5 + i for i in range(14, 4, -1)]
+        assert page["items"][0]["date"] == page["items"][0]["timestamp"]
+        assert page["total"] == 25 and page["next_cursor"] is not None
+        page = await service.query_kline_page(
+            "AAPL", "1d", page_size=10, skip=10, limit=15, include_total=True
+        )
+        assert len(page["items"]) == 5
+        assert page["total"] == 15 and page["next_cursor"] is None
+
+        # 时间范围计数（缓存窗口覆盖时不访问数据库）
+        query = service.query
+        start, end = base + timedelta(days=3), base + timedelta(days=7)
+        assert await query.count_by_ticker("AAPL", "1d", start, end) == 5
+        await query.query_by_ticker("AAPL", "1d")
+        with patch.object(query.collection, "count_documents", side_effect=AssertionError("不应访问数据库")):
+            assert await query.count_by_ticker("AAPL", "1d", start, end) == 5
+
+    @pytest.mark.asyncio
+    async def test_export_stream(self, mock_db):
+        """测试流式导出：按批读取游标，NDJSON / CSV 逐批输出（按时间升序）."""
+        import csv
+        import json
+
+        from app.services.historical_data.kline_export import export_stream
+
+        base = datetime(2024, 1, 1)
+        klines = [
+            {
+                "timestamp": base + timedelta(days=i),
+                "open": 100.0 + i,
+                "high": 101.0 + i,
+                "low": 99.0 + i,
+                "close": 100.5 + i,
+                "volume": 1000 + i,
+            }
+            for i in range(7)
+        ]
+        await HistoricalDataStorage(mock_db).save_kline_data("AAPL", "NASDAQ", "1d", klines, "yfinance")
+        service = HistoricalDataService(mock_db)
+
+        batches = [batch async for batch in service.iter_kline_batches("AAPL", "1d", batch_size=3)]
+        assert [len(batch) for batch in batches] == [3, 3, 1]
+        assert all("metadata" not in doc and "_id" not in doc for batch in batches for doc in batch)
+
+        chunks = [
+            chunk
+            async for chunk in export_stream(
+                service.iter_kline_batches("AAPL", "1d", start_date=base + timedelta(days=2), batch_size=2),
+                "ndjson",
+            )
+        ]
+        assert len(chunks) == 3
+        rows = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+        assert [row["close"] for row in rows] == [100.5 + i for i in range(2, 7)]
+        assert rows[0]["timestamp"] == (base + timedelta(days=2)).isoformat()
+        assert rows[0]["amount"] is None and rows[0]["data_source"] == "yfinance"
+
+        chunks = [
+            chunk
+            async for chunk in export_stream(service.iter_kline_batches("AAPL", "1d", batch_size=4), "csv")
+        ]
+        rows = list(csv.DictReader(b"".join(chunks).decode().splitlines()))
+        assert len(chunks) == 2 and len(rows) == 7
+        assert float(rows[-1]["close"]) == 106.5 and rows[-1]["amount"] == ""
+
+        # 没有数据时 CSV 只输出表头
+        chunks = [
+            chunk
+            async for chunk in export_stream(service.iter_kline_batches("MSFT", "1d"), "csv")
+        ]
+        assert b"".join(chunks).decode().startswith("timestamp,open,high")
+
+        with pytest.raises(ValueError):
+            export_stream(service.iter_kline_batches("AAPL", "1d"), "xml")
+
+    @pytest.mark.asyncio
+    async def test_export_stream_arrow(self, mock_db):
+        """测试 Arrow IPC 流导出（每批一个 RecordBatch）."""
+        pa = pytest.importorskip("pyarrow")
+        from app.services.historical_data.kline_export import export_stream
+
+        base = datetime(2024, 1, 1)
+        klines = [
+            {"timestamp": base + timedelta(days=i), "open": 1.0, "high": 2.0, "low": 0.5,
+             "close": 1.5 + i, "volume": 100 + i}
+            for i in range(5)
+        ]
+        await HistoricalDataStorage(mock_db).save_kline_data("AAPL", "NASDAQ", "1d", klines, "yfinance")
+        service = HistoricalDataService(mock_db)
+
+        chunks = [
+            chunk
+            async for chunk in export_stream(service.iter_kline_batches("AAPL", "1d", batch_size=2), "arrow")
+        ]
+        reader = pa.ipc.open_stream(b"".join(chunks))
+        record_batches = list(reader)
+        assert [batch.num_rows for batch in record_batches] == [2, 2, 1]
+        table = pa.Table.from_batches(record_batches)
+        assert table.column("close").to_pylist() == [1.5 + i for i in range(5)]
+        assert table.column("amount").null_count == 5
+
     @pytest.mark.asyncio
     async def test_get_latest_date(self, mock_db, sample_kline_data):
         """测试获取最新数据日期."""
@@ -312,3 +570,274 @@ class TestHistoricalDataService:
         # 获取统计信息
         stats = await service.get_kline_data_statistics("AAPL", "1d")
         assert stats["total_count"] == len(sample_kline_data)
+    
+    @pytest.mark.asyncio
+    async def test_fetch_batch_kline_data_uses_batch_download(self, mock_db):
+        """测试美股批量获取使用 yf.download 批量下载，A股逐只获取."""
+        from unittest.mock import AsyncMock, patch
+        service = HistoricalDataService(mock_db)
+        bar = {
+            "timestamp": datetime(2024, 1, 2, tzinfo=UTC),
+            "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 100,
+        }
+        service.fetcher.fetch_batch_from_yfinance = AsyncMock(
+            return_value={"AAPL": [bar], "MSFT": [bar], "XXXX": []}
+        )
+        service.fetcher.fetch_kline_data = AsyncMock(return_value=[bar])
+        service.storage.upsert_kline_batch = AsyncMock(
+            side_effect=lambda items: {
+                ticker: {"inserted": len(data), "updated": 0}
+                for ticker, _, _, data, _ in items
+            }
+        )
+        
+        with patch("app.services.historical_data.historical_data_service.asyncio.sleep", new=AsyncMock()):
+            result = await service.fetch_batch_kline_data(
+                ["AAPL", "MSFT", "XXXX", "000001"],
+                {"AAPL": "NASDAQ", "MSFT": "NASDAQ", "XXXX": "NASDAQ", "000001": "A股"},
+            )
+        
+        # 美股一次批量下载，只有 A股逐只获取
+        service.fetcher.fetch_batch_from_yfinance.assert_awaited_once()
+        assert service.fetcher.fetch_batch_from_yfinance.await_args.args[0] == ["AAPL", "MSFT", "XXXX"]
+        service.fetcher.fetch_kline_data.assert_awaited_once()
+        assert service.fetcher.fetch_kline_data.await_args.args[0] == "000001"
+        assert result["success"] == 3
+        assert result["failed"] == 1
+        assert [r["ticker"] for r in result["results"]] == ["AAPL", "MSFT", "XXXX", "000001"]
+
+
+class TestHistoricalDataFetcherBatch:
+    """测试 yfinance 批量下载."""
+    
+    @pytest.mark.asyncio
+    async def test_fetch_batch_from_yfinance(self, mock_db):
+        """测试按股票拆分 yf.download 的结果."""
+        from unittest.mock import patch
+        import numpy as np
+        import pandas as pd
+        
+        index = pd.DatetimeIndex(
+            [datetime(2024, 1, 2), datetime(2024, 1, 3)]
+        ).tz_localize("America/New_York")
+        fields = ["Open", "High", "Low", "Close", "Volume"]
+        columns = pd.MultiIndex.from_product([["AAPL", "MSFT"], fields])
+        df = pd.DataFrame(
+            [
+                [1.0, 2.0, 0.5, 1.5, 100, 10.0, 11.0, 9.0, 10.5, 1000],
+                [1.5, 2.5, 1.0, 2.0, 200, np.nan, np.nan, np.nan, np.nan, np.nan],
+            ],
+            index=index,
+            columns=columns,
+        )
+        fetcher = HistoricalDataFetcher(mock_db)
+        
+        with patch("app.services.historical_data.historical_data_fetcher.yf.download") as mock_download:
+            mock_download.return_value = df
+            results = await fetcher.fetch_batch_from_yfinance(
+                ["AAPL", "MSFT", "NOPE"], chunk_size=10
+            )
+        
+        mock_download.assert_called_once()
+        assert mock_download.call_args.kwargs["tickers"] == ["AAPL", "MSFT", "NOPE"]
+        assert len(results["AAPL"]) == 2
+        assert results["AAPL"][1]["close"] == 2.0
+        assert results["AAPL"][1]["volume"] == 200
+        assert results["AAPL"][0]["timestamp"] == index[0].to_pydatetime()
+        # MSFT 第二天没有数据
+        assert len(results["MSFT"]) == 1
+        assert results["NOPE"] == []
+    
+    @pytest.mark.asyncio
+    async def test_fetch_batch_from_yfinance_chunk_failure(self, mock_db):
+        """测试分组下载失败时不返回该组股票（由调用方逐只获取）."""
+        from unittest.mock import patch
+        fetcher = HistoricalDataFetcher(mock_db)
+        
+        with patch("app.services.historical_data.historical_data_fetcher.yf.download") as mock_download:
+            mock_download.side_effect = Exception("网络错误")
+            results = await fetcher.fetch_batch_from_yfinance(["AAPL", "MSFT"], chunk_size=1)
+        
+        assert mock_download.call_count == 2
+        assert results == {}
+    
+    @pytest.mark.asyncio
+    async def test_fetch_batch_from_yfinance_concurrent_chunks(self, mock_db):
+        """测试各分组并发下载，同时执行的分组数不超过 yfinance 线程池的线程数."""
+        import threading
+        import time
+        from unittest.mock import patch
+        import pandas as pd
+        from app.services.providers.executor import ProviderExecutor
+        
+        lock = threading.Lock()
+        running = []
+        peak = []
+        
+        def fake_download(tickers, **kwargs):
+            with lock:
+                running.append(tickers)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(tickers)
+            if tickers == ["FAIL"]:
+                raise Exception("网络错误")
+            return pd.DataFrame()
+        
+        executor = ProviderExecutor("yfinance-test", max_workers=2, max_queue=0)
+        fetcher = HistoricalDataFetcher(mock_db)
+        module = "app.services.historical_data.historical_data_fetcher"
+        try:
+            with patch(f"{module}.get_provider_executor", return_value=executor), \
+                    patch(f"{module}.yf.download", side_effect=fake_download) as mock_download:
+                results = await fetcher.fetch_batch_from_yfinance(
+                    ["A", "B", "FAIL", "C", "D"], chunk_size=1
+                )
+        finally:
+            executor.shutdown()
+        
+        assert mock_download.call_count == 5
+        assert max(peak) == 2
+        assert executor.get_metrics()["rejected"] == 0
+        assert results == {"A": [], "B": [], "C": [], "D": []}
+
+
+class TestHistoricalDataPipeline:
+    """测试批量获取流水线."""
+    
+    @pytest.mark.asyncio
+    async def test_upsert_kline_batch(self, mock_db, sample_kline_data, fake_bulk_write):
+        """测试跨股票批量 upsert."""
+        storage = HistoricalDataStorage(mock_db)
+        await storage.upsert_kline_batch(
+            [("AAPL", "NASDAQ", "1d", sample_kline_data[:1], "yfinance")]
+        )
+        
+        invalid = {**sample_kline_data[0], "high": 1.0}
+        results = await storage.upsert_kline_batch([
+            ("AAPL", "NASDAQ", "1d", sample_kline_data, "yfinance"),
+            ("MSFT", "NASDAQ", "1d", sample_kline_data[:2] + [invalid], "yfinance"),
+        ])
+        
+        # 两次调用各一次 bulk_write
+        assert fake_bulk_write == [1, 5]
+        assert results["AAPL"] == {"inserted": 2, "updated": 1}
+        assert results["MSFT"] == {"inserted": 2, "updated": 0}
+        assert await mock_db.kline_data.count_documents({}) == 5
+        
+        # 按 batch_rows 分批写入，一批跨多只股票，按股票分别统计
+        fake_bulk_write.clear()
+        results = await storage.upsert_kline_batch(
+            [
+                ("AAPL", "NASDAQ", "1d", sample_kline_data, "yfinance"),
+                ("MSFT", "NASDAQ", "1d", sample_kline_data, "yfinance"),
+                ("NVDA", "NASDAQ", "1d", sample_kline_data[:1], "yfinance"),
+            ],
+            batch_rows=2,
+        )
+        assert fake_bulk_write == [2, 2, 2, 1]
+        assert results["AAPL"] == {"inserted": 0, "updated": 3}
+        assert results["MSFT"] == {"inserted": 1, "updated": 2}
+        assert results["NVDA"] == {"inserted": 1, "updated": 0}
+        assert await mock_db.kline_data.count_documents({}) == 7
+    
+    @pytest.mark.asyncio
+    async def test_append_kline_data(self, mock_db, sample_kline_data, fake_bulk_write):
+        """测试追加保存：最新时间之后的K线直接插入，重叠的K线 upsert."""
+        from unittest.mock import AsyncMock, patch
+
+        service = HistoricalDataService(mock_db)
+        await service.storage.save_kline_data("AAPL", "NASDAQ", "1d", sample_kline_data[:2], "yfinance")
+        latest_date = await service.query.get_latest_date("AAPL", "1d")
+
+        newest = sample_kline_data[2]
+        fetched = [
+            {**sample_kline_data[1], "close": 104.0},
+            newest,
+            {**newest, "timestamp": newest["timestamp"] + timedelta(days=1)},
+            {**newest, "timestamp": newest["timestamp"] + timedelta(days=1)},
+        ]
+        result = await service.storage.append_kline_data(
+            "AAPL", "NASDAQ", "1d", fetched, "yfinance", latest_date
+        )
+        # 只有与已有数据重叠的 1 条走 bulk_write
+        assert fake_bulk_write == [1]
+        assert result == {"inserted": 2, "updated": 1}
+        assert await mock_db.kline_data.count_documents({}) == 4
+        closes = [item["close"] for item in await service.query.query_by_ticker("AAPL", "1d", sort_desc=False)]
+        assert closes == [103.0, 104.0, 109.0, 109.0]
+
+        # 不带时区的字符串时间（视为 UTC）同样按最新时间拆分
+        result = await service.save_fetched_kline_data(
+            "MSFT", "NASDAQ", "1d",
+            [{**newest, "timestamp": "2024-01-02"}, {**newest, "timestamp": "2024-01-03"}],
+            "yfinance", append=True, latest_date=datetime(2024, 1, 2),
+        )
+        assert fake_bulk_write == [1, 1]
+        assert result["inserted"] == 2 and result["updated"] == 0
+        assert await mock_db.kline_data.count_documents({"metadata.ticker": "MSFT"}) == 2
+
+        # 增量更新以最新数据日期作为追加保存的分界
+        with patch.object(service.query, "get_latest_date", AsyncMock(return_value=datetime(2024, 1, 1))), \
+                patch.object(service.fetcher, "fetch_kline_data", AsyncMock(return_value=fetched)), \
+                patch.object(
+                    service.storage, "append_kline_data",
+                    AsyncMock(return_value={"inserted": 3, "updated": 0}),
+                ) as append:
+            result = await service.update_kline_data_incremental("AAPL", "NASDAQ", "1d")
+        assert append.call_args.args[-1] == datetime(2024, 1, 1)
+        assert result["inserted"] == 3
+
+    @pytest.mark.asyncio
+    async def test_fetch_batch_kline_data_pipeline(self, mock_db, sample_kline_data, fake_bulk_write):
+        """测试并发获取、合并写入和进度推送."""
+        import asyncio
+        from unittest.mock import AsyncMock, patch
+        service = HistoricalDataService(mock_db)
+        in_flight = 0
+        max_in_flight = 0
+        real_sleep = asyncio.sleep
+        
+        async def fake_fetch(ticker, market, period, start_date, end_date, data_source=None):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await real_sleep(0.01)
+            in_flight -= 1
+            if ticker == "000003":
+                raise Exception("网络错误")
+            return [] if ticker == "000004" else sample_kline_data
+        
+        service.fetcher.fetch_kline_data = fake_fetch
+        events = []
+        
+        async def on_progress(event):
+            events.append(event)
+        
+        tickers = ["000001", "000002", "000003", "000004", "000005"]
+        with patch("app.services.historical_data.historical_data_service.asyncio.sleep", new=AsyncMock()):
+            result = await service.fetch_batch_kline_data(
+                tickers,
+                {ticker: "A股" for ticker in tickers},
+                progress_callback=on_progress,
+                concurrency=3,
+            )
+        
+        assert max_in_flight == 3
+        assert result["success"] == 3
+        assert result["failed"] == 2
+        assert [r["ticker"] for r in result["results"]] == tickers
+        assert result["results"][2]["error"] == "网络错误"
+        assert result["results"][3]["error"] == "未获取到数据"
+        assert result["results"][0]["inserted"] == len(sample_kline_data)
+        # 多只股票合并写入，bulk_write 次数少于成功股票数
+        assert sum(fake_bulk_write) == 3 * len(sample_kline_data)
+        assert len(fake_bulk_write) < 3
+        
+        stages = [event["stage"] for event in events]
+        assert stages[0] == "init"
+        assert stages[-1] == "completed"
+        assert stages.count("fetching") == 5
+        assert "saving" in stages
+        assert events[-1]["result"] == {"total": 5, "success": 3, "failed": 2}
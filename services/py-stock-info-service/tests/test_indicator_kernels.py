@@ -0,0 +1,185 @@
+"""技术指标 NumPy 内核测试（与 pandas-ta 对比）."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.indicators import indicator_kernels as kernels
+from app.services.indicators.indicator_calculator import IndicatorCalculator
+
+ta = pytest.importorskip("pandas_ta")
+
+
+def assert_parity(actual, expected):
+    """NaN 位置一致，其余值在浮点误差范围内一致."""
+    expected = np.full(len(actual), np.nan) if expected is None else np.asarray(expected, dtype=float)
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.fixture(params=[5, 40, 2000])
+def close(request):
+    """随机游走收盘价（包含数据不足窗口的长度）."""
+    rng = np.random.default_rng(request.param)
+    return pd.Series(100 + rng.normal(0, 1, request.param).cumsum())
+
+
+@pytest.fixture
+def ohlcv(close):
+    """由收盘价生成的最高价、最低价和成交量."""
+    rng = np.random.default_rng(len(close))
+    high = close + rng.uniform(0, 2, len(close))
+    low = close - rng.uniform(0, 2, len(close))
+    volume = pd.Series(rng.uniform(1e5, 1e6, len(close)))
+    return high, low, close, volume
+
+
+class TestIndicatorKernels:
+    """NumPy 内核与 pandas-ta 一致性测试."""
+
+    @pytest.mark.parametrize("length", [5, 20, 60])
+    def test_sma(self, close, length):
+        """测试 SMA."""
+        assert_parity(kernels.sma(close.to_numpy(), length), ta.sma(close, length=length))
+
+    @pytest.mark.parametrize("length", [12, 26])
+    def test_ema(self, close, length):
+        """测试 EMA（SMA 种子）."""
+        assert_parity(kernels.ema(close.to_numpy(), length), ta.ema(close, length=length))
+
+    @pytest.mark.parametrize("length", [6, 14])
+    def test_rsi(self, close, length):
+        """测试 RSI（Wilder 平滑）."""
+        assert_parity(kernels.rsi(close.to_numpy(), length), ta.rsi(close, length=length))
+
+    def test_macd(self, close):
+        """测试 MACD."""
+        dif, dea, hist = kernels.macd(close.to_numpy(), 12, 26, 9)
+        expected = ta.macd(close, fast=12, slow=26, signal=9)
+        if expected is None:
+            expected = {"MACD_12_26_9": None, "MACDs_12_26_9": None, "MACDh_12_26_9": None}
+        assert_parity(dif, expected["MACD_12_26_9"])
+        assert_parity(dea, expected["MACDs_12_26_9"])
+        assert_parity(hist, expected["MACDh_12_26_9"])
+
+    @pytest.mark.parametrize("std_dev", [2.0, 2.5])
+    def test_bbands(self, close, std_dev):
+        """测试布林带."""
+        upper, mid, lower = kernels.bbands(close.to_numpy(), 20, std_dev)
+        expected = ta.bbands(close, length=20, lower_std=std_dev, upper_std=std_dev)
+        suffix = f"20_{std_dev}_{std_dev}"
+        if expected is None:
+            expected = {f"BBU_{suffix}": None, f"BBM_{suffix}": None, f"BBL_{suffix}": None}
+        assert_parity(upper, expected[f"BBU_{suffix}"])
+        assert_parity(mid, expected[f"BBM_{suffix}"])
+        assert_parity(lower, expected[f"BBL_{suffix}"])
+
+    @pytest.mark.parametrize("length", [5, 14])
+    def test_atr(self, ohlcv, length):
+        """测试 ATR（Wilder 平滑，SMA 种子）."""
+        high, low, close, _ = ohlcv
+        assert_parity(
+            kernels.atr(high.to_numpy(), low.to_numpy(), close.to_numpy(), length),
+            ta.atr(high, low, close, length=length),
+        )
+
+    @pytest.mark.parametrize("length", [5, 14])
+    def test_willr(self, ohlcv, length):
+        """测试 Williams %R."""
+        high, low, close, _ = ohlcv
+        assert_parity(
+            kernels.willr(high.to_numpy(), low.to_numpy(), close.to_numpy(), length),
+            ta.willr(high, low, close, length=length),
+        )
+
+    def test_obv(self, ohlcv):
+        """测试 OBV（pandas-ta 从第二根K线开始累加，相差第一根K线的成交量）."""
+        _, _, close, volume = ohlcv
+        actual = kernels.obv(close.to_numpy(), volume.to_numpy())
+        assert actual[0] == volume.iloc[0]
+        assert_parity(actual[1:] - volume.iloc[0], ta.obv(close, volume).to_numpy()[1:])
+
+    def test_cci(self, ohlcv):
+        """测试 CCI（按定义计算的参考值）."""
+        high, low, close, _ = ohlcv
+        typical = (high + low + close) / 3
+        mean = typical.rolling(14).mean()
+        deviation = typical.rolling(14).apply(lambda x: np.abs(x - x.mean()).mean(), raw=True)
+        assert_parity(
+            kernels.cci(high.to_numpy(), low.to_numpy(), close.to_numpy(), 14),
+            (typical - mean) / (0.015 * deviation),
+        )
+
+    def test_kdj(self, ohlcv):
+        """测试 KDJ（逐根递推的参考实现，K、D 初始值为 50）."""
+        high, low, close, _ = ohlcv
+        k, d, j = kernels.kdj(high.to_numpy(), low.to_numpy(), close.to_numpy(), 9, 3, 3)
+        expected_k = np.full(len(close), np.nan)
+        expected_d = np.full(len(close), np.nan)
+        prev_k = prev_d = 50.0
+        for i in range(8, len(close)):
+            highest, lowest = high.iloc[i - 8 : i + 1].max(), low.iloc[i - 8 : i + 1].min()
+            rsv = 100 * (close.iloc[i] - lowest) / (highest - lowest)
+            prev_k = prev_k * 2 / 3 + rsv / 3
+            prev_d = prev_d * 2 / 3 + prev_k / 3
+            expected_k[i], expected_d[i] = prev_k, prev_d
+        assert_parity(k, expected_k)
+        assert_parity(d, expected_d)
+        assert_parity(j, 3 * expected_k - 2 * expected_d)
+
+    def test_panel_matches_single_series(self, ohlcv):
+        """测试面板计算（较短的列末尾为 NaN）与逐列计算一致."""
+        high, low, close, volume = (series.to_numpy() for series in ohlcv)
+        short = max(len(close) // 2, 1)
+
+        def panel(values):
+            padded = np.full(len(values), np.nan)
+            padded[:short] = values[:short]
+            return np.column_stack([values, padded])
+
+        kernels_under_test = [
+            lambda h, l, c, v: kernels.atr(h, l, c, 14),
+            lambda h, l, c, v: kernels.kdj(h, l, c, 9, 3, 3)[2],
+            lambda h, l, c, v: kernels.obv(c, v),
+            lambda h, l, c, v: kernels.vwap(h, l, c, v, 20),
+            lambda h, l, c, v: kernels.cci(h, l, c, 14),
+            lambda h, l, c, v: kernels.willr(h, l, c, 14),
+        ]
+        for kernel in kernels_under_test:
+            result = kernel(panel(high), panel(low), panel(close), panel(volume))
+            assert_parity(result[:, 0], kernel(high, low, close, volume))
+            assert_parity(
+                result[:short, 1], kernel(high[:short], low[:short], close[:short], volume[:short])
+            )
+
+
+@pytest.mark.asyncio
+async def test_calculator_backends_match():
+    """测试两个计算后端的指标结果一致."""
+    rng = np.random.default_rng(0)
+    timestamps = pd.date_range("2024-01-01", periods=120, freq="D")
+    close = 100 + rng.normal(0, 1, len(timestamps)).cumsum()
+    kline_data = [
+        {"timestamp": ts.to_pydatetime(), "open": c, "high": c + 1, "low": c - 1, "close": c, "volume": 1000}
+        for ts, c in zip(timestamps, close)
+    ]
+    indicators = [
+        {"name": "MA20", "type": "MA", "params": {"period": 20}},
+        {"name": "EMA12", "type": "EMA", "params": {"period": 12}},
+        {"name": "RSI14", "type": "RSI", "params": {"period": 14}},
+        {"name": "MACD_DIF", "type": "MACD", "params": {"fast": 12, "slow": 26, "signal": 9}},
+        {"name": "MACD_HIST", "type": "MACD", "params": {"fast": 12, "slow": 26, "signal": 9}},
+        {"name": "BOLL_UP", "type": "BOLL", "params": {"period": 20, "std_dev": 2.5}},
+    ]
+
+    numpy_results, _ = await IndicatorCalculator(backend="numpy").calculate_batch("TEST", indicators, kline_data)
+    ta_results, _ = await IndicatorCalculator(backend="pandas_ta").calculate_batch("TEST", indicators, kline_data)
+
+    for indicator in indicators:
+        name = indicator["name"]
+        assert [item["timestamp"] for item in numpy_results[name]] == [item["timestamp"] for item in ta_results[name]]
+        np.testing.assert_allclose(
+            [item["value"] for item in numpy_results[name]],
+            [item["value"] for item in ta_results[name]],
+            rtol=1e-9,
+        )
@@ -3,6 +3,7 @@
 import pytest
 from datetime import datetime, UTC, timedelta
 from app.services.indicators import IndicatorService
+from app.schemas.indicators import IndicatorDataResponse
 
 
 @pytest.fixture
@@ -309,6 +310,24 @@ async def test_query_indicator_data(indicator_service, sample_kline_data):
     assert all("timestamp" in item for item in result)
     assert all("value" in item for item in result)
 
+    # 列式查询：时间为 Unix 毫秒时间戳，与逐条记录一致
+    columns = await indicator_service.query_indicator_columns(
+        ticker="TEST_QUERY", indicator_name="MA5", period="1d"
+    )
+    assert columns["count"] == len(result)
+    assert columns["value"] == [item["value"] for item in result]
+    assert columns["timestamps"] == [
+        int(item["timestamp"].replace(tzinfo=UTC).timestamp() * 1000) for item in result
+    ]
+
+    # 接口响应格式：字段同 IndicatorDataResponse，时间为 ISO 8601 字符串
+    items = await indicator_service.query_indicator_items(
+        ticker="TEST_QUERY", indicator_name="MA5", period="1d"
+    )
+    assert [item["value"] for item in items] == columns["value"]
+    assert items[0]["timestamp"] == result[0]["timestamp"].isoformat()
+    assert IndicatorDataResponse(**items[0]).model_dump() == items[0]
+
 
 @pytest.mark.asyncio
 async def test_batch_calculate_indicators(indicator_service, sample_kline_data):
@@ -350,3 +369,350 @@ async def test_batch_calculate_indicators(indicator_service, sample_kline_data):
     assert any(p["stage"] == "init" for p in progress_updates)
     assert any(p["stage"] == "calculating" for p in progress_updates)
     assert any(p["stage"] == "completed" for p in progress_updates)
+
+
+def test_series_to_records_drops_nan():
+    """测试指标序列列式转换（去除 NaN，时间转换为 datetime）."""
+    import pandas as pd
+    from app.services.indicators.indicator_calculator import series_to_records, series_to_columns
+
+    index = pd.date_range("2025-01-01", periods=3, freq="D", tz="UTC")
+    series = pd.Series([float("nan"), 1.5, 2.5], index=index)
+
+    records = series_to_records(series, {"period": 2})
+
+    assert records == [
+        {"timestamp": datetime(2025, 1, 2, tzinfo=UTC), "value": 1.5, "params": {"period": 2}},
+        {"timestamp": datetime(2025, 1, 3, tzinfo=UTC), "value": 2.5, "params": {"period": 2}},
+    ]
+    assert type(records[0]["timestamp"]) is datetime
+    assert type(records[0]["value"]) is float
+    assert series_to_columns(series)["value"] == [1.5, 2.5]
+    assert series_to_records(None, {"period": 2}) == []
+
+
+@pytest.mark.asyncio
+async def test_calculate_macd_matches_rowwise(indicator_service, sample_kline_data):
+    """测试 MACD 列式转换结果与逐行转换一致（与 pandas-ta 在浮点误差范围内一致）."""
+    ta = pytest.importorskip("pandas_ta")
+
+    results = await indicator_service.calculator.calculate_macd("TEST", 12, 26, 9, sample_kline_data)
+
+    df = indicator_service.calculator._prepare_dataframe(sample_kline_data)
+    macd_df = ta.macd(df["close"], fast=12, slow=26, signal=9)
+    params = {"fast": 12, "slow": 26, "signal": 9}
+    for name, prefix in [("MACD_DIF", "MACD_"), ("MACD_DEA", "MACDs_"), ("MACD_HIST", "MACDh_")]:
+        column = next(col for col in macd_df.columns if col.startswith(prefix))
+        expected = macd_df[column][macd_df[column].notna()]
+        # 最后一条数据附带增量计算使用的 state 字段
+        assert "state" in results[name][-1]
+        assert [item["timestamp"] for item in results[name]] == [
+            timestamp.to_pydatetime() for timestamp in expected.index
+        ]
+        assert all(item["params"] == params for item in results[name])
+        assert [item["value"] for item in results[name]] == pytest.approx(
+            expected.tolist(), rel=1e-9, abs=1e-9
+        )
+
+
+@pytest.mark.asyncio
+async def test_batch_calculate_single_query_and_macd(indicator_service, sample_kline_data):
+    """测试批量计算只查询一次K线数据，MACD 只计算一次."""
+    from unittest.mock import AsyncMock, patch
+    from app.services.indicators import indicator_kernels
+
+    all_names = [item["name"] for item in indicator_service.get_supported_indicators()]
+    real_macd = indicator_kernels.macd
+
+    with patch.object(
+        indicator_service.historical_data_service,
+        "query_kline_data",
+        AsyncMock(return_value=sample_kline_data),
+    ) as mock_query, patch.object(
+        indicator_kernels, "macd", side_effect=real_macd
+    ) as mock_macd, patch.object(
+        indicator_service.storage, "upsert_indicator_data", AsyncMock()
+    ):
+        result = await indicator_service.calculate_batch_indicators(
+            ticker="TEST_BATCH", indicator_names=all_names + ["UNKNOWN"], period="1d"
+        )
+
+    assert mock_query.await_count == 1
+    assert mock_macd.call_count == 1
+    assert result["success"] == len(all_names)
+    assert result["failed"] == 1
+
+    # 与单独计算的结果一致
+    macd = await indicator_service.calculator.calculate_macd("TEST", 12, 26, 9, sample_kline_data)
+    assert result["results"]["MACD_DEA"] == macd["MACD_DEA"]
+    ma5 = await indicator_service.calculator.calculate_ma("TEST", 5, sample_kline_data)
+    assert result["results"]["MA5"] == ma5
+
+
+def test_parse_parameterized_indicator_names():
+    """测试按名称解析任意参数的指标."""
+    from app.services.indicators.indicator_registry import (
+        expand_indicator_name,
+        parse_indicator_name,
+    )
+
+    ma = parse_indicator_name("MA50")
+    assert (ma.type, ma.params, ma.output) == ("MA", {"period": 50}, "MA")
+    assert parse_indicator_name("EMA200").params == {"period": 200}
+    macd = parse_indicator_name("MACD_DIF_8_21_5")
+    assert (macd.type, macd.params, macd.output) == (
+        "MACD", {"fast": 8, "slow": 21, "signal": 5}, "MACD_DIF"
+    )
+    assert parse_indicator_name("MACD_HIST").params == {"fast": 12, "slow": 26, "signal": 9}
+    assert parse_indicator_name("BOLL_UP_20_2.5").params == {"period": 20, "std_dev": 2.5}
+    # 解析结果缓存
+    assert parse_indicator_name("MA50") is ma
+
+    assert [spec.name for spec in expand_indicator_name("BOLL_20_2.5")] == [
+        "BOLL_UP_20_2.5", "BOLL_MID_20_2.5", "BOLL_LOW_20_2.5"
+    ]
+    assert parse_indicator_name("MACD_8_21_5") is None
+    assert parse_indicator_name("KDJ_J_9_3_3").params == {"period": 9, "m1": 3, "m2": 3}
+    assert (parse_indicator_name("OBV").type, parse_indicator_name("OBV").params) == ("OBV", {})
+    assert parse_indicator_name("WR10").params == {"period": 10}
+    for invalid in (
+        "MA0", "MA", "MACD_8_21", "BOLL_UP_x_2", "KDJ9", "MACD_DIF_8_21_5_1", "MA5000", "OBV5",
+    ):
+        assert parse_indicator_name(invalid) is None, invalid
+        assert expand_indicator_name(invalid) == [], invalid
+
+
+@pytest.mark.asyncio
+async def test_batch_calculate_parameterized_indicators(indicator_service, sample_kline_data):
+    """测试批量计算任意参数的指标（多值指标整体展开为子指标）."""
+    from unittest.mock import AsyncMock, patch
+
+    with patch.object(
+        indicator_service.historical_data_service,
+        "query_kline_data",
+        AsyncMock(return_value=sample_kline_data),
+    ), patch.object(indicator_service.storage, "upsert_indicator_data", AsyncMock()):
+        result = await indicator_service.calculate_batch_indicators(
+            ticker="TEST_PARAMS",
+            indicator_names=["MA50", "EMA30", "MACD_8_21_5", "MACD_DIF_8_21_5", "BOLL_UP_10_2.5"],
+            period="1d",
+        )
+
+    calculator = indicator_service.calculator
+    assert result["total"] == 6
+    assert result["success"] == 6
+    assert result["results"]["MA50"] == await calculator.calculate_ma("TEST", 50, sample_kline_data)
+    assert result["results"]["EMA30"] == await calculator.calculate_ema("TEST", 30, sample_kline_data)
+    macd = await calculator.calculate_macd("TEST", 8, 21, 5, sample_kline_data)
+    for output in ("DIF", "DEA", "HIST"):
+        assert result["results"][f"MACD_{output}_8_21_5"] == macd[f"MACD_{output}"]
+    boll = await calculator.calculate_bollinger_bands("TEST", 10, 2.5, sample_kline_data)
+    assert result["results"]["BOLL_UP_10_2.5"] == boll["BOLL_UP"]
+
+
+@pytest.mark.asyncio
+async def test_batch_calculate_incremental(indicator_service, make_kline_data, fake_bulk_write):
+    """测试增量计算结果与全量计算一致，且只读取新K线和必要的历史窗口."""
+    from unittest.mock import AsyncMock, patch
+
+    kline_data = make_kline_data(60)
+
+    names = [
+        "MA5", "EMA12", "RSI14", "MACD_DIF", "MACD_DEA", "MACD_HIST", "BOLL_UP", "BOLL_LOW",
+        "ATR14", "KDJ_K", "KDJ_J", "OBV", "VWAP10", "CCI14", "WR14",
+    ]
+    storage = indicator_service.historical_data_service.storage
+    await storage.save_kline_data("TEST_INC", "TEST", "1d", kline_data[:50], "test")
+    await indicator_service.calculate_batch_indicators("TEST_INC", names, period="1d")
+    await indicator_service.write_queue.flush()
+
+    await storage.save_kline_data("TEST_INC", "TEST", "1d", kline_data[50:], "test")
+    history_service = indicator_service.historical_data_service
+    with patch.object(
+        history_service, "query_kline_data", AsyncMock(side_effect=AssertionError("不应全量查询"))
+    ):
+        result = await indicator_service.calculate_batch_indicators(
+            "TEST_INC", names, period="1d", incremental=True
+        )
+    await indicator_service.write_queue.flush()
+
+    assert result["success"] == len(names)
+    expected, _ = await indicator_service.calculator.calculate_batch(
+        "TEST", [{"name": name, **indicator_service._parse_indicator_name(name)} for name in names],
+        kline_data,
+    )
+    for name in names:
+        new_points = result["results"][name]
+        assert len(new_points) == 10, name
+        for actual, full in zip(new_points, expected[name][-10:]):
+            assert actual["value"] == pytest.approx(full["value"], rel=1e-9), name
+
+    # 新的最后一条数据带有下一次增量计算需要的状态
+    latest = await indicator_service.query.get_latest_record("TEST_INC", "RSI14", "1d")
+    assert set(latest["state"]) == {"avg_gain", "avg_loss", "close"}
+    latest = await indicator_service.query.get_latest_record("TEST_INC", "KDJ_K", "1d")
+    assert set(latest["state"]) == {"k", "d"}
+
+
+@pytest.mark.asyncio
+async def test_market_calculate_panel_matches_per_ticker(
+    indicator_service, make_kline_data, fake_bulk_write
+):
+    """测试面板计算与逐只股票计算结果一致（股票K线长度不同），并批量写入."""
+    kline_by_ticker = {
+        ticker: make_kline_data(length, wave=3 + n)
+        for n, (ticker, length) in enumerate([("PANEL_A", 60), ("PANEL_B", 45), ("PANEL_C", 10)])
+    }
+
+    names = [
+        "MA5", "EMA12", "RSI14", "MACD_DIF", "MACD_DEA", "MACD_HIST", "BOLL_UP", "BOLL_MID",
+        "ATR14", "KDJ_D", "OBV", "VWAP20", "CCI14", "WR14",
+    ]
+    indicators = [
+        {"name": name, **indicator_service._parse_indicator_name(name)} for name in names
+    ]
+    calculator = indicator_service.calculator
+    panel_results, errors = await calculator.calculate_panel(indicators, kline_by_ticker)
+    assert not errors
+    for ticker, kline_data in kline_by_ticker.items():
+        expected, _ = await calculator.calculate_batch(ticker, indicators, kline_data)
+        for name in names:
+            actual = panel_results[ticker].get(name, [])
+            assert len(actual) == len(expected[name]), (ticker, name)
+            for a, e in zip(actual, expected[name]):
+                assert a["timestamp"] == e["timestamp"]
+                assert a["value"] == pytest.approx(e["value"], rel=1e-9), (ticker, name)
+
+    storage = indicator_service.historical_data_service.storage
+    for ticker, kline_data in kline_by_ticker.items():
+        await storage.save_kline_data(ticker, "TEST", "1d", kline_data, "test")
+    result = await indicator_service.calculate_market_indicators(
+        ["MA5", "RSI14", "ATR14", "UNKNOWN"], period="1d", tickers=list(kline_by_ticker)
+    )
+
+    assert result["total"] == 3
+    assert result["success"] == 3
+    assert result["invalid_indicators"] == ["UNKNOWN"]
+    stored = await indicator_service.query.query_by_indicator("PANEL_B", "MA5", "1d")
+    assert len(stored) == 41
+    stored = await indicator_service.query.query_by_indicator("PANEL_B", "ATR14", "1d")
+    assert len(stored) == 32
+
+
+@pytest.mark.asyncio
+async def test_calculator_executor_modes_match_inline(indicator_service, sample_kline_data):
+    """测试进程池 / 线程池计算结果与直接计算一致，小数据量不提交到进程池."""
+    from app.services.indicators.indicator_calculator import IndicatorCalculator
+    from app.services.indicators.indicator_executor import IndicatorExecutor
+
+    names = ["MA5", "EMA12", "RSI14", "MACD_DIF", "MACD_DEA", "MACD_HIST", "BOLL_UP", "BOLL_LOW"]
+    indicators = [
+        {"name": name, **indicator_service._parse_indicator_name(name)} for name in names
+    ]
+    inline = IndicatorCalculator(backend="numpy", executor=IndicatorExecutor("inline"))
+    expected, _ = await inline.calculate_batch("TEST", indicators, sample_kline_data)
+
+    for mode in ("process", "thread"):
+        executor = IndicatorExecutor(mode, max_workers=2, min_rows=0)
+        calculator = IndicatorCalculator(backend="numpy", executor=executor)
+        try:
+            results, errors = await calculator.calculate_batch("TEST", indicators, sample_kline_data)
+            macd = await calculator.calculate_macd("TEST", 12, 26, 9, sample_kline_data)
+        finally:
+            executor.shutdown()
+        assert not errors
+        assert results == expected, mode
+        assert macd["MACD_DEA"] == expected["MACD_DEA"]
+        assert executor.get_metrics()["submitted"] == 2
+
+    executor = IndicatorExecutor("process", min_rows=10 ** 9)
+    await IndicatorCalculator(backend="numpy", executor=executor).calculate_batch(
+        "TEST", indicators, sample_kline_data
+    )
+    assert executor.get_metrics()["submitted"] == 0
+    assert executor.get_metrics()["inline"] == 1
+
+
+def test_missing_ranges():
+    """测试覆盖范围的缺失子区间计算."""
+    from app.services.indicators.indicator_coverage import merge_intervals, missing_ranges
+
+    day = lambda n: datetime(2025, 1, 1) + timedelta(days=n)  # noqa: E731
+    intervals = [(day(10), day(20)), (day(15), day(30)), (day(40), day(50))]
+    assert merge_intervals(intervals) == [(day(10), day(30)), (day(40), day(50))]
+    assert missing_ranges(intervals, day(12), day(25)) == []
+    assert missing_ranges(intervals, day(0), day(45)) == [(day(0), day(10)), (day(30), day(40))]
+    assert missing_ranges(intervals, None, None) == [
+        (None, day(10)), (day(30), day(40)), (day(50), None)
+    ]
+    assert missing_ranges([], day(1).replace(tzinfo=UTC), None) == [(day(1), None)]
+
+
+@pytest.mark.asyncio
+async def test_indicator_cache_computes_missing_ranges(
+    indicator_service, make_kline_data, fake_bulk_write
+):
+    """测试缓存只计算未覆盖的子区间，结果与全量计算一致，写入后记录覆盖范围."""
+    from unittest.mock import AsyncMock, patch
+
+    base_date = datetime(2025, 1, 1)
+    kline_data = make_kline_data(70, base_date=base_date)
+    day = lambda n: base_date + timedelta(days=n)  # noqa: E731
+
+    storage = indicator_service.historical_data_service.storage
+    calculator = indicator_service.calculator
+    expected_ma = {r["timestamp"]: r["value"] for r in await calculator.calculate_ma("T", 5, kline_data[:60])}
+    expected_ema = {r["timestamp"]: r["value"] for r in await calculator.calculate_ema("T", 12, kline_data)}
+
+    await storage.save_kline_data("TEST_COV", "TEST", "1d", kline_data[:60], "test")
+
+    # 部分区间：MA 只读取 period - 1 根预热K线，EMA 从最早的K线递推
+    for name, indicator_type, params in [("MA5", "MA", {"period": 5}), ("EMA12", "EMA", {"period": 12})]:
+        result = await indicator_service.calculate_indicator(
+            "TEST_COV", indicator_type, name, "1d", params, start_date=day(20), end_date=day(30)
+        )
+        assert [r["timestamp"] for r in result] == [day(n) for n in range(20, 31)]
+    await indicator_service.write_queue.flush()
+    assert await indicator_service.coverage.get_intervals("TEST_COV", "1d", "MA5", {"period": 5}) == [
+        (day(20), day(30))
+    ]
+
+    # 扩大区间：只计算未覆盖的两段，与已保存的数据合并
+    with patch.object(
+        indicator_service, "_calculate_range", wraps=indicator_service._calculate_range
+    ) as calculate_range:
+        result = await indicator_service.calculate_indicator(
+            "TEST_COV", "MA", "MA5", "1d", {"period": 5}, start_date=day(10)
+        )
+    assert [call.args[5:7] for call in calculate_range.call_args_list] == [
+        (day(10), day(20)), (day(30), None)
+    ]
+    assert {r["timestamp"]: r["value"] for r in result} == pytest.approx(
+        {ts: v for ts, v in expected_ma.items() if ts >= day(10)}
+    )
+    await indicator_service.write_queue.flush()
+
+    # 已全部覆盖：直接读取已保存的数据
+    with patch.object(indicator_service, "_calculate_range", AsyncMock()) as calculate_range:
+        cached = await indicator_service.calculate_indicator(
+            "TEST_COV", "MA", "MA5", "1d", {"period": 5}, start_date=day(10)
+        )
+    calculate_range.assert_not_called()
+    assert len(cached) == len(result)
+
+    # 新K线：EMA 从已保存的最后一条数据的状态继续计算，不读取全部历史
+    await indicator_service.calculate_indicator("TEST_COV", "EMA", "EMA12", "1d", {"period": 12})
+    await indicator_service.write_queue.flush()
+    await storage.save_kline_data("TEST_COV", "TEST", "1d", kline_data[60:], "test")
+    with patch.object(
+        indicator_service.historical_data_service,
+        "query_kline_data",
+        AsyncMock(side_effect=AssertionError("不应全量查询")),
+    ):
+        result = await indicator_service.calculate_indicator(
+            "TEST_COV", "EMA", "EMA12", "1d", {"period": 12}
+        )
+    await indicator_service.write_queue.flush()
+
+    assert {r["timestamp"]: r["value"] for r in result} == pytest.approx(expected_ema)
+    assert indicator_service.write_queue.get_metrics()["pending"] == 0
@@ -128,7 +128,7 @@ class TestIndicatorsRouter:
         ]
 
         with patch("app.routers.indicators.get_indicator_service") as mock_service:
-            mock_service.return_value.query_indicator_data = AsyncMock(
+            mock_service.return_value.query_indicator_items = AsyncMock(
                 return_value=mock_data
             )
 
@@ -152,7 +152,7 @@ class TestIndicatorsRouter:
         ]
 
         with patch("app.routers.indicators.get_indicator_service") as mock_service:
-            mock_service.return_value.query_indicator_data = AsyncMock(
+            mock_service.return_value.query_indicator_items = AsyncMock(
                 return_value=mock_data
             )
 
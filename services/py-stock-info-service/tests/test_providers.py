@@ -97,6 +97,61 @@ class TestAkshareProvider:
 
             assert result is True
 
+    @pytest.mark.asyncio
+    async def test_fetch_multiple_a_stocks_spot_cache(self, provider):
+        """测试批量查询复用全市场行情快照."""
+        import pandas as pd
+        provider.a_spot_cache.invalidate()
+        mock_df = pd.DataFrame({
+            "代码": ["000001", "000002", "600000"],
+            "名称": ["平安银行", "万科A", "浦发银行"],
+            "最新价": [10.5, 8.2, 7.3],
+        })
+        with patch("app.services.providers.akshare_provider.ak.stock_zh_a_spot_em") as mock_spot:
+            mock_spot.return_value = mock_df
+
+            result1 = await provider.fetch_multiple_stocks(["000001", "600000"], market="A股")
+            result2 = await provider.fetch_multiple_stocks(["000002"], market="A股")
+
+            # TTL 内只下载一次
+            assert mock_spot.call_count == 1
+            assert result1["000001"]["name"] == "平安银行"
+            assert result1["600000"]["ticker"] == "600000"
+            assert result2["000002"]["name"] == "万科A"
+        provider.a_spot_cache.invalidate()
+
+    def test_spot_cache_single_flight(self):
+        """测试并发刷新时只下载一次."""
+        import threading
+        import time
+        import pandas as pd
+        from app.services.providers.spot_cache import SpotTableCache
+
+        def loader():
+            time.sleep(0.05)
+            return pd.DataFrame({"代码": ["00700", " 09988 "], "名称": ["腾讯控股", "阿里巴巴"]})
+
+        cache = SpotTableCache("test", loader, ttl=60)
+        snapshots = []
+        threads = [
+            threading.Thread(target=lambda: snapshots.append(cache.get_snapshot()))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert cache.downloads == 1
+        assert all(s is snapshots[0] for s in snapshots)
+        assert snapshots[0].get("09988")["名称"] == "阿里巴巴"
+        assert snapshots[0].get("00001") is None
+
+        # TTL 过期后重新下载
+        cache.ttl = 0
+        cache.get_snapshot()
+        assert cache.downloads == 2
+
 
 class TestYFinanceProvider:
     """YFinanceProvider 测试类."""
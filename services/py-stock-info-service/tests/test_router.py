@@ -186,3 +186,280 @@ class TestStockDataRouter:
         assert "provider2" in hk_stock_providers
         assert "provider3" in us_stock_providers
         assert "provider1" not in us_stock_providers
+
+    @pytest.mark.asyncio
+    async def test_rate_limit(self, router):
+        """测试数据源限流（令牌桶）."""
+        import time
+        provider = MockProvider("test_provider", ["A股"], priority=1)
+        router.register_provider(provider)
+        router.set_rate_limit("test_provider", rate=20, capacity=1)
+
+        start = time.monotonic()
+        for _ in range(5):
+            await router.fetch_stock_info("000001", market="A股")
+        elapsed = time.monotonic() - start
+
+        # 容量为 1，后 4 次请求每次需要等待 1/20 秒
+        assert elapsed >= 0.18
+        assert len(provider.fetch_calls) == 5
+
+        # 取消限流
+        router.set_rate_limit("test_provider", rate=0)
+        assert "test_provider" not in router.rate_limiters
+
+    @pytest.mark.asyncio
+    async def test_health_probe_cached(self, router):
+        """测试可用性探测结果按 TTL 缓存."""
+        provider = MockProvider("test_provider", ["A股"], priority=1)
+        provider.is_available = AsyncMock(return_value=True)
+        router.register_provider(provider)
+
+        for _ in range(5):
+            await router.fetch_stock_info("000001", market="A股")
+
+        # 只在首次请求时探测一次
+        assert provider.is_available.await_count == 1
+        assert len(provider.fetch_calls) == 5
+
+    @pytest.mark.asyncio
+    async def test_health_stale_probe_refreshed_in_background(self, router):
+        """测试探测结果过期后在后台刷新."""
+        import asyncio
+        provider = MockProvider("test_provider", ["A股"], priority=1)
+        provider.is_available = AsyncMock(return_value=True)
+        router.register_provider(provider)
+        router.health.configure(ttl=0)
+
+        await router.fetch_stock_info("000001", market="A股")
+        assert provider.is_available.await_count == 1
+
+        # 过期后立即使用缓存结果，并在后台发起探测
+        provider.is_available.return_value = False
+        result = await router.fetch_stock_info("000001", market="A股")
+        assert result is not None
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert provider.is_available.await_count == 2
+        assert router.health.is_healthy("test_provider") is False
+        await router.health.stop()
+
+    @pytest.mark.asyncio
+    async def test_passive_health(self, router):
+        """测试根据最近调用结果跳过不健康的数据源."""
+        provider1 = MockProvider("provider1", ["A股"], priority=1)
+        provider2 = MockProvider("provider2", ["A股"], priority=2)
+        router.register_provider(provider1)
+        router.register_provider(provider2)
+        router.health.configure(window_size=5, min_samples=5, min_success_rate=0.5)
+        router.configure_failover(adaptive_ordering=False)
+
+        # 返回空结果（不覆盖该股票）不算失败
+        provider1._available = False
+        provider1.is_available = AsyncMock(return_value=True)
+        for _ in range(10):
+            await router.fetch_stock_info("000001", market="A股")
+        assert len(provider1.fetch_calls) == 10
+        assert router.health.is_healthy("provider1") is True
+
+        # provider1 连续抛出异常，直到被标记为不健康
+        provider1.fetch_stock_info = AsyncMock(side_effect=Exception("timeout"))
+        for _ in range(5):
+            await router.fetch_stock_info("000001", market="A股")
+        assert provider1.fetch_stock_info.await_count == 5
+        assert router.health.is_healthy("provider1") is False
+
+        # 之后的请求直接跳过 provider1
+        result = await router.fetch_stock_info("000001", market="A股")
+        assert result["data_source"] == "provider2"
+        assert provider1.fetch_stock_info.await_count == 5
+
+        # 主动探测成功后重新尝试
+        await router.health.probe("provider1")
+        assert router.health.is_healthy("provider1") is True
+        snapshot = router.health.snapshot("provider1")
+        assert snapshot["probe_ok"] is True
+        assert snapshot["recent_calls"] == 0
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker(self, router):
+        """测试连续失败后熔断，恢复超时后放行试探请求."""
+        provider1 = MockProvider("provider1", ["A股"], priority=1)
+        provider2 = MockProvider("provider2", ["A股"], priority=2)
+        router.register_provider(provider1)
+        router.register_provider(provider2)
+        router.configure_failover(failure_threshold=3, recovery_timeout=60)
+
+        provider1.fetch_stock_info = AsyncMock(side_effect=Exception("timeout"))
+        for _ in range(5):
+            result = await router.fetch_stock_info("000001", market="A股")
+            assert result["data_source"] == "provider2"
+
+        # 连续失败 3 次后熔断，之后不再请求 provider1
+        assert provider1.fetch_stock_info.await_count == 3
+        assert router.breakers["provider1"].state == "open"
+
+        # 恢复超时后进入半开状态，试探成功后关闭
+        router.breakers["provider1"].opened_at -= 60
+        assert router.breakers["provider1"].state == "half_open"
+        provider1.fetch_stock_info = AsyncMock(
+            return_value={"ticker": "000001", "data_source": "provider1"}
+        )
+        result = await router.fetch_stock_info("000001", market="A股")
+        assert result["data_source"] == "provider1"
+        assert router.breakers["provider1"].state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_ignores_empty_results(self, router):
+        """测试数据源不覆盖的股票（返回空结果）不触发熔断."""
+        akshare = MockProvider("akshare", ["A股"], priority=1)
+        yfinance = MockProvider("yfinance", ["美股"], priority=2)
+        router.register_provider(akshare)
+        router.register_provider(yfinance)
+        router.configure_failover(failure_threshold=3, recovery_timeout=60)
+
+        async def a_share_only(ticker, market=None):
+            akshare.fetch_calls.append((ticker, market))
+            return {"ticker": ticker, "data_source": "akshare"} if ticker.isdigit() else None
+
+        akshare.fetch_stock_info = a_share_only
+        for ticker in ["AAPL", "MSFT", "NVDA", "GOOG", "AMZN"]:
+            result = await router.fetch_stock_info(ticker)
+            assert result["data_source"] == "yfinance"
+
+        snapshot = router.breakers["akshare"].snapshot()
+        assert snapshot["state"] == "closed"
+        assert snapshot["consecutive_failures"] == 0
+        result = await router.fetch_stock_info("000001")
+        assert result["data_source"] == "akshare"
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_all_open(self, router):
+        """测试所有数据源都熔断时仍然尝试请求."""
+        provider = MockProvider("test_provider", ["A股"], priority=1)
+        router.register_provider(provider)
+        router.configure_failover(failure_threshold=1, recovery_timeout=60)
+
+        provider.fetch_stock_info = AsyncMock(side_effect=Exception("timeout"))
+        await router.fetch_stock_info("000001", market="A股")
+        assert router.breakers["test_provider"].state == "open"
+
+        del provider.fetch_stock_info
+        result = await router.fetch_stock_info("000001", market="A股")
+        assert result is not None
+        assert router.breakers["test_provider"].state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_adaptive_ordering(self, router):
+        """测试根据最近成功率和 p95 延迟调整数据源顺序."""
+        import asyncio
+        provider1 = MockProvider("provider1", ["A股"], priority=1)
+        provider2 = MockProvider("provider2", ["A股"], priority=2)
+        router.register_provider(provider1)
+        router.register_provider(provider2)
+        router.configure_failover(adaptive_min_samples=2)
+
+        # 样本不足时按优先级
+        assert router.get_market_order()["A股"] == ["provider1", "provider2"]
+
+        async def slow_fetch(ticker, market=None):
+            await asyncio.sleep(0.02)
+            return {"ticker": ticker, "data_source": "provider1"}
+
+        provider1.fetch_stock_info = slow_fetch
+        for _ in range(2):
+            await router.fetch_stock_info("000001", market="A股")
+            await router.fetch_stock_info("000001", market="A股", preferred_provider="provider2")
+
+        # provider2 同样成功但延迟更低，排到前面
+        assert router.get_market_order()["A股"] == ["provider2", "provider1"]
+        result = await router.fetch_stock_info("000001", market="A股")
+        assert result["data_source"] == "provider2"
+
+        status = router.get_status()
+        assert status["provider1"]["circuit_breaker"]["state"] == "closed"
+        assert status["provider1"]["markets"]["A股"]["calls"] == 2
+        assert status["provider1"]["markets"]["A股"]["success_rate"] == 1.0
+
+        # 关闭自适应排序后恢复静态优先级
+        router.configure_failover(adaptive_ordering=False)
+        assert router.get_market_order()["A股"] == ["provider1", "provider2"]
+
+    @pytest.mark.asyncio
+    async def test_single_flight(self, router):
+        """测试并发的相同请求只调用一次上游."""
+        import asyncio
+        provider = MockProvider("test_provider", ["A股"], priority=1)
+        router.register_provider(provider)
+
+        async def slow_fetch(ticker, market=None):
+            provider.fetch_calls.append((ticker, market))
+            await asyncio.sleep(0.02)
+            return {"ticker": ticker, "data_source": "test_provider"}
+
+        provider.fetch_stock_info = slow_fetch
+        results = await asyncio.gather(
+            *(router.fetch_stock_info("000001", market="A股") for _ in range(5)),
+            router.fetch_stock_info("000002", market="A股"),
+        )
+
+        assert len(provider.fetch_calls) == 2
+        assert all(r["ticker"] == "000001" for r in results[:5])
+        # 每个调用方拿到独立副本
+        assert results[0] is not results[1]
+        metrics = router.single_flight.get_metrics()
+        assert metrics["calls"] == 6
+        assert metrics["executed"] == 2
+        assert metrics["coalesced"] == 4
+        assert metrics["in_flight"] == 0
+
+        # 请求完成后不再合并
+        await router.fetch_stock_info("000001", market="A股")
+        assert len(provider.fetch_calls) == 3
+
+
+class TestProviderExecutor:
+    """ProviderExecutor 测试类."""
+
+    @pytest.mark.asyncio
+    async def test_run_and_metrics(self):
+        """测试线程池执行与统计."""
+        import asyncio
+        import threading
+        from app.services.providers.executor import ProviderExecutor, ExecutorFullError
+
+        executor = ProviderExecutor("test", max_workers=1, max_queue=1)
+        release = threading.Event()
+
+        # 1 个执行中 + 1 个排队，第 3 个被拒绝
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        queued = asyncio.ensure_future(executor.run(lambda: "done"))
+        await asyncio.sleep(0.05)
+        metrics = executor.get_metrics()
+        assert metrics["active"] == 1
+        assert metrics["queued"] == 1
+
+        with pytest.raises(ExecutorFullError):
+            await executor.run(lambda: None)
+        assert executor.get_metrics()["rejected"] == 1
+
+        release.set()
+        assert await running is True
+        assert await queued == "done"
+        metrics = executor.get_metrics()
+        assert metrics["active"] == 0
+        assert metrics["queued"] == 0
+        assert metrics["completed"] == 2
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_provider_uses_own_executor(self):
+        """测试数据源在专用线程池中执行同步调用."""
+        import threading
+        from app.services.providers.executor import get_executor_metrics
+
+        provider = MockProvider("executor_provider", ["A股"])
+        thread_name = await provider.run_blocking(lambda: threading.current_thread().name)
+
+        assert thread_name.startswith("provider-executor_provider")
+        assert get_executor_metrics()["executor_provider"]["completed"] == 1
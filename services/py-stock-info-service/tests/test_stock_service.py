@@ -493,3 +493,127 @@ class TestStockService:
         assert result["total"] == 2
         assert result["success"] == 2
         assert result["failed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_update_stocks_bounded_concurrency(self, stock_service):
+        """测试批量更新股票（有界并发，结果顺序与输入一致）."""
+        import asyncio
+        from unittest.mock import Mock, AsyncMock
+        in_flight = 0
+        max_in_flight = 0
+
+        async def mock_fetch(ticker):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if ticker == "FAIL":
+                return None
+            return {"ticker": ticker, "name": f"Stock {ticker}", "data_source": "yfinance"}
+
+        mock_router = Mock()
+        mock_router.fetch_stock_info = AsyncMock(side_effect=mock_fetch)
+        stock_service.router = mock_router
+
+        tickers = [f"T{i:02d}" for i in range(10)] + ["FAIL"]
+        result = await stock_service.batch_update_stocks(tickers, concurrency=3)
+
+        assert result["total"] == 11
+        assert result["success"] == 10
+        assert result["failed"] == 1
+        assert [r["ticker"] for r in result["results"]] == tickers
+        assert result["results"][-1]["status"] == "failed"
+        assert 1 < max_in_flight <= 3
+
+    @pytest.fixture
+    def bulk_write_calls(self, stock_service):
+        """用逐条 update_one 模拟 bulk_write（mongomock 不完全支持 bulk_write 的 UpdateOne）."""
+        calls = []
+
+        async def fake_bulk_write(collection, operations, ordered=True):
+            calls.append(len(operations))
+            for op in operations:
+                await collection.update_one(op._filter, op._doc, upsert=op._upsert)
+
+        with patch.object(type(stock_service.collection), "bulk_write", new=fake_bulk_write):
+            yield calls
+
+    @pytest.mark.asyncio
+    async def test_bulk_upsert_stocks(self, stock_service, sample_stock, bulk_write_calls):
+        """测试批量 upsert 股票（分批 bulk_write）."""
+        # 已存在的股票应保留 created_at
+        await stock_service.upsert_stock(sample_stock)
+        existing = await stock_service.collection.find_one({"ticker": "AAPL"})
+
+        stocks = [
+            {**sample_stock, "ticker": "aapl", "name": "Apple Inc. Updated"},
+            {**sample_stock, "ticker": "GOOGL", "name": "Google"},
+            {"ticker": "BROKEN"},  # 缺少 name 字段
+            {**sample_stock, "ticker": "MSFT", "name": "Microsoft"},
+        ]
+        batches = []
+
+        async def on_batch(processed, batch_results):
+            batches.append(processed)
+
+        results = await stock_service.bulk_upsert_stocks(
+            stocks, batch_size=2, progress_callback=on_batch
+        )
+
+        assert [r["ticker"] for r in results] == ["AAPL", "GOOGL", "BROKEN", "MSFT"]
+        assert [r["status"] for r in results] == ["success", "success", "failed", "success"]
+        assert batches == [2, 4]
+        # 每批一次 bulk_write
+        assert bulk_write_calls == [2, 1]
+
+        assert await stock_service.collection.count_documents({}) == 3
+        updated = await stock_service.collection.find_one({"ticker": "AAPL"})
+        assert updated["name"] == "Apple Inc. Updated"
+        assert updated["created_at"] == existing["created_at"]
+        inserted = await stock_service.collection.find_one({"ticker": "GOOGL"})
+        assert inserted["created_at"] is not None
+
+    @pytest.mark.asyncio
+    async def test_bulk_upsert_stocks_write_errors(self, stock_service, sample_stock):
+        """测试批量 upsert 部分写入失败时按股票标记失败."""
+        from pymongo.errors import BulkWriteError
+
+        error = BulkWriteError({"writeErrors": [{"index": 1, "errmsg": "duplicate key"}]})
+        with patch.object(
+            type(stock_service.collection), "bulk_write", new=AsyncMock(side_effect=error)
+        ):
+            results = await stock_service.bulk_upsert_stocks([
+                {**sample_stock, "ticker": "AAPL"},
+                {**sample_stock, "ticker": "GOOGL"},
+                {**sample_stock, "ticker": "MSFT"},
+            ])
+
+        assert [r["status"] for r in results] == ["success", "failed", "success"]
+
+    @pytest.mark.asyncio
+    async def test_fetch_and_save_all_stocks_from_provider_bulk(self, stock_service, bulk_write_calls):
+        """测试全量拉取时使用批量保存."""
+        from unittest.mock import Mock, AsyncMock
+        mock_router = Mock()
+        mock_router.fetch_all_tickers = AsyncMock(return_value=["000001", "000002", "000003"])
+        mock_router.fetch_multiple_stocks = AsyncMock(return_value={
+            "000001": {"ticker": "000001", "name": "平安银行", "data_source": "akshare"},
+            "000002": None,
+            "000003": {"ticker": "000003", "name": "测试", "data_source": "akshare"},
+        })
+        stock_service.router = mock_router
+
+        result = await stock_service.fetch_and_save_all_stocks_from_provider(
+            market="A股", delay=0
+        )
+
+        assert result["total"] == 3
+        assert result["save_success"] == 2
+        assert result["save_failed"] == 1
+        assert result["results"] == [
+            {"ticker": "000001", "status": "success"},
+            {"ticker": "000002", "status": "failed"},
+            {"ticker": "000003", "status": "success"},
+        ]
+        assert await stock_service.collection.count_documents({}) == 2